@@ -0,0 +1,199 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz Kabul Kontrolü
+Analiz kuyruğa alınmadan önce bellek maliyeti, yüklemede kaydedilen dosya
+boyutları ve görsel ölçülerinden tahmin edilir; mevcut bellek payı ve kuyruk
+derinliğiyle karşılaştırılarak iş kabul edilir, düşük bellek ayarlarıyla
+çalışacak şekilde düşürülür veya Retry-After ile reddedilir.
+"""
+
+import math
+import logging
+from typing import Dict, Optional
+
+import psutil
+
+from .config import settings
+from .database import get_analysis_files
+from .job_queue import JobQueue, job_queue, JOB_PENDING, JOB_RUNNING
+from .executor import AnalysisExecutor, analysis_executor
+from .constants import LOW_MEMORY_PROCESSING, RGB_WORKING_COPIES, MULTISPECTRAL_DERIVED_BANDS
+
+logger = logging.getLogger(__name__)
+
+KARAR_KABUL = "kabul"
+KARAR_DUSUR = "dusur"
+KARAR_REDDET = "reddet"
+
+MB = 1024 * 1024
+
+class AdmissionController:
+    """Analiz başlatma isteklerini bellek ve kuyruk durumuna göre değerlendirir"""
+
+    def __init__(self, queue: JobQueue, executor: AnalysisExecutor, enabled: bool = True,
+                 max_queue_depth: int = 20, memory_reserve_percent: float = 15.0,
+                 model_overhead_mb: float = 512.0, unknown_expansion: float = 10.0,
+                 retry_after: int = 30):
+        self.queue = queue
+        self.executor = executor
+        self.enabled = enabled
+        self.max_queue_depth = max(1, max_queue_depth)
+        self.memory_reserve_percent = min(max(memory_reserve_percent, 0.0), 90.0)
+        self.model_overhead = model_overhead_mb * MB
+        self.unknown_expansion = max(1.0, unknown_expansion)
+        self.retry_after = max(1, retry_after)
+        self._stats = {KARAR_KABUL: 0, KARAR_DUSUR: 0, KARAR_REDDET: 0, 'reddet_nedenleri': {}}
+        self._son_karar: Optional[Dict] = None
+
+    def file_cost(self, dosya: Dict) -> int:
+        """Tek dosyanın işlenirken bellekte kapladığı tahmini bayt"""
+        genislik, yukseklik = dosya.get('genislik'), dosya.get('yukseklik')
+        if genislik and yukseklik:
+            if dosya.get('dosya_tipi') == "RGB":
+                return genislik * yukseklik * 3 * RGB_WORKING_COPIES
+            # Multispektral bantlar ve indeksler float64 olarak tutulur
+            bantlar = (dosya.get('bant_sayisi') or 1) + MULTISPECTRAL_DERIVED_BANDS
+            return genislik * yukseklik * bantlar * 8
+        # Ölçüleri okunamayan dosya: sıkıştırılmış boyuttan kaba tahmin
+        return int(dosya.get('dosya_boyutu', 0) * self.unknown_expansion)
+
+    def estimate(self, analiz_id: str) -> Dict:
+        """Analizin normal ve düşük bellek ayarlarıyla tahmini tepe bellek kullanımı
+
+        RGB dosyaları işleme hattında aynı anda en fazla (kuyruk + batch) kadar
+        bellekte bulunur; multispektral dosyalar tek tek işlenir.
+        """
+        dosyalar = get_analysis_files(analiz_id)
+        rgb = sorted((self.file_cost(d) for d in dosyalar if d.get('dosya_tipi') == "RGB"), reverse=True)
+        multispektral = max((self.file_cost(d) for d in dosyalar if d.get('dosya_tipi') != "RGB"), default=0)
+
+        normal_eszamanli = max(1, settings.PIPELINE_QUEUE_SIZE + settings.INFERENCE_BATCH_SIZE)
+        dusuk_eszamanli = LOW_MEMORY_PROCESSING['queue_size'] + LOW_MEMORY_PROCESSING['batch_size']
+
+        return {
+            'dosya_sayisi': len(dosyalar),
+            'olcusu_bilinmeyen': sum(1 for d in dosyalar if not (d.get('genislik') and d.get('yukseklik'))),
+            'tahmini_bayt': int(self.model_overhead + max(sum(rgb[:normal_eszamanli]), multispektral)),
+            'dusuk_bellek_bayt': int(self.model_overhead + max(sum(rgb[:dusuk_eszamanli]), multispektral))
+        }
+
+    def memory(self) -> Dict:
+        """Anlık bellek durumu; yedek pay her zaman boş bırakılır"""
+        bellek = psutil.virtual_memory()
+        yedek = bellek.total * self.memory_reserve_percent / 100
+        return {
+            'toplam_bayt': bellek.total,
+            'bos_bayt': bellek.available,
+            'pay_bayt': int(bellek.available - yedek),  # Şu an başlayacak bir iş için
+            'kullanilabilir_bayt': int(bellek.total - yedek)  # Diğer işler bittiğinde
+        }
+
+    def queue_depth(self) -> int:
+        stats = self.queue.get_stats()
+        return stats[JOB_PENDING] + stats[JOB_RUNNING]
+
+    def retry_after_seconds(self, derinlik: int) -> int:
+        """Kuyruğun boşalması için tahmini bekleme (ortalama analiz süresinden)"""
+        stats = self.executor.get_stats()
+        tahmin = stats['avg_duration'] * derinlik / max(1, stats['max_concurrent'])
+        return max(self.retry_after, int(math.ceil(tahmin)))
+
+    def evaluate(self, analiz_id: str) -> Dict:
+        """Analiz için kabul kararı
+
+        karar: kabul (normal ayarlarla kuyruğa), dusur (düşük bellek ayarlarıyla
+        kuyruğa) veya reddet (durum_kodu ve varsa retry_after ile)
+        """
+        if not self.enabled:
+            return self._karar(KARAR_KABUL, "kapali", "Kabul kontrolü kapalı")
+
+        derinlik = self.queue_depth()
+        tahmin = self.estimate(analiz_id)
+        bellek = self.memory()
+        ayrinti = {'kuyruk_derinligi': derinlik, 'tahmin': tahmin, 'bellek': bellek}
+
+        if derinlik >= self.max_queue_depth:
+            return self._karar(KARAR_REDDET, "kuyruk_dolu",
+                               f"Analiz kuyruğu dolu ({derinlik}/{self.max_queue_depth})",
+                               durum_kodu=429, retry_after=self.retry_after_seconds(derinlik), **ayrinti)
+
+        if tahmin['dusuk_bellek_bayt'] > bellek['kullanilabilir_bayt']:
+            return self._karar(KARAR_REDDET, "cok_buyuk",
+                               f"Analiz için gereken bellek ({tahmin['dusuk_bellek_bayt'] // MB} MB) "
+                               f"sistemin ayırabileceğinden ({bellek['kullanilabilir_bayt'] // MB} MB) fazla",
+                               durum_kodu=413, **ayrinti)
+
+        if tahmin['tahmini_bayt'] <= bellek['pay_bayt']:
+            return self._karar(KARAR_KABUL, "bellek_yeterli", "Analiz kabul edildi", **ayrinti)
+
+        if tahmin['dusuk_bellek_bayt'] <= bellek['pay_bayt']:
+            return self._karar(KARAR_DUSUR, "bellek_dar",
+                               "Bellek payı dar; analiz düşük bellek ayarlarıyla çalışacak", **ayrinti)
+
+        if derinlik > 0:
+            # Kuyruktaki işler bittikçe bellek boşalır; iş başlarken tekrar değerlendirilir
+            if tahmin['tahmini_bayt'] <= bellek['kullanilabilir_bayt']:
+                return self._karar(KARAR_KABUL, "kuyrukta_bekleyecek",
+                                   "Analiz bellek boşaldığında başlayacak", **ayrinti)
+            return self._karar(KARAR_DUSUR, "kuyrukta_bekleyecek",
+                               "Analiz bellek boşaldığında düşük bellek ayarlarıyla başlayacak", **ayrinti)
+
+        # Bellek kuyruk dışındaki bir süreç tarafından kullanılıyor
+        return self._karar(KARAR_REDDET, "bellek_yetersiz",
+                           f"Yetersiz bellek (boş: {bellek['bos_bayt'] // MB} MB, "
+                           f"gereken: {tahmin['dusuk_bellek_bayt'] // MB} MB)",
+                           durum_kodu=503, retry_after=self.retry_after, **ayrinti)
+
+    def should_degrade(self, analiz_id: str) -> bool:
+        """İş başlarken bellek payı normal ayarlara yetmiyor mu?"""
+        if not self.enabled:
+            return False
+        return self.estimate(analiz_id)['tahmini_bayt'] > self.memory()['pay_bayt']
+
+    def can_start(self) -> bool:
+        """Yedek bellek payı korunuyorsa yeni iş talep edilebilir (iş kuyruğu runner'ı için)"""
+        if not self.enabled:
+            return True
+        return self.memory()['pay_bayt'] > 0
+
+    def _karar(self, karar: str, neden: str, mesaj: str, durum_kodu: int = 202,
+               retry_after: Optional[int] = None, **ayrinti) -> Dict:
+        sonuc = {
+            'karar': karar,
+            'neden': neden,
+            'mesaj': mesaj,
+            'durum_kodu': durum_kodu,
+            'retry_after': retry_after,
+            'dusuk_bellek': karar == KARAR_DUSUR
+        }
+        sonuc.update(ayrinti)
+
+        self._stats[karar] += 1
+        if karar == KARAR_REDDET:
+            nedenler = self._stats['reddet_nedenleri']
+            nedenler[neden] = nedenler.get(neden, 0) + 1
+            logger.warning(f"Analiz reddedildi: {mesaj}")
+        self._son_karar = sonuc
+        return sonuc
+
+    def get_stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats['reddet_nedenleri'] = dict(self._stats['reddet_nedenleri'])
+        stats.update({
+            'enabled': self.enabled,
+            'max_queue_depth': self.max_queue_depth,
+            'memory_reserve_percent': self.memory_reserve_percent,
+            'son_karar': self._son_karar
+        })
+        return stats
+
+# Global admission controller instance
+admission_controller = AdmissionController(
+    job_queue,
+    analysis_executor,
+    enabled=settings.ADMISSION_CONTROL_ENABLED,
+    max_queue_depth=settings.ADMISSION_MAX_QUEUE_DEPTH,
+    memory_reserve_percent=settings.ADMISSION_MEMORY_RESERVE_PERCENT,
+    model_overhead_mb=settings.ADMISSION_MODEL_OVERHEAD_MB,
+    unknown_expansion=settings.ADMISSION_UNKNOWN_EXPANSION,
+    retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS
+)
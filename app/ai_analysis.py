@@ -7,21 +7,53 @@ from typing import Dict, List, Tuple, Optional
 import logging
 import torch
 from datetime import datetime
+import time
 import gc
 import psutil
+import threading
 
 from .gpu_detector import gpu_detector
+from .model_registry import model_registry
+from .detections import Detections
+from .tiling import TiledInference
+from .pipeline import StagedPipeline
+from .inference_backends import (
+    BACKEND_ONNXRUNTIME, InferenceBackend, UltralyticsBackend, OnnxRuntimeBackend
+)
+from .models import model_manager
+from .detection_cache import detection_cache, KIND_RGB, KIND_MULTISPECTRAL
+from .checkpoint import analysis_checkpoints, dosya_imzasi, ayar_imzasi, TUR_RGB, TUR_MULTISPECTRAL
+from .system_monitor import system_monitor
+from .analysis_log import analysis_logs
+from .progress import publish_progress
+from .cancellation import CancelToken, AnalysisCancelled
+from .instrumentation import (
+    AnalysisInstrumentation, analysis_metrics, ASAMA_MODEL_YUKLEME, ASAMA_DOSYA_LISTELEME, ASAMA_OKUMA,
+    ASAMA_CIKARIM, ASAMA_SON_ISLEME, ASAMA_ISARETLEME, ASAMA_YAZMA, ASAMA_BANT_OKUMA, ASAMA_INDEKS,
+    ASAMA_GEOJSON, ASAMA_BELLEK_TEMIZLIGI
+)
 from .constants import *
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# Basit multispektral hesaplamanın sürümü; hesaplama değişirse önbellek kayıtları geçersizleşir
+MULTISPECTRAL_BASIC_VERSION = "ms-basic-v1"
+
 class ZeytinAnalizci:
     def __init__(self):
         self.yolo_model = None
+        self.model_path = None
+        self.backend_name = None
         self.current_device = "cpu"
         self.analysis_mode = "cpu"
         self.analysis_start_time = None
+        self.analiz_id = None
+        self.iptal: Optional[CancelToken] = None
+        self.dusuk_bellek = False
+        self.olcum = AnalysisInstrumentation()
+        # Thread modunda her yürütücü thread'i kendi model kopyalarını kullanır (bkz. executor)
+        self.model_slot = 0
         
     def set_analysis_mode(self, mode: str = "cpu"):
         """Analiz modunu ayarla"""
@@ -29,34 +61,65 @@ class ZeytinAnalizci:
         self.current_device = gpu_detector.get_optimal_device(self.analysis_mode)
         logger.info(f"Analiz modu ayarlandı: {self.analysis_mode}, cihaz: {self.current_device}")
     
+    def _yolo_yukle(self, model_path: str, device: str) -> InferenceBackend:
+        """YOLOv8 modelini diskten okuyup cihaza taşı (model_registry loader'ı)"""
+        model = YOLO(model_path)
+        model.to(device)
+        return UltralyticsBackend(model, model_path, device)
+    
+    def _onnx_yukle(self, model_path: str, device: str) -> InferenceBackend:
+        """Export edilmiş ONNX modelini ONNX Runtime (CPU) oturumu olarak aç"""
+        return OnnxRuntimeBackend(
+            model_path,
+            intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+            inter_op_threads=settings.ONNX_INTER_OP_THREADS,
+            iou_threshold=settings.INFERENCE_IOU_THRESHOLD,
+            max_detections=settings.INFERENCE_MAX_DETECTIONS,
+            image_size=settings.ONNX_IMAGE_SIZE
+        )
+    
+    def _model_getir(self, model_path: str, device: str, slot: int = 0) -> InferenceBackend:
+        """Modelin arka ucunu çöz ve önbellekten al veya yükle"""
+        backend, yuklenecek_yol = model_manager.get_inference_backend(model_path, device)
+        
+        # CPU modunda doğruluk kaybı toleransın içindeyse INT8 varyantı tercih et
+        if device == 'cpu' and self.analysis_mode == 'cpu':
+            int8_yolu = model_manager.get_quantized_variant(model_path)
+            if int8_yolu:
+                backend, yuklenecek_yol = BACKEND_ONNXRUNTIME, int8_yolu
+                logger.info(f"INT8 model varyantı kullanılıyor: {int8_yolu}")
+        
+        loader = self._onnx_yukle if backend == BACKEND_ONNXRUNTIME else self._yolo_yukle
+        model = model_registry.get_or_load(yuklenecek_yol, device, loader, slot=slot)
+        self.backend_name = backend
+        return model
+
+    def _kopya_slotu(self, kopya: int = 0) -> int:
+        """Bu analizcinin model kopyası için registry slot'u (thread'ler arasında çakışmaz)"""
+        return self.model_slot * max(1, settings.TILE_WORKERS) + kopya
+
     def load_yolo_model(self, model_path: str = None):
-        """YOLOv8 modelini yükle"""
+        """YOLOv8 modelini yükle (süreç genelindeki model önbelleğinden)"""
         if model_path is None:
             model_path = settings.YOLO_MODEL_PATH
-        
+
         try:
-            # Önceki modeli temizle
-            if self.yolo_model is not None:
-                del self.yolo_model
-                if self.current_device == "cuda":
-                    gpu_detector.clear_gpu_cache()
-                gc.collect()
-            
+            # Önceki modele olan referansı bırak (model önbellekte kalır)
+            self.yolo_model = None
+            self.model_path = model_path
+
             # Model dosyası kontrolü
             if not os.path.exists(model_path):
                 raise FileNotFoundError(f"Model dosyası bulunamadı: {model_path}")
-            
-            # Modeli yükle
-            self.yolo_model = YOLO(model_path)
-            
-            # Cihaza taşı
+
+            # Modeli önbellekten al veya yükle
             if self.current_device == "cuda" and gpu_detector.gpu_available:
-                self.yolo_model.to('cuda')
-                logger.info(f"YOLOv8 modeli GPU'ya yüklendi: {gpu_detector.gpu_info.get('device_name', 'Bilinmeyen')}")
+                self.yolo_model = self._model_getir(model_path, 'cuda', slot=self._kopya_slotu())
+                logger.info(f"YOLOv8 modeli GPU'da hazır: {gpu_detector.gpu_info.get('device_name', 'Bilinmeyen')}")
             else:
-                self.yolo_model.to('cpu')
-                logger.info("YOLOv8 modeli CPU'ya yüklendi")
-                
+                self.yolo_model = self._model_getir(model_path, 'cpu', slot=self._kopya_slotu())
+                logger.info(f"YOLOv8 modeli CPU'da hazır ({self.backend_name})")
+
         except Exception as e:
             logger.error(f"YOLOv8 model yükleme hatası: {e}")
             # CPU'ya fallback
@@ -65,25 +128,40 @@ class ZeytinAnalizci:
                 self.current_device = "cpu"
                 self.analysis_mode = "cpu"
                 try:
-                    self.yolo_model = YOLO(model_path)
-                    self.yolo_model.to('cpu')
-                    logger.info("YOLOv8 modeli CPU'ya yüklendi (fallback)")
+                    self.yolo_model = self._model_getir(model_path, 'cpu', slot=self._kopya_slotu())
+                    logger.info(f"YOLOv8 modeli CPU'ya yüklendi (fallback, {self.backend_name})")
                 except Exception as e2:
                     logger.error(f"CPU fallback da başarısız: {e2}")
                     self.yolo_model = None
                     raise e2
     
     async def analiz_yap(self, yukleme_klasoru: str, analiz_klasoru: str, log_yolu: str, 
-                        analiz_modu: str = "cpu") -> Dict:
-        """Ana analiz fonksiyonu"""
+                        analiz_modu: str = "cpu", zaman_butcesi: Optional[float] = None,
+                        dusuk_bellek: bool = False) -> Dict:
+        """Ana analiz fonksiyonu
+        
+        İptal isteği ve zaman bütçesi dosyalar, batch'ler ve karolar arasında
+        kontrol edilir; tetiklenirse AnalysisCancelled fırlatılır. dusuk_bellek
+        (kabul kontrolünün kararı) batch ve işleme hattını LOW_MEMORY_PROCESSING
+        ayarlarıyla çalıştırır. Aşama süreleri ve sayaçlar sonuçta
+        'enstrumantasyon' altında döner ve /metrics toplamlarına eklenir.
+        """
         
         self.analysis_start_time = datetime.now()
         
+        # İlerleme olaylarının kanalı (analiz klasörünün adı = analiz ID)
+        self.analiz_id = os.path.basename(os.path.normpath(analiz_klasoru))
+        self.iptal = CancelToken(analiz_klasoru, zaman_butcesi)
+        self.dusuk_bellek = dusuk_bellek
+        self.olcum = AnalysisInstrumentation()
+        
         # Analiz modunu ayarla
         self.set_analysis_mode(analiz_modu)
         
         # Modeli yükle
-        self.load_yolo_model()
+        with self.olcum.olc(ASAMA_MODEL_YUKLEME):
+            self.load_yolo_model()
+        self._iptal_kontrol()
         
         sonuclar = {
             'toplam_agac': 0,
@@ -97,6 +175,7 @@ class ZeytinAnalizci:
             'detaylar': [],
             'analiz_modu': self.analysis_mode,
             'kullanilan_cihaz': self.current_device,
+            'cikarim_arka_ucu': self.backend_name,
             'gpu_durumu': gpu_detector.get_gpu_status(),
             'sistem_durumu': self._get_system_status()
         }
@@ -104,22 +183,32 @@ class ZeytinAnalizci:
         try:
             # Analiz başlangıcını logla
             self._log_yazdir(log_yolu, f"Analiz başlatıldı - Mod: {self.analysis_mode}, Cihaz: {self.current_device}")
+            if self.dusuk_bellek:
+                self._log_yazdir(log_yolu, "Düşük bellek modu: batch ve işleme hattı küçültüldü")
             
             # Dosyaları listele
-            dosyalar = os.listdir(yukleme_klasoru)
-            rgb_dosyalar = [f for f in dosyalar if f.lower().endswith(tuple(ALLOWED_IMAGE_EXTENSIONS))]
-            multispektral_dosyalar = [f for f in dosyalar if f.lower().endswith(tuple(ALLOWED_MULTISPECTRAL_EXTENSIONS))]
+            with self.olcum.olc(ASAMA_DOSYA_LISTELEME):
+                dosyalar = os.listdir(yukleme_klasoru)
+                rgb_dosyalar = [f for f in dosyalar if f.lower().endswith(tuple(ALLOWED_IMAGE_EXTENSIONS))]
+                multispektral_dosyalar = [f for f in dosyalar if f.lower().endswith(tuple(ALLOWED_MULTISPECTRAL_EXTENSIONS))]
+            self.olcum.say('rgb_files', len(rgb_dosyalar))
+            self.olcum.say('multispectral_files', len(multispektral_dosyalar))
             
             self._log_yazdir(log_yolu, f"RGB dosya sayısı: {len(rgb_dosyalar)}")
             self._log_yazdir(log_yolu, f"Multispektral dosya sayısı: {len(multispektral_dosyalar)}")
+            self._ilerleme('hazirlik', rgb_dosya_sayisi=len(rgb_dosyalar),
+                           multispektral_dosya_sayisi=len(multispektral_dosyalar),
+                           cihaz=self.current_device, arka_uc=self.backend_name)
             
             # RGB analizi
             if rgb_dosyalar and self.yolo_model:
+                self._iptal_kontrol()
                 rgb_sonuclari = await self._rgb_analiz(yukleme_klasoru, rgb_dosyalar, analiz_klasoru, log_yolu)
                 sonuclar.update(rgb_sonuclari)
             
             # Multispektral analizi (basit implementasyon)
             if multispektral_dosyalar:
+                self._iptal_kontrol()
                 multispektral_sonuclari = await self._multispektral_analiz_basic(yukleme_klasoru, multispektral_dosyalar, analiz_klasoru, log_yolu)
                 sonuclar.update(multispektral_sonuclari)
             
@@ -135,6 +224,11 @@ class ZeytinAnalizci:
             
             self._log_yazdir(log_yolu, f"Analiz tamamlandı - Süre: {analiz_suresi:.2f} saniye")
             
+        except AnalysisCancelled as e:
+            self._log_yazdir(log_yolu, f"Analiz durduruldu: {e} ({self.iptal.gecen_sure:.1f} saniye sonra)")
+            # Model referansını bırak (süreç önbelleğinde kalır); bellek finally bloğunda temizlenir
+            self.yolo_model = None
+            raise
         except Exception as e:
             self._log_yazdir(log_yolu, f"Analiz hatası: {str(e)}")
             # GPU belleğini temizle
@@ -144,93 +238,166 @@ class ZeytinAnalizci:
             self._cleanup_memory()
             raise e
         finally:
+            # Önbellek sayaçlarını paylaşılan metriklere ekle
+            detection_cache.flush_stats()
+            
+            # Tamponlanan log satırlarını diske aktar
+            analysis_logs.close(log_yolu)
+            
             # Temizlik
             if self.current_device == "cuda":
                 gpu_detector.clear_gpu_cache()
             self._cleanup_memory()
+            
+            # Aşama ölçümleri sonuçla saklanır ve süreçler arası toplamlara eklenir
+            sonuclar['enstrumantasyon'] = self.olcum.to_dict()
+            analysis_metrics.flush(sonuclar['enstrumantasyon'])
         
         return sonuclar
     
     async def _rgb_analiz(self, yukleme_klasoru: str, rgb_dosyalar: List[str], 
                          analiz_klasoru: str, log_yolu: str) -> Dict:
-        """RGB analizi"""
+        """RGB analizi (okuma, çıkarım ve yazma aşamaları işleme hattında örtüşür)"""
         toplam_agac = 0
         toplam_zeytin = 0
         toplam_cap = 0.0
-        detaylar = []
+        batch_metrikleri = []
         
-        self._log_yazdir(log_yolu, f"RGB analizi başlatılıyor - Cihaz: {self.current_device}")
+        # Tespit önbelleği: decode aşamasında aranır, isabetler çıkarıma girmez
+        onbellek_params = self._onbellek_parametreleri()
+        model_hash = self._model_hash()
+        anahtarlar: Dict[str, Tuple[str, str]] = {}
+        onbellek_isabetleri: Dict[str, Tuple] = {}
         
-        for dosya_adi in rgb_dosyalar:
-            try:
-                dosya_yolu = os.path.join(yukleme_klasoru, dosya_adi)
+        # Kontrol noktaları: önceki çalıştırmada tamamlanan dosyalar tekrar işlenmez
+        kn_ayari = self._rgb_kontrol_noktasi_ayari()
+        tamamlananlar = self._tamamlanan_dosyalar(TUR_RGB, kn_ayari, yukleme_klasoru, rgb_dosyalar)
+        tamamlananlar = {dosya_adi: detay for dosya_adi, detay in tamamlananlar.items()
+                         if os.path.exists(detay.get('isaretli_gorsel', ''))}
+        kalan_dosyalar = [f for f in rgb_dosyalar if f not in tamamlananlar]
+        if tamamlananlar:
+            self.olcum.say('checkpoint_skips', len(tamamlananlar))
+            self._log_yazdir(log_yolu, f"Kontrol noktasından devam: {len(tamamlananlar)}/{len(rgb_dosyalar)} RGB dosya daha önce tamamlanmış")
+        
+        # Yazma aşaması birden fazla thread'de çalışır; ara toplamlar kilitle güncellenir
+        ilerleme_kilidi = threading.Lock()
+        ilerleme = {
+            'tamamlanan': len(tamamlananlar),
+            'agac': sum(d['agac_sayisi'] for d in tamamlananlar.values()),
+            'zeytin': sum(d['zeytin_sayisi'] for d in tamamlananlar.values())
+        }
+        
+        batch_size = max(1, self._isleme_ayari('batch_size', settings.INFERENCE_BATCH_SIZE))
+        hat = StagedPipeline(
+            decode_workers=self._isleme_ayari('decode_workers', settings.PIPELINE_DECODE_WORKERS),
+            encode_workers=self._isleme_ayari('encode_workers', settings.PIPELINE_ENCODE_WORKERS),
+            queue_size=self._isleme_ayari('queue_size', settings.PIPELINE_QUEUE_SIZE),
+            batch_size=batch_size
+        )
+        
+        self._log_yazdir(log_yolu, f"RGB analizi başlatılıyor - Cihaz: {self.current_device}, Batch boyutu: {batch_size}")
+        
+        def oku(dosya_adi: str) -> Optional[np.ndarray]:
+            self._iptal_kontrol()
+            dosya_yolu = os.path.join(yukleme_klasoru, dosya_adi)
+            if model_hash:
+                try:
+                    dosya_hash = detection_cache.file_hash(dosya_yolu)
+                    anahtar = detection_cache.make_key(KIND_RGB, dosya_hash, model_hash, onbellek_params)
+                    anahtarlar[dosya_adi] = (dosya_hash, anahtar)
+                    kayit = detection_cache.get(anahtar, KIND_RGB)
+                    if kayit is not None:
+                        onbellek_isabetleri[dosya_adi] = kayit
+                        self.olcum.say('cache_hits')
+                except OSError as e:
+                    self._log_yazdir(log_yolu, f"{dosya_adi}: önbellek anahtarı oluşturulamadı: {str(e)}")
+            
+            with self.olcum.olc(ASAMA_OKUMA):
                 gorsel = cv2.imread(dosya_yolu)
-                
-                if gorsel is None:
-                    self._log_yazdir(log_yolu, f"Görsel okunamadı: {dosya_adi}")
+            if gorsel is None:
+                self._log_yazdir(log_yolu, f"Görsel okunamadı: {dosya_adi}")
+            return gorsel
+        
+        def tahmin(batch_no: int, batch: List[Tuple[str, np.ndarray]]) -> List[Optional[Tuple]]:
+            self._iptal_kontrol()
+            ciktilar: List[Optional[Tuple]] = [None] * len(batch)
+            eksikler = []
+            for i, (dosya_adi, _) in enumerate(batch):
+                kayit = onbellek_isabetleri.get(dosya_adi)
+                if kayit is None:
+                    eksikler.append(i)
                     continue
-                
-                # YOLOv8 tespiti
-                start_time = datetime.now()
-                
-                if self.current_device == "cuda":
-                    sonuclar = self.yolo_model(gorsel, device='cuda', conf=settings.CONFIDENCE_THRESHOLD)
-                else:
-                    sonuclar = self.yolo_model(gorsel, device='cpu', conf=settings.CONFIDENCE_THRESHOLD)
-                
-                processing_time = (datetime.now() - start_time).total_seconds()
-                
-                # Sonuçları işle
-                agac_sayisi = 0
-                zeytin_sayisi = 0
-                cap_toplam = 0.0
-                
-                for result in sonuclar:
-                    boxes = result.boxes
-                    if boxes is not None:
-                        for box in boxes:
-                            cls = int(box.cls[0])
-                            conf = float(box.conf[0])
-                            
-                            if conf > settings.CONFIDENCE_THRESHOLD:
-                                if cls == YOLO_TREE_CLASS:
-                                    agac_sayisi += 1
-                                    # Çap hesaplama
-                                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                                    genislik = x2 - x1
-                                    tahmini_cap = genislik * OLIVE_DIAMETER_COEFFICIENT
-                                    cap_toplam += tahmini_cap
-                                
-                                elif cls == YOLO_OLIVE_CLASS:
-                                    zeytin_sayisi += DEFAULT_OLIVES_PER_DETECTION
-                
-                # Görseli işaretle ve kaydet
-                annotated_img = self._gorseli_isaretle(gorsel, sonuclar)
-                cikti_yolu = os.path.join(analiz_klasoru, f"isretli_{dosya_adi}")
-                cv2.imwrite(cikti_yolu, annotated_img)
-                
-                toplam_agac += agac_sayisi
-                toplam_zeytin += zeytin_sayisi
-                toplam_cap += cap_toplam
-                
-                detaylar.append({
-                    'dosya': dosya_adi,
-                    'agac_sayisi': agac_sayisi,
-                    'zeytin_sayisi': zeytin_sayisi,
-                    'ortalama_cap': cap_toplam / max(agac_sayisi, 1),
-                    'isleme_suresi': processing_time,
-                    'cihaz': self.current_device
-                })
-                
-                self._log_yazdir(log_yolu, f"{dosya_adi}: {agac_sayisi} ağaç, {zeytin_sayisi} zeytin ({processing_time:.2f}s - {self.current_device.upper()})")
-                
-                # Bellek temizliği (her dosyadan sonra)
-                if self.current_device == "cuda":
-                    torch.cuda.empty_cache()
-                
-            except Exception as e:
+                tespitler, meta = kayit
+                ciktilar[i] = (tespitler, 0.0, dict(meta, onbellek=True))
+            
+            if eksikler:
+                eksik_ciktilar = self._batch_tahmin(batch_no, [batch[i] for i in eksikler],
+                                                    batch_metrikleri, log_yolu)
+                for i, cikti in zip(eksikler, eksik_ciktilar):
+                    ciktilar[i] = cikti
+            return ciktilar
+        
+        def yaz(dosya_adi: str, gorsel: np.ndarray, cikti: Tuple) -> Dict:
+            tespitler, processing_time, ek_bilgi = cikti
+            if dosya_adi in anahtarlar and not ek_bilgi.get('onbellek'):
+                dosya_hash, anahtar = anahtarlar[dosya_adi]
+                meta = {k: v for k, v in ek_bilgi.items() if k == 'karo_sayisi'}
+                detection_cache.put(anahtar, KIND_RGB, dosya_hash, model_hash, onbellek_params,
+                                    detections=tespitler, meta=meta)
+            
+            detay = self._dosya_sonucunu_isle(dosya_adi, gorsel, tespitler, processing_time,
+                                              analiz_klasoru, log_yolu)
+            detay.update(ek_bilgi)
+            self._kontrol_noktasi_kaydet(TUR_RGB, kn_ayari, yukleme_klasoru, dosya_adi, detay)
+            
+            with ilerleme_kilidi:
+                ilerleme['tamamlanan'] += 1
+                ilerleme['agac'] += detay['agac_sayisi']
+                ilerleme['zeytin'] += detay['zeytin_sayisi']
+                ara_toplam = dict(ilerleme)
+            self._ilerleme('dosya', tur='rgb', dosya=dosya_adi,
+                           agac_sayisi=detay['agac_sayisi'], zeytin_sayisi=detay['zeytin_sayisi'],
+                           isleme_suresi=processing_time, onbellek=bool(ek_bilgi.get('onbellek')),
+                           tamamlanan=ara_toplam['tamamlanan'], toplam=len(rgb_dosyalar),
+                           toplam_agac=ara_toplam['agac'], toplam_zeytin=ara_toplam['zeytin'])
+            return detay
+        
+        def hata(asama: str, dosyalar: List[str], e: Exception):
+            # İptal dosya hatası değildir; işleme hattını durdurur
+            if isinstance(e, AnalysisCancelled):
+                raise e
+            for dosya_adi in dosyalar:
                 self._log_yazdir(log_yolu, f"{dosya_adi} analiz hatası: {str(e)}")
-                continue
+        
+        detaylar, hat_metrikleri = hat.run(kalan_dosyalar, oku, tahmin, yaz, on_error=hata)
+        
+        # Nihai toplamlar kontrol noktası kayıtlarından (önceki ve bu çalıştırma) dosya sırasıyla hesaplanır
+        dosya_sonuclari = {dosya_adi: dict(detay, kontrol_noktasi=True) for dosya_adi, detay in tamamlananlar.items()}
+        dosya_sonuclari.update((detay['dosya'], detay) for detay in detaylar)
+        detaylar = [dosya_sonuclari[f] for f in rgb_dosyalar if f in dosya_sonuclari]
+        
+        self._log_yazdir(
+            log_yolu,
+            f"İşleme hattı: okuma {hat_metrikleri['decode_time']:.2f}s ({hat_metrikleri['decode_workers']} worker), "
+            f"çıkarım {hat_metrikleri['infer_time']:.2f}s, "
+            f"yazma {hat_metrikleri['encode_time']:.2f}s ({hat_metrikleri['encode_workers']} worker), "
+            f"çıkarım bekleme {hat_metrikleri['infer_wait']:.2f}s, yazma bekleme {hat_metrikleri['encode_wait']:.2f}s, "
+            f"okuma kuyruğu ort {hat_metrikleri['decode_queue']['avg']:.1f}/maks {hat_metrikleri['decode_queue']['max']}, "
+            f"yazma kuyruğu ort {hat_metrikleri['encode_queue']['avg']:.1f}/maks {hat_metrikleri['encode_queue']['max']}, "
+            f"toplam {hat_metrikleri['total_time']:.2f}s"
+        )
+        if model_hash:
+            self._log_yazdir(log_yolu, f"Tespit önbelleği: {len(onbellek_isabetleri)}/{len(rgb_dosyalar)} görsel önbellekten")
+        
+        self._ilerleme('asama', asama='rgb', dosya_sayisi=len(detaylar),
+                       sure=hat_metrikleri['total_time'], okuma=hat_metrikleri['decode_time'],
+                       cikarim=hat_metrikleri['infer_time'], yazma=hat_metrikleri['encode_time'],
+                       onbellek_isabeti=len(onbellek_isabetleri), kontrol_noktasi=len(tamamlananlar))
+        
+        for detay in detaylar:
+            toplam_agac += detay['agac_sayisi']
+            toplam_zeytin += detay['zeytin_sayisi']
+            toplam_cap += detay['ortalama_cap'] * detay['agac_sayisi']
         
         # Tahmini zeytin miktarı
         tahmini_miktar = toplam_zeytin * DEFAULT_OLIVE_WEIGHT
@@ -240,89 +407,296 @@ class ZeytinAnalizci:
             'toplam_zeytin': toplam_zeytin,
             'tahmini_zeytin_miktari': tahmini_miktar,
             'agac_cap_ortalama': toplam_cap / max(toplam_agac, 1),
-            'detaylar': detaylar
+            'detaylar': detaylar,
+            'batch_metrikleri': batch_metrikleri,
+            'hat_metrikleri': hat_metrikleri,
+            'onbellek_isabeti': len(onbellek_isabetleri),
+            'kontrol_noktasindan': len(tamamlananlar)
         }
     
+    def _rgb_kontrol_noktasi_ayari(self) -> Optional[str]:
+        """RGB sonucunu etkileyen model ve parametrelerin imzası (hesaplanamazsa None: kontrol noktası kullanılmaz)"""
+        if not analysis_checkpoints.enabled or not self.analiz_id or self.yolo_model is None:
+            return None
+        try:
+            model_hash = detection_cache.model_hash(self.yolo_model.model_path)
+        except (OSError, TypeError):
+            return None
+        return ayar_imzasi(model_hash, self._onbellek_parametreleri())
+    
+    def _tamamlanan_dosyalar(self, tur: str, kn_ayari: Optional[str], yukleme_klasoru: str,
+                             dosyalar: List[str]) -> Dict[str, Dict]:
+        """Bu analizde daha önce tamamlanmış ve değişmemiş dosyaların kayıtlı sonuçları"""
+        if kn_ayari is None:
+            return {}
+        dosya_yollari = {f: os.path.join(yukleme_klasoru, f) for f in dosyalar}
+        return analysis_checkpoints.completed(self.analiz_id, tur, kn_ayari, dosya_yollari)
+    
+    def _kontrol_noktasi_kaydet(self, tur: str, kn_ayari: Optional[str], yukleme_klasoru: str,
+                                dosya_adi: str, sonuc: Dict):
+        """Dosya sonucunu kontrol noktasına yaz"""
+        if kn_ayari is None:
+            return
+        try:
+            imza = dosya_imzasi(os.path.join(yukleme_klasoru, dosya_adi))
+        except OSError:
+            return
+        analysis_checkpoints.save(self.analiz_id, tur, dosya_adi, imza, kn_ayari, sonuc)
+    
+    def _model_hash(self) -> Optional[str]:
+        """Yüklü model dosyasının önbellek kimliği (önbellek kapalıysa None)"""
+        if not detection_cache.enabled or self.yolo_model is None:
+            return None
+        try:
+            return detection_cache.model_hash(self.yolo_model.model_path)
+        except (OSError, TypeError):
+            return None
+    
+    def _onbellek_parametreleri(self) -> Dict:
+        """Tespit sonucunu etkileyen çıkarım parametreleri (önbellek anahtarına girer)"""
+        params = {
+            'backend': self.backend_name,
+            'conf': settings.CONFIDENCE_THRESHOLD,
+            'tiled': settings.TILED_INFERENCE_ENABLED
+        }
+        if settings.TILED_INFERENCE_ENABLED:
+            params.update({
+                'tile_min': settings.TILE_MIN_IMAGE_SIZE,
+                'tile_size': settings.TILE_SIZE,
+                'tile_overlap': settings.TILE_OVERLAP,
+                'tile_nms': settings.TILE_NMS_THRESHOLD
+            })
+        if self.backend_name == BACKEND_ONNXRUNTIME:
+            params.update({
+                'iou': settings.INFERENCE_IOU_THRESHOLD,
+                'max_det': settings.INFERENCE_MAX_DETECTIONS,
+                'imgsz': settings.ONNX_IMAGE_SIZE
+            })
+        return params
+    
+    def _batch_tahmin(self, batch_no: int, batch: List[Tuple[str, np.ndarray]],
+                      batch_metrikleri: List[Dict], log_yolu: str) -> List[Optional[Tuple]]:
+        """Bir batch'in tespitleri: her dosya için (tespitler, süre, ek bilgi) veya None
+        
+        Büyük görseller karo motoruna, diğerleri tek forward pass'e gider.
+        """
+        ciktilar: List[Optional[Tuple]] = [None] * len(batch)
+        normal_indeksler = []
+        
+        for i, (dosya_adi, gorsel) in enumerate(batch):
+            if not self._karo_gerekli(gorsel):
+                normal_indeksler.append(i)
+                continue
+            
+            try:
+                karo_sonucu = self._karo_analizi(gorsel)
+                ciktilar[i] = (karo_sonucu['detections'], karo_sonucu['inference_time'],
+                               {'karo_sayisi': karo_sonucu['tile_count']})
+                self._log_yazdir(log_yolu, f"{dosya_adi}: {karo_sonucu['tile_count']} karo, "
+                                           f"{karo_sonucu['raw_detections']} ham tespit -> {len(karo_sonucu['detections'])} "
+                                           f"(birleştirme {karo_sonucu['merge_time']:.2f}s, {karo_sonucu['workers']} worker)")
+            except AnalysisCancelled:
+                raise
+            except Exception as e:
+                self._log_yazdir(log_yolu, f"{dosya_adi} karo analizi hatası: {str(e)}")
+        
+        if not normal_indeksler:
+            return ciktilar
+        
+        # YOLOv8 tespiti (batch başına tek forward pass)
+        gorseller = [batch[i][1] for i in normal_indeksler]
+        try:
+            start_time = time.perf_counter()
+            batch_tespitleri = self._tahmin_et(self.yolo_model, gorseller)
+            batch_suresi = time.perf_counter() - start_time
+            self.olcum.gozlem(ASAMA_CIKARIM, batch_suresi)
+        except Exception as e:
+            dosya_listesi = ", ".join(batch[i][0] for i in normal_indeksler)
+            self._log_yazdir(log_yolu, f"Batch {batch_no} analiz hatası ({dosya_listesi}): {str(e)}")
+            return ciktilar
+        
+        batch_metrikleri.append({
+            'batch': batch_no,
+            'dosya_sayisi': len(gorseller),
+            'sure': batch_suresi,
+            'gorsel_basina_sure': batch_suresi / len(gorseller),
+            'cihaz': self.current_device
+        })
+        self._log_yazdir(log_yolu, f"Batch {batch_no}: {len(gorseller)} görsel, {batch_suresi:.2f}s ({batch_suresi / len(gorseller):.2f}s/görsel)")
+        
+        # Sonuçları her dosyaya eşle
+        processing_time = batch_suresi / len(gorseller)
+        for i, tespitler in zip(normal_indeksler, batch_tespitleri):
+            ciktilar[i] = (tespitler, processing_time, {'batch': batch_no})
+        
+        # Bellek temizliği (her batch'ten sonra)
+        del gorseller, batch_tespitleri
+        if self.current_device == "cuda":
+            torch.cuda.empty_cache()
+        
+        return ciktilar
+    
+    def _tahmin_et(self, model: InferenceBackend, gorseller: List[np.ndarray]) -> List[Detections]:
+        """Görsel listesini tek çağrıda modele ver, sonuçları diziye çevir"""
+        return model.predict(gorseller, settings.CONFIDENCE_THRESHOLD)
+    
+    def _karo_gerekli(self, gorsel: np.ndarray) -> bool:
+        """Görsel karo tabanlı çıkarım gerektirecek kadar büyük mü?"""
+        return settings.TILED_INFERENCE_ENABLED and max(gorsel.shape[:2]) > settings.TILE_MIN_IMAGE_SIZE
+    
+    def _karo_analizi(self, gorsel: np.ndarray) -> Dict:
+        """Büyük görseli örtüşen karolar halinde analiz et"""
+        karo_workers = self._isleme_ayari('tile_workers', settings.TILE_WORKERS)
+        motor = TiledInference(
+            tile_size=settings.TILE_SIZE,
+            overlap=settings.TILE_OVERLAP,
+            batch_size=self._isleme_ayari('tile_batch_size', settings.TILE_BATCH_SIZE),
+            workers=karo_workers,
+            nms_threshold=settings.TILE_NMS_THRESHOLD
+        )
+        
+        # Thread-safe olmayan arka uçlarda (ultralytics) her worker kendi model kopyasını kullanır
+        modeller = [self.yolo_model]
+        if karo_workers > 1 and self.yolo_model.thread_safe:
+            modeller = [self.yolo_model] * karo_workers
+        elif karo_workers > 1 and self.model_path:
+            device = 'cuda' if self.current_device == "cuda" else 'cpu'
+            for slot in range(1, karo_workers):
+                modeller.append(self._model_getir(self.model_path, device, slot=self._kopya_slotu(slot)))
+        
+        def tahminci(model: InferenceBackend):
+            def tahmin(karolar: List[np.ndarray]) -> List[Detections]:
+                # Büyük ortofotolar dakikalar sürebilir; karo batch'leri arasında iptal kontrolü
+                self._iptal_kontrol()
+                with self.olcum.olc(ASAMA_CIKARIM):
+                    return self._tahmin_et(model, karolar)
+            return tahmin
+        
+        tahminciler = [tahminci(model) for model in modeller]
+        return motor.run(gorsel, tahminciler)
+    
+    def _dosya_sonucunu_isle(self, dosya_adi: str, gorsel: np.ndarray, tespitler: Detections,
+                             processing_time: float, analiz_klasoru: str, log_yolu: str) -> Dict:
+        """Tek bir görselin tespitlerini say, görseli işaretle ve kaydet"""
+        with self.olcum.olc(ASAMA_SON_ISLEME):
+            gecerli, agac_sayisi, zeytin_sayisi, cap_toplam = self._tespitleri_say(tespitler)
+        self.olcum.say('detections', len(gecerli))
+        
+        # Görseli işaretle ve kaydet
+        with self.olcum.olc(ASAMA_ISARETLEME):
+            annotated_img = self._gorseli_isaretle(gorsel, gecerli)
+        cikti_yolu = os.path.join(analiz_klasoru, f"isretli_{dosya_adi}")
+        with self.olcum.olc(ASAMA_YAZMA):
+            cv2.imwrite(cikti_yolu, annotated_img)
+        
+        self._log_yazdir(log_yolu, f"{dosya_adi}: {agac_sayisi} ağaç, {zeytin_sayisi} zeytin ({processing_time:.2f}s - {self.current_device.upper()})")
+        
+        return {
+            'dosya': dosya_adi,
+            'agac_sayisi': agac_sayisi,
+            'zeytin_sayisi': zeytin_sayisi,
+            'ortalama_cap': cap_toplam / max(agac_sayisi, 1),
+            'isleme_suresi': processing_time,
+            'cihaz': self.current_device,
+            'isaretli_gorsel': cikti_yolu
+        }
+    
+    def _tespitleri_say(self, tespitler: Detections) -> Tuple[Detections, int, int, float]:
+        """Güven eşiğini uygula: (geçerli tespitler, ağaç sayısı, zeytin sayısı, toplam çap)"""
+        # Güven eşiği tek maskeyle uygulanır; sayım ve çizim aynı diziyi kullanır
+        gecerli = tespitler.select(tespitler.conf > settings.CONFIDENCE_THRESHOLD)
+        
+        sinif_sayilari = np.bincount(gecerli.cls, minlength=max(YOLO_TREE_CLASS, YOLO_OLIVE_CLASS) + 1)
+        agac_sayisi = int(sinif_sayilari[YOLO_TREE_CLASS])
+        zeytin_sayisi = int(sinif_sayilari[YOLO_OLIVE_CLASS]) * DEFAULT_OLIVES_PER_DETECTION
+        
+        # Çap hesaplama (ağaç kutularının genişlik sütunundan)
+        agac_kutulari = gecerli.xyxy[gecerli.cls == YOLO_TREE_CLASS]
+        cap_toplam = float((agac_kutulari[:, 2] - agac_kutulari[:, 0]).sum()) * OLIVE_DIAMETER_COEFFICIENT
+        
+        return gecerli, agac_sayisi, zeytin_sayisi, cap_toplam
+    
     async def _multispektral_analiz_basic(self, yukleme_klasoru: str, multispektral_dosyalar: List[str], 
                                          analiz_klasoru: str, log_yolu: str) -> Dict:
         """Basit multispektral analizi (rasterio olmadan)"""
-        ndvi_toplam = 0.0
-        gndvi_toplam = 0.0
-        ndre_toplam = 0.0
-        dosya_sayisi = 0
-        
         self._log_yazdir(log_yolu, "Multispektral analizi başlatılıyor (basit mod)")
+        onbellek_isabeti = 0
+        baslangic = time.perf_counter()
+        
+        # Kontrol noktaları: önceki çalıştırmada tamamlanan dosyalar tekrar okunmaz
+        kn_ayari = ayar_imzasi(MULTISPECTRAL_BASIC_VERSION) if analysis_checkpoints.enabled and self.analiz_id else None
+        dosya_sonuclari = self._tamamlanan_dosyalar(TUR_MULTISPECTRAL, kn_ayari, yukleme_klasoru,
+                                                    multispektral_dosyalar)
+        kontrol_noktasindan = len(dosya_sonuclari)
+        if kontrol_noktasindan:
+            self.olcum.say('checkpoint_skips', kontrol_noktasindan)
+            self._log_yazdir(log_yolu, f"Kontrol noktasından devam: {kontrol_noktasindan}/{len(multispektral_dosyalar)} multispektral dosya daha önce tamamlanmış")
         
         for dosya_adi in multispektral_dosyalar:
+            if dosya_adi in dosya_sonuclari:
+                continue
+            self._iptal_kontrol()
             try:
                 dosya_yolu = os.path.join(yukleme_klasoru, dosya_adi)
                 
-                # Basit TIFF okuma (PIL ile)
-                try:
-                    from PIL import Image
-                    with Image.open(dosya_yolu) as img:
-                        # Çok bantlı TIFF ise
-                        if hasattr(img, 'n_frames') and img.n_frames > 1:
-                            # İlk 4 bandı al (R, G, B, NIR varsayımı)
-                            bands = []
-                            for i in range(min(4, img.n_frames)):
-                                img.seek(i)
-                                band = np.array(img).astype(float)
-                                bands.append(band)
-                            
-                            if len(bands) >= 4:
-                                red = bands[0]
-                                green = bands[1] 
-                                blue = bands[2]
-                                nir = bands[3]
-                                
-                                # NDVI hesaplama
-                                ndvi = np.where((nir + red) != 0, (nir - red) / (nir + red), 0)
-                                
-                                # GNDVI hesaplama
-                                gndvi = np.where((nir + green) != 0, (nir - green) / (nir + green), 0)
-                                
-                                # NDRE hesaplama (NIR kullanarak)
-                                ndre = ndvi  # Basit yaklaşım
-                                
-                                # Ortalama değerler
-                                ndvi_ort = np.nanmean(ndvi)
-                                gndvi_ort = np.nanmean(gndvi)
-                                ndre_ort = np.nanmean(ndre)
-                                
-                                ndvi_toplam += ndvi_ort
-                                gndvi_toplam += gndvi_ort
-                                ndre_toplam += ndre_ort
-                                dosya_sayisi += 1
-                                
-                                self._log_yazdir(log_yolu, f"{dosya_adi}: NDVI={ndvi_ort:.3f}, GNDVI={gndvi_ort:.3f}, NDRE={ndre_ort:.3f} (basit analiz)")
-                            else:
-                                self._log_yazdir(log_yolu, f"{dosya_adi}: Yetersiz band sayısı ({len(bands)})")
-                        else:
-                            # Tek bantlı görsel - varsayılan değerler
-                            ndvi_toplam += 0.5
-                            gndvi_toplam += 0.5
-                            ndre_toplam += 0.5
-                            dosya_sayisi += 1
-                            self._log_yazdir(log_yolu, f"{dosya_adi}: Tek bantlı görsel - varsayılan değerler kullanıldı")
-                            
-                except Exception as e:
-                    self._log_yazdir(log_yolu, f"{dosya_adi}: PIL ile okuma hatası: {str(e)}")
-                    # Varsayılan değerler
-                    ndvi_toplam += 0.5
-                    gndvi_toplam += 0.5
-                    ndre_toplam += 0.5
-                    dosya_sayisi += 1
+                # İndeksler yalnızca dosya içeriğine bağlıdır; aynı dosya tekrar okunmaz
+                anahtar = None
+                indeksler = None
+                onbellekten = False
+                if detection_cache.enabled:
+                    dosya_hash = detection_cache.file_hash(dosya_yolu)
+                    anahtar = detection_cache.make_key(KIND_MULTISPECTRAL, dosya_hash,
+                                                       MULTISPECTRAL_BASIC_VERSION, {})
+                    kayit = detection_cache.get(anahtar, KIND_MULTISPECTRAL)
+                    if kayit is not None:
+                        indeksler = kayit[1]
+                        onbellekten = True
+                        onbellek_isabeti += 1
+                        self.olcum.say('cache_hits')
+                        self._log_yazdir(log_yolu, f"{dosya_adi}: {indeksler['mesaj']} (önbellek)")
+                
+                if indeksler is None:
+                    try:
+                        indeksler = self._multispektral_indeksler(dosya_yolu)
+                    except Exception as e:
+                        self._log_yazdir(log_yolu, f"{dosya_adi}: PIL ile okuma hatası: {str(e)}")
+                        # Varsayılan değerler
+                        indeksler = {'ndvi': 0.5, 'gndvi': 0.5, 'ndre': 0.5,
+                                     'mesaj': "Okuma hatası - varsayılan değerler kullanıldı"}
+                        anahtar = None
+                    else:
+                        self._log_yazdir(log_yolu, f"{dosya_adi}: {indeksler['mesaj']}")
+                    
+                    if anahtar and indeksler['ndvi'] is not None:
+                        detection_cache.put(anahtar, KIND_MULTISPECTRAL, dosya_hash,
+                                            MULTISPECTRAL_BASIC_VERSION, {}, meta=indeksler)
+                
+                dosya_sonuclari[dosya_adi] = indeksler
+                self._kontrol_noktasi_kaydet(TUR_MULTISPECTRAL, kn_ayari, yukleme_klasoru, dosya_adi, indeksler)
+                if indeksler['ndvi'] is not None:
+                    gecerli_sayisi = sum(1 for i in dosya_sonuclari.values() if i['ndvi'] is not None)
+                    self._ms_ilerleme(dosya_adi, indeksler, gecerli_sayisi, len(multispektral_dosyalar), onbellekten)
                     
             except Exception as e:
                 self._log_yazdir(log_yolu, f"{dosya_adi} multispektral analiz hatası: {str(e)}")
                 continue
         
+        if onbellek_isabeti:
+            self._log_yazdir(log_yolu, f"Tespit önbelleği: {onbellek_isabeti}/{len(multispektral_dosyalar)} multispektral dosya önbellekten")
+        
+        # Ortalamalar kontrol noktası kayıtlarından (önceki ve bu çalıştırma) hesaplanır
+        gecerli = [i for i in dosya_sonuclari.values() if i['ndvi'] is not None]
+        dosya_sayisi = len(gecerli)
+        
+        self._ilerleme('asama', asama='multispektral', dosya_sayisi=dosya_sayisi,
+                       sure=time.perf_counter() - baslangic, onbellek_isabeti=onbellek_isabeti,
+                       kontrol_noktasi=kontrol_noktasindan)
+        
         if dosya_sayisi > 0:
             return {
-                'ndvi_ortalama': ndvi_toplam / dosya_sayisi,
-                'gndvi_ortalama': gndvi_toplam / dosya_sayisi,
-                'ndre_ortalama': ndre_toplam / dosya_sayisi
+                'ndvi_ortalama': sum(i['ndvi'] for i in gecerli) / dosya_sayisi,
+                'gndvi_ortalama': sum(i['gndvi'] for i in gecerli) / dosya_sayisi,
+                'ndre_ortalama': sum(i['ndre'] for i in gecerli) / dosya_sayisi
             }
         else:
             return {
@@ -331,28 +705,94 @@ class ZeytinAnalizci:
                 'ndre_ortalama': 0.5
             }
     
-    def _gorseli_isaretle(self, gorsel: np.ndarray, sonuclar) -> np.ndarray:
-        """YOLO sonuçlarını görsele çiz"""
+    def _ms_ilerleme(self, dosya_adi: str, indeksler: Dict, tamamlanan: int, toplam: int, onbellek: bool):
+        """Multispektral dosya ilerleme olayı"""
+        self._ilerleme('dosya', tur='multispektral', dosya=dosya_adi, ndvi=indeksler['ndvi'],
+                       gndvi=indeksler['gndvi'], ndre=indeksler['ndre'], onbellek=onbellek,
+                       tamamlanan=tamamlanan, toplam=toplam)
+    
+    def _isleme_ayari(self, anahtar: str, deger: int) -> int:
+        """Batch / işleme hattı ayarı; düşük bellek modunda LOW_MEMORY_PROCESSING değeri"""
+        if self.dusuk_bellek:
+            return LOW_MEMORY_PROCESSING[anahtar]
+        return deger
+    
+    def _iptal_kontrol(self):
+        """İptal istenmişse veya zaman bütçesi aşılmışsa AnalysisCancelled fırlat"""
+        if self.iptal is not None:
+            self.iptal.check()
+    
+    def _ilerleme(self, tip: str, **veri):
+        """Analiz ilerleme olayı yayınla (SSE aboneleri için)"""
+        if self.analiz_id:
+            publish_progress(self.analiz_id, tip, **veri)
+    
+    def _multispektral_indeksler(self, dosya_yolu: str) -> Dict:
+        """Tek dosyanın ortalama NDVI / GNDVI / NDRE değerleri
+        
+        Yetersiz bant sayısında indeksler None döner; okuma hataları çağırana iletilir.
+        """
+        # Basit TIFF okuma (PIL ile)
+        from PIL import Image
+        with self.olcum.olc(ASAMA_BANT_OKUMA), Image.open(dosya_yolu) as img:
+            # Tek bantlı görsel - varsayılan değerler
+            if not (hasattr(img, 'n_frames') and img.n_frames > 1):
+                return {'ndvi': 0.5, 'gndvi': 0.5, 'ndre': 0.5,
+                        'mesaj': "Tek bantlı görsel - varsayılan değerler kullanıldı"}
+            
+            # Çok bantlı TIFF: ilk 4 bandı al (R, G, B, NIR varsayımı)
+            bands = []
+            for i in range(min(4, img.n_frames)):
+                img.seek(i)
+                bands.append(np.array(img).astype(float))
+        
+        if len(bands) < 4:
+            return {'ndvi': None, 'gndvi': None, 'ndre': None,
+                    'mesaj': f"Yetersiz band sayısı ({len(bands)})"}
+        
+        with self.olcum.olc(ASAMA_INDEKS):
+            return self._indeksleri_hesapla(bands)
+    
+    def _indeksleri_hesapla(self, bands: List[np.ndarray]) -> Dict:
+        """R, G, B, NIR bantlarından ortalama indeksler"""
+        red, green, _, nir = bands
+        
+        # NDVI hesaplama
+        ndvi = np.where((nir + red) != 0, (nir - red) / (nir + red), 0)
+        
+        # GNDVI hesaplama
+        gndvi = np.where((nir + green) != 0, (nir - green) / (nir + green), 0)
+        
+        # NDRE hesaplama (NIR kullanarak)
+        ndre = ndvi  # Basit yaklaşım
+        
+        # Ortalama değerler
+        ndvi_ort = float(np.nanmean(ndvi))
+        gndvi_ort = float(np.nanmean(gndvi))
+        ndre_ort = float(np.nanmean(ndre))
+        return {
+            'ndvi': ndvi_ort,
+            'gndvi': gndvi_ort,
+            'ndre': ndre_ort,
+            'mesaj': f"NDVI={ndvi_ort:.3f}, GNDVI={gndvi_ort:.3f}, NDRE={ndre_ort:.3f} (basit analiz)"
+        }
+    
+    def _gorseli_isaretle(self, gorsel: np.ndarray, tespitler: Detections) -> np.ndarray:
+        """Tespitleri görsele çiz (eşik uygulanmış diziler beklenir)"""
         annotated_img = gorsel.copy()
+        if len(tespitler) == 0:
+            return annotated_img
         
-        for result in sonuclar:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    x1, y1, x2, y2 = box.xyxy[0].int().tolist()
-                    conf = float(box.conf[0])
-                    cls = int(box.cls[0])
-                    
-                    if conf > settings.CONFIDENCE_THRESHOLD:
-                        # Sınıfa göre renk seç
-                        color = (0, 255, 0) if cls == YOLO_TREE_CLASS else (0, 0, 255)
-                        
-                        # Dikdörtgen çiz
-                        cv2.rectangle(annotated_img, (x1, y1), (x2, y2), color, 2)
-                        
-                        # Etiket ekle
-                        label = f"Ağaç: {conf:.2f}" if cls == YOLO_TREE_CLASS else f"Zeytin: {conf:.2f}"
-                        cv2.putText(annotated_img, label, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
+        kutular = tespitler.xyxy.astype(np.int32)
+        agac_mi = tespitler.cls == YOLO_TREE_CLASS
+        
+        for (x1, y1, x2, y2), agac, conf in zip(kutular.tolist(), agac_mi.tolist(), tespitler.conf.tolist()):
+            # Sınıfa göre renk ve etiket
+            color = (0, 255, 0) if agac else (0, 0, 255)
+            label = f"Ağaç: {conf:.2f}" if agac else f"Zeytin: {conf:.2f}"
+            
+            cv2.rectangle(annotated_img, (x1, y1), (x2, y2), color, 2)
+            cv2.putText(annotated_img, label, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
         
         return annotated_img
     
@@ -404,16 +844,14 @@ class ZeytinAnalizci:
         
         # GeoJSON dosyasını kaydet
         geojson_yolu = os.path.join(analiz_klasoru, "geojson.json")
-        with open(geojson_yolu, 'w', encoding='utf-8') as f:
+        with self.olcum.olc(ASAMA_GEOJSON), open(geojson_yolu, 'w', encoding='utf-8') as f:
             json.dump(geojson, f, ensure_ascii=False, indent=2)
         
         sonuclar['geojson_path'] = geojson_yolu
     
     def _log_yazdir(self, log_yolu: str, mesaj: str):
-        """Log dosyasına mesaj yaz"""
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(log_yolu, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {mesaj}\n")
+        """Log dosyasına mesaj yaz (tamponlanır; analiz sonunda veya eşikte diske aktarılır)"""
+        analysis_logs.write(log_yolu, mesaj)
     
     def _get_analysis_time(self) -> float:
         """Analiz süresini hesapla"""
@@ -422,17 +860,15 @@ class ZeytinAnalizci:
         return 0.0
     
     def _get_system_status(self) -> Dict:
-        """Sistem durumu bilgisi"""
+        """Sistem durumu bilgisi (arka plan örnekleyicisinin son örneği)"""
         try:
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
+            ornek = system_monitor.latest()
             return {
-                'cpu_percent': psutil.cpu_percent(interval=1),
-                'memory_percent': memory.percent,
-                'memory_available': memory.available,
-                'disk_percent': (disk.used / disk.total) * 100,
-                'disk_free': disk.free
+                'cpu_percent': ornek.get('cpu_percent'),
+                'memory_percent': ornek.get('memory_percent'),
+                'memory_available': ornek.get('memory_available'),
+                'disk_percent': ornek.get('disk_percent'),
+                'disk_free': ornek.get('disk_free')
             }
         except Exception as e:
             logger.warning(f"Sistem durumu alınamadı: {e}")
@@ -442,7 +878,8 @@ class ZeytinAnalizci:
         """Bellek temizliği"""
         try:
             # Python garbage collection
-            gc.collect()
+            with self.olcum.olc(ASAMA_BELLEK_TEMIZLIGI):
+                gc.collect()
             
             # CPU bellek kullanımını kontrol et
             memory = psutil.virtual_memory()
@@ -457,6 +894,7 @@ class ZeytinAnalizci:
         return {
             'analysis_mode': self.analysis_mode,
             'current_device': self.current_device,
+            'inference_backend': self.backend_name,
             'gpu_status': gpu_detector.get_gpu_status(),
             'system_status': self._get_system_status()
         }
\ No newline at end of file
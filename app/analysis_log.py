@@ -0,0 +1,212 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz Log Yazıcısı
+Analiz başına log.txt satırlarını bellekte tamponlar ve satır sayısı / süre
+eşiğinde veya analiz sonunda tek yazma ile diske aktarır. Dosyanın son
+satırları bellekte tutulur; durum sorguları yalnızca dosyaya yeni eklenen
+kısmı okur.
+"""
+
+import os
+import time
+import itertools
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class AnalysisLog:
+    """Tek bir analiz log dosyası için tamponlu yazıcı ve son satır önbelleği"""
+
+    def __init__(self, path: str, flush_lines: int = 50, flush_interval: float = 2.0,
+                 tail_lines: int = 1000):
+        self.path = path
+        self.flush_lines = max(1, flush_lines)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+
+        # Dosyadan okunan son satırlar (başka süreçlerin yazdıkları dahil)
+        self._tail: deque = deque(maxlen=max(1, tail_lines))
+        self._read_offset = 0
+        self._partial = b""
+        self.line_count = 0
+
+        self.lines_written = 0
+        self.flushes = 0
+
+    def write(self, mesaj: str):
+        """Zaman damgalı tek satır ekle"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.write_lines([f"[{timestamp}] {mesaj}"])
+
+    def write_lines(self, lines: Iterable[str]):
+        """Satırları olduğu gibi ekle (başlık blokları için)"""
+        with self._lock:
+            self._buffer.extend(f"{line}\n" for line in lines)
+            if (len(self._buffer) >= self.flush_lines or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            data = "".join(self._buffer)
+            count = len(self._buffer)
+            self._buffer = []
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(data)
+                self.lines_written += count
+                self.flushes += 1
+            except OSError as e:
+                logger.warning(f"Analiz logu yazılamadı ({self.path}): {e}")
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        """Tampondaki satırları diske yaz"""
+        with self._lock:
+            self._flush_locked()
+
+    def flush_if_stale(self):
+        """Süre eşiğini aşmış tamponu yaz (arka plan aktarıcısı için)"""
+        with self._lock:
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def tail(self, lines: Optional[int] = None) -> List[str]:
+        """Dosyanın son satırları; yalnızca son okumadan sonra eklenen kısım okunur"""
+        with self._lock:
+            self._flush_locked()
+            self._read_new_locked()
+            tail = list(self._tail)
+        return tail[-lines:] if lines else tail
+
+    def lines_since(self, cursor: int) -> Tuple[List[str], int, bool]:
+        """İmleçten (satır numarası) sonraki satırlar
+
+        Dönüş: (satırlar, sonraki imleç, kesildi). İmleç bellekteki pencerenin
+        gerisinde kalmışsa tutulan tüm satırlar döner ve kesildi True olur.
+        """
+        with self._lock:
+            self._flush_locked()
+            self._read_new_locked()
+            first = self.line_count - len(self._tail)
+            if cursor < first or cursor > self.line_count:
+                return list(self._tail), self.line_count, True
+            lines = list(itertools.islice(self._tail, cursor - first, None))
+            return lines, self.line_count, False
+
+    def _read_new_locked(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if size < self._read_offset:
+            # Dosya yeniden oluşturulmuş; baştan oku
+            self._read_offset, self._partial, self.line_count = 0, b"", 0
+            self._tail.clear()
+        if size == self._read_offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._read_offset)
+            data = self._partial + f.read(size - self._read_offset)
+        self._read_offset = size
+
+        # Yarım kalmış son satır bir sonraki okumaya bırakılır
+        *complete, self._partial = data.split(b"\n")
+        for line in complete:
+            self._tail.append(line.decode('utf-8', errors='replace'))
+        self.line_count += len(complete)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'path': self.path,
+                'buffered': len(self._buffer),
+                'lines_written': self.lines_written,
+                'flushes': self.flushes
+            }
+
+class AnalysisLogManager:
+    """Süreç içindeki açık analiz loglarını tutar ve süresi dolan tamponları periyodik aktarır"""
+
+    def __init__(self, flush_lines: int = 50, flush_interval: float = 2.0,
+                 tail_lines: int = 1000, max_open: int = 64):
+        self.flush_lines = flush_lines
+        self.flush_interval = flush_interval
+        self.tail_lines = tail_lines
+        self.max_open = max(1, max_open)
+        self._logs: "OrderedDict[str, AnalysisLog]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def get(self, path: str) -> AnalysisLog:
+        """Yolun log yazıcısı (yoksa oluşturulur)"""
+        key = os.path.abspath(path)
+        evicted = []
+        with self._lock:
+            log = self._logs.get(key)
+            if log is None:
+                log = AnalysisLog(path, self.flush_lines, self.flush_interval, self.tail_lines)
+                self._logs[key] = log
+                while len(self._logs) > self.max_open:
+                    evicted.append(self._logs.popitem(last=False)[1])
+            else:
+                self._logs.move_to_end(key)
+            self._ensure_flusher()
+
+        for old in evicted:
+            old.flush()
+        return log
+
+    def write(self, path: str, mesaj: str):
+        """Zaman damgalı satır ekle"""
+        self.get(path).write(mesaj)
+
+    def close(self, path: str):
+        """Log'u diske aktar ve yazıcıyı bırak"""
+        with self._lock:
+            log = self._logs.pop(os.path.abspath(path), None)
+        if log is not None:
+            log.flush()
+
+    def flush_all(self):
+        with self._lock:
+            logs = list(self._logs.values())
+        for log in logs:
+            log.flush()
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name="analysis-log-flusher", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                logs = list(self._logs.values())
+            for log in logs:
+                log.flush_if_stale()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            logs = list(self._logs.values())
+        return {
+            'open': len(logs),
+            'buffered': sum(log.get_stats()['buffered'] for log in logs)
+        }
+
+# Global analysis log manager instance
+analysis_logs = AnalysisLogManager(
+    flush_lines=settings.ANALYSIS_LOG_FLUSH_LINES,
+    flush_interval=settings.ANALYSIS_LOG_FLUSH_INTERVAL,
+    tail_lines=settings.ANALYSIS_LOG_TAIL_LINES,
+    max_open=settings.ANALYSIS_LOG_MAX_OPEN
+)
@@ -0,0 +1,109 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz Durum Deposu
+Analiz durumu ve sonucu analiz klasöründeki durum.json / sonuc.json
+dosyalarında sürüm numarasıyla tutulur. Durum sorguları yalnızca durum.json
+değiştiğinde (stat ile anlaşılır) dosyaları ve veritabanını yeniden okur; bu
+sayede birden fazla uygulama süreci aynı durumu tutarlı görür.
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .database import get_analysis, update_analysis_status
+
+logger = logging.getLogger(__name__)
+
+DURUM_DOSYASI = "durum.json"
+SONUC_DOSYASI = "sonuc.json"
+
+def _atomic_json_write(path: str, data: Dict):
+    """JSON dosyasını yarım okunamayacak şekilde yaz (geçici dosya + os.replace)"""
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+class AnalysisStatusStore:
+    """Analiz durumlarını sürümleyen ve sorgular için önbellekleyen depo"""
+
+    def __init__(self, max_cached: int = 256):
+        self.max_cached = max(1, max_cached)
+        self._cache: "OrderedDict[str, Tuple[Optional[Tuple], Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+        # os.replace her yazmada yeni inode üretir; aynı zaman damgasında da değişiklik görülür
+        try:
+            stat = os.stat(path)
+            return stat.st_ino, stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"JSON okunamadı ({path}): {e}")
+            return None
+
+    def set_status(self, analiz_id: str, analiz_klasoru: str, durum: str,
+                   sonuc: Optional[Dict] = None, hata_mesaji: Optional[str] = None) -> int:
+        """Durumu güncelle, sürümü artır; yeni sürüm numarasını döndür"""
+        update_analysis_status(analiz_id, durum, hata_mesaji)
+
+        if sonuc is not None:
+            _atomic_json_write(os.path.join(analiz_klasoru, SONUC_DOSYASI), sonuc)
+
+        durum_yolu = os.path.join(analiz_klasoru, DURUM_DOSYASI)
+        onceki = self._read_json(durum_yolu) or {}
+        surum = int(onceki.get('surum', 0)) + 1
+        _atomic_json_write(durum_yolu, {
+            'durum': durum,
+            'surum': surum,
+            'hata_mesaji': hata_mesaji,
+            'guncelleme': datetime.now().isoformat()
+        })
+        return surum
+
+    def get(self, analiz_id: str, analiz_klasoru: str) -> Dict:
+        """Durum kaydı: durum, surum, sonuc, analiz_bilgisi
+
+        durum.json değişmediyse önbellekteki kayıt döner (tek stat çağrısı).
+        """
+        durum_yolu = os.path.join(analiz_klasoru, DURUM_DOSYASI)
+        signature = self._signature(durum_yolu)
+
+        with self._lock:
+            cached = self._cache.get(analiz_id)
+            if cached is not None and cached[0] == signature:
+                self._cache.move_to_end(analiz_id)
+                return cached[1]
+
+        durum = self._read_json(durum_yolu) or {}
+        analiz_bilgisi = get_analysis(analiz_id)
+        kayit = {
+            'durum': durum.get('durum') or (analiz_bilgisi.get('durum', 'bilinmiyor') if analiz_bilgisi else 'bulunamadı'),
+            'surum': int(durum.get('surum', 0)),
+            'sonuc': self._read_json(os.path.join(analiz_klasoru, SONUC_DOSYASI)),
+            'analiz_bilgisi': analiz_bilgisi
+        }
+
+        with self._lock:
+            self._cache[analiz_id] = (signature, kayit)
+            self._cache.move_to_end(analiz_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return kayit
+
+# Global analysis status store instance
+analysis_status = AnalysisStatusStore()
@@ -0,0 +1,96 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz İptali ve Zaman Bütçesi
+İptal isteği analiz klasörüne bir işaret dosyası olarak yazılır; böylece
+analizi hangi süreç (API worker'ı, havuz süreci) çalıştırıyor olursa olsun
+görülür. Analizci dosyalar, batch'ler ve karolar arasında iptal isteğini ve
+zaman bütçesini kontrol eder.
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+IPTAL_ISARETI = "iptal_istegi.json"
+
+NEDEN_IPTAL = "iptal"
+NEDEN_ZAMAN_ASIMI = "zaman_asimi"
+
+class AnalysisCancelled(Exception):
+    """Analiz kullanıcı isteğiyle veya zaman bütçesi aşıldığı için durduruldu"""
+
+    def __init__(self, neden: str, mesaj: str):
+        # Süreç havuzundan ana sürece pickle ile taşınabilmesi için argümanlar args'ta tutulur
+        super().__init__(neden, mesaj)
+        self.neden = neden
+        self.mesaj = mesaj
+
+    def __str__(self) -> str:
+        return self.mesaj
+
+def iptal_isareti_yolu(analiz_klasoru: str) -> str:
+    return os.path.join(analiz_klasoru, IPTAL_ISARETI)
+
+def request_cancel(analiz_klasoru: str, kullanici_adi: Optional[str] = None) -> bool:
+    """Analiz için iptal isteği bırak; analiz klasörü yoksa False"""
+    if not os.path.isdir(analiz_klasoru):
+        return False
+    with open(iptal_isareti_yolu(analiz_klasoru), 'w', encoding='utf-8') as f:
+        json.dump({'kullanici_adi': kullanici_adi, 'zaman': datetime.now().isoformat()}, f)
+    return True
+
+def clear_cancel(analiz_klasoru: str):
+    """Önceki iptal isteğini kaldır (analiz yeniden başlatılırken)"""
+    try:
+        os.remove(iptal_isareti_yolu(analiz_klasoru))
+    except FileNotFoundError:
+        pass
+
+def cancel_requested(analiz_klasoru: str) -> Optional[Dict]:
+    """Bekleyen iptal isteği (yoksa None)"""
+    try:
+        with open(iptal_isareti_yolu(analiz_klasoru), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        return {}
+
+class CancelToken:
+    """Tek bir analiz çalıştırmasının iptal / zaman bütçesi kontrolü
+
+    check() iptal istenmişse veya bütçe aşılmışsa AnalysisCancelled fırlatır;
+    bir kez tetiklendikten sonra sonraki her çağrı aynı hatayı verir.
+    """
+
+    def __init__(self, analiz_klasoru: Optional[str] = None, zaman_butcesi: Optional[float] = None):
+        self.isaret_yolu = iptal_isareti_yolu(analiz_klasoru) if analiz_klasoru else None
+        self.zaman_butcesi = zaman_butcesi if zaman_butcesi and zaman_butcesi > 0 else None
+        self.baslangic = time.monotonic()
+        self._hata: Optional[AnalysisCancelled] = None
+
+    @property
+    def gecen_sure(self) -> float:
+        return time.monotonic() - self.baslangic
+
+    @property
+    def tetiklendi(self) -> bool:
+        return self._hata is not None
+
+    def check(self):
+        """İptal istenmişse veya zaman bütçesi aşılmışsa AnalysisCancelled fırlat"""
+        if self._hata is None:
+            if self.isaret_yolu and os.path.exists(self.isaret_yolu):
+                self._hata = AnalysisCancelled(NEDEN_IPTAL, "Analiz kullanıcı tarafından iptal edildi")
+            elif self.zaman_butcesi and self.gecen_sure > self.zaman_butcesi:
+                self._hata = AnalysisCancelled(
+                    NEDEN_ZAMAN_ASIMI,
+                    f"Analiz zaman bütçesi aşıldı ({self.zaman_butcesi:.0f} saniye)"
+                )
+        if self._hata is not None:
+            # Birden fazla thread'den çağrılabilir; her çağrıya yeni bir örnek
+            raise AnalysisCancelled(self._hata.neden, self._hata.mesaj)
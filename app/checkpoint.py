@@ -0,0 +1,119 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz Kontrol Noktaları
+Her dosyanın sonucu (tespit sayıları, indeksler, çıktı yolu) dosya bittiği
+anda kalıcı olarak kaydedilir. Aynı analiz tekrar çalıştırıldığında (iş
+tekrarı, yeniden başlatma) tamamlanan dosyalar atlanır ve nihai toplamlar
+kontrol noktalarından yeniden hesaplanır.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from .config import settings
+from .database import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+TUR_RGB = "rgb"
+TUR_MULTISPECTRAL = "multispektral"
+
+def dosya_imzasi(path: str) -> str:
+    """Dosyanın boyut + değişiklik zamanı imzası (dosya değişirse kontrol noktası geçersizleşir)"""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def ayar_imzasi(*parcalar) -> str:
+    """Sonucu etkileyen ayarların (model, parametreler) özeti"""
+    data = json.dumps(parcalar, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class AnalysisCheckpointStore:
+    """analysis_checkpoints tablosu üzerinde dosya başına sonuç kaydı"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def save(self, analiz_id: str, tur: str, dosya_adi: str, dosya_imza: str,
+             ayar_imza: str, sonuc: Dict) -> bool:
+        """Dosya sonucunu kaydet (her çağrı ayrı commit; analiz yarıda kalsa da korunur)"""
+        if not self.enabled:
+            return False
+        try:
+            conn = get_db_connection()
+            try:
+                conn.execute('''
+                    INSERT OR REPLACE INTO analysis_checkpoints
+                    (analiz_id, tur, dosya_adi, dosya_imzasi, ayar_imzasi, sonuc, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (analiz_id, tur, dosya_adi, dosya_imza, ayar_imza,
+                      json.dumps(sonuc, ensure_ascii=False, default=str), datetime.now().isoformat()))
+                conn.commit()
+            finally:
+                conn.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Kontrol noktası kaydedilemedi ({analiz_id}/{dosya_adi}): {e}")
+            return False
+
+    def load(self, analiz_id: str, tur: str, ayar_imza: Optional[str] = None) -> Dict[str, Dict]:
+        """Analizin geçerli kontrol noktaları: {dosya_adi: {'dosya_imzasi', 'sonuc'}}
+
+        ayar_imza verilirse farklı model / parametrelerle üretilen kayıtlar dönmez.
+        """
+        if not self.enabled:
+            return {}
+        try:
+            conn = get_db_connection()
+            try:
+                rows = conn.execute('''
+                    SELECT dosya_adi, dosya_imzasi, ayar_imzasi, sonuc FROM analysis_checkpoints
+                    WHERE analiz_id = ? AND tur = ?
+                ''', (analiz_id, tur)).fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Kontrol noktaları okunamadı ({analiz_id}): {e}")
+            return {}
+
+        return {
+            row['dosya_adi']: {'dosya_imzasi': row['dosya_imzasi'], 'sonuc': json.loads(row['sonuc'])}
+            for row in rows
+            if ayar_imza is None or row['ayar_imzasi'] == ayar_imza
+        }
+
+    def completed(self, analiz_id: str, tur: str, ayar_imza: str, dosya_yollari: Dict[str, str]) -> Dict[str, Dict]:
+        """Dosyası değişmemiş kontrol noktalarının sonuçları: {dosya_adi: sonuc}"""
+        kayitlar = self.load(analiz_id, tur, ayar_imza)
+        tamamlanan = {}
+        for dosya_adi, dosya_yolu in dosya_yollari.items():
+            kayit = kayitlar.get(dosya_adi)
+            if kayit is None:
+                continue
+            try:
+                if kayit['dosya_imzasi'] == dosya_imzasi(dosya_yolu):
+                    tamamlanan[dosya_adi] = kayit['sonuc']
+            except OSError:
+                continue
+        return tamamlanan
+
+    def clear(self, analiz_id: str, tur: Optional[str] = None) -> int:
+        """Analizin kontrol noktalarını sil"""
+        conn = get_db_connection()
+        try:
+            if tur is None:
+                deleted = conn.execute('DELETE FROM analysis_checkpoints WHERE analiz_id = ?',
+                                       (analiz_id,)).rowcount
+            else:
+                deleted = conn.execute('DELETE FROM analysis_checkpoints WHERE analiz_id = ? AND tur = ?',
+                                       (analiz_id, tur)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return deleted
+
+# Global analysis checkpoint store instance
+analysis_checkpoints = AnalysisCheckpointStore(enabled=settings.ANALYSIS_CHECKPOINT_ENABLED)
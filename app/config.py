@@ -39,7 +39,101 @@ class Settings:
     YOLO_MODEL_PATH: str = os.getenv("YOLO_MODEL_PATH", "models/yolov8n.pt")
     CONFIDENCE_THRESHOLD: float = float(os.getenv("CONFIDENCE_THRESHOLD", "0.5"))
     DEFAULT_ANALYSIS_MODE: str = os.getenv("DEFAULT_ANALYSIS_MODE", "cpu")
-    
+    INFERENCE_BATCH_SIZE: int = int(os.getenv("INFERENCE_BATCH_SIZE", "4"))
+
+    # Çıkarım arka ucu (ultralytics veya onnxruntime; model bazında _info.json "backend" alanı önceliklidir)
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "ultralytics")
+    INFERENCE_IOU_THRESHOLD: float = float(os.getenv("INFERENCE_IOU_THRESHOLD", "0.7"))
+    INFERENCE_MAX_DETECTIONS: int = int(os.getenv("INFERENCE_MAX_DETECTIONS", "300"))
+    ONNX_INTRA_OP_THREADS: int = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0: ONNX Runtime varsayılanı
+    ONNX_INTER_OP_THREADS: int = int(os.getenv("ONNX_INTER_OP_THREADS", "0"))
+    ONNX_IMAGE_SIZE: int = int(os.getenv("ONNX_IMAGE_SIZE", "640"))  # Dinamik boyutlu export'lar için giriş boyutu
+
+    # INT8 model varyantları (CPU modu)
+    QUANTIZED_MODELS_ENABLED: bool = os.getenv("QUANTIZED_MODELS_ENABLED", "True").lower() == "true"
+    QUANTIZED_MAX_MAP_DROP: float = float(os.getenv("QUANTIZED_MAX_MAP_DROP", "0.01"))  # İzin verilen mAP50 kaybı
+    QUANTIZATION_CALIBRATION_SIZE: int = int(os.getenv("QUANTIZATION_CALIBRATION_SIZE", "64"))
+
+    # Model seçimi (mAP50 en yüksek model, bu sunucuda ölçülen gecikme / bellek bütçesi içinde; 0: sınırsız)
+    MODEL_SELECTION_MAX_LATENCY_MS: float = float(os.getenv("MODEL_SELECTION_MAX_LATENCY_MS", "0"))
+    MODEL_SELECTION_MAX_MEMORY_MB: float = float(os.getenv("MODEL_SELECTION_MAX_MEMORY_MB", "0"))
+    MODEL_BENCHMARK_RUNS: int = int(os.getenv("MODEL_BENCHMARK_RUNS", "5"))
+    MODEL_BENCHMARK_IMAGE_SIZE: int = int(os.getenv("MODEL_BENCHMARK_IMAGE_SIZE", "640"))
+
+    # Eğitim veri seti hazırlama (hardlink, symlink, copy veya manifest)
+    DATASET_MATERIALIZE_MODE: str = os.getenv("DATASET_MATERIALIZE_MODE", "hardlink")
+    DATASET_COPY_WORKERS: int = int(os.getenv("DATASET_COPY_WORKERS", "8"))
+    AUGMENTATION_MODE: str = os.getenv("AUGMENTATION_MODE", "offline")  # offline (_aug_ dosyaları) veya online (eğitim sırasında)
+    AUGMENT_WORKERS: int = int(os.getenv("AUGMENT_WORKERS", "0"))  # 0: çekirdek sayısı kadar süreç
+    AUGMENT_CHUNK_SIZE: int = int(os.getenv("AUGMENT_CHUNK_SIZE", "16"))
+    AUGMENT_SEED: int = int(os.getenv("AUGMENT_SEED", "0"))
+    # Önceden boyutlandırılmış eğitim görselleri (kaynak hash + imgsz anahtarlı .npy; eğitim ve değerlendirme JPEG çözmez)
+    TRAINING_IMAGE_CACHE_ENABLED: bool = os.getenv("TRAINING_IMAGE_CACHE_ENABLED", "True").lower() == "true"
+    TRAINING_IMAGE_CACHE_DIR: str = os.getenv("TRAINING_IMAGE_CACHE_DIR", "data/training_cache")
+    TRAINING_IMAGE_CACHE_MAX_MB: float = float(os.getenv("TRAINING_IMAGE_CACHE_MAX_MB", "0"))  # 0: sınırsız
+    TRAINING_IMAGE_CACHE_WORKERS: int = int(os.getenv("TRAINING_IMAGE_CACHE_WORKERS", "4"))
+
+    # Arka plan eğitim işleri (her iş ayrı süreçte; analiz API'sini aç bırakmamak için kaynak sınırlı)
+    TRAINING_JOBS_DIR: str = os.getenv("TRAINING_JOBS_DIR", "models/training")  # İş başına veri seti, ağırlıklar ve checkpoint'ler
+    TRAINING_MAX_CONCURRENT: int = int(os.getenv("TRAINING_MAX_CONCURRENT", "1"))  # Tüm süreçlerde aynı anda çalışan eğitim sınırı
+    TRAINING_CPU_THREADS: int = int(os.getenv("TRAINING_CPU_THREADS", "0"))  # 0: çekirdek sayısının yarısı
+    TRAINING_DATALOADER_WORKERS: int = int(os.getenv("TRAINING_DATALOADER_WORKERS", "2"))
+    TRAINING_MAX_MEMORY_MB: float = float(os.getenv("TRAINING_MAX_MEMORY_MB", "0"))  # 0: sınırsız (süreç + alt süreçler RSS)
+    TRAINING_NICE: int = int(os.getenv("TRAINING_NICE", "10"))  # Eğitim sürecinin CPU önceliği düşürülür
+    TRAINING_HEARTBEAT_SECONDS: float = float(os.getenv("TRAINING_HEARTBEAT_SECONDS", "10"))
+    TRAINING_STALE_SECONDS: float = float(os.getenv("TRAINING_STALE_SECONDS", "120"))  # Kalp atışı gelmeyen iş hatalı sayılır
+    TRAINING_STOP_GRACE_SECONDS: float = float(os.getenv("TRAINING_STOP_GRACE_SECONDS", "60"))  # İptal bu sürede karşılanmazsa süreç sonlandırılır
+    TRAINING_POLL_INTERVAL: float = float(os.getenv("TRAINING_POLL_INTERVAL", "5"))
+
+    # Analiz yürütücüsü (analizler event loop dışında çalışır)
+    ANALYSIS_EXECUTOR: str = os.getenv("ANALYSIS_EXECUTOR", "process")  # process veya thread
+    ANALYSIS_WORKERS: int = int(os.getenv("ANALYSIS_WORKERS", "1"))
+    ANALYSIS_MAX_CONCURRENT: int = int(os.getenv("ANALYSIS_MAX_CONCURRENT", "0"))  # 0: worker sayısı kadar
+    ANALYSIS_TIME_BUDGET_SECONDS: float = float(os.getenv("ANALYSIS_TIME_BUDGET_SECONDS", "0"))  # 0: sınırsız
+
+    # Kalıcı analiz iş kuyruğu (SQLite; her uygulama süreci kendi runner'ını çalıştırır)
+    JOB_RUNNER_CONCURRENCY: int = int(os.getenv("JOB_RUNNER_CONCURRENCY", "1"))  # Süreç başına eşzamanlı iş
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))  # Kalp atışı gelmezse iş tekrar kuyruğa alınır
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+    # Analiz kabul kontrolü (kuyruk derinliği ve bellek payına göre kabul / düşür / reddet)
+    ADMISSION_CONTROL_ENABLED: bool = os.getenv("ADMISSION_CONTROL_ENABLED", "True").lower() == "true"
+    ADMISSION_MAX_QUEUE_DEPTH: int = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "20"))  # Bekleyen + çalışan iş sınırı
+    ADMISSION_MEMORY_RESERVE_PERCENT: float = float(os.getenv("ADMISSION_MEMORY_RESERVE_PERCENT", "15"))  # Her zaman boş bırakılan bellek
+    ADMISSION_MODEL_OVERHEAD_MB: float = float(os.getenv("ADMISSION_MODEL_OVERHEAD_MB", "512"))  # Model + çalışma zamanı
+    ADMISSION_UNKNOWN_EXPANSION: float = float(os.getenv("ADMISSION_UNKNOWN_EXPANSION", "10"))  # Boyutu bilinmeyen dosya: bellek / dosya boyutu
+    ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "30"))
+
+    # Okuma -> çıkarım -> yazma işleme hattı
+    PIPELINE_DECODE_WORKERS: int = int(os.getenv("PIPELINE_DECODE_WORKERS", "2"))
+    PIPELINE_ENCODE_WORKERS: int = int(os.getenv("PIPELINE_ENCODE_WORKERS", "2"))
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))  # Önden okunan / yazılmayı bekleyen en fazla görsel
+
+    # Büyük görseller için karo (tile) tabanlı çıkarım
+    TILED_INFERENCE_ENABLED: bool = os.getenv("TILED_INFERENCE_ENABLED", "True").lower() == "true"
+    TILE_MIN_IMAGE_SIZE: int = int(os.getenv("TILE_MIN_IMAGE_SIZE", "2048"))  # Bu kenar uzunluğunun üstü karolanır
+    TILE_SIZE: int = int(os.getenv("TILE_SIZE", "640"))
+    TILE_OVERLAP: int = int(os.getenv("TILE_OVERLAP", "128"))
+    TILE_BATCH_SIZE: int = int(os.getenv("TILE_BATCH_SIZE", "8"))
+    # >1: her worker kendi model kopyasıyla paralel çalışır. Süreç modunda torch thread'leri worker
+    # başlangıcında buna göre bölünür; thread modunda OMP_NUM_THREADS ile ayarlanmalıdır.
+    TILE_WORKERS: int = int(os.getenv("TILE_WORKERS", "1"))
+    TILE_NMS_THRESHOLD: float = float(os.getenv("TILE_NMS_THRESHOLD", "0.5"))
+
+    # Model önbellek ayarları
+    MODEL_CACHE_MAX_MODELS: int = int(os.getenv("MODEL_CACHE_MAX_MODELS", "2"))
+    MODEL_CACHE_MAX_MB: float = float(os.getenv("MODEL_CACHE_MAX_MB", "1024"))
+    MODEL_INDEX_RESCAN_SECONDS: float = float(os.getenv("MODEL_INDEX_RESCAN_SECONDS", "60"))  # Dizin değişmese de dosya imzaları bu aralıkla kontrol edilir
+
+    # Tespit sonucu önbelleği (dosya hash'i + model hash'i + parametre anahtarlı)
+    DETECTION_CACHE_ENABLED: bool = os.getenv("DETECTION_CACHE_ENABLED", "True").lower() == "true"
+    DETECTION_CACHE_MAX_ENTRIES: int = int(os.getenv("DETECTION_CACHE_MAX_ENTRIES", "50000"))
+    DETECTION_CACHE_MAX_MB: float = float(os.getenv("DETECTION_CACHE_MAX_MB", "512"))
+
+    # Dosya başına analiz kontrol noktaları (yarıda kalan analiz tamamlanan dosyaları atlayarak devam eder)
+    ANALYSIS_CHECKPOINT_ENABLED: bool = os.getenv("ANALYSIS_CHECKPOINT_ENABLED", "True").lower() == "true"
+
     # Dosya limitleri
     MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", "104857600"))  # 100MB
     ALLOWED_EXTENSIONS: list = os.getenv("ALLOWED_EXTENSIONS", "jpg,jpeg,png,tif,tiff").split(",")
@@ -55,7 +149,17 @@ class Settings:
     # Monitoring ayarları
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    SYSTEM_MONITOR_INTERVAL: float = float(os.getenv("SYSTEM_MONITOR_INTERVAL", "5"))  # saniye
+    SYSTEM_MONITOR_HISTORY: int = int(os.getenv("SYSTEM_MONITOR_HISTORY", "120"))  # Tutulan örnek sayısı
     HEALTH_CHECK_TIMEOUT: int = int(os.getenv("HEALTH_CHECK_TIMEOUT", "5"))
+    ANALYSIS_STAGE_METRICS_ENABLED: bool = os.getenv("ANALYSIS_STAGE_METRICS_ENABLED", "True").lower() == "true"  # Aşama histogramlarını /metrics için biriktir
+
+    # Analiz log.txt yazıcısı (satırlar tamponlanıp toplu yazılır)
+    ANALYSIS_LOG_FLUSH_LINES: int = int(os.getenv("ANALYSIS_LOG_FLUSH_LINES", "50"))
+    ANALYSIS_LOG_FLUSH_INTERVAL: float = float(os.getenv("ANALYSIS_LOG_FLUSH_INTERVAL", "2"))  # saniye
+    ANALYSIS_LOG_TAIL_LINES: int = int(os.getenv("ANALYSIS_LOG_TAIL_LINES", "1000"))  # Bellekte tutulan son satır
+    ANALYSIS_LOG_MAX_OPEN: int = int(os.getenv("ANALYSIS_LOG_MAX_OPEN", "64"))
+    PROGRESS_KEEPALIVE_SECONDS: float = float(os.getenv("PROGRESS_KEEPALIVE_SECONDS", "15"))  # SSE akışında boşta bekleme
     
     # Backup ayarları
     BACKUP_DIR: str = os.getenv("BACKUP_DIR", "/backups")
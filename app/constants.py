@@ -48,6 +48,18 @@ DB_RETRY_COUNT = 3
 GPU_MEMORY_THRESHOLD = 0.9  # %90 bellek kullanımında uyarı
 GPU_CLEANUP_INTERVAL = 300  # 5 dakikada bir temizlik
 
+# Düşük Bellek Sabitleri (kabul kontrolünün "düşür" kararıyla çalışan analizler)
+LOW_MEMORY_PROCESSING = {
+    'batch_size': 1,  # Çıkarım batch boyutu
+    'decode_workers': 1,
+    'encode_workers': 1,
+    'queue_size': 1,  # Önden okunan görsel sayısı
+    'tile_batch_size': 1,
+    'tile_workers': 1
+}
+RGB_WORKING_COPIES = 3  # Çözülmüş görsel + model girdisi + işaretli kopya
+MULTISPECTRAL_DERIVED_BANDS = 3  # NDVI, GNDVI, NDRE
+
 # Monitoring Sabitleri
 HEALTH_CHECK_TIMEOUT = 5  # saniye
 METRICS_UPDATE_INTERVAL = 60  # saniye
@@ -65,6 +77,7 @@ ERROR_MESSAGES = {
     "gpu_not_available": "GPU mevcut değil",
     "insufficient_permissions": "Yetersiz yetki",
     "rate_limit_exceeded": "İstek limiti aşıldı",
+    "conflict": "İşlem mevcut durumla çakışıyor",
     "internal_error": "Sistem hatası oluştu"
 }
 
@@ -72,6 +85,7 @@ ERROR_MESSAGES = {
 SUCCESS_MESSAGES = {
     "file_uploaded": "Dosya başarıyla yüklendi",
     "analysis_completed": "Analiz başarıyla tamamlandı",
+    "analysis_queued": "Analiz kuyruğa alındı",
     "report_generated": "Rapor oluşturuldu",
     "backup_created": "Yedek oluşturuldu",
     "user_created": "Kullanıcı oluşturuldu"
@@ -18,12 +18,56 @@ def get_db_connection():
         logger.error(f"Database connection error: {e}")
         raise
 
+def _extend_status_check(conn, table: str, old_values: str, new_values: str):
+    """Rebuild a table whose durum CHECK constraint predates new status values
+    
+    SQLite cannot alter a CHECK constraint in place; the table is recreated
+    from its stored schema with foreign keys disabled so that dependent rows
+    are not cascaded away.
+    """
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    if row is None or old_values not in row['sql']:
+        return
+    
+    new_table = f"{table}_migrated"
+    new_sql = row['sql'].replace(old_values, new_values, 1)
+    new_sql = new_sql.replace(table, new_table, 1)
+    
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        conn.execute(new_sql)
+        conn.execute(f"INSERT INTO {new_table} SELECT * FROM {table}")
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        conn.commit()
+        logger.info(f"Migrated {table}.durum constraint")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+def _add_missing_columns(conn, table: str, columns: dict):
+    """Add columns introduced after the table was first created"""
+    existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+            logger.info(f"Added column {table}.{name}")
+
 def init_db():
     """Initialize database and create all tables"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
+        # Status values added after the tables were first created
+        _extend_status_check(conn, 'analizler',
+                             "'tamamlandi', 'hata'))", "'tamamlandi', 'hata', 'iptal'))")
+        _extend_status_check(conn, 'analysis_jobs',
+                             "'tamamlandi', 'hata'))", "'tamamlandi', 'hata', 'iptal'))")
+        
         # Users table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -104,7 +148,7 @@ def init_db():
                 excel_path TEXT DEFAULT '',
                 geojson_path TEXT DEFAULT '',
                 log_path TEXT DEFAULT '',
-                durum TEXT DEFAULT 'yuklendi' CHECK (durum IN ('yuklendi', 'isleniyor', 'tamamlandi', 'hata')),
+                durum TEXT DEFAULT 'yuklendi' CHECK (durum IN ('yuklendi', 'isleniyor', 'tamamlandi', 'hata', 'iptal')),
                 analiz_modu TEXT DEFAULT 'cpu' CHECK (analiz_modu IN ('cpu', 'gpu')),
                 kullanilan_cihaz TEXT DEFAULT 'cpu',
                 analiz_suresi REAL DEFAULT 0.0,
@@ -126,10 +170,20 @@ def init_db():
                 dosya_hash TEXT NOT NULL,
                 upload_path TEXT NOT NULL,
                 created_at TEXT NOT NULL,
+                genislik INTEGER,
+                yukseklik INTEGER,
+                bant_sayisi INTEGER,
                 FOREIGN KEY (analiz_id) REFERENCES analizler (analiz_id) ON DELETE CASCADE
             )
         ''')
         
+        # Image dimensions used by admission control's cost estimate
+        _add_missing_columns(conn, 'file_uploads', {
+            'genislik': 'INTEGER',
+            'yukseklik': 'INTEGER',
+            'bant_sayisi': 'INTEGER'
+        })
+        
         # System settings table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS system_settings (
@@ -144,6 +198,116 @@ def init_db():
             )
         ''')
         
+        # Durable analysis job queue (claimed by job runners with leases)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                job_id TEXT PRIMARY KEY,
+                analiz_id TEXT NOT NULL,
+                analiz_modu TEXT DEFAULT 'cpu',
+                durum TEXT DEFAULT 'bekliyor' CHECK (durum IN ('bekliyor', 'calisiyor', 'tamamlandi', 'hata', 'iptal')),
+                oncelik INTEGER DEFAULT 0,
+                deneme INTEGER DEFAULT 0,
+                max_deneme INTEGER DEFAULT 3,
+                payload TEXT,
+                kullanici_id INTEGER,
+                lease_owner TEXT,
+                lease_expires REAL,
+                heartbeat_at REAL,
+                hata_mesaji TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                FOREIGN KEY (analiz_id) REFERENCES analizler (analiz_id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Per-file analysis checkpoints (completed files are skipped when an analysis is resumed)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_checkpoints (
+                analiz_id TEXT NOT NULL,
+                tur TEXT NOT NULL,
+                dosya_adi TEXT NOT NULL,
+                dosya_imzasi TEXT NOT NULL,
+                ayar_imzasi TEXT NOT NULL,
+                sonuc TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (analiz_id, tur, dosya_adi),
+                FOREIGN KEY (analiz_id) REFERENCES analizler (analiz_id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Detection result cache (keyed by file hash + model hash + inference params)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS detection_cache (
+                cache_key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                dosya_hash TEXT NOT NULL,
+                model_hash TEXT NOT NULL,
+                params TEXT NOT NULL,
+                payload BLOB,
+                meta TEXT,
+                size INTEGER NOT NULL DEFAULT 0,
+                hit_count INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        
+        # Detection cache counters, aggregated across worker processes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS detection_cache_stats (
+                kind TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                stores INTEGER NOT NULL DEFAULT 0,
+                evictions INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        # Analysis stage histograms and counters, aggregated across worker processes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_stage_metrics (
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (kind, name, field)
+            )
+        ''')
+
+        # Background training jobs (one process per job, per-epoch progress below)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS training_jobs (
+                job_id TEXT PRIMARY KEY,
+                model_name TEXT NOT NULL,
+                durum TEXT DEFAULT 'bekliyor' CHECK (durum IN ('bekliyor', 'calisiyor', 'tamamlandi', 'hata', 'iptal')),
+                payload TEXT,
+                kullanici_id INTEGER,
+                devam INTEGER DEFAULT 0,
+                owner TEXT,
+                pid INTEGER,
+                heartbeat_at REAL,
+                epoch INTEGER DEFAULT 0,
+                epochs INTEGER,
+                sonuc TEXT,
+                hata_mesaji TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS training_job_epochs (
+                job_id TEXT NOT NULL,
+                epoch INTEGER NOT NULL,
+                metrics TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (job_id, epoch),
+                FOREIGN KEY (job_id) REFERENCES training_jobs (job_id) ON DELETE CASCADE
+            )
+        ''')
+
         # Create indexes for better performance
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users (kullanici_adi)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)')
@@ -156,6 +320,11 @@ def init_db():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analizler_user ON analizler (kullanici_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analizler_date ON analizler (tarih_saat)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_uploads_analiz ON file_uploads (analiz_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_uploads_path ON file_uploads (upload_path)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_detection_cache_last_used ON detection_cache (last_used)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_claim ON analysis_jobs (durum, oncelik, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_analiz ON analysis_jobs (analiz_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_training_jobs_claim ON training_jobs (durum, created_at)')
         
         # Insert default system settings
         default_settings = [
@@ -330,7 +499,9 @@ def get_all_analyses(kullanici_id: Optional[int] = None, limit: int = 100) -> Li
         return []
 
 def add_file_upload(analiz_id: str, dosya_adi: str, dosya_boyutu: int, 
-                   dosya_tipi: str, dosya_hash: str, upload_path: str):
+                   dosya_tipi: str, dosya_hash: str, upload_path: str,
+                   genislik: Optional[int] = None, yukseklik: Optional[int] = None,
+                   bant_sayisi: Optional[int] = None):
     """Add file upload record"""
     try:
         conn = get_db_connection()
@@ -338,11 +509,13 @@ def add_file_upload(analiz_id: str, dosya_adi: str, dosya_boyutu: int,
         
         cursor.execute('''
             INSERT INTO file_uploads 
-            (analiz_id, dosya_adi, dosya_boyutu, dosya_tipi, dosya_hash, upload_path, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
+            (analiz_id, dosya_adi, dosya_boyutu, dosya_tipi, dosya_hash, upload_path, created_at,
+             genislik, yukseklik, bant_sayisi)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             analiz_id, dosya_adi, dosya_boyutu, dosya_tipi, 
-            dosya_hash, upload_path, datetime.now().isoformat()
+            dosya_hash, upload_path, datetime.now().isoformat(),
+            genislik, yukseklik, bant_sayisi
         ))
         
         conn.commit()
@@ -351,6 +524,22 @@ def add_file_upload(analiz_id: str, dosya_adi: str, dosya_boyutu: int,
     except Exception as e:
         logger.error(f"Add file upload error: {e}")
 
+def get_analysis_files(analiz_id: str) -> List[Dict]:
+    """Get upload records (size and image dimensions) of an analysis"""
+    try:
+        conn = get_db_connection()
+        rows = conn.execute('''
+            SELECT dosya_adi, dosya_boyutu, dosya_tipi, upload_path, genislik, yukseklik, bant_sayisi
+            FROM file_uploads WHERE analiz_id = ? ORDER BY upload_id
+        ''', (analiz_id,)).fetchall()
+        conn.close()
+        
+        return [dict(row) for row in rows]
+        
+    except Exception as e:
+        logger.error(f"Get analysis files error: {e}")
+        return []
+
 def get_system_setting(key: str, default_value: str = None) -> str:
     """Get system setting value"""
     try:
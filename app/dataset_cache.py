@@ -0,0 +1,254 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Eğitim Görsel Önbelleği
+Eğitim görselleri bir kez çözülüp uzun kenarı imgsz olacak şekilde
+küçültülür ve memory-map edilebilir .npy dizileri olarak saklanır. Kayıtlar
+kaynak dosyanın içerik hash'i + hedef boyut ile anahtarlanır; böylece farklı
+eğitim işleri, devam ettirilen eğitimler ve değerlendirmeler aynı diziyi
+kullanır. Veri seti klasöründe her görselin yanına kayda bağlı bir <ad>.npy
+konur; ultralytics bu dosyayı JPEG çözmek yerine doğrudan yükler.
+
+ultralytics <ad>.npy varsa görselle karşılaştırmadan onu yükler; dizinin
+görselle uyumlu kalması bu önbelleğin sorumluluğudur. Manifest veri
+setlerinde (<bölüm>.txt listeleri) kaynak görsellerin yanına dosya
+konmadığı için listelenen görseller önbelleğe alınmaz.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .config import settings
+from .detection_cache import file_md5
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+GORSEL_UZANTILARI = ('.jpg', '.jpeg', '.png')
+DIZI_UZANTISI = '.npy'
+INDEKS_DOSYASI = '.image_cache.json'
+VERI_SETI_BOLUMLERI = ('train', 'val', 'test')
+
+SONUC_OLUSTURULDU = 'built'
+SONUC_YENIDEN_KULLANILDI = 'reused'
+SONUC_HATA = 'failed'
+
+def on_boyutlandir(image: np.ndarray, imgsz: int) -> np.ndarray:
+    """Uzun kenarı imgsz'e küçült (ultralytics load_image ile aynı boyut; büyütme yapılmaz)"""
+    h, w = image.shape[:2]
+    oran = imgsz / max(h, w)
+    if oran >= 1:
+        return image
+    boyut = (min(math.ceil(w * oran), imgsz), min(math.ceil(h * oran), imgsz))
+    return cv2.resize(image, boyut, interpolation=cv2.INTER_AREA)
+
+class DatasetImageCache:
+    """Kaynak hash + hedef boyut anahtarlı, önceden boyutlandırılmış görsel dizileri"""
+
+    def __init__(self, cache_dir: str, enabled: bool = True, max_mb: float = 0, workers: int = 4):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.max_bytes = int(max_mb * MB)
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+
+    def entry_path(self, kaynak_hash: str, imgsz: int) -> str:
+        return os.path.join(self.cache_dir, kaynak_hash[:2], f"{kaynak_hash}_{imgsz}{DIZI_UZANTISI}")
+
+    def load(self, kaynak_yolu: str, imgsz: int, mmap: bool = True) -> Optional[np.ndarray]:
+        """Kaynak görselin önbellekteki dizisi (yoksa None); mmap ile diske eşlenmiş okunur"""
+        kayit = self.entry_path(file_md5(kaynak_yolu), imgsz)
+        if not os.path.exists(kayit):
+            return None
+        return np.load(kayit, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+    def ensure(self, kaynak_yolu: str, kaynak_hash: str, imgsz: int) -> Tuple[str, str]:
+        """Kaydı gerekirse oluştur; (kayıt yolu, 'built' | 'reused')"""
+        kayit = self.entry_path(kaynak_hash, imgsz)
+        if os.path.exists(kayit):
+            return kayit, SONUC_YENIDEN_KULLANILDI
+
+        image = cv2.imread(kaynak_yolu)
+        if image is None:
+            raise ValueError(f"Görsel okunamadı: {kaynak_yolu}")
+        image = np.ascontiguousarray(on_boyutlandir(image, imgsz))
+
+        # Aynı kaydı eşzamanlı oluşturan işler birbirinin yarım dosyasını görmez
+        os.makedirs(os.path.dirname(kayit), exist_ok=True)
+        gecici = f"{kayit}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(gecici, 'wb') as f:
+                np.save(f, image, allow_pickle=False)
+            os.replace(gecici, kayit)
+        finally:
+            if os.path.exists(gecici):
+                os.remove(gecici)
+        return kayit, SONUC_OLUSTURULDU
+
+    def prepare(self, dataset_dir: str, imgsz: int) -> Dict:
+        """Veri setindeki her görselin yanına önbellek kaydına bağlı <ad>.npy koy
+
+        Görsel imzaları (boyut, mtime) veri seti klasöründeki indekste tutulur;
+        değişmeyen görseller tekrar okunup hash'lenmez. İmzası değişen görselin
+        .npy bağlantısı yeniden kurulmadan önce silinir; kayıt oluşturulamazsa
+        ultralytics görseli çözer. Görseli silinmiş .npy dosyaları kaldırılır;
+        önbellek kapalıysa veri setindeki bütün .npy dosyaları kaldırılır.
+        """
+        stats = {'images': 0, SONUC_OLUSTURULDU: 0, SONUC_YENIDEN_KULLANILDI: 0, SONUC_HATA: 0,
+                 'removed': 0, 'imgsz': imgsz}
+        manifestler = [bolum for bolum in VERI_SETI_BOLUMLERI
+                       if os.path.exists(os.path.join(dataset_dir, f"{bolum}.txt"))]
+        if not self.enabled:
+            # Eski çalıştırmalardan kalan diziler görsel değişse de yüklenirdi
+            _, stats['removed'] = self._dataset_images(dataset_dir, tumu=True)
+            return stats
+        if manifestler:
+            logger.warning(f"Manifest veri seti ({dataset_dir}): {', '.join(manifestler)} listelerindeki "
+                           f"kaynak görseller önbelleğe alınmaz, eğitimde her epoch çözülür")
+
+        baslangic = time.perf_counter()
+        indeks_yolu = os.path.join(dataset_dir, INDEKS_DOSYASI)
+        eski_indeks = self._load_index(indeks_yolu)
+        gorseller, stats['removed'] = self._dataset_images(dataset_dir)
+        stats['images'] = len(gorseller)
+
+        def isle(gorsel: str) -> Tuple[str, Optional[List], str]:
+            hedef = os.path.splitext(gorsel)[0] + DIZI_UZANTISI
+            try:
+                stat = os.stat(gorsel)
+                imza = [stat.st_size, stat.st_mtime_ns]
+                onceki = eski_indeks.get(gorsel)
+                if onceki and onceki[:2] == imza:
+                    kaynak_hash = onceki[2]
+                else:
+                    # Görsel değişti (veya indekste yok): eski dizi görselin yerine yüklenmemeli
+                    if os.path.lexists(hedef):
+                        os.remove(hedef)
+                    kaynak_hash = file_md5(gorsel)
+                kayit, sonuc = self.ensure(gorsel, kaynak_hash, imgsz)
+                self._place(kayit, hedef)
+                return gorsel, imza + [kaynak_hash], sonuc
+            except Exception as e:
+                logger.warning(f"Görsel önbelleğe alınamadı ({gorsel}): {e}")
+                if os.path.lexists(hedef):
+                    os.remove(hedef)
+                return gorsel, None, SONUC_HATA
+
+        yeni_indeks = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for gorsel, kayit, sonuc in pool.map(isle, gorseller):
+                stats[sonuc] += 1
+                if kayit is not None:
+                    yeni_indeks[gorsel] = kayit
+        self._save_index(indeks_yolu, yeni_indeks)
+
+        stats['pruned'] = self.prune()
+        stats['seconds'] = round(time.perf_counter() - baslangic, 3)
+        logger.info(f"Eğitim görsel önbelleği hazır ({dataset_dir}, imgsz={imgsz}): "
+                    f"{stats[SONUC_OLUSTURULDU]} oluşturuldu, {stats[SONUC_YENIDEN_KULLANILDI]} yeniden kullanıldı, "
+                    f"{stats[SONUC_HATA]} hata")
+        return stats
+
+    def prune(self) -> int:
+        """Boyut sınırı aşıldıysa en uzun süredir kullanılmayan kayıtları sil"""
+        if not self.max_bytes or not os.path.isdir(self.cache_dir):
+            return 0
+        with self._lock:
+            kayitlar = []
+            for kok, _, dosyalar in os.walk(self.cache_dir):
+                for ad in dosyalar:
+                    if ad.endswith(DIZI_UZANTISI):
+                        stat = os.stat(os.path.join(kok, ad))
+                        kayitlar.append((stat.st_mtime, stat.st_size, os.path.join(kok, ad)))
+            toplam = sum(boyut for _, boyut, _ in kayitlar)
+            silinen = 0
+            # Veri setlerindeki hardlink'ler kayıt silinse de geçerli kalır
+            for _, boyut, yol in sorted(kayitlar):
+                if toplam <= self.max_bytes:
+                    break
+                os.remove(yol)
+                toplam -= boyut
+                silinen += 1
+        return silinen
+
+    def get_stats(self) -> Dict:
+        entries = size = 0
+        if os.path.isdir(self.cache_dir):
+            for kok, _, dosyalar in os.walk(self.cache_dir):
+                for ad in dosyalar:
+                    if ad.endswith(DIZI_UZANTISI):
+                        entries += 1
+                        size += os.path.getsize(os.path.join(kok, ad))
+        return {'enabled': self.enabled, 'cache_dir': self.cache_dir, 'entries': entries,
+                'size_mb': round(size / MB, 2), 'max_mb': round(self.max_bytes / MB, 2)}
+
+    @staticmethod
+    def _place(kayit: str, hedef: str):
+        """Kaydı görselin yanına bağla (hardlink; olmazsa symlink)
+
+        Kayıt dokunularak son kullanım zamanı güncellenir; boyut sınırı en
+        eski kullanılan kaydı siler. Bağlantı başka bir kayda (farklı içerik
+        veya imgsz) gidiyorsa yenisiyle değiştirilir.
+        """
+        os.utime(kayit)
+        try:
+            if os.path.samefile(kayit, hedef):
+                return
+        except OSError:
+            pass
+        if os.path.lexists(hedef):
+            os.remove(hedef)
+        try:
+            os.link(kayit, hedef)
+        except OSError:
+            os.symlink(os.path.abspath(kayit), hedef)
+
+    @staticmethod
+    def _dataset_images(dataset_dir: str, tumu: bool = False) -> Tuple[List[str], int]:
+        """images/<bölüm> altındaki görseller; görseli olmayan (tumu: bütün) .npy dosyaları silinir"""
+        gorseller, silinen = [], 0
+        for bolum in VERI_SETI_BOLUMLERI:
+            bolum_dizini = os.path.join(dataset_dir, 'images', bolum)
+            if not os.path.isdir(bolum_dizini):
+                continue
+            with os.scandir(bolum_dizini) as entries:
+                dosyalar = [entry.path for entry in entries]
+            koklar = {os.path.splitext(yol)[0] for yol in dosyalar if yol.lower().endswith(GORSEL_UZANTILARI)}
+            for yol in sorted(dosyalar):
+                if yol.lower().endswith(GORSEL_UZANTILARI):
+                    gorseller.append(yol)
+                elif yol.endswith(DIZI_UZANTISI) and (tumu or os.path.splitext(yol)[0] not in koklar):
+                    os.remove(yol)
+                    silinen += 1
+        return gorseller, silinen
+
+    @staticmethod
+    def _load_index(yol: str) -> Dict:
+        try:
+            with open(yol) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_index(yol: str, indeks: Dict):
+        gecici = f"{yol}.tmp"
+        with open(gecici, 'w') as f:
+            json.dump(indeks, f)
+        os.replace(gecici, yol)
+
+# Global dataset image cache instance
+dataset_image_cache = DatasetImageCache(
+    settings.TRAINING_IMAGE_CACHE_DIR,
+    enabled=settings.TRAINING_IMAGE_CACHE_ENABLED,
+    max_mb=settings.TRAINING_IMAGE_CACHE_MAX_MB,
+    workers=settings.TRAINING_IMAGE_CACHE_WORKERS
+)
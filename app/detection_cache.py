@@ -0,0 +1,267 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Tespit Önbelleği
+Görsel içerik hash'i + model kimliği + çıkarım parametreleri anahtarlı, SQLite
+üzerinde kalıcı tespit / indeks önbelleği. Aynı görsel sonraki analizlerde
+tekrar yüklendiğinde çıkarım atlanır.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+from .database import get_db_connection
+from .detections import Detections
+
+logger = logging.getLogger(__name__)
+
+KIND_RGB = "rgb"
+KIND_MULTISPECTRAL = "multispektral"
+
+def file_md5(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Dosyanın MD5 hash'i (yüklemede hesaplananla aynı)"""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DetectionCache:
+    """Tespit ve spektral indeks sonuçları için boyut sınırlı kalıcı önbellek"""
+
+    def __init__(self, enabled: bool = True, max_entries: int = 50000, max_mb: float = 512.0):
+        self.enabled = enabled
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._model_hashes: Dict[Tuple, str] = {}
+        # Henüz veritabanına yazılmamış sayaçlar (tür -> sayaç)
+        self._pending: Dict[str, Dict[str, int]] = {}
+
+    # --- Anahtarlar -------------------------------------------------------
+
+    def model_hash(self, model_path: str) -> str:
+        """Model dosyasının içerik hash'i (yol + mtime + boyut ile bellekte tutulur)"""
+        stat = os.stat(model_path)
+        signature = (os.path.abspath(model_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._model_hashes.get(signature)
+        if cached:
+            return cached
+
+        model_hash = file_md5(model_path)
+        with self._lock:
+            self._model_hashes[signature] = model_hash
+        return model_hash
+
+    def file_hash(self, path: str) -> str:
+        """Yüklenen dosyanın hash'i; yüklemede kaydedilen değer varsa yeniden hesaplanmaz"""
+        try:
+            conn = get_db_connection()
+            row = conn.execute(
+                'SELECT dosya_hash, dosya_boyutu FROM file_uploads WHERE upload_path = ? '
+                'ORDER BY upload_id DESC LIMIT 1', (path,)
+            ).fetchone()
+            conn.close()
+            if row and row['dosya_boyutu'] == os.path.getsize(path):
+                return row['dosya_hash']
+        except Exception as e:
+            logger.debug(f"Yükleme hash'i okunamadı ({path}): {e}")
+
+        return file_md5(path)
+
+    @staticmethod
+    def make_key(kind: str, file_hash: str, model_hash: str, params: Dict) -> str:
+        """(tür, dosya hash'i, model hash'i, parametreler) -> önbellek anahtarı"""
+        params_json = json.dumps(params, sort_keys=True, default=str)
+        raw = f"{kind}|{file_hash}|{model_hash}|{params_json}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # --- Okuma / yazma ----------------------------------------------------
+
+    def get(self, key: str, kind: str) -> Optional[Tuple[Optional[Detections], Dict]]:
+        """Önbellek kaydı: (tespitler veya None, ek bilgi); yoksa None"""
+        if not self.enabled:
+            return None
+
+        try:
+            conn = get_db_connection()
+            row = conn.execute(
+                'SELECT payload, meta FROM detection_cache WHERE cache_key = ?', (key,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE detection_cache SET last_used = ?, hit_count = hit_count + 1 WHERE cache_key = ?',
+                    (time.time(), key)
+                )
+                conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Tespit önbelleği okuma hatası: {e}")
+            return None
+
+        self._count(kind, 'hits' if row is not None else 'misses')
+        if row is None:
+            return None
+
+        detections = self._decode(row['payload']) if row['payload'] is not None else None
+        return detections, json.loads(row['meta'] or '{}')
+
+    def put(self, key: str, kind: str, file_hash: str, model_hash: str, params: Dict,
+            detections: Optional[Detections] = None, meta: Optional[Dict] = None):
+        """Sonucu önbelleğe yaz ve boyut sınırlarını uygula"""
+        if not self.enabled:
+            return
+
+        payload = self._encode(detections) if detections is not None else None
+        meta_json = json.dumps(meta or {}, default=float)
+        size = (len(payload) if payload else 0) + len(meta_json)
+        now = time.time()
+
+        try:
+            conn = get_db_connection()
+            conn.execute('''
+                INSERT OR REPLACE INTO detection_cache
+                (cache_key, kind, dosya_hash, model_hash, params, payload, meta, size,
+                 hit_count, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+            ''', (
+                key, kind, file_hash, model_hash, json.dumps(params, sort_keys=True, default=str),
+                payload, meta_json, size, datetime.now().isoformat(), now
+            ))
+            conn.commit()
+            evicted = self._enforce_limits(conn)
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Tespit önbelleği yazma hatası: {e}")
+            return
+
+        self._count(kind, 'stores')
+        if evicted:
+            self._count(kind, 'evictions', evicted)
+
+    def _enforce_limits(self, conn) -> int:
+        """En uzun süredir kullanılmayan kayıtları sınırlar aşılmayana kadar sil"""
+        evicted = 0
+        while True:
+            count, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM detection_cache'
+            ).fetchone()
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+
+            # Sayı aşımında fazlalık kadar, boyut aşımında en az %10 sil
+            excess = max(count - self.max_entries, 1)
+            if total > self.max_bytes:
+                excess = max(excess, count // 10, 1)
+            conn.execute('''
+                DELETE FROM detection_cache WHERE cache_key IN (
+                    SELECT cache_key FROM detection_cache ORDER BY last_used ASC LIMIT ?
+                )
+            ''', (excess,))
+            conn.commit()
+            evicted += excess
+        return evicted
+
+    @staticmethod
+    def _encode(detections: Detections) -> bytes:
+        """(N, 6) float32: x1, y1, x2, y2, conf, cls"""
+        packed = np.concatenate([
+            detections.xyxy,
+            detections.conf[:, None],
+            detections.cls.astype(np.float32)[:, None]
+        ], axis=1).astype(np.float32)
+        return packed.tobytes()
+
+    @staticmethod
+    def _decode(payload: bytes) -> Detections:
+        packed = np.frombuffer(payload, dtype=np.float32).reshape(-1, 6)
+        return Detections(packed[:, :4], packed[:, 4], packed[:, 5])
+
+    # --- Metrikler --------------------------------------------------------
+
+    def _count(self, kind: str, name: str, amount: int = 1):
+        with self._lock:
+            counters = self._pending.setdefault(kind, {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0})
+            counters[name] += amount
+
+    def flush_stats(self):
+        """Süreç içi sayaçları veritabanına ekle (havuz worker'ları dahil tüm süreçler görür)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        try:
+            conn = get_db_connection()
+            for kind, counters in pending.items():
+                conn.execute('''
+                    INSERT INTO detection_cache_stats (kind, hits, misses, stores, evictions)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(kind) DO UPDATE SET
+                        hits = hits + excluded.hits,
+                        misses = misses + excluded.misses,
+                        stores = stores + excluded.stores,
+                        evictions = evictions + excluded.evictions
+                ''', (kind, counters['hits'], counters['misses'], counters['stores'], counters['evictions']))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Tespit önbelleği metrikleri yazılamadı: {e}")
+
+    def get_stats(self) -> Dict:
+        """İsabet oranı, boyut ve tür bazında sayaçlar"""
+        self.flush_stats()
+        stats = {
+            'enabled': self.enabled,
+            'entries': 0,
+            'bytes': 0,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'by_kind': {}
+        }
+
+        try:
+            conn = get_db_connection()
+            stats['entries'], stats['bytes'] = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM detection_cache'
+            ).fetchone()
+            for row in conn.execute('SELECT * FROM detection_cache_stats'):
+                row = dict(row)
+                kind = row.pop('kind')
+                lookups = row['hits'] + row['misses']
+                row['hit_rate'] = row['hits'] / lookups if lookups else 0.0
+                stats['by_kind'][kind] = row
+                for name in ('hits', 'misses', 'stores', 'evictions'):
+                    stats[name] += row[name]
+            conn.close()
+        except Exception as e:
+            logger.warning(f"Tespit önbelleği metrikleri okunamadı: {e}")
+
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Tüm önbellek kayıtlarını sil"""
+        conn = get_db_connection()
+        conn.execute('DELETE FROM detection_cache')
+        conn.commit()
+        conn.close()
+
+# Global detection cache instance
+detection_cache = DetectionCache(
+    enabled=settings.DETECTION_CACHE_ENABLED,
+    max_entries=settings.DETECTION_CACHE_MAX_ENTRIES,
+    max_mb=settings.DETECTION_CACHE_MAX_MB
+)
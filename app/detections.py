@@ -0,0 +1,58 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Tespit Dizileri
+Model çıktılarını (kutu, güven, sınıf) sıkıştırılmış NumPy dizileri olarak taşır
+"""
+
+import numpy as np
+from typing import Iterable
+
+class Detections:
+    """Bir görsele ait tespitler: xyxy (N, 4), conf (N,), cls (N,)"""
+
+    __slots__ = ('xyxy', 'conf', 'cls')
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray):
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.asarray(cls, dtype=np.int64).reshape(-1)
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        return cls(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64))
+
+    @classmethod
+    def from_result(cls, result) -> "Detections":
+        """Ultralytics Results nesnesini tek bir tensör aktarımıyla diziye çevir"""
+        boxes = getattr(result, 'boxes', None)
+        if boxes is None or len(boxes) == 0:
+            return cls.empty()
+
+        # data: [x1, y1, x2, y2, (track_id), conf, cls]
+        data = boxes.data
+        if hasattr(data, 'cpu'):
+            data = data.cpu().numpy()
+        data = np.asarray(data)
+        return cls(data[:, :4], data[:, -2], data[:, -1])
+
+    @classmethod
+    def concatenate(cls, items: Iterable["Detections"]) -> "Detections":
+        items = [item for item in items if len(item)]
+        if not items:
+            return cls.empty()
+        return cls(
+            np.concatenate([item.xyxy for item in items]),
+            np.concatenate([item.conf for item in items]),
+            np.concatenate([item.cls for item in items])
+        )
+
+    def select(self, index) -> "Detections":
+        """Maske veya indeks dizisine göre alt küme"""
+        return Detections(self.xyxy[index], self.conf[index], self.cls[index])
+
+    def shifted(self, dx: float, dy: float) -> "Detections":
+        """Kutuları (dx, dy) kadar kaydır (karo -> global koordinat)"""
+        offset = np.array([dx, dy, dx, dy], dtype=np.float32)
+        return Detections(self.xyxy + offset, self.conf, self.cls)
+
+    def __len__(self) -> int:
+        return int(self.conf.shape[0])
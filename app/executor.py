@@ -0,0 +1,232 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz Yürütücüsü
+Analizleri event loop dışında (ayrı süreç havuzunda veya thread'de) çalıştırır;
+eşzamanlılık sınırı ve havuz kullanım metriklerini tutar.
+"""
+
+import os
+import time
+import asyncio
+import itertools
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from .config import settings
+from .progress import progress_broker, set_remote_queue
+from .cancellation import AnalysisCancelled
+
+logger = logging.getLogger(__name__)
+
+# Havuz süreci içindeki analizci (süreç başına bir kez oluşturulur)
+_worker_analizci = None
+
+# Thread modunda her yürütücü thread'inin model registry slot'u
+_thread_yerel = threading.local()
+
+def _worker_init(model_path: str, analiz_modu: str, log_level: str, progress_queue=None):
+    """Havuz süreci başlatıcısı: analizciyi oluştur ve modeli önceden yükle"""
+    global _worker_analizci
+    
+    # İlerleme olayları ana süreçteki yayıncıya aktarılır
+    set_remote_queue(progress_queue)
+
+    logging.basicConfig(
+        level=getattr(logging, log_level, logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+
+    # Paralel karo worker'ları CPU çekirdeklerini paylaşır (süreç başına bir kez)
+    if settings.TILE_WORKERS > 1:
+        from .tiling import configure_torch_threads
+        configure_torch_threads(settings.TILE_WORKERS)
+
+    from .ai_analysis import ZeytinAnalizci
+    _worker_analizci = ZeytinAnalizci()
+
+    try:
+        _worker_analizci.set_analysis_mode(analiz_modu)
+        _worker_analizci.load_yolo_model(model_path)
+        logger.info(f"Analiz worker'ı hazır (PID {os.getpid()}, cihaz: {_worker_analizci.current_device})")
+    except Exception as e:
+        # Model yoksa worker yine de çalışır; analiz sırasında tekrar denenir
+        logger.warning(f"Analiz worker'ında model ön yüklemesi başarısız (PID {os.getpid()}): {e}")
+
+def _worker_run(yukleme_klasoru: str, analiz_klasoru: str, log_yolu: str, analiz_modu: str,
+                zaman_butcesi: Optional[float] = None, dusuk_bellek: bool = False) -> Dict:
+    """Havuz sürecinde tek bir analizi çalıştır"""
+    global _worker_analizci
+    if _worker_analizci is None:
+        from .ai_analysis import ZeytinAnalizci
+        _worker_analizci = ZeytinAnalizci()
+
+    return asyncio.run(_worker_analizci.analiz_yap(yukleme_klasoru, analiz_klasoru, log_yolu, analiz_modu,
+                                                   zaman_butcesi=zaman_butcesi, dusuk_bellek=dusuk_bellek))
+
+def _thread_init(slot_sayaci):
+    """Thread havuzu başlatıcısı: thread'e kendi model registry slot'unu ata"""
+    # Ultralytics arka ucu thread-safe değil; thread'ler aynı model örneğini paylaşmamalı
+    _thread_yerel.model_slot = next(slot_sayaci)
+
+def _thread_run(yukleme_klasoru: str, analiz_klasoru: str, log_yolu: str, analiz_modu: str,
+                zaman_butcesi: Optional[float] = None, dusuk_bellek: bool = False) -> Dict:
+    """Thread modunda tek bir analizi çalıştır (modeller süreç içi önbellekten gelir)"""
+    from .ai_analysis import ZeytinAnalizci
+    analizci = ZeytinAnalizci()
+    analizci.model_slot = getattr(_thread_yerel, 'model_slot', 0)
+    return asyncio.run(analizci.analiz_yap(yukleme_klasoru, analiz_klasoru, log_yolu, analiz_modu,
+                                           zaman_butcesi=zaman_butcesi, dusuk_bellek=dusuk_bellek))
+
+class AnalysisExecutor:
+    """Analizleri süreç havuzunda ("process") veya thread havuzunda ("thread") çalıştırır"""
+
+    def __init__(self, mode: str = "process", max_workers: int = 1,
+                 max_concurrent: Optional[int] = None, model_path: Optional[str] = None,
+                 preload_mode: str = "cpu"):
+        self.mode = mode if mode in ("process", "thread") else "process"
+        self.max_workers = max(1, max_workers)
+        self.max_concurrent = max(1, max_concurrent or self.max_workers)
+        self.model_path = model_path or settings.YOLO_MODEL_PATH
+        self.preload_mode = preload_mode
+
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._created_at = time.time()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'active': 0,
+            'queued': 0,
+            'peak_active': 0,
+            'peak_queued': 0,
+            'pool_restarts': 0,
+            'busy_time': 0.0,
+            'wait_time': 0.0
+        }
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    # spawn: CUDA ve torch thread durumunun fork ile kopyalanmasını önler
+                    context = multiprocessing.get_context("spawn")
+                    # SimpleQueue yazmaları senkrondur; worker'ın olayları sonucundan önce kuyruğa girer
+                    progress_queue = context.SimpleQueue()
+                    progress_broker.attach_queue(progress_queue)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=context,
+                        initializer=_worker_init,
+                        initargs=(self.model_path, self.preload_mode, settings.LOG_LEVEL, progress_queue)
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="analysis",
+                        initializer=_thread_init,
+                        initargs=(itertools.count(),)
+                    )
+                logger.info(f"Analiz yürütücüsü başlatıldı: {self.mode}, {self.max_workers} worker")
+            return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def submit(self, yukleme_klasoru: str, analiz_klasoru: str, log_yolu: str,
+                     analiz_modu: str = "cpu", zaman_butcesi: Optional[float] = None,
+                     dusuk_bellek: bool = False) -> Dict:
+        """Analizi havuzda çalıştır ve sonucunu bekle (event loop bloklanmaz)
+        
+        zaman_butcesi: analizin çalışma süresi sınırı (saniye, kuyrukta bekleme hariç)
+        dusuk_bellek: batch ve işleme hattı düşük bellek ayarlarıyla çalışır
+        """
+        self._stats['submitted'] += 1
+        self._stats['queued'] += 1
+        self._stats['peak_queued'] = max(self._stats['peak_queued'], self._stats['queued'])
+
+        wait_start = time.perf_counter()
+        semaphore = self._get_semaphore()
+        try:
+            await semaphore.acquire()
+        finally:
+            self._stats['queued'] -= 1
+        self._stats['wait_time'] += time.perf_counter() - wait_start
+
+        self._stats['active'] += 1
+        self._stats['peak_active'] = max(self._stats['peak_active'], self._stats['active'])
+        start_time = time.perf_counter()
+        try:
+            target = _worker_run if self.mode == "process" else _thread_run
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._get_executor(), target,
+                yukleme_klasoru, analiz_klasoru, log_yolu, analiz_modu, zaman_butcesi, dusuk_bellek
+            )
+            self._stats['completed'] += 1
+            return result
+        except AnalysisCancelled:
+            self._stats['cancelled'] += 1
+            raise
+        except BrokenProcessPool:
+            # Worker süreci çöktü (ör. bellek yetersizliği); sonraki iş için havuzu yenile
+            self._stats['failed'] += 1
+            self._reset_executor()
+            raise RuntimeError("Analiz worker süreci beklenmedik şekilde sonlandı")
+        except Exception:
+            self._stats['failed'] += 1
+            raise
+        finally:
+            self._stats['busy_time'] += time.perf_counter() - start_time
+            self._stats['active'] -= 1
+            semaphore.release()
+
+    def _reset_executor(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+            self._stats['pool_restarts'] += 1
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Analiz süreç havuzu yeniden başlatılacak")
+
+    def get_stats(self) -> Dict:
+        """Eşzamanlılık ve havuz kullanım metrikleri"""
+        stats = dict(self._stats)
+        uptime = max(time.time() - self._created_at, 1e-9)
+        finished = stats['completed'] + stats['failed']
+
+        stats['mode'] = self.mode
+        stats['max_workers'] = self.max_workers
+        stats['max_concurrent'] = self.max_concurrent
+        stats['pool_started'] = self._executor is not None
+        stats['utilization'] = stats['active'] / self.max_workers
+        stats['utilization_avg'] = min(1.0, stats['busy_time'] / (uptime * self.max_workers))
+        stats['avg_duration'] = stats['busy_time'] / finished if finished else 0.0
+        stats['avg_wait'] = stats['wait_time'] / stats['submitted'] if stats['submitted'] else 0.0
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Havuzu kapat"""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            if self.mode == "process":
+                progress_broker.detach_queue()
+            logger.info("Analiz yürütücüsü kapatıldı")
+
+# Global analysis executor instance
+analysis_executor = AnalysisExecutor(
+    mode=settings.ANALYSIS_EXECUTOR,
+    max_workers=settings.ANALYSIS_WORKERS,
+    max_concurrent=settings.ANALYSIS_MAX_CONCURRENT,
+    model_path=settings.YOLO_MODEL_PATH,
+    preload_mode=settings.DEFAULT_ANALYSIS_MODE
+)
@@ -0,0 +1,210 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Çıkarım Arka Uçları
+Analizcinin modeli çalıştırma biçimini soyutlar: PyTorch üzerinde ultralytics
+veya export edilmiş ONNX modeli için ONNX Runtime (CPU).
+"""
+
+import logging
+import numpy as np
+import cv2
+from typing import List, Tuple
+
+from .detections import Detections
+from .tiling import batched_nms
+
+logger = logging.getLogger(__name__)
+
+BACKEND_ULTRALYTICS = "ultralytics"
+BACKEND_ONNXRUNTIME = "onnxruntime"
+AVAILABLE_BACKENDS = (BACKEND_ULTRALYTICS, BACKEND_ONNXRUNTIME)
+
+class InferenceBackend:
+    """Çıkarım arka ucu arayüzü: görsel listesi (BGR) -> görsel başına Detections"""
+
+    name = "base"
+    # Aynı örnek birden fazla thread'den eşzamanlı çağrılabilir mi?
+    thread_safe = False
+
+    def __init__(self, model_path: str, device: str = "cpu"):
+        self.model_path = model_path
+        self.device = device
+
+    def predict(self, images: List[np.ndarray], conf: float) -> List[Detections]:
+        raise NotImplementedError
+
+    def info(self) -> dict:
+        return {'backend': self.name, 'model_path': self.model_path, 'device': self.device}
+
+class UltralyticsBackend(InferenceBackend):
+    """ultralytics.YOLO (PyTorch) arka ucu"""
+
+    name = BACKEND_ULTRALYTICS
+
+    def __init__(self, model, model_path: str, device: str = "cpu"):
+        super().__init__(model_path, device)
+        self.model = model
+
+    def predict(self, images: List[np.ndarray], conf: float) -> List[Detections]:
+        results = self.model(images, device=self.device, conf=conf, verbose=False)
+        return [Detections.from_result(result) for result in results]
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ONNX Runtime CPU arka ucu (letterbox ön işleme ve NMS son işleme dahil)
+
+    YOLOv8 ONNX çıktısı beklenir: (N, 4 + sınıf sayısı, anchor) -> cx, cy, w, h, skorlar.
+    """
+
+    name = BACKEND_ONNXRUNTIME
+    # ONNX Runtime oturumları eşzamanlı Run çağrılarını destekler
+    thread_safe = True
+    # YOLOv8 en büyük özellik haritası adımı
+    STRIDE = 32
+
+    def __init__(self, model_path: str, intra_op_threads: int = 0, inter_op_threads: int = 0,
+                 iou_threshold: float = 0.7, max_detections: int = 300, image_size: int = 640):
+        super().__init__(model_path, "cpu")
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("ONNX Runtime arka ucu için 'onnxruntime' paketi gerekli") from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads > 0:
+            options.inter_op_num_threads = inter_op_threads
+
+        self.session = ort.InferenceSession(model_path, sess_options=options,
+                                            providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+
+        # Sabit boyutlu export'larda şekil modelden, dinamik export'larda ayardan gelir
+        batch, _, height, width = model_input.shape
+        self.fixed_batch = batch if isinstance(batch, int) else None
+        self.dynamic_shape = not (isinstance(height, int) and isinstance(width, int))
+        self.input_size = (
+            height if isinstance(height, int) else image_size,
+            width if isinstance(width, int) else image_size
+        )
+        self.iou_threshold = iou_threshold
+        self.max_detections = max_detections
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+    @staticmethod
+    def letterbox(image: np.ndarray, new_shape: Tuple[int, int],
+                  color: Tuple[int, int, int] = (114, 114, 114)) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+        """En-boy oranını koruyarak yeniden boyutlandır ve kenarları doldur
+
+        Dönüş: (görsel, ölçek, (sol dolgu, üst dolgu))
+        """
+        height, width = image.shape[:2]
+        ratio = min(new_shape[0] / height, new_shape[1] / width)
+        resized_w, resized_h = int(round(width * ratio)), int(round(height * ratio))
+
+        pad_w = (new_shape[1] - resized_w) / 2
+        pad_h = (new_shape[0] - resized_h) / 2
+
+        if (width, height) != (resized_w, resized_h):
+            image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+
+        top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+        left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+        image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+        return image, ratio, (left, top)
+
+    def _target_shape(self, images: List[np.ndarray]) -> Tuple[int, int]:
+        """Batch'in giriş boyutu
+
+        Dinamik boyutlu modellerde dolgu yalnızca stride katına kadar yapılır
+        (ör. 4:3 görselde 640x640 yerine 480x640); batch'teki görseller farklı
+        boyutlara düşüyorsa kare giriş kullanılır.
+        """
+        if not self.dynamic_shape:
+            return self.input_size
+
+        shapes = set()
+        for image in images:
+            height, width = image.shape[:2]
+            ratio = min(self.input_size[0] / height, self.input_size[1] / width)
+            resized_h, resized_w = int(round(height * ratio)), int(round(width * ratio))
+            shapes.add((-(-resized_h // self.STRIDE) * self.STRIDE, -(-resized_w // self.STRIDE) * self.STRIDE))
+        return shapes.pop() if len(shapes) == 1 else self.input_size
+
+    def _preprocess(self, images: List[np.ndarray]) -> Tuple[np.ndarray, List[Tuple]]:
+        """BGR görseller -> (N, 3, H, W) float32 tensör ve geri ölçekleme bilgisi"""
+        target_shape = self._target_shape(images)
+        batch = np.empty((len(images), 3, *target_shape), dtype=np.float32)
+        transforms = []
+        for i, image in enumerate(images):
+            padded, ratio, padding = self.letterbox(image, target_shape)
+            # BGR -> RGB, HWC -> CHW, [0, 255] -> [0, 1]
+            batch[i] = padded[:, :, ::-1].transpose(2, 0, 1) * (1.0 / 255.0)
+            transforms.append((ratio, padding, image.shape[:2]))
+        return batch, transforms
+
+    def _postprocess(self, output: np.ndarray, conf: float, transform: Tuple) -> Detections:
+        """Tek görselin ham çıktısı (4 + nc, A) -> eşik, NMS ve orijinal koordinatlar"""
+        predictions = output.T
+        scores_all = predictions[:, 4:]
+        classes = scores_all.argmax(axis=1)
+        scores = scores_all[np.arange(len(classes)), classes]
+
+        mask = scores > conf
+        if not mask.any():
+            return Detections.empty()
+
+        cx, cy, w, h = predictions[mask, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        detections = batched_nms(Detections(boxes, scores[mask], classes[mask]), self.iou_threshold, "iou")
+
+        if len(detections) > self.max_detections:
+            detections = detections.select(np.argsort(-detections.conf)[:self.max_detections])
+
+        # Letterbox koordinatlarından orijinal görsele
+        ratio, (pad_left, pad_top), (height, width) = transform
+        xyxy = (detections.xyxy - np.array([pad_left, pad_top, pad_left, pad_top], dtype=np.float32)) / ratio
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, width)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, height)
+        return Detections(xyxy, detections.conf, detections.cls)
+
+    def predict(self, images: List[np.ndarray], conf: float) -> List[Detections]:
+        if not images:
+            return []
+
+        batch, transforms = self._preprocess(images)
+
+        # Sabit batch boyutlu modeller parçalar halinde çalıştırılır
+        step = self.fixed_batch or len(images)
+        outputs = []
+        for start in range(0, len(images), step):
+            chunk = batch[start:start + step]
+            count = len(chunk)
+            if self.fixed_batch and count < self.fixed_batch:
+                chunk = np.concatenate([chunk, np.zeros((self.fixed_batch - count, *chunk.shape[1:]), chunk.dtype)])
+            outputs.append(self.session.run([self.output_name], {self.input_name: chunk})[0][:count])
+        outputs = np.concatenate(outputs)
+
+        return [self._postprocess(output, conf, transform) for output, transform in zip(outputs, transforms)]
+
+    def info(self) -> dict:
+        info = super().info()
+        info.update({
+            'input_size': list(self.input_size),
+            'fixed_batch': self.fixed_batch,
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads
+        })
+        return info
+
+def onnxruntime_available() -> bool:
+    """onnxruntime kurulu mu?"""
+    try:
+        import onnxruntime  # noqa: F401
+        return True
+    except ImportError:
+        return False
@@ -0,0 +1,192 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz Aşaması Ölçümleri
+Analizcinin sıcak yolundaki her aşama (model yükleme, okuma, çıkarım,
+işaretleme, yazma, bant okuma, indeks hesabı...) bağlam yöneticisi
+zamanlayıcılarla ölçülür ve sabit kovalı histogramlarda toplanır. Analiz
+başına özet sonuçla birlikte saklanır; tüm süreçlerin toplamı veritabanında
+birikir ve /metrics üzerinden Prometheus biçiminde dışa verilir.
+"""
+
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from .database import get_db_connection
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Aşamalar (Prometheus etiket değeri olarak da kullanılır)
+ASAMA_MODEL_YUKLEME = "model_load"
+ASAMA_DOSYA_LISTELEME = "file_listing"
+ASAMA_OKUMA = "decode"
+ASAMA_CIKARIM = "inference"
+ASAMA_SON_ISLEME = "postprocess"
+ASAMA_ISARETLEME = "annotate"
+ASAMA_YAZMA = "imwrite"
+ASAMA_BANT_OKUMA = "tiff_read"
+ASAMA_INDEKS = "index_compute"
+ASAMA_GEOJSON = "geojson_write"
+ASAMA_BELLEK_TEMIZLIGI = "memory_cleanup"
+
+# Histogram kova üst sınırları (saniye)
+VARSAYILAN_KOVALAR = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+TUR_HISTOGRAM = "histogram"
+TUR_SAYAC = "counter"
+
+class AnalysisInstrumentation:
+    """Tek analiz çalıştırmasının aşama histogramları ve sayaçları (thread-safe)"""
+
+    def __init__(self, kovalar: Tuple[float, ...] = VARSAYILAN_KOVALAR):
+        self.kovalar = tuple(sorted(kovalar))
+        self._lock = threading.Lock()
+        self._histogramlar: Dict[str, Dict] = {}
+        self._sayaclar: Dict[str, float] = {}
+
+    @contextmanager
+    def olc(self, asama: str):
+        """with olcum.olc(ASAMA_OKUMA): ... bloğunun süresini aşamaya ekle (hata olsa da)"""
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.gozlem(asama, time.perf_counter() - baslangic)
+
+    def gozlem(self, asama: str, sure: float):
+        """Ölçülmüş bir süreyi (saniye) aşama histogramına ekle"""
+        indeks = bisect.bisect_left(self.kovalar, sure)
+        with self._lock:
+            histogram = self._histogramlar.get(asama)
+            if histogram is None:
+                histogram = self._histogramlar[asama] = {
+                    'count': 0, 'sum': 0.0, 'min': sure, 'max': sure,
+                    'counts': [0] * (len(self.kovalar) + 1)
+                }
+            histogram['count'] += 1
+            histogram['sum'] += sure
+            histogram['min'] = min(histogram['min'], sure)
+            histogram['max'] = max(histogram['max'], sure)
+            histogram['counts'][indeks] += 1
+
+    def say(self, sayac: str, miktar: float = 1):
+        with self._lock:
+            self._sayaclar[sayac] = self._sayaclar.get(sayac, 0) + miktar
+
+    def to_dict(self) -> Dict:
+        """Analiz sonucuyla saklanan özet: {'buckets', 'stages': {...}, 'counters': {...}}"""
+        with self._lock:
+            asamalar = {}
+            for asama, histogram in self._histogramlar.items():
+                asamalar[asama] = dict(histogram, counts=list(histogram['counts']),
+                                       mean=histogram['sum'] / histogram['count'])
+            return {'buckets': list(self.kovalar), 'stages': asamalar, 'counters': dict(self._sayaclar)}
+
+def _kova_etiketi(ust_sinir: Optional[float]) -> str:
+    return "+Inf" if ust_sinir is None else repr(float(ust_sinir))
+
+class AnalysisMetricsStore:
+    """Tüm süreçlerin aşama ölçümlerinin veritabanındaki toplamı
+
+    Her satır toplanabilir bir değerdir (aşama + alan); kayıt yalnızca ekleme
+    yaptığı için havuz worker'ları eşzamanlı yazabilir.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def flush(self, olcum: Dict):
+        """Analiz ölçüm özetini (AnalysisInstrumentation.to_dict) toplamlara ekle"""
+        if not self.enabled:
+            return
+        satirlar: List[Tuple[str, str, str, float]] = []
+        kovalar = list(olcum.get('buckets', [])) + [None]
+        for asama, histogram in olcum.get('stages', {}).items():
+            satirlar.append((TUR_HISTOGRAM, asama, 'count', histogram['count']))
+            satirlar.append((TUR_HISTOGRAM, asama, 'sum', histogram['sum']))
+            for ust_sinir, adet in zip(kovalar, histogram['counts']):
+                if adet:
+                    satirlar.append((TUR_HISTOGRAM, asama, _kova_etiketi(ust_sinir), adet))
+        for sayac, deger in olcum.get('counters', {}).items():
+            satirlar.append((TUR_SAYAC, sayac, 'total', deger))
+        if not satirlar:
+            return
+
+        try:
+            conn = get_db_connection()
+            try:
+                conn.executemany('''
+                    INSERT INTO analysis_stage_metrics (kind, name, field, value)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(kind, name, field) DO UPDATE SET value = value + excluded.value
+                ''', satirlar)
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Analiz aşama ölçümleri yazılamadı: {e}")
+
+    def load(self) -> Dict:
+        """Toplam histogramlar: {'stages': {asama: {'count', 'sum', 'buckets': {le: adet}}}, 'counters'}"""
+        sonuc = {'stages': {}, 'counters': {}}
+        try:
+            conn = get_db_connection()
+            try:
+                rows = conn.execute('SELECT kind, name, field, value FROM analysis_stage_metrics').fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Analiz aşama ölçümleri okunamadı: {e}")
+            return sonuc
+
+        for row in rows:
+            if row['kind'] == TUR_SAYAC:
+                sonuc['counters'][row['name']] = row['value']
+                continue
+            asama = sonuc['stages'].setdefault(row['name'], {'count': 0, 'sum': 0.0, 'buckets': {}})
+            if row['field'] in ('count', 'sum'):
+                asama[row['field']] = row['value']
+            else:
+                asama['buckets'][row['field']] = row['value']
+        return sonuc
+
+    def prometheus_lines(self, onek: str = "zeytin_analysis") -> List[str]:
+        """Toplamları Prometheus metin biçiminde satırlara çevir (kovalar kümülatif)"""
+        veri = self.load()
+        satirlar = []
+
+        if veri['stages']:
+            ad = f"{onek}_stage_seconds"
+            satirlar += [f"# HELP {ad} Analiz aşama süreleri", f"# TYPE {ad} histogram"]
+            for asama in sorted(veri['stages']):
+                histogram = veri['stages'][asama]
+                sonlu = sorted((float(le), adet) for le, adet in histogram['buckets'].items() if le != "+Inf")
+                kumulatif = 0
+                for ust_sinir, adet in sonlu:
+                    kumulatif += adet
+                    satirlar.append(f'{ad}_bucket{{stage="{asama}",le="{ust_sinir!r}"}} {kumulatif:g}')
+                satirlar.append(f'{ad}_bucket{{stage="{asama}",le="+Inf"}} {histogram["count"]:g}')
+                satirlar.append(f'{ad}_sum{{stage="{asama}"}} {histogram["sum"]:.6f}')
+                satirlar.append(f'{ad}_count{{stage="{asama}"}} {histogram["count"]:g}')
+
+        if veri['counters']:
+            ad = f"{onek}_events_total"
+            satirlar += [f"# HELP {ad} Analiz olay sayaçları", f"# TYPE {ad} counter"]
+            for sayac in sorted(veri['counters']):
+                satirlar.append(f'{ad}{{event="{sayac}"}} {veri["counters"][sayac]:g}')
+        return satirlar
+
+    def reset(self) -> int:
+        conn = get_db_connection()
+        try:
+            deleted = conn.execute('DELETE FROM analysis_stage_metrics').rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return deleted
+
+# Global analysis metrics store instance
+analysis_metrics = AnalysisMetricsStore(enabled=settings.ANALYSIS_STAGE_METRICS_ENABLED)
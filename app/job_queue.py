@@ -0,0 +1,374 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz İş Kuyruğu
+SQLite üzerinde kalıcı iş kuyruğu: öncelik, deneme sayısı, kira (lease) ve
+kalp atışı. İşler atomik olarak talep edilir; kirası dolan işler (çöken veya
+yeniden başlatılan worker) tekrar kuyruğa alınır. Harici bir broker gerekmez.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .config import settings
+from .database import get_db_connection
+from .cancellation import AnalysisCancelled
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "bekliyor"
+JOB_RUNNING = "calisiyor"
+JOB_DONE = "tamamlandi"
+JOB_FAILED = "hata"
+JOB_CANCELLED = "iptal"
+
+class JobQueue:
+    """analysis_jobs tablosu üzerindeki kuyruk işlemleri"""
+
+    def enqueue(self, analiz_id: str, analiz_modu: str = "cpu", oncelik: int = 0,
+                kullanici_id: Optional[int] = None, payload: Optional[Dict] = None,
+                max_deneme: Optional[int] = None) -> str:
+        """İşi kuyruğa ekle ve iş ID'sini döndür"""
+        job_id = str(uuid.uuid4())
+        conn = get_db_connection()
+        try:
+            conn.execute('''
+                INSERT INTO analysis_jobs
+                (job_id, analiz_id, analiz_modu, durum, oncelik, max_deneme, payload, kullanici_id, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                job_id, analiz_id, analiz_modu, JOB_PENDING, oncelik,
+                max_deneme or settings.JOB_MAX_ATTEMPTS, json.dumps(payload or {}, ensure_ascii=False),
+                kullanici_id, datetime.now().isoformat()
+            ))
+            conn.commit()
+        finally:
+            conn.close()
+        return job_id
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """En yüksek öncelikli bekleyen işi atomik olarak talep et"""
+        now = time.time()
+        conn = get_db_connection()
+        try:
+            # BEGIN IMMEDIATE yazma kilidini hemen alır; iki worker aynı işi alamaz
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute('''
+                SELECT job_id FROM analysis_jobs
+                WHERE durum = ?
+                ORDER BY oncelik DESC, created_at ASC
+                LIMIT 1
+            ''', (JOB_PENDING,)).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+
+            conn.execute('''
+                UPDATE analysis_jobs SET
+                    durum = ?, deneme = deneme + 1, lease_owner = ?, lease_expires = ?,
+                    heartbeat_at = ?, started_at = ?, hata_mesaji = NULL
+                WHERE job_id = ?
+            ''', (JOB_RUNNING, worker_id, now + lease_seconds, now, datetime.now().isoformat(), row['job_id']))
+            job = conn.execute('SELECT * FROM analysis_jobs WHERE job_id = ?', (row['job_id'],)).fetchone()
+            conn.commit()
+            return self._to_dict(job)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Kirayı uzat; iş artık bu worker'da değilse False"""
+        now = time.time()
+        return self._update_owned(job_id, worker_id, '''
+            UPDATE analysis_jobs SET lease_expires = ?, heartbeat_at = ?
+            WHERE job_id = ? AND lease_owner = ? AND durum = ?
+        ''', (now + lease_seconds, now, job_id, worker_id, JOB_RUNNING))
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        """İşi tamamlandı olarak işaretle"""
+        return self._update_owned(job_id, worker_id, '''
+            UPDATE analysis_jobs SET durum = ?, lease_owner = NULL, lease_expires = NULL, finished_at = ?
+            WHERE job_id = ? AND lease_owner = ? AND durum = ?
+        ''', (JOB_DONE, datetime.now().isoformat(), job_id, worker_id, JOB_RUNNING))
+
+    def fail(self, job_id: str, worker_id: str, hata_mesaji: str) -> bool:
+        """İşi hatalı olarak işaretle (analiz hataları tekrar denenmez)"""
+        return self._update_owned(job_id, worker_id, '''
+            UPDATE analysis_jobs SET durum = ?, hata_mesaji = ?, lease_owner = NULL,
+                lease_expires = NULL, finished_at = ?
+            WHERE job_id = ? AND lease_owner = ? AND durum = ?
+        ''', (JOB_FAILED, hata_mesaji, datetime.now().isoformat(), job_id, worker_id, JOB_RUNNING))
+
+    def cancel(self, job_id: str, worker_id: str, mesaj: str) -> bool:
+        """Çalışan işi iptal edildi olarak işaretle (iptal isteği veya zaman bütçesi)"""
+        return self._update_owned(job_id, worker_id, '''
+            UPDATE analysis_jobs SET durum = ?, hata_mesaji = ?, lease_owner = NULL,
+                lease_expires = NULL, finished_at = ?
+            WHERE job_id = ? AND lease_owner = ? AND durum = ?
+        ''', (JOB_CANCELLED, mesaj, datetime.now().isoformat(), job_id, worker_id, JOB_RUNNING))
+
+    def cancel_pending(self, analiz_id: str, mesaj: str = "Kuyruktayken iptal edildi") -> int:
+        """Analizin henüz başlamamış işlerini iptal et"""
+        conn = get_db_connection()
+        try:
+            cancelled = conn.execute('''
+                UPDATE analysis_jobs SET durum = ?, hata_mesaji = ?, finished_at = ?
+                WHERE analiz_id = ? AND durum = ?
+            ''', (JOB_CANCELLED, mesaj, datetime.now().isoformat(), analiz_id, JOB_PENDING)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return cancelled
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """İşi bu denemeyi saymadan kuyruğa geri bırak (düzenli kapanış)"""
+        return self._update_owned(job_id, worker_id, '''
+            UPDATE analysis_jobs SET durum = ?, deneme = MAX(deneme - 1, 0), lease_owner = NULL,
+                lease_expires = NULL
+            WHERE job_id = ? AND lease_owner = ? AND durum = ?
+        ''', (JOB_PENDING, job_id, worker_id, JOB_RUNNING))
+
+    def requeue_expired(self) -> int:
+        """Kirası dolan işleri kuyruğa geri al; deneme hakkı bitenleri hatalı işaretle"""
+        now = time.time()
+        conn = get_db_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            failed = conn.execute('''
+                UPDATE analysis_jobs SET durum = ?, lease_owner = NULL, lease_expires = NULL,
+                    hata_mesaji = 'Kira süresi doldu, deneme hakkı kalmadı', finished_at = ?
+                WHERE durum = ? AND lease_expires < ? AND deneme >= max_deneme
+            ''', (JOB_FAILED, datetime.now().isoformat(), JOB_RUNNING, now)).rowcount
+            requeued = conn.execute('''
+                UPDATE analysis_jobs SET durum = ?, lease_owner = NULL, lease_expires = NULL
+                WHERE durum = ? AND lease_expires < ?
+            ''', (JOB_PENDING, JOB_RUNNING, now)).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        if requeued or failed:
+            logger.warning(f"Kirası dolan işler: {requeued} tekrar kuyrukta, {failed} hatalı")
+        return requeued
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        conn = get_db_connection()
+        try:
+            row = conn.execute('SELECT * FROM analysis_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._to_dict(row) if row else None
+
+    def latest_for_analysis(self, analiz_id: str) -> Optional[Dict]:
+        """Analizin en son işi"""
+        conn = get_db_connection()
+        try:
+            row = conn.execute('''
+                SELECT * FROM analysis_jobs WHERE analiz_id = ? ORDER BY created_at DESC LIMIT 1
+            ''', (analiz_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._to_dict(row) if row else None
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Bekleyen işin kuyruktaki sırası (0: sıradaki)"""
+        job = self.get(job_id)
+        if not job or job['durum'] != JOB_PENDING:
+            return None
+        conn = get_db_connection()
+        try:
+            return conn.execute('''
+                SELECT COUNT(*) FROM analysis_jobs
+                WHERE durum = ? AND (oncelik > ? OR (oncelik = ? AND created_at < ?))
+            ''', (JOB_PENDING, job['oncelik'], job['oncelik'], job['created_at'])).fetchone()[0]
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict:
+        conn = get_db_connection()
+        try:
+            rows = conn.execute('SELECT durum, COUNT(*) AS sayi FROM analysis_jobs GROUP BY durum').fetchall()
+        finally:
+            conn.close()
+        stats = {JOB_PENDING: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_FAILED: 0, JOB_CANCELLED: 0}
+        stats.update({row['durum']: row['sayi'] for row in rows})
+        return stats
+
+    def _update_owned(self, job_id: str, worker_id: str, query: str, params: tuple) -> bool:
+        conn = get_db_connection()
+        try:
+            updated = conn.execute(query, params).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return updated == 1
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job.get('payload') or '{}')
+        return job
+
+class JobRunner:
+    """Kuyruktan iş talep eden ve çalıştıran asyncio worker'ları
+
+    Her uygulama süreci kendi runner'ını çalıştırır; talep atomik olduğu için
+    birden fazla süreç aynı kuyruğu güvenle paylaşır. gate verilirse False
+    döndürdüğü sürece (ör. bellek payı yok) yeni iş talep edilmez.
+    """
+
+    def __init__(self, queue: JobQueue, handler: Optional[Callable[[Dict], Awaitable]] = None,
+                 concurrency: int = 1, lease_seconds: float = 60.0, poll_interval: float = 2.0,
+                 gate: Optional[Callable[[], bool]] = None):
+        self.queue = queue
+        self.handler = handler
+        self.gate = gate
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = max(1.0, lease_seconds)
+        self.heartbeat_interval = self.lease_seconds / 3
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running_jobs: Dict[str, Dict] = {}
+        self._stats = {'claimed': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'released': 0,
+                       'lease_lost': 0, 'gated': 0}
+
+    def start(self, handler: Optional[Callable[[Dict], Awaitable]] = None,
+              gate: Optional[Callable[[], bool]] = None):
+        """Worker döngülerini mevcut event loop'ta başlat"""
+        if handler is not None:
+            self.handler = handler
+        if gate is not None:
+            self.gate = gate
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker_loop()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._reaper_loop()))
+        logger.info(f"İş kuyruğu runner'ı başlatıldı: {self.worker_id}, {self.concurrency} worker")
+
+    async def stop(self):
+        """Döngüleri durdur; çalışan işler deneme sayılmadan kuyruğa bırakılır"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def notify(self):
+        """Yeni iş eklendi; bekleyen worker'ları hemen uyandır"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _gate_open(self) -> bool:
+        if self.gate is None:
+            return True
+        try:
+            return self.gate()
+        except Exception as e:
+            logger.warning(f"İş alma kontrolü başarısız: {e}")
+            return True
+
+    async def _worker_loop(self):
+        while True:
+            if not self._gate_open():
+                # Geri basınç: iş kuyrukta kalır, kaynak boşalınca tekrar denenir
+                self._stats['gated'] += 1
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            try:
+                job = await asyncio.to_thread(self.queue.claim, self.worker_id, self.lease_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"İş talep edilemedi: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._stats['claimed'] += 1
+            await self._run(job)
+
+    async def _run(self, job: Dict):
+        job_id = job['job_id']
+        self._running_jobs[job_id] = job
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job_id))
+        try:
+            await self.handler(job)
+            await asyncio.to_thread(self.queue.complete, job_id, self.worker_id)
+            self._stats['completed'] += 1
+        except asyncio.CancelledError:
+            # Uygulama kapanıyor: iş başka bir worker tarafından alınabilsin
+            self.queue.release(job_id, self.worker_id)
+            self._stats['released'] += 1
+            raise
+        except AnalysisCancelled as e:
+            logger.info(f"İş durduruldu ({job_id}): {e}")
+            await asyncio.to_thread(self.queue.cancel, job_id, self.worker_id, str(e))
+            self._stats['cancelled'] += 1
+        except Exception as e:
+            logger.error(f"İş hatası ({job_id}): {e}")
+            await asyncio.to_thread(self.queue.fail, job_id, self.worker_id, str(e))
+            self._stats['failed'] += 1
+        finally:
+            heartbeat.cancel()
+            self._running_jobs.pop(job_id, None)
+
+    async def _heartbeat_loop(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                owned = await asyncio.to_thread(self.queue.heartbeat, job_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Kalp atışı yazılamadı ({job_id}): {e}")
+                continue
+            if not owned:
+                self._stats['lease_lost'] += 1
+                logger.warning(f"İş kirası kaybedildi ({job_id}); sonuç başka bir worker tarafından üretilebilir")
+                return
+
+    async def _reaper_loop(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 2)
+            try:
+                if await asyncio.to_thread(self.queue.requeue_expired):
+                    self.notify()
+            except Exception as e:
+                logger.error(f"Kirası dolan işler kuyruğa alınamadı: {e}")
+
+    def get_stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats.update({
+            'worker_id': self.worker_id,
+            'concurrency': self.concurrency,
+            'running': list(self._running_jobs),
+            'started': bool(self._tasks)
+        })
+        return stats
+
+# Global job queue and runner instances
+job_queue = JobQueue()
+job_runner = JobRunner(
+    job_queue,
+    concurrency=settings.JOB_RUNNER_CONCURRENCY,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL
+)
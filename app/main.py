@@ -1,30 +1,43 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Depends, Header
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Depends, Header, Query
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from pydantic import BaseModel
 import os
 import uuid
+import asyncio
 import shutil
 from datetime import datetime
 import logging
 import json
 import time
-import psutil
 
 from .ai_analysis import ZeytinAnalizci
 from .gpu_detector import gpu_detector
 from .auth import auth_manager, get_current_user, get_admin_user, get_current_user_optional
-from .rate_limiter import check_rate_limit
+from .rate_limiter import check_rate_limit, rate_limiter
 from .middleware import LoggingMiddleware, SecurityHeadersMiddleware
 from .backup import backup_manager
 from .validation import file_validator
-from .database import init_db, get_db_connection, create_analysis, get_analysis, update_analysis, add_file_upload
+from .database import init_db, get_db_connection, create_analysis, update_analysis, add_file_upload
 from .config import settings
 from .constants import ERROR_MESSAGES, SUCCESS_MESSAGES, API_RESPONSES
 from .models import model_manager, model_trainer
+from .model_registry import model_registry
+from .executor import analysis_executor
+from .detection_cache import detection_cache
+from .system_monitor import system_monitor
+from .analysis_log import analysis_logs
+from .analysis_status import analysis_status
+from .progress import progress_broker, TERMINAL_EVENTS
+from .job_queue import job_queue, job_runner, JOB_PENDING, JOB_RUNNING, JOB_CANCELLED
+from .cancellation import AnalysisCancelled, request_cancel, clear_cancel
+from .training_jobs import training_job_manager
+from .admission import admission_controller, KARAR_REDDET, MB
+from .instrumentation import analysis_metrics
 
 # Logging yapılandırması
 logging.basicConfig(
@@ -75,6 +88,8 @@ metrics_data = {
 class AnalysisRequest(BaseModel):
     analiz_id: str
     analiz_modu: Optional[str] = "cpu"
+    oncelik: int = 0
+    zaman_butcesi: Optional[float] = None
 
 class LoginRequest(BaseModel):
     kullanici_adi: str
@@ -91,6 +106,14 @@ class ModelTrainingRequest(BaseModel):
     annotations_dir: str
     model_name: Optional[str] = "custom_olive"
     epochs: Optional[int] = 100
+    quantize: Optional[bool] = False
+    dataset_mode: Optional[str] = None
+    augmentation_mode: Optional[str] = None
+
+class ModelQuantizeRequest(BaseModel):
+    dataset_config: Optional[str] = None
+    mode: Optional[str] = None
+    calibration_size: Optional[int] = None
 
 def update_metrics(endpoint: str, error: bool = False):
     """Metrics güncelle"""
@@ -114,6 +137,7 @@ def safe_error_response(status_code: int, detail: str, log_detail: str = None):
             401: ERROR_MESSAGES["insufficient_permissions"],
             403: ERROR_MESSAGES["insufficient_permissions"],
             404: "Kaynak bulunamadı",
+            409: ERROR_MESSAGES["conflict"],
             429: ERROR_MESSAGES["rate_limit_exceeded"],
             500: ERROR_MESSAGES["internal_error"]
         }
@@ -138,6 +162,25 @@ def get_admin_user_from_header(credentials: HTTPAuthorizationCredentials = Depen
     
     return get_admin_user(credentials.credentials)
 
+@app.on_event("startup")
+async def startup_event():
+    """Sistem kaynak örnekleyicisini, rate limit temizliğini, analiz iş kuyruğu runner'ını ve eğitim işi yöneticisini başlat"""
+    system_monitor.start()
+    rate_limiter.start_cleanup()
+    job_runner.start(_analiz_isini_calistir, gate=admission_controller.can_start)
+    training_job_manager.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Uygulama kapanırken iş runner'ını, eğitim işlerini, analiz havuzunu ve örnekleyiciyi kapat"""
+    # Çalışan işler deneme sayılmadan kuyruğa bırakılır; başka bir süreç devralır
+    await job_runner.stop()
+    # Çalışan eğitimler iptal edilir; son checkpoint'ten devam ettirilebilir
+    await training_job_manager.stop()
+    analysis_executor.shutdown(wait=False)
+    system_monitor.stop()
+    analysis_logs.flush_all()
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     """Ana sayfa"""
@@ -170,12 +213,15 @@ async def health_check():
             checks["database_error"] = str(e)
             logger.error(f"Database health check failed: {e}")
         
+        # Disk, bellek ve GPU örnekleyicinin son örneğinden okunur
+        ornek = system_monitor.latest()
+        checks["system_sample_age_s"] = round(ornek['age'], 2)
+        
         # Disk alanı kontrolü
         try:
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
+            disk_percent = ornek['disk_percent']
             checks["disk_usage_percent"] = round(disk_percent, 2)
-            checks["disk_free_gb"] = round(disk.free / (1024**3), 2)
+            checks["disk_free_gb"] = round(ornek['disk_free'] / (1024**3), 2)
             
             if disk_percent > 90:
                 checks["disk"] = "critical"
@@ -189,7 +235,7 @@ async def health_check():
         
         # GPU durumu
         try:
-            gpu_status = gpu_detector.get_gpu_status()
+            gpu_status = ornek['gpu']
             checks["gpu_available"] = gpu_status.get('gpu_available', False)
             checks["cuda_available"] = gpu_status.get('cuda_available', False)
             if gpu_status.get('gpu_available'):
@@ -200,7 +246,7 @@ async def health_check():
         
         # Model dosyası kontrolü
         try:
-            best_model = model_manager.get_best_model()
+            best_model = model_manager.get_best_model(benchmark_missing=False)
             checks["model_available"] = best_model is not None
             if best_model:
                 model_size = os.path.getsize(best_model)
@@ -212,13 +258,13 @@ async def health_check():
         
         # Bellek kontrolü
         try:
-            memory = psutil.virtual_memory()
-            checks["memory_usage_percent"] = round(memory.percent, 2)
-            checks["memory_available_gb"] = round(memory.available / (1024**3), 2)
+            memory_percent = ornek['memory_percent']
+            checks["memory_usage_percent"] = round(memory_percent, 2)
+            checks["memory_available_gb"] = round(ornek['memory_available'] / (1024**3), 2)
             
-            if memory.percent > 90:
+            if memory_percent > 90:
                 checks["memory"] = "critical"
-            elif memory.percent > 80:
+            elif memory_percent > 80:
                 checks["memory"] = "warning"
             else:
                 checks["memory"] = "healthy"
@@ -251,6 +297,43 @@ async def health_check():
             status_code=503
         )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metin biçiminde metrikler (istek sayaçları, sistem örneği, analiz aşama histogramları)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics devre dışı")
+    
+    satirlar = []
+    
+    def metrik(ad: str, tur: str, aciklama: str, degerler):
+        satirlar.extend([f"# HELP {ad} {aciklama}", f"# TYPE {ad} {tur}"])
+        for etiketler, deger in degerler:
+            satirlar.append(f"{ad}{etiketler} {deger:g}")
+    
+    metrik("zeytin_requests_total", "counter", "Toplam istek sayısı", [("", metrics_data["requests_total"])])
+    metrik("zeytin_requests_by_endpoint_total", "counter", "Endpoint başına istek sayısı",
+           [(f'{{endpoint="{endpoint}"}}', sayi) for endpoint, sayi in sorted(metrics_data["requests_by_endpoint"].items())])
+    metrik("zeytin_errors_total", "counter", "Hatalı istek sayısı", [("", metrics_data["errors_total"])])
+    metrik("zeytin_analysis_total", "counter", "Başlatılan analiz sayısı", [("", metrics_data["analysis_count"])])
+    metrik("zeytin_gpu_usage_total", "counter", "GPU modunda başlatılan analiz sayısı", [("", metrics_data["gpu_usage_count"])])
+    metrik("zeytin_cpu_usage_total", "counter", "CPU modunda başlatılan analiz sayısı", [("", metrics_data["cpu_usage_count"])])
+    metrik("zeytin_upload_bytes_total", "counter", "Yüklenen toplam bayt", [("", metrics_data["upload_size_total"])])
+    
+    # Sistem değerleri örnekleyicinin son örneğinden okunur
+    ornek = system_monitor.latest()
+    for ad, anahtar, aciklama in (("system_cpu_percent", "cpu_percent", "CPU kullanımı (%)"),
+                                  ("system_memory_percent", "memory_percent", "Bellek kullanımı (%)"),
+                                  ("system_disk_percent", "disk_percent", "Disk kullanımı (%)")):
+        if ornek.get(anahtar) is not None:
+            metrik(ad, "gauge", aciklama, [("", ornek[anahtar])])
+    gpu_var = bool((ornek.get('gpu') or {}).get('gpu_available', False))
+    metrik("gpu_available", "gauge", "GPU kullanılabilir mi (1/0)", [("", int(gpu_var))])
+    
+    # Tüm worker süreçlerinin analiz aşama histogramları (veritabanındaki toplamlar)
+    satirlar.extend(await run_in_threadpool(analysis_metrics.prometheus_lines))
+    
+    return Response("\n".join(satirlar) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Authentication endpoints
 @app.post("/auth/giris")
 async def giris(request: Request, login_data: LoginRequest):
@@ -403,6 +486,12 @@ async def dosya_yukle(request: Request, dosyalar: List[UploadFile] = File(...),
         yuklenen_dosyalar = []
         toplam_boyut = 0
         
+        # Validasyonda okunan görsel boyutları (kabul kontrolü maliyet tahmini)
+        dosya_metadata = {
+            dosya_sonucu['filename']: dosya_sonucu['result'].get('metadata', {})
+            for dosya_sonucu in validation_result['files']
+        }
+        
         # Dosya kontrolü ve yükleme
         for dosya in dosyalar:
             if dosya.filename:
@@ -424,7 +513,10 @@ async def dosya_yukle(request: Request, dosyalar: List[UploadFile] = File(...),
                 dosya_hash = hashlib.md5(dosya_icerik).hexdigest()
                 
                 # Database'e kaydet
-                add_file_upload(analiz_id, dosya.filename, dosya_boyutu, dosya_tipi, dosya_hash, dosya_yolu)
+                metadata = dosya_metadata.get(dosya.filename, {})
+                add_file_upload(analiz_id, dosya.filename, dosya_boyutu, dosya_tipi, dosya_hash, dosya_yolu,
+                                genislik=metadata.get('width'), yukseklik=metadata.get('height'),
+                                bant_sayisi=metadata.get('bands'))
                 
                 yuklenen_dosyalar.append({
                     "dosya_adi": dosya.filename,
@@ -443,17 +535,23 @@ async def dosya_yukle(request: Request, dosyalar: List[UploadFile] = File(...),
         
         # Log dosyası oluştur
         log_yolu = os.path.join(analiz_klasoru, "log.txt")
-        with open(log_yolu, "w", encoding="utf-8") as log_file:
-            log_file.write(f"Analiz ID: {analiz_id}\n")
-            log_file.write(f"Yükleme Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            if current_user:
-                log_file.write(f"Kullanıcı: {current_user['kullanici_adi']} (ID: {current_user['kullanici_id']})\n")
-            log_file.write(f"Toplam Dosya Sayısı: {len(yuklenen_dosyalar)}\n")
-            log_file.write(f"Toplam Boyut: {toplam_boyut} bytes\n")
-            log_file.write(f"GPU Durumu: {gpu_detector.get_gpu_status()}\n\n")
-            
-            for dosya in yuklenen_dosyalar:
-                log_file.write(f"Dosya: {dosya['dosya_adi']} - Boyut: {dosya['dosya_boyutu']} bytes - Tip: {dosya['dosya_tipi']}\n")
+        log_satirlari = [
+            f"Analiz ID: {analiz_id}",
+            f"Yükleme Tarihi: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        ]
+        if current_user:
+            log_satirlari.append(f"Kullanıcı: {current_user['kullanici_adi']} (ID: {current_user['kullanici_id']})")
+        log_satirlari += [
+            f"Toplam Dosya Sayısı: {len(yuklenen_dosyalar)}",
+            f"Toplam Boyut: {toplam_boyut} bytes",
+            f"GPU Durumu: {gpu_detector.get_gpu_status()}",
+            ""
+        ]
+        for dosya in yuklenen_dosyalar:
+            log_satirlari.append(f"Dosya: {dosya['dosya_adi']} - Boyut: {dosya['dosya_boyutu']} bytes - Tip: {dosya['dosya_tipi']}")
+        analiz_logu = analysis_logs.get(log_yolu)
+        analiz_logu.write_lines(log_satirlari)
+        analiz_logu.flush()
         
         return JSONResponse({
             "success": True,
@@ -473,25 +571,124 @@ async def dosya_yukle(request: Request, dosyalar: List[UploadFile] = File(...),
         update_metrics("/analiz/yukle", error=True)
         safe_error_response(500, "Dosya yükleme hatası", str(e))
 
+async def _analiz_isini_calistir(job: dict):
+    """Kuyruktan alınan analiz işini çalıştır (iş kuyruğu runner'ı tarafından çağrılır)"""
+    analiz_id = job['analiz_id']
+    analiz_modu = job['analiz_modu']
+    baslatan = job['payload']
+    analiz_klasoru = os.path.join(settings.DATA_PATH, "analizler", analiz_id)
+    yuklenen_klasor = os.path.join(analiz_klasoru, "yuklenen_dosyalar")
+    log_yolu = os.path.join(analiz_klasoru, "log.txt")
+    
+    # Kuyrukta beklerken bellek daralmışsa iş düşük bellek ayarlarıyla çalışır
+    dusuk_bellek = bool(baslatan.get('dusuk_bellek'))
+    if not dusuk_bellek:
+        dusuk_bellek = await asyncio.to_thread(admission_controller.should_degrade, analiz_id)
+    
+    # Log dosyasına analiz başlangıcını yaz (worker süreci aynı dosyaya eklediği için önce diske aktarılır)
+    analiz_logu = analysis_logs.get(log_yolu)
+    analiz_logu.write_lines([
+        "",
+        f"--- Analiz Başlatıldı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---",
+        f"Başlatan Kullanıcı: {baslatan.get('kullanici_adi')} (ID: {job.get('kullanici_id')})",
+        f"İş ID: {job['job_id']} (Deneme: {job['deneme']}/{job['max_deneme']})",
+        f"İstenen Analiz Modu: {analiz_modu.upper()}",
+        f"Düşük Bellek Modu: {'Evet' if dusuk_bellek else 'Hayır'}",
+        f"GPU Durumu: {gpu_detector.get_gpu_status()}"
+    ])
+    analiz_logu.flush()
+    analysis_status.set_status(analiz_id, analiz_klasoru, "isleniyor")
+    progress_broker.publish_ordered(analiz_id, {"tip": "basladi", "analiz_modu": analiz_modu, "is_id": job['job_id']})
+    
+    # AI analizi (yürütücü havuzunda; event loop bloklanmaz)
+    zaman_butcesi = baslatan.get('zaman_butcesi') or settings.ANALYSIS_TIME_BUDGET_SECONDS or None
+    start_time = datetime.now()
+    try:
+        analiz_sonuclari = await analysis_executor.submit(
+            yuklenen_klasor, 
+            analiz_klasoru, 
+            log_yolu,
+            analiz_modu,
+            zaman_butcesi=zaman_butcesi,
+            dusuk_bellek=dusuk_bellek
+        )
+    except asyncio.CancelledError:
+        # Uygulama kapanıyor; iş kuyruğa geri bırakılır, durum değiştirilmez
+        raise
+    except AnalysisCancelled as e:
+        clear_cancel(analiz_klasoru)
+        # Tamamlanan dosyalar kontrol noktalarında kalır; analiz yeniden başlatılırsa devam eder
+        analiz_logu.write(f"--- Analiz Durduruldu: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - {e} ---")
+        analiz_logu.flush()
+        analysis_status.set_status(analiz_id, analiz_klasoru, "iptal", hata_mesaji=str(e))
+        progress_broker.publish_ordered(analiz_id, {"tip": "iptal", "neden": e.neden, "mesaj": str(e)})
+        logger.info(f"Analiz durduruldu: {analiz_id} - {e}")
+        raise
+    except Exception as e:
+        update_metrics("/analiz/baslat", error=True)
+        analiz_logu.write(f"HATA: Analiz başarısız: {e}")
+        analiz_logu.flush()
+        analysis_status.set_status(analiz_id, analiz_klasoru, "hata", hata_mesaji=str(e))
+        progress_broker.publish_ordered(analiz_id, {"tip": "hata", "hata_mesaji": str(e)})
+        clear_cancel(analiz_klasoru)
+        raise
+    end_time = datetime.now()
+    
+    # Analiz son kontrolden önce bittiyse geç kalan iptal isteği yok sayılır
+    clear_cancel(analiz_klasoru)
+    
+    # Analiz süresini hesapla
+    analiz_suresi = (end_time - start_time).total_seconds()
+    analiz_sonuclari['analiz_suresi'] = analiz_suresi
+    
+    # Log dosyasını güncelle
+    analiz_logu.write_lines([
+        f"--- Analiz Tamamlandı: {end_time.strftime('%Y-%m-%d %H:%M:%S')} ---",
+        f"Toplam Süre: {analiz_suresi:.2f} saniye",
+        f"Kullanılan Cihaz: {analiz_sonuclari.get('kullanilan_cihaz', 'cpu').upper()}",
+        f"Toplam Ağaç: {analiz_sonuclari['toplam_agac']}",
+        f"Toplam Zeytin: {analiz_sonuclari['toplam_zeytin']}",
+        f"Tahmini Zeytin Miktarı: {analiz_sonuclari['tahmini_zeytin_miktari']} kg",
+        f"NDVI Ortalama: {analiz_sonuclari['ndvi_ortalama']:.3f}",
+        f"Sağlık Durumu: {analiz_sonuclari['saglik_durumu']}"
+    ])
+    analiz_logu.flush()
+    analysis_status.set_status(analiz_id, analiz_klasoru, "tamamlandi", sonuc=analiz_sonuclari)
+    progress_broker.publish_ordered(analiz_id, {"tip": "sonuc", "sonuc": analiz_sonuclari})
+    
+    logger.info(f"Analiz tamamlandı: {analiz_id} - {analiz_suresi:.2f}s - {analiz_sonuclari.get('kullanilan_cihaz', 'cpu').upper()}")
+
 @app.post("/analiz/baslat")
 async def analiz_baslat(
     request: Request,
     analiz_id: str = Form(...),
     analiz_modu: str = Form(default="cpu"),
+    oncelik: int = Form(default=0),
+    zaman_butcesi: Optional[float] = Form(default=None),
     admin_user: dict = Depends(get_admin_user_from_header)
 ):
-    """Analiz başlatma endpoint'i"""
+    """Analiz başlatma endpoint'i
+    
+    Analiz kalıcı iş kuyruğuna eklenir ve 202 ile iş ID'si döner; ilerleme
+    /analiz/akis/{analiz_id} veya /analiz/durum/{analiz_id} üzerinden izlenir.
+    zaman_butcesi (saniye) verilmezse ANALYSIS_TIME_BUDGET_SECONDS uygulanır.
+    Kabul kontrolü kuyruk dolu veya bellek yetersizse isteği Retry-After ile
+    reddeder, bellek payı darsa analizi düşük bellek ayarlarıyla kuyruğa alır.
+    """
     await check_rate_limit(request, "/analiz/baslat")
     update_metrics("/analiz/baslat")
     
     try:
         analiz_klasoru = os.path.join(settings.DATA_PATH, "analizler", analiz_id)
-        yuklenen_klasor = os.path.join(analiz_klasoru, "yuklenen_dosyalar")
-        log_yolu = os.path.join(analiz_klasoru, "log.txt")
         
         if not os.path.exists(analiz_klasoru):
             safe_error_response(404, "Analiz bulunamadı")
         
+        # Aynı analiz için bekleyen veya çalışan iş varsa tekrar kuyruğa alınmaz
+        mevcut_is = job_queue.latest_for_analysis(analiz_id)
+        if mevcut_is and mevcut_is['durum'] in (JOB_PENDING, JOB_RUNNING):
+            safe_error_response(409, "Analiz zaten kuyrukta veya çalışıyor")
+        
         # Analiz modunu kontrol et
         if analiz_modu.lower() not in ["cpu", "gpu"]:
             analiz_modu = "cpu"
@@ -501,6 +698,16 @@ async def analiz_baslat(
             logger.warning("GPU istendi ama mevcut değil, CPU moduna geçiliyor")
             analiz_modu = "cpu"
         
+        # Kabul kontrolü: tahmini bellek maliyeti, bellek payı ve kuyruk derinliği
+        kabul = admission_controller.evaluate(analiz_id)
+        if kabul['karar'] == KARAR_REDDET:
+            headers = {"Retry-After": str(kabul['retry_after'])} if kabul['retry_after'] else None
+            raise HTTPException(
+                status_code=kabul['durum_kodu'],
+                detail={"error": kabul['mesaj'], "neden": kabul['neden'], "retry_after": kabul['retry_after']},
+                headers=headers
+            )
+        
         # Metrics güncelle
         metrics_data["analysis_count"] += 1
         if analiz_modu == "gpu":
@@ -508,44 +715,39 @@ async def analiz_baslat(
         else:
             metrics_data["cpu_usage_count"] += 1
         
-        # Log dosyasına analiz başlangıcını yaz
-        with open(log_yolu, "a", encoding="utf-8") as log_file:
-            log_file.write(f"\n--- Analiz Başlatıldı: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ---\n")
-            log_file.write(f"Başlatan Kullanıcı: {admin_user['kullanici_adi']} (ID: {admin_user['kullanici_id']})\n")
-            log_file.write(f"İstenen Analiz Modu: {analiz_modu.upper()}\n")
-            log_file.write(f"GPU Durumu: {gpu_detector.get_gpu_status()}\n")
-        
-        # AI analizi başlat
-        start_time = datetime.now()
-        analiz_sonuclari = await analizci.analiz_yap(
-            yuklenen_klasor, 
-            analiz_klasoru, 
-            log_yolu,
-            analiz_modu
+        # Önceki çalıştırmadan kalan iptal isteği yeni işi durdurmamalı
+        clear_cancel(analiz_klasoru)
+        
+        is_id = job_queue.enqueue(
+            analiz_id,
+            analiz_modu,
+            oncelik=oncelik,
+            kullanici_id=admin_user['kullanici_id'],
+            payload={
+                "kullanici_adi": admin_user['kullanici_adi'],
+                "zaman_butcesi": zaman_butcesi,
+                "dusuk_bellek": kabul['dusuk_bellek']
+            }
         )
-        end_time = datetime.now()
-        
-        # Analiz süresini hesapla
-        analiz_suresi = (end_time - start_time).total_seconds()
-        analiz_sonuclari['analiz_suresi'] = analiz_suresi
-        
-        # Log dosyasını güncelle
-        with open(log_yolu, "a", encoding="utf-8") as log_file:
-            log_file.write(f"--- Analiz Tamamlandı: {end_time.strftime('%Y-%m-%d %H:%M:%S')} ---\n")
-            log_file.write(f"Toplam Süre: {analiz_suresi:.2f} saniye\n")
-            log_file.write(f"Kullanılan Cihaz: {analiz_sonuclari.get('kullanilan_cihaz', 'cpu').upper()}\n")
-            log_file.write(f"Toplam Ağaç: {analiz_sonuclari['toplam_agac']}\n")
-            log_file.write(f"Toplam Zeytin: {analiz_sonuclari['toplam_zeytin']}\n")
-            log_file.write(f"Tahmini Zeytin Miktarı: {analiz_sonuclari['tahmini_zeytin_miktari']} kg\n")
-            log_file.write(f"NDVI Ortalama: {analiz_sonuclari['ndvi_ortalama']:.3f}\n")
-            log_file.write(f"Sağlık Durumu: {analiz_sonuclari['saglik_durumu']}\n")
+        job_runner.notify()
         
-        logger.info(f"Analiz tamamlandı: {analiz_id} - {analiz_suresi:.2f}s - {analiz_sonuclari.get('kullanilan_cihaz', 'cpu').upper()}")
+        logger.info(f"Analiz kuyruğa alındı: {analiz_id} - iş {is_id} - öncelik {oncelik}")
         
-        return JSONResponse({
+        return JSONResponse(status_code=202, content={
             "success": True,
-            "sonuc": analiz_sonuclari,
-            "mesaj": SUCCESS_MESSAGES["analysis_completed"]
+            "is_id": is_id,
+            "analiz_id": analiz_id,
+            "durum": JOB_PENDING,
+            "kuyruk_sirasi": job_queue.position(is_id),
+            "akis_url": f"/analiz/akis/{analiz_id}",
+            "kabul": {
+                "karar": kabul['karar'],
+                "neden": kabul['neden'],
+                "mesaj": kabul['mesaj'],
+                "dusuk_bellek": kabul['dusuk_bellek'],
+                "tahmini_bellek_mb": kabul['tahmin']['tahmini_bayt'] // MB if 'tahmin' in kabul else None
+            },
+            "mesaj": SUCCESS_MESSAGES["analysis_queued"]
         })
         
     except HTTPException:
@@ -564,16 +766,112 @@ async def analiz_baslat_json(request: Request, analysis_request: AnalysisRequest
             request=request,
             analiz_id=analysis_request.analiz_id,
             analiz_modu=analysis_request.analiz_modu,
+            oncelik=analysis_request.oncelik,
+            zaman_butcesi=analysis_request.zaman_butcesi,
             admin_user=admin_user
         )
+    except HTTPException:
+        raise
     except Exception as e:
         update_metrics("/analiz/baslat-json", error=True)
         safe_error_response(500, "JSON analiz hatası", str(e))
 
+@app.post("/analiz/iptal/{analiz_id}")
+async def analiz_iptal(request: Request, analiz_id: str,
+                      admin_user: dict = Depends(get_admin_user_from_header)):
+    """Analizi iptal et
+    
+    Kuyruktaki iş hemen iptal edilir; çalışan analiz bir sonraki dosya, batch
+    veya karo arasında durur (iptal isteği analiz klasöründen tüm süreçlere görünür).
+    """
+    await check_rate_limit(request)
+    update_metrics("/analiz/iptal")
+    
+    try:
+        analiz_klasoru = os.path.join(settings.DATA_PATH, "analizler", analiz_id)
+        
+        if not os.path.exists(analiz_klasoru):
+            safe_error_response(404, "Analiz bulunamadı")
+        
+        mevcut_is = job_queue.latest_for_analysis(analiz_id)
+        if not mevcut_is or mevcut_is['durum'] not in (JOB_PENDING, JOB_RUNNING):
+            safe_error_response(409, "Analiz kuyrukta veya çalışır durumda değil")
+        
+        # Önce işaret bırakılır: iş bu arada talep edilirse analizci ilk kontrolde durur
+        request_cancel(analiz_klasoru, admin_user['kullanici_adi'])
+        
+        if job_queue.cancel_pending(analiz_id):
+            mesaj = "Analiz kuyruktayken iptal edildi"
+            analysis_status.set_status(analiz_id, analiz_klasoru, "iptal", hata_mesaji=mesaj)
+            progress_broker.publish_ordered(analiz_id, {"tip": "iptal", "neden": "iptal", "mesaj": mesaj})
+            clear_cancel(analiz_klasoru)
+            durum = "iptal"
+        else:
+            mesaj = "İptal isteği alındı; analiz bir sonraki kontrol noktasında duracak"
+            durum = "iptal_istendi"
+        
+        analysis_logs.write(os.path.join(analiz_klasoru, "log.txt"),
+                            f"İptal isteği: {admin_user['kullanici_adi']} (ID: {admin_user['kullanici_id']})")
+        logger.info(f"Analiz iptal isteği: {analiz_id} - {durum}")
+        
+        return {
+            "success": True,
+            "analiz_id": analiz_id,
+            "durum": durum,
+            "mesaj": mesaj
+        }
+    except HTTPException:
+        update_metrics("/analiz/iptal", error=True)
+        raise
+    except Exception as e:
+        update_metrics("/analiz/iptal", error=True)
+        safe_error_response(500, "Analiz iptal hatası", str(e))
+
+@app.get("/analiz/is/{is_id}")
+async def analiz_is_durumu(request: Request, is_id: str,
+                          current_user: dict = Depends(get_current_user_from_header)):
+    """Analiz işinin kuyruk durumu (durum, deneme, kuyruk sırası)"""
+    await check_rate_limit(request)
+    update_metrics("/analiz/is")
+    
+    try:
+        job = job_queue.get(is_id)
+        if job is None:
+            safe_error_response(404, "İş bulunamadı")
+        
+        return {
+            "is_id": job['job_id'],
+            "analiz_id": job['analiz_id'],
+            "analiz_modu": job['analiz_modu'],
+            "durum": job['durum'],
+            "oncelik": job['oncelik'],
+            "deneme": job['deneme'],
+            "max_deneme": job['max_deneme'],
+            "kuyruk_sirasi": job_queue.position(is_id),
+            "hata_mesaji": job['hata_mesaji'],
+            "olusturma_tarihi": job['created_at'],
+            "baslangic_tarihi": job['started_at'],
+            "bitis_tarihi": job['finished_at']
+        }
+    except HTTPException:
+        update_metrics("/analiz/is", error=True)
+        raise
+    except Exception as e:
+        update_metrics("/analiz/is", error=True)
+        safe_error_response(500, "İş durumu hatası", str(e))
+
 @app.get("/analiz/durum/{analiz_id}")
 async def analiz_durum(request: Request, analiz_id: str,
+                      log_cursor: Optional[int] = Query(default=None, ge=0),
+                      surum: Optional[int] = Query(default=None, ge=0),
+                      if_none_match: Optional[str] = Header(default=None),
                       current_user: dict = Depends(get_current_user_from_header)):
-    """Analiz durumu sorgulama"""
+    """Analiz durumu sorgulama
+    
+    log_cursor verilirse yalnızca bu satırdan sonraki log satırları döner;
+    surum mevcut sürümle aynıysa sonuç ve analiz bilgisi tekrar gönderilmez.
+    Değişiklik yoksa If-None-Match ile 304 döner.
+    """
     await check_rate_limit(request)
     update_metrics("/analiz/durum")
     
@@ -584,30 +882,35 @@ async def analiz_durum(request: Request, analiz_id: str,
         if not os.path.exists(analiz_klasoru):
             safe_error_response(404, "Analiz bulunamadı")
         
-        # Database'den analiz bilgisi al
-        analiz_bilgisi = get_analysis(analiz_id)
+        # Durum, sonuç ve veritabanı kaydı yalnızca durum.json değiştiğinde yeniden okunur
+        kayit = analysis_status.get(analiz_id, analiz_klasoru)
+        
+        # Log: bellekteki son satırlar (dosyanın yalnızca yeni eklenen kısmı okunur)
+        analiz_logu = analysis_logs.get(log_yolu)
+        if log_cursor is None:
+            log_satirlari = analiz_logu.tail()
+            sonraki_cursor, log_kesildi = analiz_logu.line_count, False
+        else:
+            log_satirlari, sonraki_cursor, log_kesildi = analiz_logu.lines_since(log_cursor)
         
-        # Log dosyasını oku
-        log_icerik = ""
-        if os.path.exists(log_yolu):
-            with open(log_yolu, "r", encoding="utf-8") as f:
-                log_icerik = f.read()
+        etag = f'W/"{kayit["surum"]}-{sonraki_cursor}"'
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Sonuç dosyasını kontrol et
-        sonuc_dosyasi = os.path.join(analiz_klasoru, "sonuc.json")
-        sonuc = None
-        if os.path.exists(sonuc_dosyasi):
-            with open(sonuc_dosyasi, "r", encoding="utf-8") as f:
-                sonuc = json.load(f)
+        sonuc_degisti = surum != kayit["surum"]
         
         return JSONResponse({
             "analiz_id": analiz_id,
-            "durum": analiz_bilgisi.get("durum", "bilinmiyor") if analiz_bilgisi else "bulunamadı",
-            "log": log_icerik,
-            "sonuc": sonuc,
-            "analiz_bilgisi": analiz_bilgisi,
-            "gpu_durumu": gpu_detector.get_gpu_status()
-        })
+            "durum": kayit["durum"],
+            "surum": kayit["surum"],
+            "sonuc_degisti": sonuc_degisti,
+            "log": "\n".join(log_satirlari) + "\n" if log_satirlari else "",
+            "log_cursor": sonraki_cursor,
+            "log_kesildi": log_kesildi,
+            "sonuc": kayit["sonuc"] if sonuc_degisti else None,
+            "analiz_bilgisi": kayit["analiz_bilgisi"] if sonuc_degisti else None,
+            "gpu_durumu": system_monitor.latest().get("gpu")
+        }, headers={"ETag": etag})
         
     except HTTPException:
         update_metrics("/analiz/durum", error=True)
@@ -616,6 +919,81 @@ async def analiz_durum(request: Request, analiz_id: str,
         update_metrics("/analiz/durum", error=True)
         safe_error_response(500, "Durum sorgulama hatası", str(e))
 
+def _sse_olay(olay: dict) -> str:
+    """İlerleme olayını SSE çerçevesine çevir"""
+    veri = json.dumps(olay, ensure_ascii=False, default=str)
+    return f"id: {olay.get('seq', 0)}\nevent: {olay['tip']}\ndata: {veri}\n\n"
+
+def _kayitli_son_olay(analiz_id: str, analiz_klasoru: str) -> Optional[dict]:
+    """Analiz bitmişse durum deposundaki sonucu / hatayı / iptali olay olarak döndür"""
+    kayit = analysis_status.get(analiz_id, analiz_klasoru)
+    if kayit["durum"] == "tamamlandi":
+        return {"tip": "sonuc", "sonuc": kayit["sonuc"]}
+    if kayit["durum"] == "hata":
+        return {"tip": "hata", "hata_mesaji": (kayit["analiz_bilgisi"] or {}).get("hata_mesaji")}
+    if kayit["durum"] == "iptal":
+        return {"tip": "iptal", "mesaj": (kayit["analiz_bilgisi"] or {}).get("hata_mesaji")}
+    return None
+
+@app.get("/analiz/akis/{analiz_id}")
+async def analiz_akis(request: Request, analiz_id: str,
+                      last_event_id: Optional[int] = Header(default=None),
+                      current_user: dict = Depends(get_current_user_from_header)):
+    """Analiz ilerleme akışı (Server-Sent Events)
+    
+    Dosya bazında ilerleme, aşama süreleri, ara sayımlar ve nihai sonuç
+    üretildikçe gönderilir; sonuç veya hata olayından sonra akış kapanır.
+    """
+    await check_rate_limit(request)
+    update_metrics("/analiz/akis")
+    
+    analiz_klasoru = os.path.join(settings.DATA_PATH, "analizler", analiz_id)
+    if not os.path.exists(analiz_klasoru):
+        safe_error_response(404, "Analiz bulunamadı")
+    
+    kuyruk, kacirilanlar, bitti = progress_broker.subscribe(analiz_id, last_event_id or 0)
+    
+    async def olaylar():
+        try:
+            # Bu süreçte olay geçmişi yoksa ve analiz bitmişse kayıtlı durum gönderilir
+            if not kacirilanlar:
+                son_olay = _kayitli_son_olay(analiz_id, analiz_klasoru)
+                if son_olay:
+                    yield _sse_olay(son_olay)
+                    return
+            
+            for olay in kacirilanlar:
+                yield _sse_olay(olay)
+            if bitti:
+                return
+            
+            while True:
+                if await request.is_disconnected():
+                    return
+                try:
+                    olay = await asyncio.wait_for(kuyruk.get(), timeout=settings.PROGRESS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Analiz başka bir uygulama sürecinde çalışıyorsa olaylar buraya gelmez;
+                    # bitişi durum deposundan yakala
+                    son_olay = _kayitli_son_olay(analiz_id, analiz_klasoru)
+                    if son_olay:
+                        yield _sse_olay(son_olay)
+                        return
+                    # Proxy'lerin bağlantıyı kapatmaması için yorum satırı
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse_olay(olay)
+                if olay["tip"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            progress_broker.unsubscribe(analiz_id, kuyruk)
+    
+    return StreamingResponse(
+        olaylar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Model Management Endpoints
 @app.get("/models/list")
 async def list_models(admin_user: dict = Depends(get_admin_user_from_header)):
@@ -629,7 +1007,11 @@ async def list_models(admin_user: dict = Depends(get_admin_user_from_header)):
 @app.post("/models/train")
 async def train_model(request: Request, training_request: ModelTrainingRequest,
                      admin_user: dict = Depends(get_admin_user_from_header)):
-    """Train custom model"""
+    """Submit a custom model training job
+    
+    Training runs in a separate, resource-capped process; the job id is returned
+    with 202 and per-epoch progress is served by GET /models/train/{job_id}.
+    """
     await check_rate_limit(request)
     
     try:
@@ -640,26 +1022,141 @@ async def train_model(request: Request, training_request: ModelTrainingRequest,
         if not os.path.exists(training_request.annotations_dir):
             safe_error_response(400, "Annotations directory not found")
         
-        # Start training
-        output_model_path = f"models/{training_request.model_name}.pt"
+        model_name = training_request.model_name or "custom_olive"
+        if os.path.basename(model_name) != model_name:
+            safe_error_response(400, "Invalid model name")
         
-        model_info = model_trainer.create_training_pipeline(
-            images_dir=training_request.images_dir,
-            annotations_dir=training_request.annotations_dir,
-            output_model_path=output_model_path
-        )
+        job_id = training_job_manager.submit(model_name, {
+            "images_dir": training_request.images_dir,
+            "annotations_dir": training_request.annotations_dir,
+            "epochs": training_request.epochs,
+            "quantize": training_request.quantize,
+            "dataset_mode": training_request.dataset_mode,
+            "augmentation_mode": training_request.augmentation_mode,
+            "kullanici_adi": admin_user['kullanici_adi']
+        }, kullanici_id=admin_user['kullanici_id'])
         
-        logger.info(f"Model training completed: {training_request.model_name}")
+        logger.info(f"Model training queued: {model_name} - job {job_id}")
         
-        return {
+        return JSONResponse(status_code=202, content={
             "success": True,
-            "message": "Model training completed",
-            "model_info": model_info
-        }
+            "job_id": job_id,
+            "model_name": model_name,
+            "durum": JOB_PENDING,
+            "durum_url": f"/models/train/{job_id}",
+            "message": "Model training queued"
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         safe_error_response(500, "Model eğitim hatası", str(e))
 
+@app.get("/models/train")
+async def list_training_jobs(limit: int = 20, admin_user: dict = Depends(get_admin_user_from_header)):
+    """List recent training jobs"""
+    try:
+        return {"success": True, "jobs": training_job_manager.store.list_jobs(max(1, min(limit, 100)))}
+    except Exception as e:
+        safe_error_response(500, "Eğitim işleri listeleme hatası", str(e))
+
+@app.get("/models/train/{job_id}")
+async def training_job_status(job_id: str, admin_user: dict = Depends(get_admin_user_from_header)):
+    """Training job status with per-epoch loss, mAP and epoch time"""
+    job = training_job_manager.get(job_id)
+    if job is None:
+        safe_error_response(404, "Training job not found")
+    return {"success": True, "job": job}
+
+@app.post("/models/train/{job_id}/cancel")
+async def cancel_training_job(job_id: str, admin_user: dict = Depends(get_admin_user_from_header)):
+    """Cancel a training job (a running job stops at the next batch, keeping its last checkpoint)"""
+    durum = training_job_manager.cancel(job_id, admin_user['kullanici_adi'])
+    if durum is None:
+        safe_error_response(404, "Training job not found")
+    if durum not in (JOB_PENDING, JOB_RUNNING, JOB_CANCELLED):
+        safe_error_response(409, "Training job already finished")
+    return {"success": True, "job_id": job_id, "durum": durum, "iptal_istendi": durum == JOB_RUNNING}
+
+@app.post("/models/train/{job_id}/resume")
+async def resume_training_job(job_id: str, admin_user: dict = Depends(get_admin_user_from_header)):
+    """Resume a cancelled or failed training job from its last checkpoint"""
+    if training_job_manager.store.get(job_id, epochs=False) is None:
+        safe_error_response(404, "Training job not found")
+    if not training_job_manager.resume(job_id):
+        safe_error_response(409, "Training job is not resumable (no checkpoint or not stopped)")
+    return JSONResponse(status_code=202, content={
+        "success": True, "job_id": job_id, "durum": JOB_PENDING, "durum_url": f"/models/train/{job_id}"
+    })
+
+@app.put("/models/{model_name}/backend")
+async def set_model_backend(model_name: str, backend: str = Form(...),
+                           admin_user: dict = Depends(get_admin_user_from_header)):
+    """Select the inference backend (ultralytics / onnxruntime) for a model"""
+    try:
+        model_info = model_manager.set_model_backend(model_name, backend)
+        return {"success": True, "model_info": model_info}
+    except ValueError as e:
+        safe_error_response(400, str(e))
+    except FileNotFoundError:
+        safe_error_response(404, "Model not found")
+    except Exception as e:
+        safe_error_response(500, "Model backend hatası", str(e))
+
+@app.post("/models/{model_name}/quantize")
+async def quantize_model(request: Request, model_name: str, quantize_request: ModelQuantizeRequest,
+                        admin_user: dict = Depends(get_admin_user_from_header)):
+    """Create an INT8 variant of a model for CPU analysis"""
+    await check_rate_limit(request)
+    
+    try:
+        model_path = os.path.join(model_manager.models_dir, f"{model_name}.pt")
+        if not os.path.exists(model_path):
+            safe_error_response(404, "Model not found")
+        
+        if quantize_request.dataset_config and not os.path.exists(quantize_request.dataset_config):
+            safe_error_response(400, "Dataset config not found")
+        
+        variant_info = await run_in_threadpool(
+            model_trainer.quantize_model,
+            model_path,
+            quantize_request.dataset_config,
+            quantize_request.mode,
+            quantize_request.calibration_size
+        )
+        
+        return {"success": True, "variant": variant_info}
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        safe_error_response(400, str(e))
+    except Exception as e:
+        safe_error_response(500, "Model quantization hatası", str(e))
+
+@app.post("/models/{model_name}/benchmark")
+async def benchmark_model(request: Request, model_name: str, device: str = Form("cpu"),
+                         admin_user: dict = Depends(get_admin_user_from_header)):
+    """Measure a model's inference latency and memory on this host (stored in its info file)"""
+    await check_rate_limit(request)
+    
+    try:
+        model_path = os.path.join(model_manager.models_dir, f"{model_name}.pt")
+        if not os.path.exists(model_path):
+            safe_error_response(404, "Model not found")
+        
+        if device not in ("cpu", "cuda"):
+            safe_error_response(400, "Invalid device")
+        
+        result = await run_in_threadpool(model_manager.benchmark_model, model_path, device)
+        return {"success": True, "benchmark": result,
+                "best_model": model_manager.get_best_model(device=device, benchmark_missing=False)}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        safe_error_response(500, "Model benchmark hatası", str(e))
+
 @app.delete("/models/{model_name}")
 async def delete_model(model_name: str, admin_user: dict = Depends(get_admin_user_from_header)):
     """Delete a model"""
@@ -790,13 +1287,11 @@ async def sistem_durumu(request: Request, admin_user: dict = Depends(get_admin_u
     update_metrics("/admin/sistem-durumu")
     
     try:
-        # Sistem bilgileri
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        # Sistem bilgileri (arka plan örnekleyicisinden, bloklamadan)
+        ornek = system_monitor.latest()
         
         # GPU bilgileri
-        gpu_status = gpu_detector.get_gpu_status()
+        gpu_status = ornek.get('gpu') or gpu_detector.get_gpu_status()
         
         # Analiz istatistikleri
         from .database import get_all_analyses
@@ -808,11 +1303,13 @@ async def sistem_durumu(request: Request, admin_user: dict = Depends(get_admin_u
         return {
             "success": True,
             "system": {
-                "cpu_percent": cpu_percent,
-                "memory_percent": memory.percent,
-                "memory_available": memory.available,
-                "disk_percent": (disk.used / disk.total) * 100,
-                "disk_free": disk.free
+                "cpu_percent": ornek.get('cpu_percent'),
+                "memory_percent": ornek.get('memory_percent'),
+                "memory_available": ornek.get('memory_available'),
+                "disk_percent": ornek.get('disk_percent'),
+                "disk_free": ornek.get('disk_free'),
+                "sample_age": ornek['age'],
+                "history": system_monitor.summary()
             },
             "gpu": gpu_status,
             "analyses": {
@@ -822,8 +1319,19 @@ async def sistem_durumu(request: Request, admin_user: dict = Depends(get_admin_u
             },
             "models": {
                 "available": len(model_manager.list_available_models()),
-                "best_model": model_manager.get_best_model()
+                "best_model": model_manager.get_best_model(benchmark_missing=False),
+                "registry": model_registry.get_stats()
+            },
+            "executor": analysis_executor.get_stats(),
+            "detection_cache": detection_cache.get_stats(),
+            "progress": progress_broker.get_stats(),
+            "jobs": {
+                "queue": job_queue.get_stats(),
+                "runner": job_runner.get_stats()
             },
+            "training": training_job_manager.get_stats(),
+            "admission": admission_controller.get_stats(),
+            "analysis_stages": analysis_metrics.load(),
             "user_stats": user_stats,
             "metrics": metrics_data
         }
@@ -0,0 +1,222 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Model Kayıt Defteri
+Yüklenmiş modelleri süreç boyunca bellekte tutar (LRU + bellek bütçesi)
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """(model yolu, dosya imzası, cihaz) anahtarlı, süreç genelinde model önbelleği"""
+
+    def __init__(self, max_models: int = 2, max_memory_mb: float = 1024.0):
+        self.max_models = max(1, max_models)
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Tuple, threading.Lock] = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'load_errors': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'load_time_total': 0.0,
+            'load_time_last': 0.0
+        }
+
+    @staticmethod
+    def file_signature(model_path: str) -> Optional[Tuple[int, int]]:
+        """Model dosyasının imzası (mtime_ns, boyut); dosya okunamazsa None"""
+        try:
+            stat = os.stat(model_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _normalize_path(model_path: str) -> str:
+        return os.path.abspath(model_path)
+
+    @staticmethod
+    def estimate_model_size(model: Any, model_path: str) -> int:
+        """Modelin bellekteki yaklaşık boyutu (byte)"""
+        try:
+            module = getattr(model, 'model', model)
+            parameters = getattr(module, 'parameters', None)
+            if callable(parameters):
+                size = sum(p.numel() * p.element_size() for p in parameters())
+                if size > 0:
+                    return int(size)
+        except Exception:
+            pass
+
+        try:
+            return os.path.getsize(model_path)
+        except OSError:
+            return 0
+
+    def get_or_load(self, model_path: str, device: str,
+                    loader: Callable[[str, str], Any], slot: int = 0) -> Any:
+        """Modeli önbellekten döndür, yoksa loader(model_path, device) ile yükle
+
+        slot: aynı modelin bağımsız kopyaları için (ör. paralel karo worker'ları)
+        """
+        signature = self.file_signature(model_path)
+
+        # İmza alınamıyorsa (dosya yok / erişilemiyor) önbelleği atla
+        if signature is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            return self._load(model_path, device, loader)
+
+        key = (self._normalize_path(model_path), signature, device, slot)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry['last_used'] = time.time()
+                entry['hits'] += 1
+                self._stats['hits'] += 1
+                return entry['model']
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Aynı model için eşzamanlı yüklemeleri tek yüklemeye indir
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry['hits'] += 1
+                    self._stats['hits'] += 1
+                    return entry['model']
+                self._stats['misses'] += 1
+
+            try:
+                model = self._load(model_path, device, loader)
+
+                with self._lock:
+                    # Aynı yolun eski imzalı kopyalarını at (dosya değişmiş)
+                    stale_keys = [k for k in self._entries if k[0] == key[0] and k[1] != signature]
+                    for stale_key in stale_keys:
+                        self._remove(stale_key, reason="dosya değişti")
+
+                    self._entries[key] = {
+                        'model': model,
+                        'size': self.estimate_model_size(model, model_path),
+                        'loaded_at': time.time(),
+                        'last_used': time.time(),
+                        'hits': 0
+                    }
+                    self._enforce_budget(keep=key)
+            finally:
+                # Yükleme başarısız olsa da (bozuk / eksik dosya) kilit kaydı birikmemeli
+                with self._lock:
+                    self._load_locks.pop(key, None)
+
+        return model
+
+    def _load(self, model_path: str, device: str, loader: Callable[[str, str], Any]) -> Any:
+        start_time = time.perf_counter()
+        try:
+            model = loader(model_path, device)
+        except Exception:
+            with self._lock:
+                self._stats['load_errors'] += 1
+            raise
+
+        load_time = time.perf_counter() - start_time
+        with self._lock:
+            self._stats['loads'] += 1
+            self._stats['load_time_total'] += load_time
+            self._stats['load_time_last'] = load_time
+
+        logger.info(f"Model yüklendi: {model_path} ({device}) - {load_time:.2f}s")
+        return model
+
+    def _enforce_budget(self, keep: Tuple):
+        """LRU sırasına göre sayı ve bellek bütçesini uygula
+
+        Sayı limiti farklı modelleri (yol, cihaz) sayar; aynı modelin worker
+        kopyaları yalnızca bellek bütçesine dahil edilir.
+        """
+        while len(self._entries) > 1:
+            total_size = sum(e['size'] for e in self._entries.values())
+            model_count = len({(k[0], k[2]) for k in self._entries})
+            if model_count <= self.max_models and total_size <= self.max_memory_bytes:
+                break
+
+            oldest_key = next(iter(self._entries))
+            if oldest_key == keep:
+                break
+            self._remove(oldest_key, reason="bütçe")
+
+    def _remove(self, key: Tuple, reason: str = ""):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        if reason == "bütçe":
+            self._stats['evictions'] += 1
+        else:
+            self._stats['invalidations'] += 1
+
+        logger.info(f"Model önbellekten çıkarıldı: {key[0]} ({key[2]}) - {reason}")
+
+        if key[2] == "cuda":
+            from .gpu_detector import gpu_detector
+            del entry
+            gpu_detector.clear_gpu_cache()
+
+    def invalidate(self, model_path: Optional[str] = None):
+        """Belirli bir modelin (veya tüm modellerin) önbellek kayıtlarını sil"""
+        with self._lock:
+            if model_path is None:
+                keys = list(self._entries)
+            else:
+                normalized = self._normalize_path(model_path)
+                keys = [k for k in self._entries if k[0] == normalized]
+
+            for key in keys:
+                self._remove(key, reason="geçersiz kılındı")
+
+    def get_stats(self) -> Dict:
+        """Önbellek istatistikleri"""
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+            stats['load_time_avg'] = stats['load_time_total'] / stats['loads'] if stats['loads'] else 0.0
+            stats['resident_models'] = len({(k[0], k[2]) for k in self._entries})
+            stats['resident_instances'] = len(self._entries)
+            stats['resident_bytes'] = sum(e['size'] for e in self._entries.values())
+            stats['max_models'] = self.max_models
+            stats['max_memory_bytes'] = self.max_memory_bytes
+            stats['models'] = [
+                {
+                    'path': key[0],
+                    'device': key[2],
+                    'slot': key[3],
+                    'size': entry['size'],
+                    'hits': entry['hits'],
+                    'loaded_at': entry['loaded_at']
+                }
+                for key, entry in self._entries.items()
+            ]
+            return stats
+
+# Global model registry instance
+model_registry = ModelRegistry(
+    max_models=settings.MODEL_CACHE_MAX_MODELS,
+    max_memory_mb=settings.MODEL_CACHE_MAX_MB
+)
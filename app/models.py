@@ -8,15 +8,198 @@ import torch
 import logging
 from ultralytics import YOLO
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import cv2
 import numpy as np
 from datetime import datetime
 import json
 import shutil
+import time
+import re
+import zlib
+import random
+import hashlib
+import itertools
+import platform
+import threading
+import multiprocessing
+import psutil
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .model_registry import model_registry
+from .dataset_cache import dataset_image_cache
+from .config import settings
+from .inference_backends import (
+    AVAILABLE_BACKENDS, BACKEND_ONNXRUNTIME, BACKEND_ULTRALYTICS, InferenceBackend,
+    OnnxRuntimeBackend, UltralyticsBackend
+)
 
 logger = logging.getLogger(__name__)
 
+# Compact index of the models directory (see ModelManager._refresh_index)
+MODEL_INDEX_MANIFEST = ".model_index.json"
+MODEL_INDEX_VERSION = 1
+
+# Dataset materialization modes for prepare_dataset
+DATASET_MODE_COPY = "copy"
+DATASET_MODE_HARDLINK = "hardlink"
+DATASET_MODE_SYMLINK = "symlink"
+DATASET_MODE_MANIFEST = "manifest"
+DATASET_MODES = (DATASET_MODE_COPY, DATASET_MODE_HARDLINK, DATASET_MODE_SYMLINK, DATASET_MODE_MANIFEST)
+DATASET_SPLITS = ('train', 'val', 'test')
+DATASET_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Augmentation modes: offline writes _aug_<i> files, online lets the trainer augment each batch
+AUGMENT_MODE_OFFLINE = "offline"
+AUGMENT_MODE_ONLINE = "online"
+# Ultralytics training hyperparameters that approximate the offline pipeline
+ONLINE_AUGMENTATION = {
+    'fliplr': 0.5,
+    'flipud': 0.2,
+    'degrees': 90.0,
+    'hsv_h': 0.015,
+    'hsv_s': 0.5,
+    'hsv_v': 0.4,
+}
+
+# Bumped on every info file write in this process so model indexes notice in-place edits
+_info_generation = 0
+
+def model_info_path(model_path: str) -> str:
+    """Path of the <name>_info.json file that sits next to a model file"""
+    return os.path.splitext(model_path)[0] + '_info.json'
+
+def load_model_info(model_path: str) -> Dict:
+    """Load a model's info file; returns an empty dict if missing or unreadable"""
+    info_path = model_info_path(model_path)
+    try:
+        with open(info_path, 'r') as f:
+            info = json.load(f)
+        return info if isinstance(info, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def write_model_info(model_path: str, info: Dict):
+    """Write a model's info file"""
+    global _info_generation
+    with open(model_info_path(model_path), 'w') as f:
+        json.dump(info, f, indent=2)
+    _info_generation += 1
+
+def update_model_info(model_path: str, updates: Dict) -> Dict:
+    """Merge updates into a model's info file and write it back"""
+    info = load_model_info(model_path)
+    info.update(updates)
+    write_model_info(model_path, info)
+    return info
+
+def _default_augmentation_pipeline():
+    """Albumentations pipeline for offline augmentation (YOLO-format boxes)"""
+    import albumentations as A
+    
+    return A.Compose([
+        A.HorizontalFlip(p=0.5),
+        A.VerticalFlip(p=0.2),
+        A.RandomRotate90(p=0.5),
+        A.RandomBrightnessContrast(p=0.3),
+        A.HueSaturationValue(p=0.3),
+        A.GaussianBlur(p=0.2),
+        A.RandomGamma(p=0.2),
+        A.CLAHE(p=0.2),
+    ], bbox_params=A.BboxParams(format='yolo', label_fields=['class_labels']))
+
+def _read_yolo_labels(label_file: str) -> Tuple[List[List[float]], List[int]]:
+    bboxes, class_labels = [], []
+    if os.path.exists(label_file):
+        with open(label_file, 'r') as f:
+            for line in f:
+                parts = line.strip().split()
+                if len(parts) >= 5:
+                    class_labels.append(int(parts[0]))
+                    bboxes.append(list(map(float, parts[1:5])))
+    return bboxes, class_labels
+
+def yolo_label_path(image_path: str) -> str:
+    """Label file YOLO reads for an image listed by path (.../images/x.jpg -> .../labels/x.txt)"""
+    images_part, labels_part = f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}"
+    return os.path.splitext(labels_part.join(image_path.rsplit(images_part, 1)))[0] + '.txt'
+
+def _dataset_split_entry(dataset_config_path: str, split: str) -> str:
+    """Absolute path of a split in a dataset config (a directory or a .txt image list)"""
+    config = {}
+    if os.path.exists(dataset_config_path):
+        with open(dataset_config_path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    base_dir = config.get('path') or os.path.dirname(dataset_config_path)
+    return os.path.abspath(os.path.join(base_dir, config.get(split) or f'images/{split}'))
+
+def dataset_split_images(dataset_config_path: str, split: str = 'train') -> List[str]:
+    """Image files of a dataset split, read from the directory or .txt list the config names
+    
+    A missing config falls back to the default images/<split> layout next to it.
+    Relative entries of a list are resolved against the list's directory, as YOLO does.
+    """
+    entry = _dataset_split_entry(dataset_config_path, split)
+    if entry.endswith('.txt'):
+        if not os.path.exists(entry):
+            return []
+        with open(entry, 'r') as f:
+            paths = [line.strip() for line in f if line.strip()]
+        images = [os.path.abspath(os.path.join(os.path.dirname(entry), path)) for path in paths]
+    elif os.path.isdir(entry):
+        with os.scandir(entry) as entries:
+            images = [os.path.abspath(e.path) for e in entries if e.is_file()]
+    else:
+        return []
+    return sorted(path for path in images if path.lower().endswith(DATASET_IMAGE_EXTENSIONS))
+
+def _augment_images(image_paths: List[str], output_dir: str, augmentation_factor: int, seed: int,
+                    pipeline_factory: Callable) -> Dict:
+    """Augment a chunk of images into output_dir (runs in a pool worker)
+    
+    Labels are read from and written to where YOLO looks for them (see
+    yolo_label_path). Only one decoded image is held at a time. Each image is seeded from
+    the base seed and its name, so results do not depend on which worker
+    or chunk it lands in.
+    """
+    transform = pipeline_factory()
+    stats = {'images': 0, 'augmented': 0, 'failed': 0}
+    
+    for img_path in image_paths:
+        image = cv2.imread(img_path)
+        if image is None:
+            stats['failed'] += 1
+            continue
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        stem = Path(img_path).stem
+        bboxes, class_labels = _read_yolo_labels(yolo_label_path(img_path))
+        
+        image_seed = (seed + zlib.crc32(stem.encode())) % (2 ** 32)
+        random.seed(image_seed)
+        np.random.seed(image_seed)
+        if hasattr(transform, 'set_random_seed'):
+            transform.set_random_seed(image_seed)
+        
+        for i in range(augmentation_factor):
+            try:
+                augmented = transform(image=image, bboxes=bboxes, class_labels=class_labels)
+                
+                # Save augmented image
+                aug_img_path = os.path.join(output_dir, f"{stem}_aug_{i}.jpg")
+                cv2.imwrite(aug_img_path, cv2.cvtColor(augmented['image'], cv2.COLOR_RGB2BGR))
+                
+                # Save augmented annotations
+                with open(yolo_label_path(aug_img_path), 'w') as f:
+                    for bbox, class_id in zip(augmented['bboxes'], augmented['class_labels']):
+                        f.write(f"{class_id} {' '.join(map(str, bbox))}\n")
+                stats['augmented'] += 1
+            except Exception as e:
+                logger.warning(f"Augmentation failed for {os.path.basename(img_path)}: {e}")
+                stats['failed'] += 1
+        stats['images'] += 1
+    
+    return stats
+
 class ZeytinModelTrainer:
     """Custom YOLOv8 model trainer for olive detection"""
     
@@ -73,14 +256,18 @@ class ZeytinModelTrainer:
             'dropout': 0.0,
         }
     
-    def create_dataset_config(self, dataset_path: str, train_ratio: float = 0.8) -> str:
-        """Create YOLO dataset configuration file"""
+    def create_dataset_config(self, dataset_path: str, train_ratio: float = 0.8,
+                              splits: Optional[Dict[str, str]] = None) -> str:
+        """Create YOLO dataset configuration file
+        
+        splits maps split names to directories or file lists relative to
+        dataset_path (default: images/<split>).
+        """
         try:
+            splits = splits or {split: f'images/{split}' for split in DATASET_SPLITS}
             config = {
                 'path': dataset_path,
-                'train': 'images/train',
-                'val': 'images/val',
-                'test': 'images/test',
+                **splits,
                 'nc': 2,  # number of classes
                 'names': ['olive_tree', 'olive_fruit']
             }
@@ -96,142 +283,299 @@ class ZeytinModelTrainer:
             logger.error(f"Dataset config creation error: {e}")
             raise
     
-    def prepare_dataset(self, images_dir: str, annotations_dir: str, output_dir: str) -> str:
-        """Prepare dataset in YOLO format"""
+    def prepare_dataset(self, images_dir: str, annotations_dir: str, output_dir: str,
+                        mode: Optional[str] = None) -> str:
+        """Prepare dataset in YOLO format
+        
+        mode (default DATASET_MATERIALIZE_MODE) decides how files reach
+        output_dir: 'hardlink' (falls back to copying across filesystems),
+        'symlink', 'copy' (parallel), or 'manifest', which writes
+        <split>.txt lists of the source images instead of touching them and
+        therefore needs labels where YOLO looks for them (the 'labels'
+        sibling of the images directory). The split is deterministic, and
+        re-runs skip files that are already in place and remove stale ones.
+        """
+        mode = mode or settings.DATASET_MATERIALIZE_MODE
+        if mode not in DATASET_MODES:
+            raise ValueError(f"Unknown dataset mode: {mode}")
+        
         try:
-            # Create directory structure
-            dataset_dirs = [
-                'images/train', 'images/val', 'images/test',
-                'labels/train', 'labels/val', 'labels/test'
-            ]
-            
-            for dir_name in dataset_dirs:
-                os.makedirs(os.path.join(output_dir, dir_name), exist_ok=True)
-            
-            # Get all image files
-            image_files = []
-            for ext in ['.jpg', '.jpeg', '.png']:
-                image_files.extend(Path(images_dir).glob(f'*{ext}'))
-                image_files.extend(Path(images_dir).glob(f'*{ext.upper()}'))
-            
-            # Split dataset
-            np.random.shuffle(image_files)
-            train_split = int(len(image_files) * 0.8)
-            val_split = int(len(image_files) * 0.9)
-            
-            train_files = image_files[:train_split]
-            val_files = image_files[train_split:val_split]
-            test_files = image_files[val_split:]
-            
-            # Copy files to appropriate directories
-            for split_name, files in [('train', train_files), ('val', val_files), ('test', test_files)]:
-                for img_file in files:
-                    # Copy image
-                    dst_img = os.path.join(output_dir, 'images', split_name, img_file.name)
-                    shutil.copy2(img_file, dst_img)
-                    
-                    # Copy corresponding annotation if exists
-                    ann_file = os.path.join(annotations_dir, img_file.stem + '.txt')
+            image_files = self._dataset_images(images_dir)
+            splits = self._split_dataset(image_files)
+            
+            if mode == DATASET_MODE_MANIFEST:
+                config_splits = self._write_split_manifests(splits, images_dir, annotations_dir, output_dir)
+                logger.info(f"Dataset manifest prepared: {len(splits['train'])} train, "
+                            f"{len(splits['val'])} val, {len(splits['test'])} test")
+                return self.create_dataset_config(output_dir, splits=config_splits)
+            
+            # Planned destination -> source for every image and existing annotation
+            plan = {}
+            for split_name, files in splits.items():
+                for dir_name in ('images', 'labels'):
+                    os.makedirs(os.path.join(output_dir, dir_name, split_name), exist_ok=True)
+                for img_path in files:
+                    name = os.path.basename(img_path)
+                    plan[os.path.join(output_dir, 'images', split_name, name)] = img_path
+                    ann_file = os.path.join(annotations_dir, os.path.splitext(name)[0] + '.txt')
                     if os.path.exists(ann_file):
-                        dst_ann = os.path.join(output_dir, 'labels', split_name, img_file.stem + '.txt')
-                        shutil.copy2(ann_file, dst_ann)
+                        plan[os.path.join(output_dir, 'labels', split_name, os.path.splitext(name)[0] + '.txt')] = ann_file
             
-            logger.info(f"Dataset prepared: {len(train_files)} train, {len(val_files)} val, {len(test_files)} test")
+            removed = self._remove_stale_files(output_dir, plan)
+            
+            with ThreadPoolExecutor(max_workers=max(1, settings.DATASET_COPY_WORKERS)) as pool:
+                results = list(pool.map(lambda item: self._materialize_file(item[1], item[0], mode), plan.items()))
+            counts = {result: results.count(result) for result in set(results)}
+            
+            logger.info(f"Dataset prepared ({mode}): {len(splits['train'])} train, {len(splits['val'])} val, "
+                        f"{len(splits['test'])} test; files {counts}, removed {removed}")
             return self.create_dataset_config(output_dir)
             
         except Exception as e:
             logger.error(f"Dataset preparation error: {e}")
             raise
     
-    def augment_dataset(self, dataset_path: str, augmentation_factor: int = 3):
-        """Apply data augmentation to increase dataset size"""
+    @staticmethod
+    def _dataset_images(images_dir: str) -> List[str]:
+        """Image files of a directory (single scan, extensions matched case-insensitively)"""
+        with os.scandir(images_dir) as entries:
+            return sorted(os.path.abspath(entry.path) for entry in entries
+                          if entry.name.lower().endswith(DATASET_IMAGE_EXTENSIONS) and entry.is_file())
+    
+    @staticmethod
+    def _split_dataset(image_files: List[str]) -> Dict[str, List[str]]:
+        """80/10/10 split ordered by a hash of the file name
+        
+        The same files always land in the same split, and adding images only
+        moves the few files around the split boundaries, which keeps
+        incremental re-runs cheap.
+        """
+        ordered = sorted(image_files, key=lambda path: hashlib.md5(os.path.basename(path).encode()).hexdigest())
+        train_split = int(len(ordered) * 0.8)
+        val_split = int(len(ordered) * 0.9)
+        return {
+            'train': ordered[:train_split],
+            'val': ordered[train_split:val_split],
+            'test': ordered[val_split:]
+        }
+    
+    def _write_split_manifests(self, splits: Dict[str, List[str]], images_dir: str, annotations_dir: str,
+                               output_dir: str) -> Dict[str, str]:
+        """Write <split>.txt image lists; returns the dataset config split entries"""
+        images_dir = os.path.abspath(images_dir)
+        label_dir = os.path.dirname(yolo_label_path(os.path.join(images_dir, 'image.jpg')))
+        if label_dir == images_dir or label_dir != os.path.abspath(annotations_dir):
+            raise ValueError("Manifest mode needs labels in the 'labels' directory next to 'images' "
+                             f"(expected {label_dir}); use a link or copy mode instead")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        config_splits = {}
+        for split_name, files in splits.items():
+            list_path = os.path.join(output_dir, f"{split_name}.txt")
+            with open(list_path, 'w') as f:
+                f.writelines(f"{path}\n" for path in files)
+            config_splits[split_name] = f"{split_name}.txt"
+        return config_splits
+    
+    @staticmethod
+    def _remove_stale_files(output_dir: str, plan: Dict[str, str]) -> int:
+        """Delete files in the split directories that are not part of this run's plan
+        
+        Pre-resized .npy arrays next to planned images are kept; the image cache
+        refreshes them.
+        """
+        planned_stems = {os.path.splitext(path)[0] for path in plan}
+        removed = 0
+        for dir_name in ('images', 'labels'):
+            for split_name in DATASET_SPLITS:
+                split_dir = os.path.join(output_dir, dir_name, split_name)
+                if not os.path.isdir(split_dir):
+                    continue
+                with os.scandir(split_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.npy') and os.path.splitext(entry.path)[0] in planned_stems:
+                            continue
+                        if entry.path not in plan and (entry.is_file() or entry.is_symlink()):
+                            os.remove(entry.path)
+                            removed += 1
+        return removed
+    
+    @staticmethod
+    def _materialize_file(src: str, dst: str, mode: str) -> str:
+        """Place src at dst; returns 'skipped', 'linked' or 'copied'"""
+        if os.path.lexists(dst):
+            try:
+                if mode == DATASET_MODE_SYMLINK:
+                    up_to_date = os.path.islink(dst) and os.readlink(dst) == src
+                elif os.path.islink(dst):
+                    up_to_date = False
+                elif os.path.samefile(src, dst):
+                    up_to_date = mode == DATASET_MODE_HARDLINK
+                else:
+                    # Copies keep the source mtime (copy2); hardlink mode may have fallen back to one
+                    src_stat, dst_stat = os.stat(src), os.stat(dst)
+                    up_to_date = (src_stat.st_size == dst_stat.st_size
+                                  and int(src_stat.st_mtime) == int(dst_stat.st_mtime))
+            except OSError:
+                up_to_date = False
+            if up_to_date:
+                return 'skipped'
+            # Unlink first so a stale hardlink never writes through to its source
+            os.remove(dst)
+        
+        if mode == DATASET_MODE_SYMLINK:
+            os.symlink(src, dst)
+            return 'linked'
+        if mode == DATASET_MODE_HARDLINK:
+            try:
+                os.link(src, dst)
+                return 'linked'
+            except OSError:
+                pass  # Different filesystem or no link support: copy instead
+        shutil.copy2(src, dst)
+        return 'copied'
+    
+    def augment_dataset(self, dataset_path: str, augmentation_factor: int = 3, mode: Optional[str] = None,
+                        workers: Optional[int] = None, seed: Optional[int] = None,
+                        progress_callback: Optional[Callable[[Dict], None]] = None,
+                        pipeline_factory: Optional[Callable] = None) -> Optional[Dict]:
+        """Apply data augmentation to increase dataset size
+        
+        Offline mode (default AUGMENTATION_MODE) shards the training images
+        into chunks of AUGMENT_CHUNK_SIZE across a process pool
+        (AUGMENT_WORKERS, 0 = one per core) with at most two chunks per
+        worker in flight, and reports progress and throughput after every
+        chunk. The training images come from dataset.yaml, so manifest
+        datasets work too: their sources stay untouched, outputs go to the
+        dataset's own images/train and are appended to train.txt. Online
+        mode writes nothing and returns 'training_overrides' that make the
+        trainer augment each batch instead.
+        """
+        mode = mode or settings.AUGMENTATION_MODE
+        if mode == AUGMENT_MODE_ONLINE:
+            logger.info("Online augmentation: no files written, augmenting during training")
+            return {'mode': AUGMENT_MODE_ONLINE, 'training_overrides': dict(ONLINE_AUGMENTATION)}
+        if mode != AUGMENT_MODE_OFFLINE:
+            raise ValueError(f"Unknown augmentation mode: {mode}")
+        
         try:
-            import albumentations as A
-            
-            # Define augmentation pipeline
-            transform = A.Compose([
-                A.HorizontalFlip(p=0.5),
-                A.VerticalFlip(p=0.2),
-                A.RandomRotate90(p=0.5),
-                A.RandomBrightnessContrast(p=0.3),
-                A.HueSaturationValue(p=0.3),
-                A.GaussianBlur(p=0.2),
-                A.RandomGamma(p=0.2),
-                A.CLAHE(p=0.2),
-            ], bbox_params=A.BboxParams(format='yolo', label_fields=['class_labels']))
-            
-            train_img_dir = os.path.join(dataset_path, 'images', 'train')
-            train_label_dir = os.path.join(dataset_path, 'labels', 'train')
-            
-            image_files = list(Path(train_img_dir).glob('*.jpg'))
-            
-            for img_file in image_files:
-                # Load image
-                image = cv2.imread(str(img_file))
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-                
-                # Load annotations
-                label_file = os.path.join(train_label_dir, img_file.stem + '.txt')
-                bboxes = []
-                class_labels = []
-                
-                if os.path.exists(label_file):
-                    with open(label_file, 'r') as f:
-                        for line in f:
-                            parts = line.strip().split()
-                            if len(parts) >= 5:
-                                class_id = int(parts[0])
-                                x_center, y_center, width, height = map(float, parts[1:5])
-                                bboxes.append([x_center, y_center, width, height])
-                                class_labels.append(class_id)
-                
-                # Apply augmentations
-                for i in range(augmentation_factor):
-                    try:
-                        augmented = transform(image=image, bboxes=bboxes, class_labels=class_labels)
-                        
-                        # Save augmented image
-                        aug_img_name = f"{img_file.stem}_aug_{i}.jpg"
-                        aug_img_path = os.path.join(train_img_dir, aug_img_name)
-                        aug_image = cv2.cvtColor(augmented['image'], cv2.COLOR_RGB2BGR)
-                        cv2.imwrite(aug_img_path, aug_image)
-                        
-                        # Save augmented annotations
-                        aug_label_path = os.path.join(train_label_dir, f"{img_file.stem}_aug_{i}.txt")
-                        with open(aug_label_path, 'w') as f:
-                            for bbox, class_id in zip(augmented['bboxes'], augmented['class_labels']):
-                                f.write(f"{class_id} {' '.join(map(str, bbox))}\n")
-                                
-                    except Exception as e:
-                        logger.warning(f"Augmentation failed for {img_file.name}: {e}")
-                        continue
-            
-            logger.info(f"Dataset augmentation completed with factor {augmentation_factor}")
+            pipeline_factory = pipeline_factory or _default_augmentation_pipeline
+            pipeline_factory()  # Fails fast if albumentations is missing
+            
+            # The training split may be a directory or a manifest image list
+            config_path = os.path.join(dataset_path, 'dataset.yaml')
+            train_entry = _dataset_split_entry(config_path, 'train')
+            train_list = train_entry if train_entry.endswith('.txt') else None
+            # Manifest datasets keep their sources untouched; outputs go to the dataset's own images/train
+            output_dir = os.path.join(dataset_path, 'images', 'train') if train_list else train_entry
+            os.makedirs(output_dir, exist_ok=True)
+            os.makedirs(os.path.dirname(yolo_label_path(os.path.join(output_dir, 'image.jpg'))), exist_ok=True)
+            
+            # Outputs of an earlier run are not augmented again
+            image_files = [path for path in dataset_split_images(config_path, 'train')
+                           if '_aug_' not in Path(path).stem]
+            chunk_size = max(1, settings.AUGMENT_CHUNK_SIZE)
+            chunks = [image_files[i:i + chunk_size] for i in range(0, len(image_files), chunk_size)]
+            
+            workers = workers if workers is not None else settings.AUGMENT_WORKERS
+            workers = max(1, min(workers or os.cpu_count() or 1, len(chunks) or 1))
+            seed = settings.AUGMENT_SEED if seed is None else seed
+            args = (output_dir, augmentation_factor, seed, pipeline_factory)
+            
+            stats = {'mode': AUGMENT_MODE_OFFLINE, 'workers': workers, 'total_images': len(image_files),
+                     'images': 0, 'augmented': 0, 'failed': 0}
+            start_time = time.perf_counter()
+            
+            def merge(result: Dict):
+                for key in ('images', 'augmented', 'failed'):
+                    stats[key] += result[key]
+                stats['elapsed'] = time.perf_counter() - start_time
+                stats['images_per_s'] = stats['images'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+                logger.info(f"Augmentation progress: {stats['images']}/{stats['total_images']} images, "
+                            f"{stats['images_per_s']:.1f} images/s")
+                if progress_callback:
+                    progress_callback(dict(stats))
+            
+            if workers == 1:
+                for chunk in chunks:
+                    merge(_augment_images(chunk, *args))
+            else:
+                # spawn: avoids copying torch/CUDA state into the workers
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    remaining = iter(chunks)
+                    pending = {pool.submit(_augment_images, chunk, *args)
+                               for chunk in itertools.islice(remaining, workers * 2)}
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            merge(future.result())
+                            chunk = next(remaining, None)
+                            if chunk is not None:
+                                pending.add(pool.submit(_augment_images, chunk, *args))
+            
+            if train_list:
+                self._extend_split_manifest(train_list, image_files, output_dir)
+            
+            stats['elapsed'] = time.perf_counter() - start_time
+            stats['images_per_s'] = stats['images'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+            logger.info(f"Dataset augmentation completed with factor {augmentation_factor}: "
+                        f"{stats['augmented']} images written by {workers} workers "
+                        f"({stats['images_per_s']:.1f} source images/s)")
+            return stats
             
         except ImportError:
             logger.warning("Albumentations not installed, skipping augmentation")
         except Exception as e:
             logger.error(f"Dataset augmentation error: {e}")
+        return None
+    
+    @staticmethod
+    def _extend_split_manifest(list_path: str, image_files: List[str], output_dir: str):
+        """Rewrite a split image list as its source images plus their augmented copies"""
+        source_stems = {Path(path).stem for path in image_files}
+        with os.scandir(output_dir) as entries:
+            augmented = sorted(os.path.abspath(entry.path) for entry in entries
+                               if '_aug_' in entry.name and entry.name.lower().endswith('.jpg')
+                               and entry.name.rsplit('_aug_', 1)[0] in source_stems)
+        tmp_path = list_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.writelines(f"{path}\n" for path in image_files + augmented)
+        os.replace(tmp_path, list_path)
     
-    def train_model(self, dataset_config_path: str, **kwargs) -> str:
-        """Train custom olive detection model"""
+    def train_model(self, dataset_config_path: str, callbacks: Optional[Dict[str, Callable]] = None,
+                    resume_from: Optional[str] = None, **kwargs) -> str:
+        """Train custom olive detection model
+        
+        callbacks are registered as ultralytics trainer callbacks (event -> function).
+        resume_from continues an interrupted run from its last.pt checkpoint; the
+        checkpoint carries the original data and training arguments.
+        """
         try:
             # Update training config with kwargs
             config = self.training_config.copy()
             config.update(kwargs)
             
-            # Load base model
-            self.model = YOLO(self.base_model_path)
+            # Load base model (or the interrupted run's checkpoint)
+            self.model = YOLO(resume_from or self.base_model_path)
+            for event, callback in (callbacks or {}).items():
+                self.model.add_callback(event, callback)
             
             # Start training
-            logger.info("Starting model training...")
-            results = self.model.train(
-                data=dataset_config_path,
-                **config
-            )
+            if resume_from:
+                logger.info(f"Resuming model training from {resume_from}...")
+                results = self.model.train(resume=True)
+            else:
+                logger.info("Starting model training...")
+                results = self.model.train(
+                    data=dataset_config_path,
+                    **config
+                )
             
-            # Get best model path
-            best_model_path = os.path.join(config['project'], config['name'], 'weights', 'best.pt')
+            # Get best model path (ultralytics may suffix the run name, resume reuses the original run)
+            save_dir = str(getattr(getattr(self.model, 'trainer', None), 'save_dir', '') or
+                           os.path.join(config['project'], config['name']))
+            best_model_path = os.path.join(save_dir, 'weights', 'best.pt')
             
             # Save training results
             training_results = {
@@ -242,7 +586,7 @@ class ZeytinModelTrainer:
                 'results': str(results)
             }
             
-            results_path = os.path.join(config['project'], config['name'], 'training_results.json')
+            results_path = os.path.join(save_dir, 'training_results.json')
             with open(results_path, 'w') as f:
                 json.dump(training_results, f, indent=2)
             
@@ -279,13 +623,17 @@ class ZeytinModelTrainer:
             logger.error(f"Model evaluation error: {e}")
             return {}
     
-    def export_model(self, model_path: str, export_format: str = 'onnx') -> str:
+    def export_model(self, model_path: str, export_format: str = 'onnx', **kwargs) -> str:
         """Export model to different formats"""
         try:
             model = YOLO(model_path)
             
-            # Export model
-            export_path = model.export(format=export_format)
+            # Export model (e.g. dynamic=True for a batch-capable ONNX graph)
+            export_path = str(model.export(format=export_format, **kwargs))
+            
+            # Record the export so ModelManager can serve it with the matching backend
+            if export_format == 'onnx':
+                update_model_info(model_path, {'onnx_path': export_path})
             
             logger.info(f"Model exported to {export_format}: {export_path}")
             return export_path
@@ -294,21 +642,211 @@ class ZeytinModelTrainer:
             logger.error(f"Model export error: {e}")
             raise
     
-    def create_training_pipeline(self, images_dir: str, annotations_dir: str, 
-                                output_model_path: str = "models/olive_custom.pt") -> Dict:
-        """Complete training pipeline"""
+    def quantize_model(self, model_path: str, dataset_config_path: Optional[str] = None,
+                       mode: Optional[str] = None, calibration_size: Optional[int] = None) -> Dict:
+        """Create an INT8 ONNX variant of a model for CPU inference
+        
+        Static quantization calibrates activation ranges on images drawn from
+        the training split of the dataset; dynamic quantization needs no
+        data. The result is stored next to the .pt file as <name>_int8.onnx
+        with its own _info.json, including the mAP delta against the
+        original model and the measured latency of both ONNX graphs.
+        """
+        try:
+            from onnxruntime.quantization import (
+                CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+            )
+        except ImportError as e:
+            raise ImportError("Model quantization requires the 'onnxruntime' package") from e
+        
+        mode = mode or ('static' if dataset_config_path else 'dynamic')
+        if mode not in ('static', 'dynamic'):
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        if mode == 'static' and not dataset_config_path:
+            raise ValueError("Static quantization requires a dataset for calibration")
+        calibration_size = calibration_size or settings.QUANTIZATION_CALIBRATION_SIZE
+        
         try:
-            # Prepare dataset
-            dataset_dir = "data/olive_dataset"
-            os.makedirs(dataset_dir, exist_ok=True)
+            # FP32 ONNX graph is the quantization input (reuse an existing export)
+            onnx_path = load_model_info(model_path).get('onnx_path')
+            if not onnx_path or not os.path.exists(onnx_path):
+                onnx_path = self.export_model(model_path, 'onnx', dynamic=True)
+            
+            quantized_path = os.path.splitext(model_path)[0] + '_int8.onnx'
+            calibration_images = self._calibration_images(dataset_config_path, calibration_size) if dataset_config_path else []
+            
+            logger.info(f"Quantizing {onnx_path} ({mode}, {len(calibration_images)} calibration images)")
+            if mode == 'static':
+                input_name, input_size = self._onnx_input(onnx_path)
+                
+                class _Reader(CalibrationDataReader):
+                    """Feeds letterboxed calibration images one at a time"""
+                    def __init__(self, images):
+                        self._images = iter(images)
+                    
+                    def get_next(self):
+                        image_path = next(self._images, None)
+                        if image_path is None:
+                            return None
+                        image = cv2.imread(image_path)
+                        if image is None:
+                            return self.get_next()
+                        padded, _, _ = OnnxRuntimeBackend.letterbox(image, input_size)
+                        tensor = padded[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+                        return {input_name: tensor}
+                
+                quantize_static(
+                    onnx_path, quantized_path, _Reader(calibration_images),
+                    quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8,
+                    weight_type=QuantType.QInt8,
+                    per_channel=True,
+                    # Keep the detection head (box decoding) in FP32
+                    nodes_to_exclude=self._detect_head_nodes(onnx_path)
+                )
+            else:
+                quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+            
+            # Accuracy: mAP of the original model vs the INT8 graph
+            baseline_metrics, quantized_metrics, map_delta = {}, {}, None
+            if dataset_config_path:
+                baseline_metrics = self.evaluate_model(model_path, dataset_config_path)
+                quantized_metrics = self.evaluate_model(quantized_path, dataset_config_path)
+                if 'mAP50' in baseline_metrics and 'mAP50' in quantized_metrics:
+                    map_delta = baseline_metrics['mAP50'] - quantized_metrics['mAP50']
+            
+            # Latency of the FP32 and INT8 ONNX graphs on the same images
+            latency_images = calibration_images[:8]
+            baseline_latency = self._onnx_latency_ms(onnx_path, latency_images)
+            quantized_latency = self._onnx_latency_ms(quantized_path, latency_images)
+            
+            variant_info = {
+                'model_path': quantized_path,
+                'base_model': model_path,
+                'backend': BACKEND_ONNXRUNTIME,
+                'quantization': mode,
+                'precision': 'int8',
+                'calibration_images': len(calibration_images),
+                'quantization_date': datetime.now().isoformat(),
+                'metrics': quantized_metrics,
+                'baseline_metrics': baseline_metrics,
+                'map_delta': map_delta,
+                'latency_ms': quantized_latency,
+                'baseline_latency_ms': baseline_latency,
+                'size': os.path.getsize(quantized_path)
+            }
+            write_model_info(quantized_path, variant_info)
             
-            dataset_config = self.prepare_dataset(images_dir, annotations_dir, dataset_dir)
+            # Register the variant on the original model
+            info = load_model_info(model_path)
+            variants = info.get('variants', {})
+            variants['int8'] = {
+                'path': quantized_path,
+                'quantization': mode,
+                'map_delta': map_delta,
+                'latency_ms': quantized_latency,
+                'baseline_latency_ms': baseline_latency
+            }
+            update_model_info(model_path, {'variants': variants})
+            model_registry.invalidate(quantized_path)
             
-            # Augment dataset
-            self.augment_dataset(dataset_dir)
+            logger.info(f"Quantized model saved: {quantized_path} (mAP50 delta: {map_delta}, "
+                        f"latency: {baseline_latency:.1f} -> {quantized_latency:.1f} ms)")
+            return variant_info
+            
+        except Exception as e:
+            logger.error(f"Model quantization error: {e}")
+            raise
+    
+    @staticmethod
+    def _calibration_images(dataset_config_path: str, limit: int) -> List[str]:
+        """Sample calibration images from the training split of a dataset"""
+        images = dataset_split_images(dataset_config_path, 'train')
+        
+        # Fixed seed so repeated runs calibrate on the same sample
+        rng = np.random.default_rng(0)
+        if len(images) > limit:
+            images = [images[i] for i in sorted(rng.choice(len(images), limit, replace=False))]
+        return images
+    
+    @staticmethod
+    def _onnx_input(onnx_path: str) -> Tuple[str, Tuple[int, int]]:
+        """Input name and spatial size of an ONNX model (dynamic dims use ONNX_IMAGE_SIZE)"""
+        import onnxruntime as ort
+        session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        model_input = session.get_inputs()[0]
+        _, _, height, width = model_input.shape
+        return model_input.name, (
+            height if isinstance(height, int) else settings.ONNX_IMAGE_SIZE,
+            width if isinstance(width, int) else settings.ONNX_IMAGE_SIZE
+        )
+    
+    @staticmethod
+    def _detect_head_nodes(onnx_path: str) -> List[str]:
+        """Names of the nodes that belong to the last (Detect) module of a YOLOv8 graph"""
+        try:
+            import onnx
+            graph = onnx.load(onnx_path).graph
+            module_of = {}
+            for node in graph.node:
+                match = re.match(r'/model\.(\d+)/', node.name)
+                if match:
+                    module_of[node.name] = int(match.group(1))
+            if not module_of:
+                return []
+            head = max(module_of.values())
+            return [name for name, index in module_of.items() if index == head]
+        except Exception as e:
+            logger.warning(f"Could not determine detection head nodes: {e}")
+            return []
+    
+    @staticmethod
+    def _onnx_latency_ms(onnx_path: str, image_paths: List[str], runs: int = 3) -> float:
+        """Mean single-image latency (ms) of an ONNX model on CPU"""
+        images = [img for img in (cv2.imread(p) for p in image_paths) if img is not None]
+        if not images:
+            images = [np.random.default_rng(0).integers(0, 255, (640, 640, 3), dtype=np.uint8)]
+        
+        backend = OnnxRuntimeBackend(onnx_path, image_size=settings.ONNX_IMAGE_SIZE)
+        backend.predict(images[:1], settings.CONFIDENCE_THRESHOLD)  # warm-up
+        
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            for image in images:
+                backend.predict([image], settings.CONFIDENCE_THRESHOLD)
+        return (time.perf_counter() - start_time) * 1000 / (runs * len(images))
+    
+    def create_training_pipeline(self, images_dir: str, annotations_dir: str, 
+                                output_model_path: str = "models/olive_custom.pt",
+                                quantize: bool = False, dataset_mode: Optional[str] = None,
+                                augmentation_mode: Optional[str] = None,
+                                dataset_dir: str = "data/olive_dataset",
+                                callbacks: Optional[Dict[str, Callable]] = None,
+                                resume_from: Optional[str] = None, **training_kwargs) -> Dict:
+        """Complete training pipeline
+        
+        training_kwargs override training_config (epochs, project, name, workers...).
+        With resume_from the dataset prepared by the interrupted run is reused.
+        """
+        try:
+            dataset_config = os.path.join(dataset_dir, 'dataset.yaml')
+            augmentation = {}
+            if not (resume_from and os.path.exists(dataset_config)):
+                # Prepare dataset
+                os.makedirs(dataset_dir, exist_ok=True)
+                
+                dataset_config = self.prepare_dataset(images_dir, annotations_dir, dataset_dir, mode=dataset_mode)
+                
+                # Augment dataset (online mode hands augmentation settings to the trainer)
+                augmentation = self.augment_dataset(dataset_dir, mode=augmentation_mode) or {}
+            
+            # Decode and shrink images once; training and evaluation load the cached arrays
+            dataset_image_cache.prepare(dataset_dir, training_kwargs.get('imgsz', self.training_config['imgsz']))
             
             # Train model
-            best_model_path = self.train_model(dataset_config)
+            training_kwargs.update(augmentation.get('training_overrides', {}))
+            best_model_path = self.train_model(dataset_config, callbacks=callbacks, resume_from=resume_from,
+                                               **training_kwargs)
             
             # Evaluate model
             metrics = self.evaluate_model(best_model_path, dataset_config)
@@ -317,6 +855,9 @@ class ZeytinModelTrainer:
             os.makedirs(os.path.dirname(output_model_path), exist_ok=True)
             shutil.copy2(best_model_path, output_model_path)
             
+            # Drop any cached copy of the model previously stored at this path
+            model_registry.invalidate(output_model_path)
+            
             # Create model info file
             model_info = {
                 'model_path': output_model_path,
@@ -327,9 +868,19 @@ class ZeytinModelTrainer:
                 'model_type': 'YOLOv8_custom_olive'
             }
             
-            info_path = output_model_path.replace('.pt', '_info.json')
-            with open(info_path, 'w') as f:
-                json.dump(model_info, f, indent=2)
+            write_model_info(output_model_path, model_info)
+            
+            # Optional INT8 variant for CPU inference (failure keeps the FP32 model usable)
+            if quantize:
+                try:
+                    variant_info = self.quantize_model(output_model_path, dataset_config)
+                    model_info['variants'] = {'int8': {
+                        'path': variant_info['model_path'],
+                        'map_delta': variant_info['map_delta'],
+                        'latency_ms': variant_info['latency_ms']
+                    }}
+                except Exception as e:
+                    logger.warning(f"Quantization skipped: {e}")
             
             logger.info(f"Training pipeline completed. Model saved: {output_model_path}")
             return model_info
@@ -338,41 +889,177 @@ class ZeytinModelTrainer:
             logger.error(f"Training pipeline error: {e}")
             raise
 
+def benchmark_host_key(device: str = 'cpu') -> str:
+    """Key of the current host/device pair in a model's 'benchmarks' info field"""
+    return f"{platform.node() or 'localhost'}/{device}"
+
 class ModelManager:
     """Manage multiple models and their versions"""
     
     def __init__(self, models_dir: str = "models"):
         self.models_dir = models_dir
         os.makedirs(models_dir, exist_ok=True)
+        # (device, latency budget, memory budget) -> (model set signature, selected path)
+        self._selection_cache: Dict[Tuple, Tuple[Tuple, Optional[str]]] = {}
+        self._selection_lock = threading.Lock()
+        # Model index: file name -> {'signature', 'entry'}; built lazily, persisted to MODEL_INDEX_MANIFEST
+        self._index: Dict[str, Dict] = {}
+        self._index_models: List[Dict] = []
+        self._index_state: Optional[Tuple] = None
+        self._index_checked = 0.0
+        self._index_version = 0
+        self._index_lock = threading.Lock()
     
     def list_available_models(self) -> List[Dict]:
-        """List all available models"""
-        models = []
+        """List all available models (newest first, served from the model index)"""
+        self._refresh_index()
+        return [dict(entry) for entry in self._index_models]
+    
+    def _dir_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.models_dir).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _refresh_index(self):
+        """Bring the model index up to date
         
-        for model_file in Path(self.models_dir).glob("*.pt"):
-            info_file = model_file.with_suffix('').with_suffix('_info.json')
+        O(1) while the directory mtime and this process's info write
+        generation are unchanged; otherwise (or every
+        MODEL_INDEX_RESCAN_SECONDS, to catch in-place edits by other
+        processes) the directory is scanned and only models whose file
+        signatures changed are re-read.
+        """
+        with self._index_lock:
+            state = (self._dir_mtime(), _info_generation)
+            now = time.monotonic()
+            if state == self._index_state and now - self._index_checked < settings.MODEL_INDEX_RESCAN_SECONDS:
+                return
             
-            model_info = {
-                'name': model_file.stem,
-                'path': str(model_file),
-                'size': model_file.stat().st_size,
-                'created': datetime.fromtimestamp(model_file.stat().st_ctime).isoformat()
-            }
+            if self._index_state is None:
+                self._load_manifest()
             
-            if info_file.exists():
-                try:
-                    with open(info_file, 'r') as f:
-                        additional_info = json.load(f)
-                        model_info.update(additional_info)
-                except Exception as e:
-                    logger.warning(f"Could not load model info for {model_file}: {e}")
+            if self._rebuild_index(self._scan_models_dir()):
+                self._index_version += 1
+                self._save_manifest()
+                # The manifest write itself changes the directory mtime
+                state = (self._dir_mtime(), state[1])
+            
+            self._index_state = state
+            self._index_checked = now
+    
+    def _scan_models_dir(self) -> Dict[str, List]:
+        """File name -> [size, mtime_ns] for model, info and ONNX files"""
+        files = {}
+        try:
+            with os.scandir(self.models_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(('.pt', '_info.json', '.onnx')) and entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name] = [stat.st_size, stat.st_mtime_ns]
+        except OSError as e:
+            logger.warning(f"Models directory could not be scanned: {e}")
+        return files
+    
+    def _rebuild_index(self, files: Dict[str, List]) -> bool:
+        """Update index entries whose signatures changed; returns True if anything changed"""
+        changed = False
+        index = {}
+        for name in files:
+            if not name.endswith('.pt'):
+                continue
+            stem = name[:-len('.pt')]
+            signature = [files[name], files.get(f"{stem}_info.json"), f"{stem}.onnx" in files]
+            
+            cached = self._index.get(name)
+            if cached is not None and cached['signature'] == signature:
+                index[name] = cached
+                continue
             
-            models.append(model_info)
+            model_path = os.path.join(self.models_dir, name)
+            try:
+                index[name] = {'signature': signature, 'entry': self._index_entry(model_path)}
+            except OSError:
+                continue
+            changed = True
         
-        return sorted(models, key=lambda x: x['created'], reverse=True)
+        if changed or index.keys() != self._index.keys():
+            self._index = index
+            self._index_models = sorted((item['entry'] for item in index.values()),
+                                        key=lambda x: x['created'], reverse=True)
+            return True
+        return False
+    
+    def _index_entry(self, model_path: str) -> Dict:
+        stat = os.stat(model_path)
+        info = load_model_info(model_path)
+        entry = {
+            'name': os.path.splitext(os.path.basename(model_path))[0],
+            'path': model_path,
+            'size': stat.st_size,
+            'created': datetime.fromtimestamp(stat.st_ctime).isoformat()
+        }
+        entry.update(info)
+        entry['backend'] = self._resolve_backend(model_path, info, 'cpu')[0]
+        return entry
+    
+    def _manifest_path(self) -> str:
+        return os.path.join(self.models_dir, MODEL_INDEX_MANIFEST)
+    
+    def _load_manifest(self):
+        """Seed the index from the manifest so a restart only re-reads changed models"""
+        try:
+            with open(self._manifest_path(), 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(manifest, dict) or manifest.get('version') != MODEL_INDEX_VERSION:
+            return
+        self._index = {name: item for name, item in manifest.get('models', {}).items()
+                       if isinstance(item, dict) and 'signature' in item and 'entry' in item}
+    
+    def _save_manifest(self):
+        manifest = {'version': MODEL_INDEX_VERSION, 'models': self._index}
+        tmp_path = self._manifest_path() + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(manifest, f, separators=(',', ':'))
+            os.replace(tmp_path, self._manifest_path())
+        except OSError as e:
+            logger.warning(f"Model index manifest could not be written: {e}")
     
-    def get_best_model(self) -> Optional[str]:
-        """Get the best performing model"""
+    def get_best_model(self, max_latency_ms: Optional[float] = None, max_memory_mb: Optional[float] = None,
+                       device: str = 'cpu', benchmark_missing: bool = True) -> Optional[str]:
+        """Get the most accurate model (mAP50) within the latency / memory budget
+        
+        Budgets default to MODEL_SELECTION_MAX_LATENCY_MS / _MAX_MEMORY_MB (0
+        means unlimited) and are checked against benchmarks measured on this
+        host; models without a current benchmark are measured first unless
+        benchmark_missing is False. The selection is cached until the
+        model index changes.
+        """
+        if max_latency_ms is None:
+            max_latency_ms = settings.MODEL_SELECTION_MAX_LATENCY_MS
+        if max_memory_mb is None:
+            max_memory_mb = settings.MODEL_SELECTION_MAX_MEMORY_MB
+        budgeted = max_latency_ms > 0 or max_memory_mb > 0
+        cache_key = (device, max_latency_ms, max_memory_mb)
+        
+        with self._selection_lock:
+            self._refresh_index()
+            cached = self._selection_cache.get(cache_key)
+            if cached and cached[0] == self._index_version:
+                return cached[1]
+            
+            selected = self._select_model(max_latency_ms, max_memory_mb, device,
+                                          benchmark_missing and budgeted)
+            # Version is taken after selection so freshly stored benchmarks do not invalidate it
+            self._refresh_index()
+            self._selection_cache[cache_key] = (self._index_version, selected)
+            return selected
+    
+    def _select_model(self, max_latency_ms: float, max_memory_mb: float, device: str,
+                      benchmark_missing: bool) -> Optional[str]:
         models = self.list_available_models()
         
         # Filter models with metrics
@@ -383,18 +1070,209 @@ class ModelManager:
             default_path = os.path.join(self.models_dir, 'yolov8n.pt')
             return default_path if os.path.exists(default_path) else None
         
-        # Sort by mAP50 score
-        best_model = max(models_with_metrics, key=lambda x: x['metrics']['mAP50'])
-        return best_model['path']
+        if max_latency_ms <= 0 and max_memory_mb <= 0:
+            # Sort by mAP50 score
+            best_model = max(models_with_metrics, key=lambda x: x['metrics']['mAP50'])
+            return best_model['path']
+        
+        measured = []
+        for model in models_with_metrics:
+            result = self.get_benchmark(model['path'], device, info=model)
+            if result is None and benchmark_missing:
+                try:
+                    result = self.benchmark_model(model['path'], device)
+                except Exception as e:
+                    logger.warning(f"Model benchmark failed for {model['path']}: {e}")
+            if result is not None:
+                measured.append((model, result))
+        
+        if not measured:
+            logger.warning("No model benchmarks for this host; selecting by mAP50 only")
+            return max(models_with_metrics, key=lambda x: x['metrics']['mAP50'])['path']
+        
+        within_budget = [
+            (model, result) for model, result in measured
+            if (max_latency_ms <= 0 or result['latency_ms'] <= max_latency_ms)
+            and (max_memory_mb <= 0 or result['memory_mb'] <= max_memory_mb)
+        ]
+        if within_budget:
+            return max(within_budget, key=lambda x: x[0]['metrics']['mAP50'])[0]['path']
+        
+        # Nothing fits: the fastest measured model is the closest to the budget
+        fastest = min(measured, key=lambda x: (x[1]['latency_ms'], x[1]['memory_mb']))
+        logger.warning(f"No model within budget (latency {max_latency_ms} ms, memory {max_memory_mb} MB); "
+                       f"using fastest: {fastest[0]['path']} ({fastest[1]['latency_ms']:.1f} ms)")
+        return fastest[0]['path']
+    
+    def _load_for_benchmark(self, model_path: str, device: str) -> InferenceBackend:
+        """Fresh (uncached) instance of the backend that would serve the model"""
+        backend, load_path = self.get_inference_backend(model_path, device)
+        if backend == BACKEND_ONNXRUNTIME:
+            return OnnxRuntimeBackend(
+                load_path,
+                intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+                inter_op_threads=settings.ONNX_INTER_OP_THREADS,
+                iou_threshold=settings.INFERENCE_IOU_THRESHOLD,
+                max_detections=settings.INFERENCE_MAX_DETECTIONS,
+                image_size=settings.ONNX_IMAGE_SIZE
+            )
+        model = YOLO(load_path)
+        model.to(device)
+        return UltralyticsBackend(model, load_path, device)
+    
+    def benchmark_model(self, model_path: str, device: str = 'cpu', runs: Optional[int] = None,
+                        loader: Optional[Callable[[str, str], InferenceBackend]] = None) -> Dict:
+        """Measure a model's single-image latency and memory on this host
+        
+        The result is stored in the model's info file under
+        'benchmarks' -> '<host>/<device>' and is reused until the model file
+        or its backend changes. Memory is the process RSS growth from
+        loading the model and running it (peak CUDA allocation on GPU).
+        """
+        runs = max(1, runs or settings.MODEL_BENCHMARK_RUNS)
+        size = settings.MODEL_BENCHMARK_IMAGE_SIZE
+        image = np.random.default_rng(0).integers(0, 255, (size, size, 3), dtype=np.uint8)
+        backend_name = self.get_inference_backend(model_path, device)[0]
+        
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        if device == 'cuda' and torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+        
+        start_time = time.perf_counter()
+        backend = (loader or self._load_for_benchmark)(model_path, device)
+        load_ms = (time.perf_counter() - start_time) * 1000
+        try:
+            backend.predict([image], settings.CONFIDENCE_THRESHOLD)  # warm-up
+            
+            latencies = []
+            for _ in range(runs):
+                start_time = time.perf_counter()
+                backend.predict([image], settings.CONFIDENCE_THRESHOLD)
+                latencies.append((time.perf_counter() - start_time) * 1000)
+            
+            if device == 'cuda' and torch.cuda.is_available():
+                memory_bytes = torch.cuda.max_memory_allocated()
+            else:
+                memory_bytes = max(0, process.memory_info().rss - rss_before)
+        finally:
+            del backend
+        
+        model_stat = os.stat(model_path)
+        result = {
+            'latency_ms': float(np.mean(latencies)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'memory_mb': memory_bytes / (1024 ** 2),
+            'load_ms': load_ms,
+            'runs': runs,
+            'image_size': size,
+            'backend': backend_name,
+            'model_size': model_stat.st_size,
+            'model_mtime': model_stat.st_mtime,
+            'measured_at': datetime.now().isoformat()
+        }
+        
+        benchmarks = load_model_info(model_path).get('benchmarks', {})
+        benchmarks[benchmark_host_key(device)] = result
+        update_model_info(model_path, {'benchmarks': benchmarks})
+        logger.info(f"Model benchmark {model_path} ({device}, {backend_name}): "
+                    f"{result['latency_ms']:.1f} ms, {result['memory_mb']:.0f} MB")
+        return result
+    
+    def get_benchmark(self, model_path: str, device: str = 'cpu', info: Optional[Dict] = None) -> Optional[Dict]:
+        """Stored benchmark for this host, or None if missing or stale"""
+        if info is None:
+            info = load_model_info(model_path)
+        result = info.get('benchmarks', {}).get(benchmark_host_key(device))
+        if not result:
+            return None
+        try:
+            model_stat = os.stat(model_path)
+        except OSError:
+            return None
+        if (result.get('model_size') != model_stat.st_size or result.get('model_mtime') != model_stat.st_mtime
+                or result.get('backend') != self._resolve_backend(model_path, info, device)[0]):
+            return None
+        return result
+    
+    def get_inference_backend(self, model_path: str, device: str = 'cpu') -> Tuple[str, str]:
+        """Resolve which backend serves a model and which file it loads
+        
+        Returns (backend, path). '.onnx' files always use ONNX Runtime; for
+        other models the 'backend' field of the info file (or the
+        INFERENCE_BACKEND setting) decides. ONNX Runtime is CPU-only, and
+        falls back to ultralytics when no exported ONNX file exists.
+        """
+        if model_path.endswith('.onnx'):
+            return BACKEND_ONNXRUNTIME, model_path
+        return self._resolve_backend(model_path, load_model_info(model_path), device)
+    
+    def _resolve_backend(self, model_path: str, info: Dict, device: str) -> Tuple[str, str]:
+        backend = info.get('backend', settings.INFERENCE_BACKEND)
+        
+        if backend == BACKEND_ONNXRUNTIME and device == 'cpu':
+            onnx_path = info.get('onnx_path') or os.path.splitext(model_path)[0] + '.onnx'
+            if os.path.isfile(onnx_path):
+                return BACKEND_ONNXRUNTIME, onnx_path
+            logger.warning(f"ONNX backend requested but no ONNX export found for {model_path}")
+        
+        return BACKEND_ULTRALYTICS, model_path
+    
+    def get_quantized_variant(self, model_path: str) -> Optional[str]:
+        """INT8 variant of a model if it is usable for CPU inference
+        
+        The variant must exist, have a measured mAP delta, and lose no more
+        than QUANTIZED_MAX_MAP_DROP mAP50 against the original model.
+        """
+        if not settings.QUANTIZED_MODELS_ENABLED:
+            return None
+        
+        variant = load_model_info(model_path).get('variants', {}).get('int8')
+        if not variant or not os.path.isfile(variant.get('path', '')):
+            return None
+        
+        map_delta = variant.get('map_delta')
+        if map_delta is None or map_delta > settings.QUANTIZED_MAX_MAP_DROP:
+            return None
+        
+        return variant['path']
+    
+    def set_model_backend(self, model_name: str, backend: str) -> Dict:
+        """Select the inference backend for a model (stored in its info file)"""
+        if backend not in AVAILABLE_BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        
+        model_path = os.path.join(self.models_dir, f"{model_name}.pt")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model not found: {model_name}")
+        
+        info = update_model_info(model_path, {'backend': backend})
+        model_registry.invalidate(model_path)
+        if info.get('onnx_path'):
+            model_registry.invalidate(info['onnx_path'])
+        logger.info(f"Inference backend for {model_name} set to {backend}")
+        return info
     
     def delete_model(self, model_name: str) -> bool:
-        """Delete a model and its info file"""
+        """Delete a model, its ONNX export and quantized variants, and its info file"""
         try:
             model_path = os.path.join(self.models_dir, f"{model_name}.pt")
             info_path = os.path.join(self.models_dir, f"{model_name}_info.json")
+            info = load_model_info(model_path)
             
-            if os.path.exists(model_path):
-                os.remove(model_path)
+            # Derived files are listed in the info file, which is removed last
+            derived_paths = [variant['path'] for variant in info.get('variants', {}).values() if variant.get('path')]
+            if info.get('onnx_path'):
+                derived_paths.append(info['onnx_path'])
+            
+            for path in [model_path] + derived_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+                model_registry.invalidate(path)
+                
+                derived_info_path = model_info_path(path)
+                if derived_info_path != info_path and os.path.exists(derived_info_path):
+                    os.remove(derived_info_path)
             
             if os.path.exists(info_path):
                 os.remove(info_path)
@@ -0,0 +1,216 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Aşamalı İşleme Hattı
+Okuma -> çıkarım -> işaretleme/yazma aşamalarını sınırlı kuyruklarla örtüştürür:
+okuma havuzu sonraki görselleri önceden çözer, çıkarım çağıran thread'de
+batch'ler halinde çalışır, yazma havuzu sonuçları paralel kodlayıp diske yazar.
+"""
+
+import time
+import queue
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Okuma kuyruğunun sonunu işaretler
+_DONE = object()
+
+class StagedPipeline:
+    """Okuma / çıkarım / yazma aşamalarından oluşan sınırlı kuyruklu işleme hattı
+
+    decode(item) -> veri veya None (atla)
+    infer(batch_no, [(item, veri), ...]) -> her öğe için çıktı veya None (atla)
+    encode(item, veri, çıktı) -> sonuç
+    on_error(stage, items, exc): aşama hatalarını bildirir; hat durmaz
+    """
+
+    def __init__(self, decode_workers: int = 2, encode_workers: int = 2,
+                 queue_size: int = 8, batch_size: int = 4):
+        self.decode_workers = max(1, decode_workers)
+        self.encode_workers = max(1, encode_workers)
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self._stats_lock = threading.Lock()
+
+    def run(self, items: Iterable[Any], decode: Callable, infer: Callable, encode: Callable,
+            on_error: Optional[Callable[[str, List[Any], Exception], None]] = None) -> Tuple[List[Any], Dict]:
+        """Öğeleri hattan geçir; (sıralı sonuçlar, aşama metrikleri) döndür"""
+        on_error = on_error or self._log_error
+        stats = {
+            'items': 0,
+            'batches': 0,
+            'decode_time': 0.0,
+            'infer_time': 0.0,
+            'encode_time': 0.0,
+            'infer_wait': 0.0,
+            'encode_wait': 0.0,
+            'decode_depth': [],
+            'encode_depth': [],
+            'encode_pending': 0
+        }
+        start_time = time.perf_counter()
+
+        decode_queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        encode_slots = threading.BoundedSemaphore(self.queue_size)
+        stop = threading.Event()
+        encode_futures = []
+
+        with ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix="decode") as decode_pool, \
+             ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix="encode") as encode_pool:
+
+            feeder = threading.Thread(
+                target=self._feed,
+                args=(items, decode, decode_pool, decode_queue, stop, stats),
+                name="decode-feeder",
+                daemon=True
+            )
+            feeder.start()
+
+            try:
+                batch = []
+                while True:
+                    wait_start = time.perf_counter()
+                    stats['decode_depth'].append(decode_queue.qsize())
+                    entry = decode_queue.get()
+                    if entry is _DONE:
+                        break
+
+                    item, future = entry
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        on_error('decode', [item], e)
+                        data = None
+                    stats['infer_wait'] += time.perf_counter() - wait_start
+
+                    if data is None:
+                        continue
+
+                    batch.append((item, data))
+                    if len(batch) >= self.batch_size:
+                        self._infer_batch(batch, infer, encode, encode_pool, encode_slots,
+                                          encode_futures, on_error, stats)
+                        batch = []
+
+                if batch:
+                    self._infer_batch(batch, infer, encode, encode_pool, encode_slots,
+                                      encode_futures, on_error, stats)
+            finally:
+                # Hata durumunda besleyici thread'i serbest bırak
+                stop.set()
+                while feeder.is_alive():
+                    try:
+                        decode_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                feeder.join()
+
+            results = []
+            for item, future in encode_futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    on_error('encode', [item], e)
+
+        return results, self._summarize(stats, time.perf_counter() - start_time)
+
+    def _feed(self, items: Iterable[Any], decode: Callable, decode_pool: ThreadPoolExecutor,
+              decode_queue: "queue.Queue", stop: threading.Event, stats: Dict):
+        """Okuma işlerini sırayla gönder; kuyruk doluysa bekle (önden okuma sınırı)"""
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                future = decode_pool.submit(self._timed, decode, 'decode_time', stats, item)
+                if not self._put(decode_queue, (item, future), stop):
+                    return
+        finally:
+            self._put(decode_queue, _DONE, stop)
+
+    @staticmethod
+    def _put(target: "queue.Queue", entry: Any, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                target.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _infer_batch(self, batch: List[Tuple[Any, Any]], infer: Callable, encode: Callable,
+                     encode_pool: ThreadPoolExecutor, encode_slots: threading.BoundedSemaphore,
+                     encode_futures: List, on_error: Callable, stats: Dict):
+        """Batch'i çağıran thread'de çıkarımdan geçir, çıktıları yazma havuzuna ver"""
+        stats['batches'] += 1
+        stats['items'] += len(batch)
+
+        start_time = time.perf_counter()
+        try:
+            outputs = infer(stats['batches'], batch)
+        except Exception as e:
+            on_error('infer', [item for item, _ in batch], e)
+            return
+        finally:
+            stats['infer_time'] += time.perf_counter() - start_time
+
+        for (item, data), output in zip(batch, outputs):
+            if output is None:
+                continue
+
+            # Yazma kuyruğu doluysa çıkarımı beklet (bellek sınırı)
+            wait_start = time.perf_counter()
+            encode_slots.acquire()
+            stats['encode_wait'] += time.perf_counter() - wait_start
+
+            with self._stats_lock:
+                stats['encode_depth'].append(stats['encode_pending'])
+                stats['encode_pending'] += 1
+            future = encode_pool.submit(self._encode_task, encode, encode_slots, stats, item, data, output)
+            encode_futures.append((item, future))
+
+    def _encode_task(self, encode: Callable, encode_slots: threading.BoundedSemaphore,
+                     stats: Dict, item: Any, data: Any, output: Any) -> Any:
+        try:
+            return self._timed(encode, 'encode_time', stats, item, data, output)
+        finally:
+            with self._stats_lock:
+                stats['encode_pending'] -= 1
+            encode_slots.release()
+
+    def _timed(self, func: Callable, key: str, stats: Dict, *args) -> Any:
+        start_time = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start_time
+            with self._stats_lock:
+                stats[key] += elapsed
+
+    def _summarize(self, stats: Dict, total_time: float) -> Dict:
+        def depth(samples: List[int]) -> Dict:
+            return {
+                'avg': sum(samples) / len(samples) if samples else 0.0,
+                'max': max(samples) if samples else 0
+            }
+
+        return {
+            'items': stats['items'],
+            'batches': stats['batches'],
+            'decode_time': stats['decode_time'],
+            'infer_time': stats['infer_time'],
+            'encode_time': stats['encode_time'],
+            'infer_wait': stats['infer_wait'],
+            'encode_wait': stats['encode_wait'],
+            'total_time': total_time,
+            'decode_queue': depth(stats['decode_depth']),
+            'encode_queue': depth(stats['encode_depth']),
+            'decode_workers': self.decode_workers,
+            'encode_workers': self.encode_workers,
+            'queue_size': self.queue_size
+        }
+
+    @staticmethod
+    def _log_error(stage: str, items: List[Any], exc: Exception):
+        logger.error(f"İşleme hattı {stage} hatası ({', '.join(map(str, items))}): {exc}")
@@ -0,0 +1,161 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz İlerleme Yayını
+Analiz sırasında üretilen ilerleme olaylarını (dosya sonuçları, aşama
+süreleri, nihai sonuç) abonelere (SSE bağlantıları) iletir. Analiz süreç
+havuzunda çalışıyorsa olaylar worker'dan ana sürece bir kuyruk üzerinden
+aktarılır.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Aboneliği sonlandıran olay tipleri
+TERMINAL_EVENTS = ("sonuc", "hata", "iptal")
+
+# Havuz worker'ında ana sürece giden kuyruk (_worker_init tarafından atanır)
+_remote_queue = None
+
+def set_remote_queue(queue):
+    """Bu süreçte yayınlanan olayları ana sürece aktar (havuz worker'ları için)"""
+    global _remote_queue
+    _remote_queue = queue
+
+def publish_progress(analiz_id: str, tip: str, **veri):
+    """İlerleme olayı yayınla; worker'da ana sürece aktarılır, aksi halde doğrudan abonelere gider"""
+    olay = {'tip': tip, 'zaman': time.time(), **veri}
+    if _remote_queue is not None:
+        try:
+            _remote_queue.put((analiz_id, olay))
+        except Exception as e:
+            logger.debug(f"İlerleme olayı aktarılamadı: {e}")
+        return
+    progress_broker.publish(analiz_id, olay)
+
+class _Channel:
+    """Tek bir analizin olay geçmişi ve aboneleri"""
+
+    def __init__(self, history_size: int):
+        self.seq = 0
+        self.history: deque = deque(maxlen=history_size)
+        self.subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.finished = False
+
+class ProgressBroker:
+    """Süreç içi yayın / abonelik; yeni abonelere son olaylar tekrar gönderilir"""
+
+    def __init__(self, history_size: int = 500, max_channels: int = 128):
+        self.history_size = max(1, history_size)
+        self.max_channels = max(1, max_channels)
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._relay_queue = None
+        self._relay_thread: Optional[threading.Thread] = None
+
+    def _channel(self, analiz_id: str) -> _Channel:
+        channel = self._channels.get(analiz_id)
+        if channel is None:
+            channel = _Channel(self.history_size)
+            self._channels[analiz_id] = channel
+            # Abonesi olmayan en eski kanallar bırakılır
+            for key in list(self._channels):
+                if len(self._channels) <= self.max_channels:
+                    break
+                if not self._channels[key].subscribers:
+                    del self._channels[key]
+        else:
+            self._channels.move_to_end(analiz_id)
+        return channel
+
+    def publish(self, analiz_id: str, olay: Dict):
+        """Olayı geçmişe ekle ve abonelere ilet (herhangi bir thread'den çağrılabilir)"""
+        with self._lock:
+            channel = self._channel(analiz_id)
+            # Yeni analiz aynı kanalda başlarsa önceki çalıştırmanın olayları temizlenir
+            if olay.get('tip') == 'basladi' and channel.finished:
+                channel.history.clear()
+                channel.finished = False
+            channel.seq += 1
+            olay = dict(olay, seq=channel.seq)
+            channel.history.append(olay)
+            if olay.get('tip') in TERMINAL_EVENTS:
+                channel.finished = True
+            subscribers = list(channel.subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, olay)
+            except RuntimeError:
+                # Abonenin event loop'u kapanmış
+                pass
+
+    def publish_ordered(self, analiz_id: str, olay: Dict):
+        """Worker olaylarından sonra sıralı yayınla
+
+        Süreç havuzunda worker olayları kuyrukta bekliyor olabilir; nihai olay
+        aynı kuyruktan geçirilerek onlardan sonra teslim edilir.
+        """
+        olay = {'zaman': time.time(), **olay}
+        if self._relay_queue is not None:
+            self._relay_queue.put((analiz_id, olay))
+        else:
+            self.publish(analiz_id, olay)
+
+    def subscribe(self, analiz_id: str, after_seq: int = 0) -> Tuple[asyncio.Queue, List[Dict], bool]:
+        """Abone ol: (kuyruk, kaçırılan olaylar, analiz bitti mi)"""
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            channel = self._channel(analiz_id)
+            channel.subscribers.append((loop, queue))
+            replay = [olay for olay in channel.history if olay['seq'] > after_seq]
+            return queue, replay, channel.finished
+
+    def unsubscribe(self, analiz_id: str, queue: asyncio.Queue):
+        with self._lock:
+            channel = self._channels.get(analiz_id)
+            if channel is not None:
+                channel.subscribers = [(l, q) for l, q in channel.subscribers if q is not queue]
+
+    def attach_queue(self, queue):
+        """Havuz worker'larından gelen olay kuyruğunu dinlemeye başla"""
+        self.detach_queue()
+        self._relay_queue = queue
+        self._relay_thread = threading.Thread(target=self._relay, args=(queue,),
+                                              name="progress-relay", daemon=True)
+        self._relay_thread.start()
+
+    def detach_queue(self):
+        queue, self._relay_queue = self._relay_queue, None
+        if queue is not None:
+            try:
+                queue.put(None)
+            except Exception:
+                pass
+
+    def _relay(self, queue):
+        while True:
+            try:
+                item = queue.get()
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+            analiz_id, olay = item
+            self.publish(analiz_id, olay)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'channels': len(self._channels),
+                'subscribers': sum(len(c.subscribers) for c in self._channels.values()),
+                'relay_attached': self._relay_queue is not None
+            }
+
+# Global progress broker instance
+progress_broker = ProgressBroker()
@@ -22,8 +22,13 @@ class RateLimiter:
             "default": {"requests": settings.RATE_LIMIT_REQUESTS, "window": settings.RATE_LIMIT_WINDOW}
         }
         
-        # Cleanup task
-        asyncio.create_task(self.cleanup_old_requests())
+        # Cleanup task (uygulama başlarken start_cleanup ile başlatılır)
+        self._cleanup_task = None
+    
+    def start_cleanup(self):
+        """Temizlik görevini bir kez başlat; modül event loop dışında import edilebilmeli"""
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self.cleanup_old_requests())
     
     async def cleanup_old_requests(self):
         """Eski istekleri temizle"""
@@ -0,0 +1,139 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Sistem Kaynak Örnekleyicisi
+CPU, bellek, disk ve GPU durumunu arka plan thread'inde periyodik olarak
+örnekler ve halka tamponda tutar. Okuyucular (sağlık kontrolü, yönetici
+paneli, analiz başlangıcı) son örneği veya kısa geçmişi bloklanmadan alır.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import psutil
+
+from .config import settings
+from .gpu_detector import gpu_detector
+
+logger = logging.getLogger(__name__)
+
+# Geçmiş özetinde min / ort / maks hesaplanan alanlar
+SUMMARY_FIELDS = ('cpu_percent', 'memory_percent', 'disk_percent')
+
+class SystemMonitor:
+    """Sistem kaynaklarını arka planda örnekleyen halka tampon"""
+
+    def __init__(self, interval: float = 5.0, history_size: int = 120, disk_path: str = "/"):
+        self.interval = max(0.1, interval)
+        self.disk_path = disk_path
+        self._samples: deque = deque(maxlen=max(1, history_size))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # cpu_percent(interval=None) bir önceki çağrıya göre ölçer; ilk çağrı referans noktasıdır
+        psutil.cpu_percent(interval=None)
+
+    def _sample(self) -> Dict:
+        """Tek bir örnek (bloklamaz)"""
+        sample = {'timestamp': time.time()}
+
+        try:
+            sample['cpu_percent'] = psutil.cpu_percent(interval=None)
+            memory = psutil.virtual_memory()
+            sample['memory_percent'] = memory.percent
+            sample['memory_available'] = memory.available
+        except Exception as e:
+            logger.warning(f"CPU / bellek örneklenemedi: {e}")
+
+        try:
+            disk = psutil.disk_usage(self.disk_path)
+            sample['disk_percent'] = (disk.used / disk.total) * 100
+            sample['disk_free'] = disk.free
+        except Exception as e:
+            logger.warning(f"Disk örneklenemedi: {e}")
+
+        try:
+            sample['gpu'] = gpu_detector.get_gpu_status()
+        except Exception as e:
+            logger.warning(f"GPU örneklenemedi: {e}")
+
+        return sample
+
+    def sample_now(self) -> Dict:
+        """Hemen bir örnek al ve tampona ekle"""
+        sample = self._sample()
+        with self._lock:
+            self._samples.append(sample)
+        return sample
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample_now()
+
+    def start(self):
+        """Örnekleyici thread'ini başlat (zaten çalışıyorsa bir şey yapmaz)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="system-monitor", daemon=True)
+            self._thread.start()
+        logger.info(f"Sistem örnekleyicisi başlatıldı ({self.interval:.1f}s aralık)")
+
+    def stop(self):
+        """Örnekleyici thread'ini durdur"""
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=self.interval + 1)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest(self) -> Dict:
+        """Son örnek ve yaşı; henüz örnek yoksa örnekleyici başlatılıp hemen bir örnek alınır"""
+        with self._lock:
+            sample = self._samples[-1] if self._samples else None
+
+        if sample is None:
+            self.start()
+            sample = self.sample_now()
+
+        sample = dict(sample)
+        sample['age'] = time.time() - sample['timestamp']
+        return sample
+
+    def history(self, seconds: Optional[float] = None) -> List[Dict]:
+        """Tampondaki örnekler (isteğe bağlı olarak son N saniye)"""
+        with self._lock:
+            samples = list(self._samples)
+        if seconds is not None:
+            cutoff = time.time() - seconds
+            samples = [s for s in samples if s['timestamp'] >= cutoff]
+        return samples
+
+    def summary(self, seconds: Optional[float] = None) -> Dict:
+        """Geçmiş için alan başına min / ort / maks"""
+        samples = self.history(seconds)
+        summary = {'samples': len(samples), 'window': 0.0}
+        if len(samples) > 1:
+            summary['window'] = samples[-1]['timestamp'] - samples[0]['timestamp']
+
+        for field in SUMMARY_FIELDS:
+            values = [s[field] for s in samples if field in s]
+            if values:
+                summary[field] = {
+                    'min': min(values),
+                    'avg': sum(values) / len(values),
+                    'max': max(values)
+                }
+        return summary
+
+# Global system monitor instance
+system_monitor = SystemMonitor(
+    interval=settings.SYSTEM_MONITOR_INTERVAL,
+    history_size=settings.SYSTEM_MONITOR_HISTORY
+)
@@ -0,0 +1,181 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Karo (Tile) Tabanlı Çıkarım
+Büyük ortofotoları örtüşen karolara böler, karoları batch'ler halinde modele
+verir, kutuları global koordinatlara taşır ve karo sınırlarındaki tekrarları
+vektörel NMS ile birleştirir.
+"""
+
+import os
+import time
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence
+
+from .detections import Detections
+
+logger = logging.getLogger(__name__)
+
+# Karo listesi alır, her karo için Detections döndürür
+TilePredictor = Callable[[List[np.ndarray]], List[Detections]]
+
+def configure_torch_threads(workers: int) -> int:
+    """CPU'da torch intra-op thread'lerini karo worker'ları arasında paylaştır
+
+    torch.set_num_threads süreç geneli bir ayardır; karo başına değil, analiz
+    süreci başlarken bir kez çağrılır.
+    """
+    threads = max(1, (os.cpu_count() or workers) // max(1, workers))
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except Exception as e:
+        logger.warning(f"torch thread sayısı ayarlanamadı: {e}")
+    return threads
+
+def tile_windows(height: int, width: int, tile_size: int, overlap: int) -> np.ndarray:
+    """Görseli kaplayan karo pencereleri (K, 4) -> x1, y1, x2, y2
+
+    Kenar karoları görselin içine kaydırılır; böylece görsel karodan büyük
+    olduğu sürece tüm karolar aynı boyutta olur ve tek batch'te işlenebilir.
+    """
+    tile_size = max(1, int(tile_size))
+    overlap = min(max(0, int(overlap)), tile_size - 1)
+    stride = tile_size - overlap
+
+    def starts(length: int) -> np.ndarray:
+        if length <= tile_size:
+            return np.array([0])
+        positions = np.arange(0, length - tile_size + 1, stride)
+        if positions[-1] + tile_size < length:
+            positions = np.append(positions, length - tile_size)
+        return positions
+
+    ys = starts(height)
+    xs = starts(width)
+    grid_y, grid_x = np.meshgrid(ys, xs, indexing='ij')
+    x1 = grid_x.ravel()
+    y1 = grid_y.ravel()
+    x2 = np.minimum(x1 + tile_size, width)
+    y2 = np.minimum(y1 + tile_size, height)
+    return np.stack([x1, y1, x2, y2], axis=1).astype(np.int64)
+
+def box_overlap(box: np.ndarray, boxes: np.ndarray, metric: str = "iou") -> np.ndarray:
+    """Bir kutunun kutu dizisiyle örtüşmesi (iou veya ios: küçük kutuya göre kesişim)"""
+    ix1 = np.maximum(box[0], boxes[:, 0])
+    iy1 = np.maximum(box[1], boxes[:, 1])
+    ix2 = np.minimum(box[2], boxes[:, 2])
+    iy2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+    if metric == "ios":
+        denom = np.minimum(area, areas)
+    else:
+        denom = area + areas - inter
+    return inter / np.maximum(denom, 1e-9)
+
+def nms(boxes: np.ndarray, scores: np.ndarray, threshold: float = 0.5,
+        metric: str = "iou") -> np.ndarray:
+    """Greedy NMS; her adımda örtüşmeler tüm kalan kutulara karşı vektörel hesaplanır"""
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # Skor eşitliğinde büyük kutu önce gelir (karo sınırında kesilmiş kısmi kutular elenir)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = np.lexsort((-areas, -scores))
+    keep = []
+    while order.size > 0:
+        current = order[0]
+        keep.append(current)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        overlaps = box_overlap(boxes[current], boxes[rest], metric)
+        order = rest[overlaps <= threshold]
+
+    return np.array(keep, dtype=np.int64)
+
+def batched_nms(detections: Detections, threshold: float = 0.5, metric: str = "iou") -> Detections:
+    """Sınıf bazında NMS (sınıflar koordinat ofsetiyle ayrıştırılır, tek NMS çağrısı)"""
+    if len(detections) == 0:
+        return detections
+
+    max_coordinate = float(detections.xyxy.max()) + 1.0
+    offsets = detections.cls.astype(np.float32)[:, None] * max_coordinate
+    keep = nms(detections.xyxy + offsets, detections.conf, threshold, metric)
+    return detections.select(np.sort(keep))
+
+class TiledInference:
+    """Büyük görseller için karo tabanlı çıkarım motoru"""
+
+    def __init__(self, tile_size: int = 640, overlap: int = 128, batch_size: int = 8,
+                 workers: int = 1, nms_threshold: float = 0.5, nms_metric: str = "ios"):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.nms_threshold = nms_threshold
+        self.nms_metric = nms_metric
+
+    def run(self, image: np.ndarray, predictors: Sequence[TilePredictor]) -> Dict:
+        """Görseli karolar halinde işle
+
+        predictors: her biri ayrı bir worker tarafından kullanılan tahmin
+        fonksiyonları. Ultralytics modelleri thread-safe olmadığından her
+        worker kendi model örneğini kullanmalıdır.
+        """
+        height, width = image.shape[:2]
+        windows = tile_windows(height, width, self.tile_size, self.overlap)
+        batches = [windows[i:i + self.batch_size] for i in range(0, len(windows), self.batch_size)]
+        workers = max(1, min(self.workers, len(predictors), len(batches)))
+
+        start_time = time.perf_counter()
+        if workers == 1:
+            tile_detections = self._run_batches(image, batches, predictors[0])
+        else:
+            tile_detections = self._run_parallel(image, batches, predictors[:workers])
+        inference_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        merged = Detections.concatenate(tile_detections)
+        raw_count = len(merged)
+        merged = batched_nms(merged, self.nms_threshold, self.nms_metric)
+        merge_time = time.perf_counter() - start_time
+
+        return {
+            'detections': merged,
+            'tile_count': len(windows),
+            'batch_count': len(batches),
+            'workers': workers,
+            'raw_detections': raw_count,
+            'inference_time': inference_time,
+            'merge_time': merge_time
+        }
+
+    def _run_batches(self, image: np.ndarray, batches: List[np.ndarray],
+                     predictor: TilePredictor) -> List[Detections]:
+        results = []
+        for batch in batches:
+            tiles = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in batch]
+            predictions = predictor(tiles)
+            for (x1, y1, _, _), detections in zip(batch, predictions):
+                results.append(detections.shifted(x1, y1))
+        return results
+
+    def _run_parallel(self, image: np.ndarray, batches: List[np.ndarray],
+                      predictors: Sequence[TilePredictor]) -> List[Detections]:
+        """Batch'leri worker'lara dağıt; her worker kendi predictor'ını sırayla kullanır"""
+        workers = len(predictors)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tile") as executor:
+            futures = [
+                executor.submit(self._run_batches, image, batches[i::workers], predictors[i])
+                for i in range(workers)
+            ]
+            results = []
+            for future in futures:
+                results.extend(future.result())
+            return results
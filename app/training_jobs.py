@@ -0,0 +1,587 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Arka Plan Model Eğitim İşleri
+/models/train isteği bir eğitim işi olarak kaydedilir ve API worker'ını
+bloke etmeden ayrı bir süreçte (spawn) çalıştırılır. Eğitim süreci her epoch
+sonunda kayıp, mAP ve epoch süresini veritabanına yazar; CPU iş parçacığı
+sayısı, öncelik ve bellek kullanımı sınırlandırılır. İptal isteği iş
+klasörüne işaret dosyası olarak bırakılır; iptal edilen veya yarıda kalan iş
+son checkpoint'ten (weights/last.pt) devam ettirilebilir.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+import threading
+import multiprocessing
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import psutil
+
+from .config import settings
+from .database import get_db_connection
+from .cancellation import request_cancel, clear_cancel, cancel_requested
+from .job_queue import JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+BITMIS_DURUMLAR = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# ultralytics trainer.metrics anahtarı -> ilerleme alanı
+METRIK_ALANLARI = (
+    ('metrics/mAP50(B)', 'map50'),
+    ('metrics/mAP50-95(B)', 'map50_95'),
+    ('metrics/precision(B)', 'precision'),
+    ('metrics/recall(B)', 'recall'),
+)
+
+class TrainingStopped(Exception):
+    """Eğitim iptal isteği veya kaynak sınırı nedeniyle durduruldu"""
+
+    def __init__(self, durum: str, mesaj: str):
+        super().__init__(durum, mesaj)
+        self.durum = durum
+        self.mesaj = mesaj
+
+    def __str__(self) -> str:
+        return self.mesaj
+
+def egitim_klasoru(job: Dict) -> str:
+    """İşin veri seti, ağırlık ve iptal işareti klasörü"""
+    return job['payload']['klasor']
+
+def son_checkpoint(job: Dict) -> Optional[str]:
+    """Yarıda kalan eğitimin devam noktası (yoksa None)"""
+    checkpoint = os.path.join(egitim_klasoru(job), 'weights', 'last.pt')
+    return checkpoint if os.path.exists(checkpoint) else None
+
+def epoch_ozeti(trainer, epoch_suresi: Optional[float] = None) -> Dict:
+    """ultralytics trainer durumundan epoch ilerleme kaydı (kayıplar, mAP, süre)"""
+    kayiplar = {}
+    tloss = getattr(trainer, 'tloss', None)
+    if tloss is not None and hasattr(trainer, 'label_loss_items'):
+        kayiplar = {anahtar.split('/', 1)[-1]: round(float(deger), 5)
+                    for anahtar, deger in trainer.label_loss_items(tloss, prefix='train').items()}
+
+    ozet = {
+        'epoch': int(trainer.epoch) + 1,
+        'epochs': int(getattr(trainer, 'epochs', 0) or 0),
+        'loss': kayiplar,
+        'loss_total': round(sum(kayiplar.values()), 5) if kayiplar else None,
+        'epoch_time': round(epoch_suresi, 3) if epoch_suresi is not None else None
+    }
+    metrikler = getattr(trainer, 'metrics', None) or {}
+    for anahtar, alan in METRIK_ALANLARI:
+        ozet[alan] = round(float(metrikler[anahtar]), 5) if anahtar in metrikler else None
+    return ozet
+
+class TrainingJobStore:
+    """training_jobs ve training_job_epochs tabloları üzerindeki işlemler"""
+
+    def submit(self, model_name: str, istek: Dict, kullanici_id: Optional[int] = None) -> str:
+        """Eğitim işini kaydet ve iş ID'sini döndür"""
+        job_id = str(uuid.uuid4())
+        payload = dict(istek, klasor=os.path.abspath(os.path.join(settings.TRAINING_JOBS_DIR, job_id)))
+        conn = get_db_connection()
+        try:
+            conn.execute('''
+                INSERT INTO training_jobs (job_id, model_name, durum, payload, kullanici_id, epochs, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                job_id, model_name, JOB_PENDING, json.dumps(payload, ensure_ascii=False),
+                kullanici_id, istek.get('epochs'), datetime.now().isoformat()
+            ))
+            conn.commit()
+        finally:
+            conn.close()
+        return job_id
+
+    def claim(self, owner: str, max_concurrent: int) -> Optional[Dict]:
+        """Eşzamanlı eğitim sınırı dolmadıysa en eski bekleyen işi atomik olarak al"""
+        now = time.time()
+        conn = get_db_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            calisan = conn.execute('SELECT COUNT(*) FROM training_jobs WHERE durum = ?', (JOB_RUNNING,)).fetchone()[0]
+            row = None
+            if calisan < max(1, max_concurrent):
+                row = conn.execute('''
+                    SELECT job_id FROM training_jobs WHERE durum = ? ORDER BY created_at ASC LIMIT 1
+                ''', (JOB_PENDING,)).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+
+            conn.execute('''
+                UPDATE training_jobs SET durum = ?, owner = ?, pid = NULL, heartbeat_at = ?, started_at = ?,
+                    finished_at = NULL, hata_mesaji = NULL
+                WHERE job_id = ?
+            ''', (JOB_RUNNING, owner, now, datetime.now().isoformat(), row['job_id']))
+            job = conn.execute('SELECT * FROM training_jobs WHERE job_id = ?', (row['job_id'],)).fetchone()
+            conn.commit()
+            return self._to_dict(job)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def set_pid(self, job_id: str, pid: int):
+        self._execute('UPDATE training_jobs SET pid = ? WHERE job_id = ?', (pid, job_id))
+
+    def heartbeat(self, job_id: str) -> bool:
+        return self._execute('''
+            UPDATE training_jobs SET heartbeat_at = ? WHERE job_id = ? AND durum = ?
+        ''', (time.time(), job_id, JOB_RUNNING)) == 1
+
+    def record_epoch(self, job_id: str, ozet: Dict):
+        """Epoch ilerlemesini yaz (devam ettirilen eğitimde aynı epoch'un kaydı yenilenir)"""
+        now = datetime.now().isoformat()
+        conn = get_db_connection()
+        try:
+            conn.execute('''
+                INSERT INTO training_job_epochs (job_id, epoch, metrics, created_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(job_id, epoch) DO UPDATE SET metrics = excluded.metrics, created_at = excluded.created_at
+            ''', (job_id, ozet['epoch'], json.dumps(ozet), now))
+            conn.execute('''
+                UPDATE training_jobs SET epoch = ?, epochs = COALESCE(NULLIF(?, 0), epochs), heartbeat_at = ?
+                WHERE job_id = ?
+            ''', (ozet['epoch'], ozet.get('epochs'), time.time(), job_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def finish(self, job_id: str, durum: str, hata_mesaji: Optional[str] = None,
+               sonuc: Optional[Dict] = None) -> bool:
+        """Çalışan işi sonuçlandır; iş zaten sonuçlanmışsa False"""
+        return self._execute('''
+            UPDATE training_jobs SET durum = ?, hata_mesaji = ?, sonuc = ?, finished_at = ?
+            WHERE job_id = ? AND durum = ?
+        ''', (
+            durum, hata_mesaji, json.dumps(sonuc, ensure_ascii=False, default=str) if sonuc is not None else None,
+            datetime.now().isoformat(), job_id, JOB_RUNNING
+        )) == 1
+
+    def cancel_pending(self, job_id: str, mesaj: str = "Kuyruktayken iptal edildi") -> bool:
+        return self._execute('''
+            UPDATE training_jobs SET durum = ?, hata_mesaji = ?, finished_at = ? WHERE job_id = ? AND durum = ?
+        ''', (JOB_CANCELLED, mesaj, datetime.now().isoformat(), job_id, JOB_PENDING)) == 1
+
+    def resume(self, job_id: str) -> bool:
+        """İptal edilen / hatalı işi son checkpoint'ten devam etmek üzere kuyruğa al"""
+        job = self.get(job_id, epochs=False)
+        if not job or job['durum'] not in (JOB_FAILED, JOB_CANCELLED) or not son_checkpoint(job):
+            return False
+        clear_cancel(egitim_klasoru(job))
+        return self._execute('''
+            UPDATE training_jobs SET durum = ?, devam = 1, owner = NULL, pid = NULL, hata_mesaji = NULL,
+                finished_at = NULL
+            WHERE job_id = ? AND durum IN (?, ?)
+        ''', (JOB_PENDING, job_id, JOB_FAILED, JOB_CANCELLED)) == 1
+
+    def fail_stale(self, stale_seconds: float) -> int:
+        """Kalp atışı kesilen (çöken / öldürülen) eğitimleri hatalı işaretle"""
+        failed = self._execute('''
+            UPDATE training_jobs SET durum = ?, finished_at = ?,
+                hata_mesaji = 'Eğitim süreci yanıt vermiyor; son checkpoint''ten devam ettirilebilir'
+            WHERE durum = ? AND heartbeat_at < ?
+        ''', (JOB_FAILED, datetime.now().isoformat(), JOB_RUNNING, time.time() - stale_seconds))
+        if failed:
+            logger.warning(f"Kalp atışı kesilen eğitim işleri hatalı işaretlendi: {failed}")
+        return failed
+
+    def get(self, job_id: str, epochs: bool = True) -> Optional[Dict]:
+        conn = get_db_connection()
+        try:
+            row = conn.execute('SELECT * FROM training_jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = self._to_dict(row)
+            if epochs:
+                job['epoch_gecmisi'] = [json.loads(r['metrics']) for r in conn.execute(
+                    'SELECT metrics FROM training_job_epochs WHERE job_id = ? ORDER BY epoch', (job_id,))]
+        finally:
+            conn.close()
+        return job
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        conn = get_db_connection()
+        try:
+            rows = conn.execute('SELECT * FROM training_jobs ORDER BY created_at DESC LIMIT ?', (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [self._to_dict(row) for row in rows]
+
+    def get_stats(self) -> Dict:
+        conn = get_db_connection()
+        try:
+            rows = conn.execute('SELECT durum, COUNT(*) AS sayi FROM training_jobs GROUP BY durum').fetchall()
+        finally:
+            conn.close()
+        stats = {JOB_PENDING: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_FAILED: 0, JOB_CANCELLED: 0}
+        stats.update({row['durum']: row['sayi'] for row in rows})
+        return stats
+
+    def _execute(self, query: str, params: tuple) -> int:
+        conn = get_db_connection()
+        try:
+            updated = conn.execute(query, params).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        return updated
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job.get('payload') or '{}')
+        job['sonuc'] = json.loads(job['sonuc']) if job.get('sonuc') else None
+        return job
+
+class TrainingWatchdog(threading.Thread):
+    """Eğitim sürecinde kalp atışı, iptal isteği ve bellek sınırı kontrolü
+
+    Durdurma kararı bir sonraki batch/epoch callback'inde TrainingStopped ile
+    uygulanır; eğitim TRAINING_STOP_GRACE_SECONDS içinde callback'e ulaşmazsa
+    (ör. veri yükleyici takıldıysa) iş sonuçlandırılıp süreç sonlandırılır.
+    """
+
+    def __init__(self, store: TrainingJobStore, job: Dict, kontrol_araligi: float = 1.0):
+        super().__init__(name=f"egitim-izleyici-{job['job_id'][:8]}", daemon=True)
+        self.store = store
+        self.job_id = job['job_id']
+        self.klasor = egitim_klasoru(job)
+        self.kontrol_araligi = kontrol_araligi
+        self.durdurma: Optional[TrainingStopped] = None
+        self._durdurma_zamani = 0.0
+        self._son_kalp_atisi = 0.0
+        self._dur = threading.Event()
+        self._process = psutil.Process()
+
+    def kontrol(self):
+        """Durdurma kararı verildiyse TrainingStopped fırlat (eğitim callback'lerinden çağrılır)"""
+        if self.durdurma is not None:
+            raise self.durdurma
+
+    def bellek_mb(self) -> float:
+        """Eğitim sürecinin ve veri yükleyici alt süreçlerinin toplam RSS'i"""
+        toplam = self._process.memory_info().rss
+        for alt in self._process.children(recursive=True):
+            try:
+                toplam += alt.memory_info().rss
+            except psutil.Error:
+                pass
+        return toplam / MB
+
+    def durdur(self):
+        self._dur.set()
+
+    def run(self):
+        while not self._dur.wait(self.kontrol_araligi):
+            try:
+                self._adim()
+            except Exception as e:
+                logger.warning(f"Eğitim izleyici hatası ({self.job_id}): {e}")
+
+    def _adim(self):
+        now = time.monotonic()
+        if now - self._son_kalp_atisi >= settings.TRAINING_HEARTBEAT_SECONDS:
+            self.store.heartbeat(self.job_id)
+            self._son_kalp_atisi = now
+
+        if self.durdurma is not None:
+            if now - self._durdurma_zamani > settings.TRAINING_STOP_GRACE_SECONDS:
+                logger.error(f"Eğitim durdurma isteğine yanıt vermiyor, süreç sonlandırılıyor: {self.job_id}")
+                self.store.finish(self.job_id, self.durdurma.durum, self.durdurma.mesaj)
+                os._exit(1)
+            return
+
+        if cancel_requested(self.klasor) is not None:
+            self.durdurma = TrainingStopped(
+                JOB_CANCELLED, "Eğitim iptal edildi; son checkpoint'ten devam ettirilebilir")
+        elif settings.TRAINING_MAX_MEMORY_MB > 0:
+            bellek = self.bellek_mb()
+            if bellek > settings.TRAINING_MAX_MEMORY_MB:
+                self.durdurma = TrainingStopped(
+                    JOB_FAILED, f"Bellek sınırı aşıldı: {bellek:.0f} MB > {settings.TRAINING_MAX_MEMORY_MB:.0f} MB")
+        if self.durdurma is not None:
+            self._durdurma_zamani = now
+            logger.warning(f"Eğitim durduruluyor ({self.job_id}): {self.durdurma}")
+
+class TrainingProgress:
+    """Eğitim sürecine eklenen ultralytics callback'leri: epoch ilerlemesi ve durdurma kontrolü"""
+
+    def __init__(self, store: TrainingJobStore, job_id: str, izleyici: TrainingWatchdog):
+        self.store = store
+        self.job_id = job_id
+        self.izleyici = izleyici
+        self._epoch_baslangic: Optional[float] = None
+
+    def callbacks(self) -> Dict[str, Callable]:
+        return {
+            'on_train_epoch_start': self.epoch_basladi,
+            'on_train_batch_end': self.batch_bitti,
+            'on_fit_epoch_end': self.epoch_bitti
+        }
+
+    def epoch_basladi(self, trainer):
+        self._epoch_baslangic = time.monotonic()
+
+    def batch_bitti(self, trainer):
+        self.izleyici.kontrol()
+
+    def epoch_bitti(self, trainer):
+        # Epoch süresi doğrulamayı da kapsar
+        sure = time.monotonic() - self._epoch_baslangic if self._epoch_baslangic is not None else None
+        ozet = epoch_ozeti(trainer, sure)
+        try:
+            self.store.record_epoch(self.job_id, ozet)
+        except Exception as e:
+            logger.warning(f"Epoch ilerlemesi yazılamadı ({self.job_id}): {e}")
+        logger.info(f"Eğitim {self.job_id}: epoch {ozet['epoch']}/{ozet['epochs']} "
+                    f"loss={ozet['loss_total']} mAP50={ozet['map50']}")
+        self.izleyici.kontrol()
+
+def kaynak_sinirlarini_uygula() -> int:
+    """Eğitim sürecinin iş parçacığı sayısını ve CPU önceliğini sınırla
+
+    Ortam değişkenleri torch / OpenCV yüklenmeden önce ayarlanmalıdır.
+    """
+    threads = settings.TRAINING_CPU_THREADS or max(1, (os.cpu_count() or 2) // 2)
+    for degisken in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS'):
+        os.environ[degisken] = str(threads)
+    if settings.TRAINING_NICE > 0 and hasattr(os, 'nice'):
+        try:
+            os.nice(settings.TRAINING_NICE)
+        except OSError as e:
+            logger.warning(f"Eğitim süreci önceliği düşürülemedi: {e}")
+    return threads
+
+def _egitimi_calistir(job: Dict, ilerleme: TrainingProgress, threads: int) -> Dict:
+    """Eğitim hattını çalıştır (ağır kütüphaneler yalnızca eğitim sürecinde yüklenir)"""
+    import cv2
+    import torch
+    from .models import ZeytinModelTrainer
+
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+
+    istek = job['payload']
+    klasor = egitim_klasoru(job)
+    trainer = ZeytinModelTrainer()
+    return trainer.create_training_pipeline(
+        images_dir=istek['images_dir'],
+        annotations_dir=istek['annotations_dir'],
+        output_model_path=f"models/{job['model_name']}.pt",
+        quantize=istek.get('quantize', False),
+        dataset_mode=istek.get('dataset_mode'),
+        augmentation_mode=istek.get('augmentation_mode'),
+        dataset_dir=os.path.join(klasor, 'dataset'),
+        callbacks=ilerleme.callbacks(),
+        resume_from=son_checkpoint(job) if job['devam'] else None,
+        epochs=istek.get('epochs') or trainer.training_config['epochs'],
+        project=os.path.dirname(klasor),
+        name=os.path.basename(klasor),
+        exist_ok=True,
+        workers=settings.TRAINING_DATALOADER_WORKERS
+    )
+
+def _egitim_sureci(job_id: str, veritabani: str, calistirici: Optional[Callable] = None):
+    """Eğitim sürecinin giriş noktası (spawn ile başlatılır)"""
+    settings.DATABASE_URL = veritabani
+    threads = kaynak_sinirlarini_uygula()
+
+    store = TrainingJobStore()
+    job = store.get(job_id, epochs=False)
+    if job is None or job['durum'] != JOB_RUNNING:
+        return
+    os.makedirs(egitim_klasoru(job), exist_ok=True)
+
+    izleyici = TrainingWatchdog(store, job)
+    izleyici.start()
+    try:
+        ilerleme = TrainingProgress(store, job_id, izleyici)
+        if calistirici is None:
+            sonuc = _egitimi_calistir(job, ilerleme, threads)
+        else:
+            sonuc = calistirici(job, ilerleme)
+        store.finish(job_id, JOB_DONE, sonuc=sonuc)
+        logger.info(f"Eğitim işi tamamlandı: {job_id}")
+    except TrainingStopped as e:
+        store.finish(job_id, e.durum, e.mesaj)
+        logger.info(f"Eğitim işi durduruldu ({job_id}): {e}")
+    except Exception as e:
+        store.finish(job_id, JOB_FAILED, str(e))
+        logger.error(f"Eğitim işi hatası ({job_id}): {e}")
+    finally:
+        izleyici.durdur()
+
+class TrainingJobManager:
+    """Bekleyen eğitim işlerini ayrı süreçlerde başlatan ve izleyen döngü
+
+    Her uygulama süreci kendi yöneticisini çalıştırır; iş alma atomik olduğu
+    için TRAINING_MAX_CONCURRENT sınırı tüm süreçler için geçerlidir.
+    calistirici verilirse eğitim hattı yerine çağrılır (modül düzeyinde,
+    pickle edilebilir bir fonksiyon olmalıdır).
+    """
+
+    def __init__(self, store: TrainingJobStore, max_concurrent: int = 1, poll_interval: float = 5.0,
+                 calistirici: Optional[Callable] = None):
+        self.store = store
+        self.max_concurrent = max(1, max_concurrent)
+        self.poll_interval = poll_interval
+        self.calistirici = calistirici
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._processes: Dict[str, multiprocessing.Process] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats = {'started': 0, 'crashed': 0}
+
+    def start(self):
+        """İzleme döngüsünü mevcut event loop'ta başlat"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._monitor_loop())
+        logger.info(f"Eğitim işi yöneticisi başlatıldı: {self.owner}")
+
+    async def stop(self):
+        """Döngüyü durdur; bu süreçteki eğitimler iptal edilir (checkpoint'ten devam ettirilebilir)"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._processes:
+            await asyncio.to_thread(self._stop_processes, settings.TRAINING_STOP_GRACE_SECONDS)
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def submit(self, model_name: str, istek: Dict, kullanici_id: Optional[int] = None) -> str:
+        job_id = self.store.submit(model_name, istek, kullanici_id)
+        self.notify()
+        return job_id
+
+    def cancel(self, job_id: str, kullanici_adi: Optional[str] = None) -> Optional[str]:
+        """İptal iste; işin yeni durumunu döndürür (iş yoksa None)
+
+        Bekleyen iş hemen iptal edilir; çalışan eğitim bir sonraki batch'te durur.
+        """
+        job = self.store.get(job_id, epochs=False)
+        if job is None:
+            return None
+        if job['durum'] == JOB_PENDING and self.store.cancel_pending(job_id):
+            return JOB_CANCELLED
+        if job['durum'] == JOB_RUNNING:
+            os.makedirs(egitim_klasoru(job), exist_ok=True)
+            request_cancel(egitim_klasoru(job), kullanici_adi)
+            return JOB_RUNNING
+        return job['durum']
+
+    def resume(self, job_id: str) -> bool:
+        resumed = self.store.resume(job_id)
+        if resumed:
+            self.notify()
+        return resumed
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """İş durumu, epoch geçmişi ve ilerleme yüzdesi"""
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        job['ilerleme'] = round(100 * job['epoch'] / job['epochs'], 1) if job.get('epochs') else None
+        job['iptal_istendi'] = job['durum'] == JOB_RUNNING and cancel_requested(egitim_klasoru(job)) is not None
+        job['devam_ettirilebilir'] = job['durum'] in (JOB_FAILED, JOB_CANCELLED) and son_checkpoint(job) is not None
+        return job
+
+    def tick(self):
+        """Biten süreçleri topla, yanıt vermeyen işleri işaretle, boş yer varsa yeni iş başlat"""
+        self._reap()
+        self.store.fail_stale(settings.TRAINING_STALE_SECONDS)
+        while True:
+            job = self.store.claim(self.owner, self.max_concurrent)
+            if job is None:
+                return
+            self._spawn(job)
+
+    async def _monitor_loop(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.tick)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Eğitim işleri kontrol edilemedi: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _spawn(self, job: Dict):
+        job_id = job['job_id']
+        try:
+            # CUDA ve fork güvenli değil; eğitim süreci temiz bir yorumlayıcıda başlar
+            process = multiprocessing.get_context("spawn").Process(
+                target=_egitim_sureci, args=(job_id, settings.DATABASE_URL, self.calistirici),
+                name=f"egitim-{job_id[:8]}"
+            )
+            process.start()
+        except Exception as e:
+            logger.error(f"Eğitim süreci başlatılamadı ({job_id}): {e}")
+            self.store.finish(job_id, JOB_FAILED, f"Eğitim süreci başlatılamadı: {e}")
+            return
+        self.store.set_pid(job_id, process.pid)
+        self._processes[job_id] = process
+        self._stats['started'] += 1
+        logger.info(f"Eğitim işi başlatıldı: {job_id} (pid {process.pid})")
+
+    def _reap(self):
+        for job_id, process in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del self._processes[job_id]
+            # Süreç işi sonuçlandırmadan çıktıysa (ör. OOM killer) hata olarak kaydedilir
+            if self.store.finish(job_id, JOB_FAILED, f"Eğitim süreci beklenmedik şekilde sonlandı "
+                                                     f"(çıkış kodu {process.exitcode})"):
+                self._stats['crashed'] += 1
+                logger.error(f"Eğitim süreci beklenmedik şekilde sonlandı: {job_id}")
+
+    def _stop_processes(self, grace_seconds: float):
+        for job_id in list(self._processes):
+            self.cancel(job_id, "sistem")
+        son = time.monotonic() + grace_seconds
+        for job_id, process in list(self._processes.items()):
+            process.join(max(0.0, son - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join(5)
+                self.store.finish(job_id, JOB_CANCELLED, "Sunucu kapatıldı; son checkpoint'ten devam ettirilebilir")
+        self._processes.clear()
+
+    def get_stats(self) -> Dict:
+        stats = dict(self._stats)
+        stats.update({
+            'owner': self.owner,
+            'max_concurrent': self.max_concurrent,
+            'running': list(self._processes),
+            'jobs': self.store.get_stats()
+        })
+        return stats
+
+# Global training job store and manager instances
+training_job_store = TrainingJobStore()
+training_job_manager = TrainingJobManager(
+    training_job_store,
+    max_concurrent=settings.TRAINING_MAX_CONCURRENT,
+    poll_interval=settings.TRAINING_POLL_INTERVAL
+)
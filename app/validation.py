@@ -121,6 +121,7 @@ class FileValidator:
                 result['metadata'].update({
                     'width': width,
                     'height': height,
+                    'bands': len(img.getbands()),
                     'mode': mode,
                     'format': format_name
                 })
@@ -167,6 +168,17 @@ class FileValidator:
                     'file_type': 'multispectral'
                 })
                 
+                # Boyut ve bant sayısı TIFF başlığından (kabul kontrolünün maliyet tahmini için)
+                try:
+                    with Image.open(io.BytesIO(content)) as img:
+                        result['metadata'].update({
+                            'width': img.size[0],
+                            'height': img.size[1],
+                            'bands': max(len(img.getbands()), getattr(img, 'n_frames', 1))
+                        })
+                except Exception:
+                    pass
+                
                 # Temel boyut tahmini (TIFF header'dan)
                 # Bu basit bir implementasyon, gerçek rasterio kadar detaylı değil
                 result['warnings'].append("Multispektral dosya temel validasyon yapıldı (detaylı analiz için rasterio gerekli)")
@@ -0,0 +1,5 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Performans Ölçümleri
+Sentetik bahçe görselleriyle analiz hattının uçtan uca ve aşama bazında
+ölçümü. Çalıştırma: python -m benchmarks.analysis_benchmark --output sonuc.json
+"""
@@ -0,0 +1,345 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Analiz Hattı Ölçümü
+Sentetik RGB ve multispektral dosyalarla ZeytinAnalizci.analiz_yap'ı uçtan
+uca ve aşama bazında (okuma, çıkarım, son işleme, işaretleme, yazma, NDVI)
+çalıştırır; verim, p50 / p95 / p99 gecikme ve tepe RSS değerlerini commit'ler
+arası karşılaştırma için JSON dosyasına yazar.
+
+    python -m benchmarks.analysis_benchmark --output sonuc.json
+    python -m benchmarks.analysis_benchmark --output yeni.json --compare sonuc.json
+
+Varsayılan olarak model ağırlığı gerektirmeyen StubDetector kullanılır;
+--model verilirse gerçek model yüklenir. Tespit önbelleği ve kontrol
+noktaları ölçüm süresince kapatılır (tekrarlar önbellekten dönmesin).
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+import psutil
+from PIL import Image
+
+from app.config import settings
+from app.ai_analysis import ZeytinAnalizci
+from app.checkpoint import analysis_checkpoints
+from app.detection_cache import detection_cache
+from app.instrumentation import analysis_metrics
+from app.inference_backends import InferenceBackend
+from app.constants import ALLOWED_IMAGE_EXTENSIONS, ALLOWED_MULTISPECTRAL_EXTENSIONS
+
+from .synthetic import generate_dataset, parse_resolutions
+from .stub_backend import StubDetector
+
+SONUC_SURUMU = 1
+
+ASAMALAR = ("decode", "inference", "postprocess", "annotate", "write", "ndvi")
+
+MB = 1024 * 1024
+
+class PeakRSS:
+    """Blok süresince süreç RSS'inin tepe değerini arka plan thread'iyle örnekler"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.baslangic = 0
+        self.tepe = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ornekle(self):
+        while not self._stop.is_set():
+            self.tepe = max(self.tepe, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "PeakRSS":
+        self.baslangic = self.tepe = self.process.memory_info().rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._ornekle, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.tepe = max(self.tepe, self.process.memory_info().rss)
+
+    def to_dict(self) -> Dict:
+        return {
+            'peak_rss_mb': round(self.tepe / MB, 1),
+            'rss_growth_mb': round((self.tepe - self.baslangic) / MB, 1)
+        }
+
+def summarize(sureler: List[float]) -> Dict:
+    """Süre listesinin (saniye) özeti; verim ölçüm başına (dosya / saniye)"""
+    if not sureler:
+        return {'count': 0}
+    dizi = np.asarray(sureler, dtype=np.float64)
+    toplam = float(dizi.sum())
+    p50, p95, p99 = np.percentile(dizi, [50, 95, 99])
+    return {
+        'count': len(sureler),
+        'total_s': round(toplam, 6),
+        'mean_ms': round(float(dizi.mean()) * 1000, 3),
+        'p50_ms': round(float(p50) * 1000, 3),
+        'p95_ms': round(float(p95) * 1000, 3),
+        'p99_ms': round(float(p99) * 1000, 3),
+        'throughput_per_s': round(len(sureler) / toplam, 3) if toplam > 0 else None
+    }
+
+class BenchmarkAnalizci(ZeytinAnalizci):
+    """Sabit bir çıkarım arka ucuyla çalışan analizci (backend None ise gerçek model yüklenir)"""
+
+    def __init__(self, backend: Optional[InferenceBackend] = None):
+        super().__init__()
+        self.sabit_backend = backend
+
+    def load_yolo_model(self, model_path: str = None):
+        if self.sabit_backend is None:
+            return super().load_yolo_model(model_path)
+        self.yolo_model = self.sabit_backend
+        self.model_path = None
+        self.backend_name = self.sabit_backend.name
+
+def _dosya_turleri(dosyalar: List[str]):
+    rgb = [f for f in dosyalar if f.lower().endswith(tuple(ALLOWED_IMAGE_EXTENSIONS))]
+    multispektral = [f for f in dosyalar if f.lower().endswith(tuple(ALLOWED_MULTISPECTRAL_EXTENSIONS))]
+    return rgb, multispektral
+
+def _megapiksel(yol: str) -> float:
+    """Görselin piksel sayısı (yalnızca başlık okunur)"""
+    with Image.open(yol) as img:
+        return img.size[0] * img.size[1] / 1e6
+
+def run_end_to_end(analizci: ZeytinAnalizci, yukleme_klasoru: str, calisma_klasoru: str,
+                   megapiksel: float, tekrar: int = 3, isinma: int = 1) -> Dict:
+    """analiz_yap'ı her tekrar için yeni bir analiz klasörüyle çalıştır"""
+    dosya_sayisi = len(os.listdir(yukleme_klasoru))
+    sureler = []
+
+    def calistir(no: int) -> float:
+        analiz_klasoru = os.path.join(calisma_klasoru, f"analiz_{no}")
+        os.makedirs(analiz_klasoru, exist_ok=True)
+        log_yolu = os.path.join(analiz_klasoru, "log.txt")
+        baslangic = time.perf_counter()
+        asyncio.run(analizci.analiz_yap(yukleme_klasoru, analiz_klasoru, log_yolu, "cpu"))
+        sure = time.perf_counter() - baslangic
+        shutil.rmtree(analiz_klasoru, ignore_errors=True)
+        return sure
+
+    for no in range(isinma):
+        calistir(-1 - no)
+
+    with PeakRSS() as rss:
+        for no in range(tekrar):
+            sureler.append(calistir(no))
+
+    ozet = {'latency': summarize(sureler)}
+    toplam = sum(sureler)
+    ozet['throughput_files_per_s'] = round(dosya_sayisi * tekrar / toplam, 3) if toplam > 0 else None
+    ozet['throughput_mpix_per_s'] = round(megapiksel * tekrar / toplam, 3) if toplam > 0 else None
+    ozet.update(rss.to_dict())
+    return ozet
+
+def run_stages(analizci: ZeytinAnalizci, yukleme_klasoru: str, calisma_klasoru: str, tekrar: int = 3) -> Dict:
+    """Her aşamayı dosya başına ayrı ölç (batch boyutu 1; batch etkisi uçtan uca ölçümdedir)"""
+    rgb_dosyalar, multispektral_dosyalar = _dosya_turleri(sorted(os.listdir(yukleme_klasoru)))
+    os.makedirs(calisma_klasoru, exist_ok=True)
+    log_yolu = os.path.join(calisma_klasoru, "log.txt")
+    analizci.load_yolo_model()
+
+    sureler: Dict[str, List[float]] = {asama: [] for asama in ASAMALAR}
+    megapiksel: Dict[str, List[float]] = {asama: [] for asama in ASAMALAR}
+
+    def olc(asama: str, mp: float, islem, *args):
+        baslangic = time.perf_counter()
+        sonuc = islem(*args)
+        sureler[asama].append(time.perf_counter() - baslangic)
+        megapiksel[asama].append(mp)
+        return sonuc
+
+    with PeakRSS() as rss:
+        for _ in range(tekrar):
+            for dosya_adi in rgb_dosyalar:
+                yol = os.path.join(yukleme_klasoru, dosya_adi)
+                mp = _megapiksel(yol)
+                gorsel = olc("decode", mp, cv2.imread, yol)
+                cikti = olc("inference", mp, analizci._batch_tahmin, 0, [(dosya_adi, gorsel)], [], log_yolu)[0]
+                gecerli = olc("postprocess", mp, analizci._tespitleri_say, cikti[0])[0]
+                isaretli = olc("annotate", mp, analizci._gorseli_isaretle, gorsel, gecerli)
+                olc("write", mp, cv2.imwrite, os.path.join(calisma_klasoru, f"isretli_{dosya_adi}"), isaretli)
+
+            for dosya_adi in multispektral_dosyalar:
+                yol = os.path.join(yukleme_klasoru, dosya_adi)
+                olc("ndvi", _megapiksel(yol), analizci._multispektral_indeksler, yol)
+
+    sonuc = {asama: summarize(sureler[asama]) for asama in ASAMALAR}
+    for asama in ASAMALAR:
+        toplam = sum(sureler[asama])
+        sonuc[asama]['throughput_mpix_per_s'] = round(sum(megapiksel[asama]) / toplam, 3) if toplam > 0 else None
+    sonuc.update(rss.to_dict())
+    return sonuc
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _ayar_ozeti() -> Dict:
+    """Sonucu etkileyen ayarlar (karşılaştırılan koşuların aynı ayarlarla alındığını doğrulamak için)"""
+    anahtarlar = (
+        "INFERENCE_BATCH_SIZE", "PIPELINE_DECODE_WORKERS", "PIPELINE_ENCODE_WORKERS", "PIPELINE_QUEUE_SIZE",
+        "TILED_INFERENCE_ENABLED", "TILE_MIN_IMAGE_SIZE", "TILE_SIZE", "TILE_OVERLAP", "TILE_BATCH_SIZE",
+        "TILE_WORKERS", "CONFIDENCE_THRESHOLD"
+    )
+    return {anahtar: getattr(settings, anahtar) for anahtar in anahtarlar}
+
+def run_benchmark(cozunurlukler, rgb_sayisi: int = 4, multispektral_sayisi: int = 1, bant_sayisi: int = 5,
+                  tekrar: int = 3, isinma: int = 1, gecikme_ms: float = 0.0, model_yolu: Optional[str] = None,
+                  seed: int = 0, calisma_klasoru: Optional[str] = None, uctan_uca: bool = True,
+                  asamalar: bool = True) -> Dict:
+    """Her çözünürlük için veri üret, ölç ve sonuç sözlüğünü döndür"""
+    backend = None if model_yolu else StubDetector(gecikme_ms=gecikme_ms)
+    analizci = BenchmarkAnalizci(backend)
+    if model_yolu:
+        settings.YOLO_MODEL_PATH = model_yolu
+
+    gecici = calisma_klasoru is None
+    kok = calisma_klasoru or tempfile.mkdtemp(prefix="zeytin_benchmark_")
+
+    onbellek_acik, kontrol_noktasi_acik = detection_cache.enabled, analysis_checkpoints.enabled
+    metrikler_acik = analysis_metrics.enabled
+    detection_cache.enabled = analysis_checkpoints.enabled = analysis_metrics.enabled = False
+    try:
+        senaryolar = {}
+        for genislik, yukseklik in cozunurlukler:
+            anahtar = f"{genislik}x{yukseklik}"
+            yukleme_klasoru = os.path.join(kok, anahtar, "yuklenen_dosyalar")
+            generate_dataset(yukleme_klasoru, [(genislik, yukseklik)], rgb_sayisi,
+                             multispektral_sayisi, bant_sayisi, seed)
+            megapiksel = (rgb_sayisi + multispektral_sayisi) * genislik * yukseklik / 1e6
+
+            senaryo = {
+                'resolution': [genislik, yukseklik],
+                'rgb_files': rgb_sayisi,
+                'multispectral_files': multispektral_sayisi,
+                'bands': bant_sayisi
+            }
+            if uctan_uca:
+                senaryo['end_to_end'] = run_end_to_end(analizci, yukleme_klasoru, os.path.join(kok, anahtar),
+                                                       megapiksel, tekrar, isinma)
+            if asamalar:
+                senaryo['stages'] = run_stages(analizci, yukleme_klasoru,
+                                               os.path.join(kok, anahtar, "asamalar"), tekrar)
+            senaryolar[anahtar] = senaryo
+    finally:
+        detection_cache.enabled, analysis_checkpoints.enabled = onbellek_acik, kontrol_noktasi_acik
+        analysis_metrics.enabled = metrikler_acik
+        if gecici:
+            shutil.rmtree(kok, ignore_errors=True)
+
+    return {
+        'meta': {
+            'version': SONUC_SURUMU,
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'memory_total_mb': round(psutil.virtual_memory().total / MB),
+            'backend': analizci.backend_name or (backend.name if backend else None),
+            'stub_latency_ms': gecikme_ms if backend else None,
+            'model_path': model_yolu,
+            'repeat': tekrar,
+            'warmup': isinma,
+            'seed': seed,
+            'settings': _ayar_ozeti()
+        },
+        'scenarios': senaryolar
+    }
+
+def compare(onceki: Dict, simdiki: Dict) -> List[str]:
+    """İki sonuç dosyasının p50 gecikmelerini karşılaştır (negatif yüzde: hızlanma)"""
+    satirlar = []
+
+    def satir(etiket: str, eski: Optional[Dict], yeni: Optional[Dict]):
+        if not eski or not yeni or not eski.get('p50_ms') or yeni.get('p50_ms') is None:
+            return
+        degisim = (yeni['p50_ms'] - eski['p50_ms']) / eski['p50_ms'] * 100
+        satirlar.append(f"{etiket}: p50 {eski['p50_ms']:.1f} -> {yeni['p50_ms']:.1f} ms ({degisim:+.1f}%)")
+
+    for anahtar, senaryo in simdiki.get('scenarios', {}).items():
+        eski_senaryo = onceki.get('scenarios', {}).get(anahtar)
+        if not eski_senaryo:
+            continue
+        satir(f"{anahtar} end_to_end", eski_senaryo.get('end_to_end', {}).get('latency'),
+              senaryo.get('end_to_end', {}).get('latency'))
+        for asama in ASAMALAR:
+            satir(f"{anahtar} {asama}", eski_senaryo.get('stages', {}).get(asama),
+                  senaryo.get('stages', {}).get(asama))
+    return satirlar
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Zeytin analiz hattı performans ölçümü")
+    parser.add_argument("--output", default="benchmark_sonuclari.json", help="Sonuç JSON dosyası")
+    parser.add_argument("--resolutions", default="640x480,1920x1080,4000x3000",
+                        help="Virgülle ayrılmış çözünürlükler (GxY)")
+    parser.add_argument("--rgb", type=int, default=4, help="Çözünürlük başına RGB görsel sayısı")
+    parser.add_argument("--multispectral", type=int, default=1, help="Çözünürlük başına multispektral dosya sayısı")
+    parser.add_argument("--bands", type=int, default=5, help="Multispektral bant sayısı")
+    parser.add_argument("--repeat", type=int, default=3, help="Ölçülen tekrar sayısı")
+    parser.add_argument("--warmup", type=int, default=1, help="Ölçülmeyen ısınma koşusu sayısı")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0,
+                        help="Sahte dedektörün görsel başına ek gecikmesi")
+    parser.add_argument("--model", default=None, help="Sahte dedektör yerine gerçek model dosyası")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="Üretilen dosyalar için klasör (varsayılan: geçici)")
+    parser.add_argument("--skip-end-to-end", action="store_true")
+    parser.add_argument("--skip-stages", action="store_true")
+    parser.add_argument("--compare", default=None, help="Karşılaştırılacak önceki sonuç dosyası")
+    args = parser.parse_args(argv)
+
+    sonuc = run_benchmark(
+        parse_resolutions(args.resolutions), rgb_sayisi=args.rgb, multispektral_sayisi=args.multispectral,
+        bant_sayisi=args.bands, tekrar=max(1, args.repeat), isinma=max(0, args.warmup),
+        gecikme_ms=args.stub_latency_ms, model_yolu=args.model, seed=args.seed,
+        calisma_klasoru=args.workdir, uctan_uca=not args.skip_end_to_end, asamalar=not args.skip_stages
+    )
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(sonuc, f, ensure_ascii=False, indent=2)
+    print(f"Sonuçlar yazıldı: {args.output}")
+
+    for anahtar, senaryo in sonuc['scenarios'].items():
+        uctan_uca = senaryo.get('end_to_end')
+        if uctan_uca:
+            gecikme = uctan_uca['latency']
+            print(f"{anahtar}: p50 {gecikme['p50_ms']:.1f} ms, p95 {gecikme['p95_ms']:.1f} ms, "
+                  f"{uctan_uca['throughput_files_per_s']} dosya/s, tepe RSS {uctan_uca['peak_rss_mb']} MB")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            onceki = json.load(f)
+        for satir in compare(onceki, sonuc):
+            print(satir)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Ölçüm İçin Sahte Tespit Arka Ucu
+Model ağırlığı gerektirmeden çalışır: yeşil bitki örtüsünü küçültülmüş
+görselde bağlı bileşenlerle bulur ve her tepe için bir ağaç ile birkaç
+zeytin kutusu üretir. Sonuç yalnızca görsel içeriğine bağlıdır.
+"""
+
+import time
+from typing import List
+
+import cv2
+import numpy as np
+
+from app.detections import Detections
+from app.inference_backends import InferenceBackend
+from app.constants import YOLO_TREE_CLASS, YOLO_OLIVE_CLASS
+
+BACKEND_STUB = "stub"
+
+class StubDetector(InferenceBackend):
+    """Deterministik sahte dedektör; gecikme_ms görsel başına model süresini taklit eder"""
+
+    name = BACKEND_STUB
+    thread_safe = True
+
+    def __init__(self, gecikme_ms: float = 0.0, olcek: int = 8, zeytin_sayisi: int = 3):
+        super().__init__(BACKEND_STUB, "cpu")
+        self.gecikme = max(0.0, gecikme_ms) / 1000
+        self.olcek = max(1, olcek)
+        self.zeytin_sayisi = zeytin_sayisi
+
+    def _tespit(self, gorsel: np.ndarray) -> Detections:
+        yukseklik, genislik = gorsel.shape[:2]
+        kucuk = cv2.resize(gorsel, (max(1, genislik // self.olcek), max(1, yukseklik // self.olcek)),
+                           interpolation=cv2.INTER_AREA)
+        b, g, r = cv2.split(kucuk.astype(np.int16))
+        maske = ((g - r > 30) & (g - b > 30)).astype(np.uint8)
+
+        adet, _, istatistik, _ = cv2.connectedComponentsWithStats(maske, connectivity=8)
+        kutular, guvenler, siniflar = [], [], []
+        for x, y, w, h, alan in istatistik[1:]:
+            if alan < 4:
+                continue
+            x1, y1 = x * self.olcek, y * self.olcek
+            x2, y2 = (x + w) * self.olcek, (y + h) * self.olcek
+            kutular.append((x1, y1, x2, y2))
+            guvenler.append(min(0.99, 0.6 + alan / (alan + 200)))
+            siniflar.append(YOLO_TREE_CLASS)
+
+            # Tepe içinde sabit konumlu zeytin kutuları
+            zw, zh = max(2, (x2 - x1) // 10), max(2, (y2 - y1) // 10)
+            for i in range(self.zeytin_sayisi):
+                zx = x1 + (x2 - x1) * (i + 1) // (self.zeytin_sayisi + 1)
+                zy = y1 + (y2 - y1) // 2
+                kutular.append((zx, zy, zx + zw, zy + zh))
+                guvenler.append(0.7)
+                siniflar.append(YOLO_OLIVE_CLASS)
+
+        if not kutular:
+            return Detections.empty()
+        return Detections(np.array(kutular), np.array(guvenler), np.array(siniflar))
+
+    def predict(self, images: List[np.ndarray], conf: float) -> List[Detections]:
+        if self.gecikme:
+            time.sleep(self.gecikme * len(images))
+        sonuclar = []
+        for gorsel in images:
+            tespitler = self._tespit(gorsel)
+            sonuclar.append(tespitler.select(tespitler.conf >= conf))
+        return sonuclar
+
+    def info(self) -> dict:
+        info = super().info()
+        info['gecikme_ms'] = self.gecikme * 1000
+        return info
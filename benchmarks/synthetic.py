@@ -0,0 +1,106 @@
+"""
+Zeytin Ağacı Analiz Sistemi - Sentetik Bahçe Görselleri
+Aynı tohumla her zaman aynı içeriği üreten RGB JPEG'ler ve çok bantlı
+TIFF'ler: toprak zemin üzerinde ızgaraya yakın dizilmiş ağaç tepeleri ve
+tepelerin içinde koyu zeytin noktaları.
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Çok bantlı dosyalarda bant sırası (analizci ilk dört bandı R, G, B, NIR kabul eder)
+BANT_SIRASI = ("red", "green", "blue", "nir", "red_edge")
+
+def parse_resolutions(metin: str) -> List[Tuple[int, int]]:
+    """"640x480,1920x1080" -> [(640, 480), (1920, 1080)]"""
+    cozunurlukler = []
+    for parca in metin.split(","):
+        parca = parca.strip().lower()
+        if not parca:
+            continue
+        genislik, yukseklik = parca.split("x")
+        cozunurlukler.append((int(genislik), int(yukseklik)))
+    return cozunurlukler
+
+def _agac_konumlari(genislik: int, yukseklik: int, rng: np.random.Generator) -> List[Tuple[int, int, int]]:
+    """Sıralı dikime benzer ızgara üzerinde hafif kaydırılmış ağaç merkezleri ve yarıçapları"""
+    aralik = max(48, min(genislik, yukseklik) // 6)
+    konumlar = []
+    for y in range(aralik // 2, yukseklik, aralik):
+        for x in range(aralik // 2, genislik, aralik):
+            dx, dy = rng.integers(-aralik // 6, aralik // 6 + 1, size=2)
+            yaricap = int(aralik * rng.uniform(0.25, 0.4))
+            konumlar.append((int(x + dx), int(y + dy), yaricap))
+    return konumlar
+
+def orchard_scene(genislik: int, yukseklik: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """BGR görsel ve ağaç tepesi maskesi (uint8, 0 / 255)"""
+    rng = np.random.default_rng(seed)
+
+    # Toprak zemin + gürültü
+    gorsel = np.empty((yukseklik, genislik, 3), dtype=np.uint8)
+    gorsel[:] = (60, 100, 140)
+    gurultu = rng.integers(-20, 21, size=(yukseklik, genislik, 1), dtype=np.int16)
+    gorsel = np.clip(gorsel.astype(np.int16) + gurultu, 0, 255).astype(np.uint8)
+
+    maske = np.zeros((yukseklik, genislik), dtype=np.uint8)
+    for x, y, yaricap in _agac_konumlari(genislik, yukseklik, rng):
+        yesil = (int(rng.integers(30, 60)), int(rng.integers(110, 170)), int(rng.integers(40, 80)))
+        cv2.circle(gorsel, (x, y), yaricap, yesil, -1)
+        cv2.circle(maske, (x, y), yaricap, 255, -1)
+
+        # Tepe içinde koyu zeytin noktaları
+        for _ in range(int(rng.integers(5, 15))):
+            aci = rng.uniform(0, 2 * np.pi)
+            uzaklik = rng.uniform(0, yaricap * 0.8)
+            zx, zy = int(x + uzaklik * np.cos(aci)), int(y + uzaklik * np.sin(aci))
+            cv2.circle(gorsel, (zx, zy), max(1, yaricap // 12), (40, 45, 35), -1)
+
+    return gorsel, maske
+
+def write_rgb_jpeg(yol: str, genislik: int, yukseklik: int, seed: int = 0, kalite: int = 90) -> str:
+    """Sentetik bahçe görselini JPEG olarak yaz"""
+    gorsel, _ = orchard_scene(genislik, yukseklik, seed)
+    if not cv2.imwrite(yol, gorsel, [cv2.IMWRITE_JPEG_QUALITY, kalite]):
+        raise IOError(f"Görsel yazılamadı: {yol}")
+    return yol
+
+def write_multiband_tiff(yol: str, genislik: int, yukseklik: int, bant_sayisi: int = 5, seed: int = 0) -> str:
+    """Sentetik bahçeyi çok sayfalı (sayfa başına bir bant) TIFF olarak yaz
+
+    Ağaç tepelerinde NIR yüksek, kırmızı düşüktür; NDVI sağlıklı bitki örtüsü verir.
+    """
+    gorsel, maske = orchard_scene(genislik, yukseklik, seed)
+    bitki = maske > 0
+    b, g, r = cv2.split(gorsel)
+
+    nir = np.where(bitki, 200, 90).astype(np.uint8)
+    red_edge = np.where(bitki, 150, 85).astype(np.uint8)
+    bantlar = {"red": r, "green": g, "blue": b, "nir": nir, "red_edge": red_edge}
+
+    sayfalar = [Image.fromarray(bantlar[BANT_SIRASI[i % len(BANT_SIRASI)]]) for i in range(max(1, bant_sayisi))]
+    sayfalar[0].save(yol, format="TIFF", save_all=True, append_images=sayfalar[1:])
+    return yol
+
+def generate_dataset(klasor: str, cozunurlukler: List[Tuple[int, int]], rgb_sayisi: int = 4,
+                     multispektral_sayisi: int = 1, bant_sayisi: int = 5, seed: int = 0) -> Dict[str, List[str]]:
+    """Her çözünürlük için RGB ve multispektral dosyalar üret: {"WxH": [dosya adları]}"""
+    os.makedirs(klasor, exist_ok=True)
+    dosyalar: Dict[str, List[str]] = {}
+    for genislik, yukseklik in cozunurlukler:
+        anahtar = f"{genislik}x{yukseklik}"
+        adlar = []
+        for i in range(rgb_sayisi):
+            ad = f"bahce_{anahtar}_{i}.jpg"
+            write_rgb_jpeg(os.path.join(klasor, ad), genislik, yukseklik, seed=seed + i)
+            adlar.append(ad)
+        for i in range(multispektral_sayisi):
+            ad = f"bahce_{anahtar}_{i}.tif"
+            write_multiband_tiff(os.path.join(klasor, ad), genislik, yukseklik, bant_sayisi, seed=seed + i)
+            adlar.append(ad)
+        dosyalar[anahtar] = adlar
+    return dosyalar
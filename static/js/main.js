@@ -214,23 +214,20 @@ class ZeytinAnaliz {
 
             const result = await response.json();
 
-            if (result.success) {
-                const endTime = Date.now();
-                const analysisTime = ((endTime - startTime) / 1000).toFixed(2);
-                
-                // Update analysis time badge
-                document.getElementById('analysisTime').textContent = `${analysisTime}s`;
-                
-                this.displayAnalysisResults(result.sonuc);
-                
-                // Show performance comparison message
-                if (analysisMode === 'cpu' && this.gpuAvailable) {
-                    this.showMessage('Analiz CPU ile tamamlandı. GPU modu ile daha hızlı sonuç alabilirsiniz.', 'info');
-                } else if (analysisMode === 'gpu') {
-                    this.showMessage('Analiz GPU ile hızlandırılmış olarak tamamlandı!', 'success');
-                }
+            if (response.status === 202 && result.success) {
+                // Analiz kuyruğa alındı; ilerleme sunucu olayları ile izlenir
+                analysisProgress.textContent = result.kuyruk_sirasi
+                    ? `Analiz kuyrukta (sıra: ${result.kuyruk_sirasi + 1})...`
+                    : `${analysisMode.toUpperCase()} modu ile analiz kuyruğa alındı...`;
+                this.followAnalysis(result.akis_url, analysisMode, startTime);
+            } else if (result.detail && result.detail.error) {
+                // Kabul kontrolü reddetti (kuyruk dolu / bellek yetersiz)
+                const retryAfter = response.headers.get('Retry-After');
+                throw new Error(retryAfter
+                    ? `${result.detail.error}. ${retryAfter} saniye sonra tekrar deneyin.`
+                    : result.detail.error);
             } else {
-                throw new Error(result.mesaj || 'Analiz hatası');
+                throw new Error(result.mesaj || result.detail || 'Analiz hatası');
             }
 
         } catch (error) {
@@ -239,6 +236,52 @@ class ZeytinAnaliz {
         }
     }
 
+    followAnalysis(akisUrl, analysisMode, startTime) {
+        const analysisProgress = document.getElementById('analysisProgress');
+        const source = new EventSource(akisUrl);
+
+        source.addEventListener('basladi', () => {
+            analysisProgress.textContent = `${analysisMode.toUpperCase()} modu ile analiz yapılıyor...`;
+        });
+
+        source.addEventListener('dosya', (event) => {
+            const olay = JSON.parse(event.data);
+            if (olay.toplam) {
+                analysisProgress.textContent = `İşlenen dosya: ${olay.tamamlanan}/${olay.toplam} (${olay.dosya})`;
+            }
+        });
+
+        source.addEventListener('sonuc', (event) => {
+            source.close();
+            const olay = JSON.parse(event.data);
+            const analysisTime = ((Date.now() - startTime) / 1000).toFixed(2);
+
+            // Update analysis time badge
+            document.getElementById('analysisTime').textContent = `${analysisTime}s`;
+
+            this.displayAnalysisResults(olay.sonuc);
+
+            // Show performance comparison message
+            if (analysisMode === 'cpu' && this.gpuAvailable) {
+                this.showMessage('Analiz CPU ile tamamlandı. GPU modu ile daha hızlı sonuç alabilirsiniz.', 'info');
+            } else if (analysisMode === 'gpu') {
+                this.showMessage('Analiz GPU ile hızlandırılmış olarak tamamlandı!', 'success');
+            }
+        });
+
+        source.addEventListener('hata', (event) => {
+            source.close();
+            const olay = JSON.parse(event.data);
+            this.showMessage('Analiz hatası: ' + (olay.hata_mesaji || 'Bilinmeyen hata'), 'error');
+        });
+
+        source.addEventListener('iptal', (event) => {
+            source.close();
+            const olay = JSON.parse(event.data);
+            this.showMessage(olay.mesaj || 'Analiz durduruldu', 'info');
+        });
+    }
+
     displayAnalysisResults(sonuc) {
         // Hide loading, show results
         document.getElementById('analysisStatus').style.display = 'none';
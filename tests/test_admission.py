@@ -0,0 +1,179 @@
+import pytest
+import os
+import sys
+import asyncio
+import tempfile
+import shutil
+from collections import namedtuple
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, create_analysis, add_file_upload, get_analysis_files
+from app.job_queue import JobQueue, JobRunner
+from app.executor import AnalysisExecutor
+from app.admission import AdmissionController, KARAR_KABUL, KARAR_DUSUR, KARAR_REDDET, MB
+
+Bellek = namedtuple('Bellek', ['total', 'available'])
+
+GB = 1024 * MB
+
+class TestAdmissionController:
+    """Analiz kabul kontrolü testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_patch = patch('app.config.settings.DATABASE_URL', os.path.join(self.temp_dir, "test.db"))
+        self.db_patch.start()
+        init_db()
+        for analiz_id in ("a1", "a2", "a3"):
+            create_analysis(analiz_id, 1)
+        self.queue = JobQueue()
+        self.controller = AdmissionController(self.queue, AnalysisExecutor(mode="thread"),
+                                              max_queue_depth=2, memory_reserve_percent=10,
+                                              model_overhead_mb=100, retry_after=30)
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        self.db_patch.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _rgb_yukle(self, analiz_id: str, adet: int, genislik: int = 4000, yukseklik: int = 3000):
+        for i in range(adet):
+            add_file_upload(analiz_id, f"img{i}.jpg", 5 * MB, "RGB", f"hash{i}", f"/tmp/img{i}.jpg",
+                            genislik=genislik, yukseklik=yukseklik, bant_sayisi=3)
+
+    def _bellek(self, toplam_gb: float, bos_gb: float):
+        return patch('app.admission.psutil.virtual_memory',
+                     return_value=Bellek(int(toplam_gb * GB), int(bos_gb * GB)))
+
+    def test_dimensions_recorded(self):
+        """Yüklemede kaydedilen görsel ölçüleri okunabilmeli"""
+        self._rgb_yukle("a1", 1)
+
+        dosyalar = get_analysis_files("a1")
+
+        assert dosyalar[0]['genislik'] == 4000
+        assert dosyalar[0]['yukseklik'] == 3000
+        assert dosyalar[0]['bant_sayisi'] == 3
+
+    def test_estimate_uses_dimensions(self):
+        """Ölçüsü bilinen dosya piksel sayısından, bilinmeyen dosya boyutundan tahmin edilmeli"""
+        rgb = {'dosya_tipi': "RGB", 'genislik': 1000, 'yukseklik': 1000, 'dosya_boyutu': MB}
+        multispektral = {'dosya_tipi': "Multispektral", 'genislik': 1000, 'yukseklik': 1000,
+                         'bant_sayisi': 5, 'dosya_boyutu': MB}
+        bilinmeyen = {'dosya_tipi': "RGB", 'genislik': None, 'yukseklik': None, 'dosya_boyutu': MB}
+
+        assert self.controller.file_cost(multispektral) > self.controller.file_cost(rgb)
+        assert self.controller.file_cost(bilinmeyen) == 10 * MB
+
+        self._rgb_yukle("a1", 20)
+        tahmin = self.controller.estimate("a1")
+
+        assert tahmin['dosya_sayisi'] == 20
+        assert tahmin['olcusu_bilinmeyen'] == 0
+        assert tahmin['dusuk_bellek_bayt'] < tahmin['tahmini_bayt']
+
+    def test_accepts_when_memory_available(self):
+        """Bellek payı yeterliyse analiz normal ayarlarla kabul edilmeli"""
+        self._rgb_yukle("a1", 2)
+
+        with self._bellek(16, 12):
+            karar = self.controller.evaluate("a1")
+
+        assert karar['karar'] == KARAR_KABUL
+        assert karar['dusuk_bellek'] is False
+        assert karar['durum_kodu'] == 202
+
+    def test_degrades_when_headroom_is_tight(self):
+        """Normal ayarlara yetmeyen ama düşük bellekle sığan analiz düşürülmeli"""
+        self._rgb_yukle("a1", 20)
+        tahmin = self.controller.estimate("a1")
+        bos = (tahmin['dusuk_bellek_bayt'] + tahmin['tahmini_bayt']) / 2 / GB
+
+        with self._bellek(16, bos + 1.6):
+            karar = self.controller.evaluate("a1")
+
+        assert karar['karar'] == KARAR_DUSUR
+        assert karar['dusuk_bellek'] is True
+
+    def test_rejects_full_queue_with_retry_after(self):
+        """Kuyruk derinliği sınırına ulaşılınca Retry-After ile reddedilmeli"""
+        self.queue.enqueue("a2")
+        self.queue.enqueue("a3")
+
+        with self._bellek(16, 12):
+            karar = self.controller.evaluate("a1")
+
+        assert karar['karar'] == KARAR_REDDET
+        assert karar['durum_kodu'] == 429
+        assert karar['retry_after'] >= 30
+        assert self.controller.get_stats()['reddet_nedenleri'] == {'kuyruk_dolu': 1}
+
+    def test_rejects_when_memory_exhausted(self):
+        """Kuyruk boşken bellek yetmiyorsa 503, hiç sığmayacak analiz 413 ile reddedilmeli"""
+        self._rgb_yukle("a1", 2)
+        self._rgb_yukle("a2", 1, genislik=100000, yukseklik=100000)
+
+        with self._bellek(16, 1.6):
+            dolu = self.controller.evaluate("a1")
+            buyuk = self.controller.evaluate("a2")
+
+        assert dolu['durum_kodu'] == 503
+        assert dolu['retry_after'] == 30
+        assert buyuk['durum_kodu'] == 413
+        assert buyuk['retry_after'] is None
+
+    def test_queues_behind_running_jobs(self):
+        """Bellek kuyruktaki işlerce kullanılıyorsa analiz reddedilmeden kuyruğa alınmalı"""
+        self._rgb_yukle("a1", 2)
+        self.queue.enqueue("a2")
+
+        with self._bellek(16, 1.6):
+            karar = self.controller.evaluate("a1")
+            assert self.controller.can_start() is False
+
+        assert karar['karar'] == KARAR_KABUL
+        assert karar['neden'] == "kuyrukta_bekleyecek"
+
+    def test_disabled_controller_accepts(self):
+        """Kapalı kabul kontrolü her analizi kabul etmeli"""
+        controller = AdmissionController(self.queue, AnalysisExecutor(mode="thread"), enabled=False)
+
+        with self._bellek(16, 0.1):
+            assert controller.evaluate("a1")['karar'] == KARAR_KABUL
+            assert controller.can_start() is True
+            assert controller.should_degrade("a1") is False
+
+    @pytest.mark.asyncio
+    async def test_runner_gate_holds_jobs(self):
+        """Kapı kapalıyken runner iş talep etmemeli"""
+        job_id = self.queue.enqueue("a1")
+        acik = {'deger': False}
+        calisan = []
+
+        async def handler(job):
+            calisan.append(job['job_id'])
+
+        runner = JobRunner(self.queue, handler, lease_seconds=5, poll_interval=0.05)
+        runner.start(gate=lambda: acik['deger'])
+        try:
+            await asyncio.sleep(0.2)
+            assert calisan == []
+            assert runner.get_stats()['gated'] > 0
+
+            acik['deger'] = True
+            for _ in range(100):
+                if calisan:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await runner.stop()
+
+        assert calisan == [job_id]
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
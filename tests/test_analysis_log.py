@@ -0,0 +1,110 @@
+import pytest
+import os
+import sys
+import time
+import tempfile
+import shutil
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analysis_log import AnalysisLog, AnalysisLogManager
+
+class TestAnalysisLog:
+    """Tamponlu analiz log yazıcısı testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "log.txt")
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _file_lines(self):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_lines_buffered_until_threshold(self):
+        """Satır eşiğine kadar diske yazılmamalı, eşikte tek seferde yazılmalı"""
+        log = AnalysisLog(self.log_path, flush_lines=3, flush_interval=60)
+
+        log.write("birinci")
+        log.write("ikinci")
+        assert self._file_lines() == []
+
+        log.write("üçüncü")
+        lines = self._file_lines()
+        assert len(lines) == 3
+        assert lines[2].endswith("] üçüncü")
+        assert log.flushes == 1
+
+    def test_time_threshold(self):
+        """Süre eşiği geçtiyse tampon yazılmalı"""
+        log = AnalysisLog(self.log_path, flush_lines=100, flush_interval=0.05)
+
+        log.write("birinci")
+        time.sleep(0.1)
+        log.flush_if_stale()
+
+        assert len(self._file_lines()) == 1
+
+    def test_tail_reads_only_appended_data(self):
+        """Son satırlar başka yazıcıların eklediklerini de içermeli"""
+        log = AnalysisLog(self.log_path, flush_lines=100, flush_interval=60, tail_lines=3)
+        log.write_lines(["a", "b"])
+        assert log.tail() == ["a", "b"]
+
+        # Başka bir süreç aynı dosyaya ekliyor (yarım satır dahil)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("c\nd\ne")
+        assert log.tail() == ["b", "c", "d"]
+
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("\n")
+        assert log.tail() == ["c", "d", "e"]
+        assert log.line_count == 5
+
+    def test_lines_since_cursor(self):
+        """İmleçten sonraki satırlar ve sonraki imleç dönmeli"""
+        log = AnalysisLog(self.log_path, flush_lines=100, flush_interval=60, tail_lines=3)
+        log.write_lines(["a", "b"])
+
+        assert log.lines_since(0) == (["a", "b"], 2, False)
+        assert log.lines_since(2) == ([], 2, False)
+
+        log.write_lines(["c", "d", "e"])
+        assert log.lines_since(2) == (["c", "d", "e"], 5, False)
+
+        # Pencerenin gerisinde kalan imleç: tutulan satırlar ve kesildi işareti
+        assert log.lines_since(1) == (["c", "d", "e"], 5, True)
+
+    def test_manager_close_flushes(self):
+        """Kapatılan log diske aktarılmalı ve yöneticiden çıkarılmalı"""
+        manager = AnalysisLogManager(flush_lines=100, flush_interval=60)
+
+        manager.write(self.log_path, "mesaj")
+        assert manager.get_stats() == {'open': 1, 'buffered': 1}
+
+        manager.close(self.log_path)
+
+        assert len(self._file_lines()) == 1
+        assert manager.get_stats()['open'] == 0
+
+    def test_manager_evicts_oldest(self):
+        """Açık log sınırı aşılınca en eski log aktarılıp bırakılmalı"""
+        manager = AnalysisLogManager(flush_lines=100, flush_interval=60, max_open=1)
+        other_path = os.path.join(self.temp_dir, "diger.txt")
+
+        manager.write(self.log_path, "eski")
+        manager.write(other_path, "yeni")
+
+        assert len(self._file_lines()) == 1
+        assert manager.get_stats()['open'] == 1
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
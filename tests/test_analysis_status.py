@@ -0,0 +1,82 @@
+import pytest
+import os
+import sys
+import json
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analysis_status import AnalysisStatusStore
+
+class TestAnalysisStatusStore:
+    """Sürümlü analiz durum deposu testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = AnalysisStatusStore()
+        self.db_patches = [
+            patch('app.analysis_status.update_analysis_status'),
+            patch('app.analysis_status.get_analysis', return_value={'durum': 'yuklendi'})
+        ]
+        self.update_status, self.get_analysis = [p.start() for p in self.db_patches]
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        for p in self.db_patches:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_version_increments(self):
+        """Her durum değişikliği sürümü artırmalı ve sonucu yazmalı"""
+        assert self.store.set_status("a1", self.temp_dir, "isleniyor") == 1
+        assert self.store.set_status("a1", self.temp_dir, "tamamlandi", sonuc={'toplam_agac': 3}) == 2
+
+        kayit = self.store.get("a1", self.temp_dir)
+
+        assert kayit['durum'] == "tamamlandi"
+        assert kayit['surum'] == 2
+        assert kayit['sonuc'] == {'toplam_agac': 3}
+        self.update_status.assert_called_with("a1", "tamamlandi", None)
+
+    def test_unchanged_status_served_from_cache(self):
+        """durum.json değişmediyse dosyalar ve veritabanı tekrar okunmamalı"""
+        self.store.set_status("a1", self.temp_dir, "isleniyor")
+
+        self.store.get("a1", self.temp_dir)
+        self.store.get("a1", self.temp_dir)
+        assert self.get_analysis.call_count == 1
+
+        self.store.set_status("a1", self.temp_dir, "hata", hata_mesaji="model yok")
+        kayit = self.store.get("a1", self.temp_dir)
+
+        assert self.get_analysis.call_count == 2
+        assert kayit['durum'] == "hata"
+
+    def test_change_from_other_process_is_seen(self):
+        """Başka bir süreçteki depo yazdığında değişiklik görülmeli"""
+        diger = AnalysisStatusStore()
+        self.store.set_status("a1", self.temp_dir, "isleniyor")
+        assert self.store.get("a1", self.temp_dir)['surum'] == 1
+
+        diger.set_status("a1", self.temp_dir, "tamamlandi", sonuc={'toplam_agac': 1})
+
+        assert self.store.get("a1", self.temp_dir)['surum'] == 2
+
+    def test_legacy_analysis_without_status_file(self):
+        """durum.json yoksa veritabanı durumu ve sürüm 0 kullanılmalı"""
+        with open(os.path.join(self.temp_dir, "sonuc.json"), 'w') as f:
+            json.dump({'toplam_agac': 7}, f)
+
+        kayit = self.store.get("eski", self.temp_dir)
+
+        assert kayit['durum'] == "yuklendi"
+        assert kayit['surum'] == 0
+        assert kayit['sonuc'] == {'toplam_agac': 7}
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
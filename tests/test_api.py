@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.main import app
 from app.auth import auth_manager
 from app.database import init_db, get_db_connection
+from app.job_queue import job_queue, JOB_PENDING
 
 class TestZeytinAnaliz:
     @classmethod
@@ -180,20 +181,8 @@ class TestZeytinAnaliz:
         assert response.status_code == 403
         assert "admin yetkisi gerekli" in response.json()["detail"]
     
-    @patch('app.ai_analysis.ZeytinAnalizci.analiz_yap')
-    def test_analysis_start_with_admin(self, mock_analysis):
+    def test_analysis_start_with_admin(self):
         """Admin ile analiz başlatma testi"""
-        # Mock analiz sonucu
-        mock_analysis.return_value = {
-            'toplam_agac': 10,
-            'toplam_zeytin': 100,
-            'tahmini_zeytin_miktari': 0.4,
-            'ndvi_ortalama': 0.75,
-            'saglik_durumu': 'Sağlıklı',
-            'analiz_modu': 'cpu',
-            'kullanilan_cihaz': 'cpu'
-        }
-        
         # Admin token al
         token = self._get_auth_token("testadmin", "adminpass123")
         headers = {"Authorization": f"Bearer {token}"}
@@ -214,13 +203,27 @@ class TestZeytinAnaliz:
                 headers=headers
             )
             
-            assert response.status_code == 200
+            # Analiz kuyruğa alınır; sonuç /analiz/durum ve /analiz/akis üzerinden izlenir
+            assert response.status_code == 202
             data = response.json()
             assert data["success"] is True
-            assert "sonuc" in data
+            assert data["is_id"]
+            assert data["analiz_id"] == test_analiz_id
+            assert data["durum"] == JOB_PENDING
+            assert isinstance(data["kuyruk_sirasi"], int) and data["kuyruk_sirasi"] >= 0
+            assert data["akis_url"] == f"/analiz/akis/{test_analiz_id}"
+            assert "sonuc" not in data
+            
+            # Aynı analiz bekleyen işi varken tekrar kuyruğa alınmamalı
+            response = self.client.post("/analiz/baslat",
+                data={"analiz_id": test_analiz_id, "analiz_modu": "cpu"},
+                headers=headers
+            )
+            assert response.status_code == 409
             
         finally:
             # Temizlik
+            job_queue.cancel_pending(test_analiz_id)
             shutil.rmtree(test_dir, ignore_errors=True)
     
     def test_analysis_status(self):
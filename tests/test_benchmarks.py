@@ -0,0 +1,107 @@
+import pytest
+import os
+import sys
+import tempfile
+import shutil
+
+import numpy as np
+from PIL import Image
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import orchard_scene, write_multiband_tiff, generate_dataset, parse_resolutions
+from benchmarks.stub_backend import StubDetector
+from benchmarks.analysis_benchmark import summarize, compare, run_benchmark, ASAMALAR
+from app.constants import YOLO_TREE_CLASS, YOLO_OLIVE_CLASS
+
+class TestSyntheticData:
+    """Sentetik bahçe verisi testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_scene_is_deterministic(self):
+        """Aynı tohum aynı görseli, farklı tohum farklı görseli üretmeli"""
+        ilk, maske = orchard_scene(320, 240, seed=7)
+        ikinci, _ = orchard_scene(320, 240, seed=7)
+        farkli, _ = orchard_scene(320, 240, seed=8)
+
+        assert ilk.shape == (240, 320, 3)
+        assert np.array_equal(ilk, ikinci)
+        assert not np.array_equal(ilk, farkli)
+        assert maske.any()
+
+    def test_multiband_tiff(self):
+        """Çok bantlı TIFF her bandı ayrı sayfa olarak içermeli"""
+        yol = write_multiband_tiff(os.path.join(self.temp_dir, "ms.tif"), 200, 100, bant_sayisi=5)
+
+        with Image.open(yol) as img:
+            assert img.n_frames == 5
+            assert img.size == (200, 100)
+
+    def test_generate_dataset(self):
+        """Her çözünürlük için istenen sayıda RGB ve multispektral dosya üretilmeli"""
+        dosyalar = generate_dataset(self.temp_dir, parse_resolutions("160x120, 320x240"),
+                                    rgb_sayisi=2, multispektral_sayisi=1)
+
+        assert list(dosyalar) == ["160x120", "320x240"]
+        assert len(dosyalar["320x240"]) == 3
+        assert len(os.listdir(self.temp_dir)) == 6
+
+class TestStubDetector:
+    """Sahte dedektör testleri"""
+
+    def test_detects_canopies(self):
+        """Ağaç tepeleri ağaç, tepe içindeki kutular zeytin olarak dönmeli"""
+        gorsel, _ = orchard_scene(640, 480, seed=1)
+        detektor = StubDetector()
+
+        tespitler = detektor.predict([gorsel], 0.5)[0]
+        tekrar = detektor.predict([gorsel], 0.5)[0]
+
+        agac = int((tespitler.cls == YOLO_TREE_CLASS).sum())
+        assert agac > 0
+        assert int((tespitler.cls == YOLO_OLIVE_CLASS).sum()) == agac * detektor.zeytin_sayisi
+        assert np.array_equal(tespitler.xyxy, tekrar.xyxy)
+
+class TestBenchmarkHarness:
+    """Ölçüm düzeneği testleri"""
+
+    def test_summarize_percentiles(self):
+        """Özet gecikme yüzdelikleri ve verimi hesaplamalı"""
+        ozet = summarize([0.01 * i for i in range(1, 101)])
+
+        assert ozet['count'] == 100
+        assert ozet['p50_ms'] == pytest.approx(505.0)
+        assert ozet['p99_ms'] == pytest.approx(990.1)
+        assert ozet['throughput_per_s'] == pytest.approx(100 / 50.5, rel=1e-3)
+        assert summarize([]) == {'count': 0}
+
+    def test_compare_reports_change(self):
+        """Karşılaştırma p50 değişimini yüzde olarak vermeli"""
+        onceki = {'scenarios': {'640x480': {'end_to_end': {'latency': {'p50_ms': 200.0}}}}}
+        simdiki = {'scenarios': {'640x480': {'end_to_end': {'latency': {'p50_ms': 150.0}}}}}
+
+        assert compare(onceki, simdiki) == ["640x480 end_to_end: p50 200.0 -> 150.0 ms (-25.0%)"]
+
+    def test_run_benchmark_small(self):
+        """Küçük bir koşu uçtan uca ve tüm aşamalar için sonuç üretmeli"""
+        sonuc = run_benchmark([(320, 240)], rgb_sayisi=2, multispektral_sayisi=1, tekrar=1, isinma=0)
+
+        senaryo = sonuc['scenarios']['320x240']
+        assert sonuc['meta']['backend'] == "stub"
+        assert senaryo['end_to_end']['latency']['count'] == 1
+        assert senaryo['end_to_end']['peak_rss_mb'] > 0
+        for asama in ASAMALAR:
+            assert senaryo['stages'][asama]['count'] > 0
+            assert senaryo['stages'][asama]['p95_ms'] >= senaryo['stages'][asama]['p50_ms']
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,78 @@
+import pytest
+import os
+import sys
+import time
+import pickle
+import tempfile
+import shutil
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cancellation import (
+    CancelToken, AnalysisCancelled, request_cancel, clear_cancel, cancel_requested,
+    NEDEN_IPTAL, NEDEN_ZAMAN_ASIMI
+)
+
+class TestCancelToken:
+    """Analiz iptali ve zaman bütçesi testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_no_request_passes(self):
+        """İptal isteği ve bütçe yoksa kontrol geçmeli"""
+        token = CancelToken(self.temp_dir)
+
+        token.check()
+
+        assert token.tetiklendi is False
+
+    def test_cancel_request(self):
+        """İşaret dosyası bırakılınca kontrol iptal hatası vermeli"""
+        token = CancelToken(self.temp_dir)
+
+        assert request_cancel(self.temp_dir, "admin") is True
+        assert cancel_requested(self.temp_dir)['kullanici_adi'] == "admin"
+
+        with pytest.raises(AnalysisCancelled) as exc_info:
+            token.check()
+        assert exc_info.value.neden == NEDEN_IPTAL
+
+        # Tetiklenen token işaret kaldırılsa da durdurulmuş kalmalı
+        clear_cancel(self.temp_dir)
+        assert cancel_requested(self.temp_dir) is None
+        with pytest.raises(AnalysisCancelled):
+            token.check()
+
+    def test_time_budget(self):
+        """Zaman bütçesi aşılınca kontrol zaman aşımı hatası vermeli"""
+        token = CancelToken(self.temp_dir, zaman_butcesi=0.05)
+        token.check()
+
+        time.sleep(0.1)
+
+        with pytest.raises(AnalysisCancelled) as exc_info:
+            token.check()
+        assert exc_info.value.neden == NEDEN_ZAMAN_ASIMI
+
+    def test_missing_folder(self):
+        """Olmayan analiz klasörüne iptal isteği bırakılmamalı"""
+        assert request_cancel(os.path.join(self.temp_dir, "yok")) is False
+        clear_cancel(os.path.join(self.temp_dir, "yok"))
+
+    def test_exception_pickles(self):
+        """Hata süreç havuzundan ana sürece taşınabilmeli"""
+        hata = pickle.loads(pickle.dumps(AnalysisCancelled(NEDEN_ZAMAN_ASIMI, "bütçe aşıldı")))
+
+        assert hata.neden == NEDEN_ZAMAN_ASIMI
+        assert str(hata) == "bütçe aşıldı"
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+import pytest
+import os
+import sys
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, create_analysis, get_db_connection
+from app.checkpoint import AnalysisCheckpointStore, dosya_imzasi, ayar_imzasi, TUR_RGB, TUR_MULTISPECTRAL
+
+class TestAnalysisCheckpointStore:
+    """Dosya başına analiz kontrol noktası testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_patch = patch('app.config.settings.DATABASE_URL', os.path.join(self.temp_dir, "test.db"))
+        self.db_patch.start()
+        init_db()
+        create_analysis("a1", 2)
+        self.store = AnalysisCheckpointStore()
+        self.ayar = ayar_imzasi("model-hash", {'conf': 0.5})
+
+        self.dosyalar = {}
+        for ad in ("img0.jpg", "img1.jpg"):
+            yol = os.path.join(self.temp_dir, ad)
+            with open(yol, "wb") as f:
+                f.write(b"gorsel")
+            self.dosyalar[ad] = yol
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        self.db_patch.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _kaydet(self, ad: str, ayar: str = None, **sonuc):
+        return self.store.save("a1", TUR_RGB, ad, dosya_imzasi(self.dosyalar[ad]),
+                               ayar or self.ayar, dict({'dosya': ad}, **sonuc))
+
+    def test_completed_returns_saved_results(self):
+        """Kaydedilen dosyalar tamamlanmış sayılmalı, diğerleri dönmemeli"""
+        assert self._kaydet("img0.jpg", agac_sayisi=3) is True
+
+        tamamlanan = self.store.completed("a1", TUR_RGB, self.ayar, self.dosyalar)
+
+        assert tamamlanan == {"img0.jpg": {'dosya': "img0.jpg", 'agac_sayisi': 3}}
+        assert self.store.completed("a1", TUR_MULTISPECTRAL, self.ayar, self.dosyalar) == {}
+
+    def test_changed_settings_invalidate(self):
+        """Farklı model / parametrelerle üretilen kayıt kullanılmamalı"""
+        self._kaydet("img0.jpg", agac_sayisi=3)
+
+        diger_ayar = ayar_imzasi("baska-model", {'conf': 0.5})
+
+        assert self.store.completed("a1", TUR_RGB, diger_ayar, self.dosyalar) == {}
+
+    def test_changed_file_invalidates(self):
+        """Dosya değişmişse kontrol noktası atlanmamalı"""
+        self._kaydet("img0.jpg", agac_sayisi=3)
+        with open(self.dosyalar["img0.jpg"], "ab") as f:
+            f.write(b"yeni veri")
+
+        assert self.store.completed("a1", TUR_RGB, self.ayar, self.dosyalar) == {}
+
+    def test_save_replaces_previous(self):
+        """Aynı dosyanın yeni sonucu eskisinin yerine geçmeli"""
+        self._kaydet("img0.jpg", agac_sayisi=3)
+        self._kaydet("img0.jpg", agac_sayisi=5)
+
+        tamamlanan = self.store.completed("a1", TUR_RGB, self.ayar, self.dosyalar)
+
+        assert tamamlanan["img0.jpg"]['agac_sayisi'] == 5
+
+    def test_clear_and_cascade(self):
+        """Silinen kontrol noktaları ve analizle birlikte silinen kayıtlar dönmemeli"""
+        self._kaydet("img0.jpg")
+        self._kaydet("img1.jpg")
+
+        assert self.store.clear("a1", TUR_RGB) == 2
+        assert self.store.load("a1", TUR_RGB) == {}
+
+        self._kaydet("img0.jpg")
+        conn = get_db_connection()
+        conn.execute("DELETE FROM analizler WHERE analiz_id = ?", ("a1",))
+        conn.commit()
+        conn.close()
+
+        assert self.store.load("a1", TUR_RGB) == {}
+
+    def test_disabled_store(self):
+        """Kapalı depo kayıt yapmamalı"""
+        store = AnalysisCheckpointStore(enabled=False)
+
+        assert store.save("a1", TUR_RGB, "img0.jpg", "imza", self.ayar, {}) is False
+        assert store.completed("a1", TUR_RGB, self.ayar, self.dosyalar) == {}
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
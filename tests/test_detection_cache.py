@@ -0,0 +1,114 @@
+import pytest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db
+from app.detection_cache import DetectionCache, KIND_RGB, KIND_MULTISPECTRAL, file_md5
+from app.detections import Detections
+
+class TestDetectionCache:
+    """Tespit sonucu önbelleği testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_patch = patch('app.config.settings.DATABASE_URL', os.path.join(self.temp_dir, "test.db"))
+        self.db_patch.start()
+        init_db()
+        self.cache = DetectionCache(max_entries=100, max_mb=10)
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        self.db_patch.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _detections(n: int = 3) -> Detections:
+        xyxy = np.arange(n * 4, dtype=np.float32).reshape(n, 4)
+        return Detections(xyxy, np.linspace(0.5, 0.9, n), np.arange(n) % 2)
+
+    def test_roundtrip(self):
+        """Kaydedilen tespitler aynen geri okunmalı"""
+        detections = self._detections()
+        key = self.cache.make_key(KIND_RGB, "dosya", "model", {'conf': 0.5})
+
+        assert self.cache.get(key, KIND_RGB) is None
+        self.cache.put(key, KIND_RGB, "dosya", "model", {'conf': 0.5}, detections, {'karo_sayisi': 4})
+        cached, meta = self.cache.get(key, KIND_RGB)
+
+        np.testing.assert_allclose(cached.xyxy, detections.xyxy)
+        np.testing.assert_allclose(cached.conf, detections.conf, rtol=1e-6)
+        np.testing.assert_array_equal(cached.cls, detections.cls)
+        assert meta == {'karo_sayisi': 4}
+
+    def test_key_depends_on_model_and_params(self):
+        """Model veya parametre değişince anahtar değişmeli"""
+        key = self.cache.make_key(KIND_RGB, "dosya", "model", {'conf': 0.5, 'backend': 'ultralytics'})
+
+        assert key == self.cache.make_key(KIND_RGB, "dosya", "model", {'backend': 'ultralytics', 'conf': 0.5})
+        assert key != self.cache.make_key(KIND_RGB, "dosya", "model2", {'conf': 0.5, 'backend': 'ultralytics'})
+        assert key != self.cache.make_key(KIND_RGB, "dosya", "model", {'conf': 0.6, 'backend': 'ultralytics'})
+        assert key != self.cache.make_key(KIND_MULTISPECTRAL, "dosya", "model", {'conf': 0.5, 'backend': 'ultralytics'})
+
+    def test_eviction_removes_least_recently_used(self):
+        """Sınır aşılınca en uzun süredir kullanılmayan kayıt silinmeli"""
+        cache = DetectionCache(max_entries=2, max_mb=10)
+        keys = [cache.make_key(KIND_RGB, f"dosya{i}", "model", {}) for i in range(3)]
+
+        cache.put(keys[0], KIND_RGB, "dosya0", "model", {}, self._detections())
+        cache.put(keys[1], KIND_RGB, "dosya1", "model", {}, self._detections())
+        assert cache.get(keys[0], KIND_RGB) is not None
+        cache.put(keys[2], KIND_RGB, "dosya2", "model", {}, self._detections())
+
+        assert cache.get(keys[1], KIND_RGB) is None
+        assert cache.get(keys[0], KIND_RGB) is not None
+        stats = cache.get_stats()
+        assert stats['entries'] == 2
+        assert stats['evictions'] == 1
+
+    def test_hit_rate_metrics(self):
+        """İsabet oranı tür bazında hesaplanmalı"""
+        key = self.cache.make_key(KIND_MULTISPECTRAL, "dosya", "ms", {})
+        self.cache.get(key, KIND_MULTISPECTRAL)
+        self.cache.put(key, KIND_MULTISPECTRAL, "dosya", "ms", {}, meta={'ndvi': 0.7})
+        self.cache.get(key, KIND_MULTISPECTRAL)
+        self.cache.get(key, KIND_MULTISPECTRAL)
+
+        stats = self.cache.get_stats()
+
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['by_kind'][KIND_MULTISPECTRAL]['hit_rate'] == pytest.approx(2 / 3)
+
+    def test_file_hash_uses_upload_record(self):
+        """Yüklemede kaydedilen hash yeniden hesaplanmadan kullanılmalı"""
+        from app.database import create_analysis, add_file_upload
+
+        dosya_yolu = os.path.join(self.temp_dir, "gorsel.jpg")
+        with open(dosya_yolu, 'wb') as f:
+            f.write(b"gorsel")
+        create_analysis("analiz-1", 1)
+        add_file_upload("analiz-1", "gorsel.jpg", 6, "image/jpeg", "kayitli-hash", dosya_yolu)
+
+        assert self.cache.file_hash(dosya_yolu) == "kayitli-hash"
+        assert self.cache.file_hash(os.path.join(self.temp_dir, "test.db")) == file_md5(os.path.join(self.temp_dir, "test.db"))
+
+    def test_disabled_cache(self):
+        """Önbellek kapalıysa hiçbir şey saklanmamalı"""
+        cache = DetectionCache(enabled=False)
+        key = cache.make_key(KIND_RGB, "dosya", "model", {})
+
+        cache.put(key, KIND_RGB, "dosya", "model", {}, self._detections())
+
+        assert cache.get(key, KIND_RGB) is None
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+import pytest
+import os
+import sys
+import time
+import asyncio
+import threading
+from unittest.mock import patch, MagicMock
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.executor import AnalysisExecutor
+from app.cancellation import AnalysisCancelled, NEDEN_ZAMAN_ASIMI
+from app.model_registry import ModelRegistry
+
+def _yavas_analiz(yukleme_klasoru, analiz_klasoru, log_yolu, analiz_modu, zaman_butcesi=None, dusuk_bellek=False):
+    """Bloklayan sahte analiz"""
+    time.sleep(0.2)
+    return {'toplam_agac': 1, 'analiz_modu': analiz_modu}
+
+def _hatali_analiz(yukleme_klasoru, analiz_klasoru, log_yolu, analiz_modu, zaman_butcesi=None, dusuk_bellek=False):
+    raise ValueError("analiz hatası")
+
+def _butcesi_asan_analiz(yukleme_klasoru, analiz_klasoru, log_yolu, analiz_modu, zaman_butcesi=None, dusuk_bellek=False):
+    raise AnalysisCancelled(NEDEN_ZAMAN_ASIMI, f"Analiz zaman bütçesi aşıldı ({zaman_butcesi:.0f} saniye)")
+
+class TestAnalysisExecutor:
+    """Analiz yürütücüsü testleri"""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """Analiz çalışırken event loop diğer işleri yürütmeli"""
+        executor = AnalysisExecutor(mode="thread", max_workers=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        with patch('app.executor._thread_run', _yavas_analiz):
+            task = asyncio.create_task(ticker())
+            result = await executor.submit("in", "out", "log.txt", "cpu")
+            task.cancel()
+
+        executor.shutdown()
+        assert result['toplam_agac'] == 1
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Eşzamanlılık sınırını aşan istekler kuyrukta beklemeli"""
+        executor = AnalysisExecutor(mode="thread", max_workers=2, max_concurrent=1)
+
+        with patch('app.executor._thread_run', _yavas_analiz):
+            start_time = time.perf_counter()
+            results = await asyncio.gather(*[
+                executor.submit("in", "out", "log.txt", "cpu") for _ in range(3)
+            ])
+            elapsed = time.perf_counter() - start_time
+
+        stats = executor.get_stats()
+        executor.shutdown()
+
+        assert len(results) == 3
+        assert elapsed >= 0.55
+        assert stats['peak_active'] == 1
+        assert stats['peak_queued'] >= 2
+        assert stats['completed'] == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self):
+        """Hatalar çağırana iletilmeli ve sayılmalı"""
+        executor = AnalysisExecutor(mode="thread", max_workers=1)
+
+        with patch('app.executor._thread_run', _hatali_analiz):
+            with pytest.raises(ValueError):
+                await executor.submit("in", "out", "log.txt", "cpu")
+
+        stats = executor.get_stats()
+        executor.shutdown()
+
+        assert stats['failed'] == 1
+        assert stats['active'] == 0
+        assert stats['utilization'] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_cancellations_are_counted(self):
+        """Zaman bütçesi worker'a iletilmeli, iptal hata olarak sayılmamalı"""
+        executor = AnalysisExecutor(mode="thread", max_workers=1)
+
+        with patch('app.executor._thread_run', _butcesi_asan_analiz):
+            with pytest.raises(AnalysisCancelled) as exc_info:
+                await executor.submit("in", "out", "log.txt", "cpu", zaman_butcesi=30)
+
+        stats = executor.get_stats()
+        executor.shutdown()
+
+        assert exc_info.value.neden == NEDEN_ZAMAN_ASIMI
+        assert "30 saniye" in str(exc_info.value)
+        assert stats['cancelled'] == 1
+        assert stats['failed'] == 0
+
+    @pytest.mark.asyncio
+    async def test_thread_workers_do_not_share_backend(self, tmp_path):
+        """Eşzamanlı thread modu analizleri aynı (thread-safe olmayan) model örneğini paylaşmamalı"""
+        from app.ai_analysis import ZeytinAnalizci
+
+        model_yolu = tmp_path / "model.pt"
+        model_yolu.write_bytes(b"model")
+        executor = AnalysisExecutor(mode="thread", max_workers=2)
+        bariyer = threading.Barrier(2, timeout=5)
+        manager = MagicMock()
+        manager.get_inference_backend.return_value = ("ultralytics", str(model_yolu))
+        manager.get_quantized_variant.return_value = None
+
+        async def sahte_analiz(self, *args, **kwargs):
+            # İki analiz aynı anda çalışıyor olmalı
+            bariyer.wait()
+            self.load_yolo_model(str(model_yolu))
+            return {'model': self.yolo_model}
+
+        with patch('app.ai_analysis.model_registry', ModelRegistry(max_models=4)), \
+             patch('app.ai_analysis.model_manager', manager), \
+             patch.object(ZeytinAnalizci, '_yolo_yukle', lambda self, path, device: object()), \
+             patch.object(ZeytinAnalizci, 'analiz_yap', sahte_analiz):
+            results = await asyncio.gather(*[
+                executor.submit("in", "out", "log.txt", "cpu") for _ in range(2)
+            ])
+
+        executor.shutdown()
+
+        assert results[0]['model'] is not None
+        assert results[0]['model'] is not results[1]['model']
+
+    def test_unknown_mode_falls_back_to_process(self):
+        """Geçersiz mod süreç havuzuna düşmeli"""
+        executor = AnalysisExecutor(mode="bilinmeyen")
+
+        assert executor.mode == "process"
+        assert executor.get_stats()['pool_started'] is False
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,372 @@
+import pytest
+import os
+import sys
+import json
+import time
+import tempfile
+import numpy as np
+from unittest.mock import patch, MagicMock
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.inference_backends import OnnxRuntimeBackend, BACKEND_ONNXRUNTIME, BACKEND_ULTRALYTICS
+from app.models import ModelManager, ZeytinModelTrainer, update_model_info, load_model_info, benchmark_host_key
+from app.config import settings
+
+def _backend(input_size=(640, 640), dynamic_shape=False) -> OnnxRuntimeBackend:
+    """Oturum açmadan ön/son işleme testleri için arka uç"""
+    backend = OnnxRuntimeBackend.__new__(OnnxRuntimeBackend)
+    backend.input_size = input_size
+    backend.dynamic_shape = dynamic_shape
+    backend.iou_threshold = 0.7
+    backend.max_detections = 300
+    return backend
+
+class TestOnnxPreprocessing:
+    """Letterbox ön işleme testleri"""
+
+    def test_letterbox_keeps_aspect_ratio(self):
+        """Görsel oranı korunmalı, dolgu ortalanmalı"""
+        image = np.full((400, 800, 3), 255, dtype=np.uint8)
+
+        padded, ratio, (left, top) = OnnxRuntimeBackend.letterbox(image, (640, 640))
+
+        assert padded.shape == (640, 640, 3)
+        assert ratio == pytest.approx(0.8)
+        assert (left, top) == (0, 160)
+        assert padded[0, 0, 0] == 114
+        assert padded[320, 320, 0] == 255
+
+    def test_dynamic_model_pads_to_stride(self):
+        """Dinamik modelde dolgu yalnızca stride katına kadar yapılmalı"""
+        backend = _backend(dynamic_shape=True)
+        images = [np.zeros((800, 1200, 3), dtype=np.uint8)] * 2
+
+        batch, _ = backend._preprocess(images)
+
+        assert batch.shape == (2, 3, 448, 640)
+
+    def test_mixed_shapes_use_square_input(self):
+        """Farklı oranlı görsellerden oluşan batch kare girişe düşmeli"""
+        backend = _backend(dynamic_shape=True)
+        images = [np.zeros((800, 1200, 3), dtype=np.uint8), np.zeros((1200, 800, 3), dtype=np.uint8)]
+
+        batch, _ = backend._preprocess(images)
+
+        assert batch.shape == (2, 3, 640, 640)
+
+class TestOnnxPostprocessing:
+    """Ham YOLOv8 çıktısının son işleme testleri"""
+
+    @staticmethod
+    def _raw_output(boxes_cxcywh, class_scores):
+        """(4 + nc, A) biçiminde ham çıktı"""
+        return np.concatenate([np.asarray(boxes_cxcywh, np.float32).T,
+                               np.asarray(class_scores, np.float32).T])
+
+    def test_threshold_and_nms(self):
+        """Eşik altı ve örtüşen kutular elenmeli"""
+        output = self._raw_output(
+            [[100, 100, 50, 50], [102, 101, 50, 50], [300, 300, 40, 40], [500, 500, 40, 40]],
+            [[0.9, 0.1], [0.8, 0.1], [0.1, 0.7], [0.2, 0.3]]
+        )
+
+        detections = _backend()._postprocess(output, 0.5, (1.0, (0, 0), (640, 640)))
+
+        assert len(detections) == 2
+        assert sorted(detections.cls.tolist()) == [0, 1]
+        np.testing.assert_allclose(detections.xyxy[detections.cls == 0][0], [75, 75, 125, 125])
+
+    def test_boxes_mapped_to_original_image(self):
+        """Kutular letterbox koordinatlarından orijinal görsele taşınmalı"""
+        output = self._raw_output([[320, 320, 64, 32]], [[0.9]])
+
+        detections = _backend()._postprocess(output, 0.5, (0.5, (0, 80), (960, 1280)))
+
+        np.testing.assert_allclose(detections.xyxy[0], [576, 448, 704, 512])
+
+class TestBackendSelection:
+    """ModelManager arka uç seçimi testleri"""
+
+    @pytest.fixture
+    def manager(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield ModelManager(models_dir=temp_dir)
+
+    def test_default_backend(self, manager):
+        """Bilgi dosyası yoksa ultralytics kullanılmalı"""
+        model_path = os.path.join(manager.models_dir, "olive.pt")
+        open(model_path, 'wb').close()
+
+        assert manager.get_inference_backend(model_path) == (BACKEND_ULTRALYTICS, model_path)
+
+    def test_onnx_backend_from_model_info(self, manager):
+        """Bilgi dosyasında onnxruntime seçilmişse ONNX export'u kullanılmalı"""
+        model_path = os.path.join(manager.models_dir, "olive.pt")
+        onnx_path = os.path.join(manager.models_dir, "olive.onnx")
+        open(model_path, 'wb').close()
+        open(onnx_path, 'wb').close()
+
+        info = manager.set_model_backend("olive", BACKEND_ONNXRUNTIME)
+
+        assert info['backend'] == BACKEND_ONNXRUNTIME
+        assert manager.get_inference_backend(model_path) == (BACKEND_ONNXRUNTIME, onnx_path)
+        # ONNX Runtime arka ucu yalnızca CPU'da kullanılır
+        assert manager.get_inference_backend(model_path, 'cuda') == (BACKEND_ULTRALYTICS, model_path)
+
+    def test_missing_export_falls_back(self, manager):
+        """ONNX export'u yoksa ultralytics'e düşmeli"""
+        model_path = os.path.join(manager.models_dir, "olive.pt")
+        open(model_path, 'wb').close()
+        with open(os.path.join(manager.models_dir, "olive_info.json"), 'w') as f:
+            json.dump({'backend': BACKEND_ONNXRUNTIME}, f)
+
+        assert manager.get_inference_backend(model_path) == (BACKEND_ULTRALYTICS, model_path)
+
+    def test_list_models_reports_backend(self, manager):
+        """Model listesi bilgi dosyasını ve arka ucu içermeli"""
+        model_path = os.path.join(manager.models_dir, "olive.pt")
+        open(model_path, 'wb').close()
+        with open(os.path.join(manager.models_dir, "olive_info.json"), 'w') as f:
+            json.dump({'metrics': {'mAP50': 0.8}}, f)
+
+        models = manager.list_available_models()
+
+        assert models[0]['metrics']['mAP50'] == 0.8
+        assert models[0]['backend'] == BACKEND_ULTRALYTICS
+
+    def test_unknown_backend_rejected(self, manager):
+        """Bilinmeyen arka uç reddedilmeli"""
+        with pytest.raises(ValueError):
+            manager.set_model_backend("olive", "tensorrt")
+
+class TestQuantizedVariant:
+    """INT8 varyant seçimi testleri"""
+
+    @pytest.fixture
+    def manager(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield ModelManager(models_dir=temp_dir)
+
+    @staticmethod
+    def _model_with_variant(manager, map_delta):
+        model_path = os.path.join(manager.models_dir, "olive.pt")
+        variant_path = os.path.join(manager.models_dir, "olive_int8.onnx")
+        open(model_path, 'wb').close()
+        open(variant_path, 'wb').close()
+        update_model_info(model_path, {'variants': {'int8': {'path': variant_path, 'map_delta': map_delta}}})
+        return model_path, variant_path
+
+    def test_variant_within_tolerance(self, manager):
+        """Tolerans içindeki INT8 varyantı seçilmeli"""
+        model_path, variant_path = self._model_with_variant(manager, 0.004)
+
+        with patch.object(settings, 'QUANTIZED_MAX_MAP_DROP', 0.01):
+            assert manager.get_quantized_variant(model_path) == variant_path
+
+    def test_variant_outside_tolerance(self, manager):
+        """Doğruluk kaybı toleransı aşıyorsa veya ölçülmemişse varyant kullanılmamalı"""
+        model_path, _ = self._model_with_variant(manager, 0.05)
+
+        with patch.object(settings, 'QUANTIZED_MAX_MAP_DROP', 0.01):
+            assert manager.get_quantized_variant(model_path) is None
+
+        model_path, _ = self._model_with_variant(manager, None)
+        assert manager.get_quantized_variant(model_path) is None
+
+    def test_variant_disabled(self, manager):
+        """Ayar kapalıysa varyant kullanılmamalı"""
+        model_path, _ = self._model_with_variant(manager, 0.0)
+
+        with patch.object(settings, 'QUANTIZED_MODELS_ENABLED', False):
+            assert manager.get_quantized_variant(model_path) is None
+
+    def test_analyzer_prefers_variant_in_cpu_mode(self, manager):
+        """Analizci CPU modunda INT8 varyantını ONNX Runtime ile yüklemeli"""
+        from app.ai_analysis import ZeytinAnalizci
+
+        model_path, variant_path = self._model_with_variant(manager, 0.0)
+        analizci = ZeytinAnalizci()
+        analizci.analysis_mode = "cpu"
+
+        with patch('app.ai_analysis.model_manager', manager), \
+             patch('app.ai_analysis.model_registry') as registry:
+            analizci._model_getir(model_path, 'cpu')
+
+        assert registry.get_or_load.call_args[0][0] == variant_path
+        assert analizci.backend_name == BACKEND_ONNXRUNTIME
+
+    def test_delete_removes_variants(self, manager):
+        """Model silinirken ONNX export'u ve INT8 varyantı da silinmeli, önbellekten düşürülmeli"""
+        model_path = os.path.join(manager.models_dir, "olive.pt")
+        onnx_path = os.path.join(manager.models_dir, "olive.onnx")
+        open(model_path, 'wb').close()
+        trainer = ZeytinModelTrainer()
+
+        def sahte_export(path, export_format='onnx', **kwargs):
+            open(onnx_path, 'wb').close()
+            update_model_info(path, {'onnx_path': onnx_path})
+            return onnx_path
+
+        def sahte_quantize(input_path, output_path, **kwargs):
+            with open(output_path, 'wb') as f:
+                f.write(b"int8")
+
+        with patch.object(trainer, 'export_model', sahte_export), \
+             patch.object(trainer, '_onnx_latency_ms', return_value=1.0), \
+             patch('onnxruntime.quantization.quantize_dynamic', sahte_quantize):
+            variant_info = trainer.quantize_model(model_path)
+
+        variant_path = variant_info['model_path']
+        assert load_model_info(model_path)['variants']['int8']['path'] == variant_path
+
+        with patch('app.models.model_registry') as registry:
+            assert manager.delete_model("olive") is True
+
+        invalidated = {call.args[0] for call in registry.invalidate.call_args_list}
+        assert {model_path, onnx_path, variant_path} <= invalidated
+        assert os.listdir(manager.models_dir) == []
+
+class TestModelSelection:
+    """Gecikme / bellek bütçeli model seçimi testleri"""
+
+    # Model adı -> (mAP50, görsel başına gecikme ms)
+    MODELS = {'big': (0.9, 30.0), 'small': (0.7, 2.0)}
+
+    @pytest.fixture
+    def manager(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = ModelManager(models_dir=temp_dir)
+            for name, (map50, _) in self.MODELS.items():
+                model_path = os.path.join(temp_dir, f"{name}.pt")
+                open(model_path, 'wb').close()
+                update_model_info(model_path, {'metrics': {'mAP50': map50}})
+            manager._load_for_benchmark = MagicMock(side_effect=self._fake_loader)
+            yield manager
+
+    def _fake_loader(self, model_path, device):
+        gecikme = self.MODELS[os.path.splitext(os.path.basename(model_path))[0]][1] / 1000
+        backend = MagicMock()
+        backend.predict.side_effect = lambda images, conf: time.sleep(gecikme) or []
+        return backend
+
+    def test_benchmark_stored_in_info(self, manager):
+        """Ölçüm sonucu bu sunucu anahtarıyla bilgi dosyasına yazılmalı, model değişince geçersizleşmeli"""
+        model_path = os.path.join(manager.models_dir, "big.pt")
+
+        result = manager.benchmark_model(model_path, runs=2)
+
+        assert result['latency_ms'] >= 30.0
+        assert result['runs'] == 2
+        assert load_model_info(model_path)['benchmarks'][benchmark_host_key('cpu')] == result
+        assert manager.get_benchmark(model_path) == result
+
+        with open(model_path, 'wb') as f:
+            f.write(b"yeni agirliklar")
+        assert manager.get_benchmark(model_path) is None
+
+    def test_selection_under_budget(self, manager):
+        """Bütçe yoksa en doğru, bütçe varsa bütçeye sığan en doğru model seçilmeli"""
+        with patch.object(settings, 'MODEL_BENCHMARK_RUNS', 1):
+            assert manager.get_best_model().endswith("big.pt")
+            assert manager.get_best_model(max_latency_ms=15).endswith("small.pt")
+            assert manager.get_best_model(max_latency_ms=1000).endswith("big.pt")
+            # Hiçbiri sığmıyorsa en hızlı model
+            assert manager.get_best_model(max_latency_ms=0.5).endswith("small.pt")
+
+    def test_selection_cached_until_models_change(self, manager):
+        """Seçim önbellekten dönmeli; model kümesi değişince yeniden hesaplanmalı"""
+        with patch.object(settings, 'MODEL_BENCHMARK_RUNS', 1):
+            manager.get_best_model(max_latency_ms=15)
+            yukleme_sayisi = manager._load_for_benchmark.call_count
+            assert yukleme_sayisi == 2
+
+            with patch.object(manager, '_select_model') as select:
+                manager.get_best_model(max_latency_ms=15)
+                select.assert_not_called()
+
+            new_path = os.path.join(manager.models_dir, "tiny.pt")
+            open(new_path, 'wb').close()
+            update_model_info(new_path, {'metrics': {'mAP50': 0.75}})
+            self.MODELS['tiny'] = (0.75, 1.0)
+            try:
+                assert manager.get_best_model(max_latency_ms=15).endswith("tiny.pt")
+            finally:
+                del self.MODELS['tiny']
+            # Yalnızca yeni model ölçülmeli
+            assert manager._load_for_benchmark.call_count == yukleme_sayisi + 1
+
+    def test_status_lookup_does_not_benchmark(self, manager):
+        """benchmark_missing=False ölçüm yapmamalı, mAP50'ye göre seçmeli"""
+        assert manager.get_best_model(max_latency_ms=15, benchmark_missing=False).endswith("big.pt")
+        manager._load_for_benchmark.assert_not_called()
+
+class TestModelIndex:
+    """Model dizini indeksi testleri"""
+
+    @pytest.fixture
+    def models_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(3):
+                model_path = os.path.join(temp_dir, f"olive_v{i}.pt")
+                open(model_path, 'wb').close()
+                update_model_info(model_path, {'metrics': {'mAP50': 0.5 + i / 10}})
+            yield temp_dir
+
+    def test_unchanged_directory_is_not_rescanned(self, models_dir):
+        """Dizin değişmediyse listeleme ve seçim dizini taramamalı"""
+        manager = ModelManager(models_dir=models_dir)
+        assert len(manager.list_available_models()) == 3
+
+        with patch('app.models.os.scandir') as scandir, patch('app.models.load_model_info') as load_info:
+            assert len(manager.list_available_models()) == 3
+            assert manager.get_best_model().endswith("olive_v2.pt")
+            assert manager.get_best_model().endswith("olive_v2.pt")
+            scandir.assert_not_called()
+            load_info.assert_not_called()
+
+    def test_index_follows_changes(self, models_dir):
+        """Yeni model, bilgi güncellemesi ve silme indekse yansımalı"""
+        manager = ModelManager(models_dir=models_dir)
+        assert manager.get_best_model().endswith("olive_v2.pt")
+
+        new_path = os.path.join(models_dir, "olive_v3.pt")
+        open(new_path, 'wb').close()
+        update_model_info(new_path, {'metrics': {'mAP50': 0.95}})
+        assert manager.get_best_model().endswith("olive_v3.pt")
+
+        update_model_info(new_path, {'metrics': {'mAP50': 0.1}})
+        assert manager.get_best_model().endswith("olive_v2.pt")
+
+        manager.delete_model("olive_v2")
+        assert manager.get_best_model().endswith("olive_v1.pt")
+        assert len(manager.list_available_models()) == 3
+
+    def test_external_edit_seen_after_rescan_interval(self, models_dir):
+        """Başka süreçte yerinde düzenlenen bilgi dosyası yeniden tarama aralığında görülmeli"""
+        manager = ModelManager(models_dir=models_dir)
+        manager.list_available_models()
+
+        info_path = os.path.join(models_dir, "olive_v0_info.json")
+        with open(info_path, 'w') as f:
+            json.dump({'metrics': {'mAP50': 0.99}}, f)
+        os.utime(info_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+
+        with patch.object(settings, 'MODEL_INDEX_RESCAN_SECONDS', 0):
+            assert manager.get_best_model().endswith("olive_v0.pt")
+
+    def test_manifest_reused_after_restart(self, models_dir):
+        """Yeni yönetici manifestten başlamalı, yalnızca değişen modeli okumalı"""
+        ModelManager(models_dir=models_dir).list_available_models()
+        assert os.path.exists(os.path.join(models_dir, ".model_index.json"))
+
+        update_model_info(os.path.join(models_dir, "olive_v1.pt"), {'metrics': {'mAP50': 0.99}})
+        manager = ModelManager(models_dir=models_dir)
+        with patch('app.models.load_model_info', wraps=load_model_info) as load_info:
+            assert manager.get_best_model().endswith("olive_v1.pt")
+        assert load_info.call_count == 1
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
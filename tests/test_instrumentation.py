@@ -0,0 +1,148 @@
+import pytest
+import os
+import sys
+import asyncio
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db
+from app.instrumentation import (
+    AnalysisInstrumentation, AnalysisMetricsStore, ASAMA_OKUMA, ASAMA_CIKARIM, ASAMA_YAZMA,
+    ASAMA_MODEL_YUKLEME, ASAMA_DOSYA_LISTELEME, ASAMA_BANT_OKUMA, ASAMA_INDEKS, ASAMA_GEOJSON
+)
+
+class TestAnalysisInstrumentation:
+    """Analiz başına aşama ölçümü testleri"""
+
+    def test_histogram_buckets(self):
+        """Gözlemler doğru kovaya düşmeli, özet sayı/toplam/min/maks vermeli"""
+        olcum = AnalysisInstrumentation(kovalar=(0.1, 1.0))
+        for sure in (0.05, 0.1, 0.5, 2.0):
+            olcum.gozlem(ASAMA_OKUMA, sure)
+
+        ozet = olcum.to_dict()
+        okuma = ozet['stages'][ASAMA_OKUMA]
+        assert ozet['buckets'] == [0.1, 1.0]
+        assert okuma['counts'] == [2, 1, 1]
+        assert okuma['count'] == 4
+        assert okuma['sum'] == pytest.approx(2.65)
+        assert okuma['min'] == 0.05 and okuma['max'] == 2.0
+        assert okuma['mean'] == pytest.approx(2.65 / 4)
+
+    def test_timer_records_on_error(self):
+        """Hata fırlatan blok da ölçülmeli; sayaçlar birikmeli"""
+        olcum = AnalysisInstrumentation()
+        with pytest.raises(ValueError):
+            with olcum.olc(ASAMA_CIKARIM):
+                raise ValueError("model hatası")
+        olcum.say('detections', 3)
+        olcum.say('detections', 2)
+
+        ozet = olcum.to_dict()
+        assert ozet['stages'][ASAMA_CIKARIM]['count'] == 1
+        assert ozet['counters'] == {'detections': 5}
+
+class TestAnalysisMetricsStore:
+    """Süreçler arası aşama toplamları testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_patch = patch('app.config.settings.DATABASE_URL', os.path.join(self.temp_dir, "test.db"))
+        self.db_patch.start()
+        init_db()
+        self.store = AnalysisMetricsStore()
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        self.db_patch.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _olcum(*sureler) -> dict:
+        olcum = AnalysisInstrumentation(kovalar=(0.1, 1.0))
+        for sure in sureler:
+            olcum.gozlem(ASAMA_YAZMA, sure)
+        olcum.say('rgb_files', len(sureler))
+        return olcum.to_dict()
+
+    def test_flush_merges_runs(self):
+        """Farklı analizlerin ölçümleri toplanmalı"""
+        self.store.flush(self._olcum(0.05, 0.5))
+        self.store.flush(self._olcum(0.05, 5.0))
+
+        veri = self.store.load()
+        yazma = veri['stages'][ASAMA_YAZMA]
+        assert yazma['count'] == 4
+        assert yazma['sum'] == pytest.approx(5.6)
+        assert yazma['buckets'] == {'0.1': 2, '1.0': 1, '+Inf': 1}
+        assert veri['counters'] == {'rgb_files': 4}
+
+    def test_prometheus_lines(self):
+        """Kovalar kümülatif, +Inf kovası toplam sayıya eşit olmalı"""
+        self.store.flush(self._olcum(0.05, 0.5, 5.0))
+
+        satirlar = self.store.prometheus_lines()
+        assert '# TYPE zeytin_analysis_stage_seconds histogram' in satirlar
+        assert 'zeytin_analysis_stage_seconds_bucket{stage="imwrite",le="0.1"} 1' in satirlar
+        assert 'zeytin_analysis_stage_seconds_bucket{stage="imwrite",le="1.0"} 2' in satirlar
+        assert 'zeytin_analysis_stage_seconds_bucket{stage="imwrite",le="+Inf"} 3' in satirlar
+        assert 'zeytin_analysis_stage_seconds_count{stage="imwrite"} 3' in satirlar
+        assert 'zeytin_analysis_events_total{event="rgb_files"} 3' in satirlar
+
+    def test_disabled_and_reset(self):
+        """Kapalı kayıt yazmamalı; reset toplamları silmeli"""
+        AnalysisMetricsStore(enabled=False).flush(self._olcum(0.5))
+        assert self.store.load() == {'stages': {}, 'counters': {}}
+        assert self.store.prometheus_lines() == []
+
+        self.store.flush(self._olcum(0.5))
+        assert self.store.reset() > 0
+        assert self.store.load()['stages'] == {}
+
+class TestAnalyzerInstrumentation:
+    """Analizcinin aşama ölçümleri testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_patch = patch('app.config.settings.DATABASE_URL', os.path.join(self.temp_dir, "test.db"))
+        self.db_patch.start()
+        init_db()
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        self.db_patch.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_analysis_reports_stages(self):
+        """Analiz sonucu ve toplamlar sıcak yol aşamalarını içermeli"""
+        from benchmarks.synthetic import generate_dataset
+        from benchmarks.stub_backend import StubDetector
+        from benchmarks.analysis_benchmark import BenchmarkAnalizci
+        from app.instrumentation import analysis_metrics
+
+        yukleme = os.path.join(self.temp_dir, "yuklenen_dosyalar")
+        analiz = os.path.join(self.temp_dir, "analiz")
+        os.makedirs(analiz)
+        generate_dataset(yukleme, [(320, 240)], rgb_sayisi=2, multispektral_sayisi=1)
+
+        analizci = BenchmarkAnalizci(StubDetector())
+        with patch.object(analysis_metrics, 'enabled', True):
+            sonuclar = asyncio.run(analizci.analiz_yap(yukleme, analiz, os.path.join(analiz, "log.txt")))
+
+        ozet = sonuclar['enstrumantasyon']
+        for asama in (ASAMA_MODEL_YUKLEME, ASAMA_DOSYA_LISTELEME, ASAMA_OKUMA, ASAMA_CIKARIM,
+                      ASAMA_YAZMA, ASAMA_BANT_OKUMA, ASAMA_INDEKS, ASAMA_GEOJSON):
+            assert ozet['stages'][asama]['count'] > 0, asama
+        assert ozet['stages'][ASAMA_OKUMA]['count'] == 2
+        assert ozet['counters']['rgb_files'] == 2
+        assert analysis_metrics.load()['stages'][ASAMA_OKUMA]['count'] == 2
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,196 @@
+import pytest
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, create_analysis, get_db_connection
+from app.job_queue import JobQueue, JobRunner, JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from app.cancellation import AnalysisCancelled, NEDEN_IPTAL
+
+class TestJobQueue:
+    """Kalıcı analiz iş kuyruğu testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_patch = patch('app.config.settings.DATABASE_URL', os.path.join(self.temp_dir, "test.db"))
+        self.db_patch.start()
+        init_db()
+        for analiz_id in ("a1", "a2", "a3"):
+            create_analysis(analiz_id, 1)
+        self.queue = JobQueue()
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        self.db_patch.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _expire(self, job_id: str):
+        conn = get_db_connection()
+        conn.execute('UPDATE analysis_jobs SET lease_expires = ? WHERE job_id = ?', (time.time() - 1, job_id))
+        conn.commit()
+        conn.close()
+
+    def test_claim_by_priority(self):
+        """Önce yüksek öncelikli, eşitlikte önce eklenen iş alınmalı"""
+        ilk = self.queue.enqueue("a1")
+        ikinci = self.queue.enqueue("a2")
+        acil = self.queue.enqueue("a3", oncelik=5)
+
+        assert self.queue.position(acil) == 0
+        assert self.queue.position(ikinci) == 2
+
+        sirayla = [self.queue.claim("w1", 60)['job_id'] for _ in range(3)]
+
+        assert sirayla == [acil, ilk, ikinci]
+        assert self.queue.claim("w1", 60) is None
+
+    def test_claim_marks_running(self):
+        """Talep edilen iş çalışıyor durumuna geçmeli ve başka worker'a verilmemeli"""
+        job_id = self.queue.enqueue("a1", payload={'kullanici_adi': 'admin'})
+
+        job = self.queue.claim("w1", 60)
+
+        assert job['job_id'] == job_id
+        assert job['durum'] == JOB_RUNNING
+        assert job['deneme'] == 1
+        assert job['lease_owner'] == "w1"
+        assert job['payload'] == {'kullanici_adi': 'admin'}
+        assert self.queue.claim("w2", 60) is None
+
+    def test_only_owner_updates(self):
+        """Kirası başka worker'a geçmiş işi eski worker güncelleyememeli"""
+        job_id = self.queue.enqueue("a1")
+        self.queue.claim("w1", 60)
+
+        assert self.queue.heartbeat(job_id, "w2", 60) is False
+        assert self.queue.complete(job_id, "w2") is False
+        assert self.queue.heartbeat(job_id, "w1", 60) is True
+        assert self.queue.complete(job_id, "w1") is True
+        assert self.queue.get(job_id)['durum'] == JOB_DONE
+
+    def test_expired_lease_requeued(self):
+        """Kirası dolan iş tekrar kuyruğa alınmalı, deneme hakkı bitince hatalı işaretlenmeli"""
+        job_id = self.queue.enqueue("a1", max_deneme=2)
+
+        self.queue.claim("w1", 60)
+        self._expire(job_id)
+        assert self.queue.requeue_expired() == 1
+        assert self.queue.get(job_id)['durum'] == JOB_PENDING
+
+        job = self.queue.claim("w2", 60)
+        assert job['deneme'] == 2
+        assert self.queue.complete(job_id, "w1") is False
+
+        self._expire(job_id)
+        assert self.queue.requeue_expired() == 0
+        job = self.queue.get(job_id)
+        assert job['durum'] == JOB_FAILED
+        assert job['hata_mesaji']
+
+    def test_release_keeps_attempt(self):
+        """Kuyruğa bırakılan iş deneme hakkını kaybetmemeli"""
+        job_id = self.queue.enqueue("a1")
+        self.queue.claim("w1", 60)
+
+        assert self.queue.release(job_id, "w1") is True
+
+        job = self.queue.get(job_id)
+        assert job['durum'] == JOB_PENDING
+        assert job['deneme'] == 0
+        assert self.queue.get_stats()[JOB_PENDING] == 1
+
+    def test_cancel_pending(self):
+        """Bekleyen iş iptal edilmeli, çalışan iş etkilenmemeli"""
+        bekleyen = self.queue.enqueue("a1")
+        calisan = self.queue.enqueue("a2", oncelik=1)
+        self.queue.claim("w1", 60)
+
+        assert self.queue.cancel_pending("a1") == 1
+        assert self.queue.cancel_pending("a2") == 0
+
+        assert self.queue.get(bekleyen)['durum'] == JOB_CANCELLED
+        assert self.queue.get(calisan)['durum'] == JOB_RUNNING
+        assert self.queue.claim("w2", 60) is None
+
+    @pytest.mark.asyncio
+    async def test_runner_marks_cancelled(self):
+        """Analiz durdurulursa iş hata değil iptal olarak işaretlenmeli"""
+        job_id = self.queue.enqueue("a1")
+
+        async def handler(job):
+            raise AnalysisCancelled(NEDEN_IPTAL, "Analiz kullanıcı tarafından iptal edildi")
+
+        runner = JobRunner(self.queue, handler, lease_seconds=5, poll_interval=0.05)
+        runner.start()
+        try:
+            for _ in range(100):
+                if runner.get_stats()['cancelled']:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await runner.stop()
+
+        job = self.queue.get(job_id)
+        assert job['durum'] == JOB_CANCELLED
+        assert job['hata_mesaji'] == "Analiz kullanıcı tarafından iptal edildi"
+        assert runner.get_stats()['failed'] == 0
+
+    @pytest.mark.asyncio
+    async def test_runner_completes_and_fails(self):
+        """Runner işleri çalıştırmalı; hata veren iş tekrar denenmeden hatalı işaretlenmeli"""
+        tamam = self.queue.enqueue("a1")
+        hatali = self.queue.enqueue("a2")
+        calisan = []
+
+        async def handler(job):
+            calisan.append(job['analiz_id'])
+            if job['analiz_id'] == "a2":
+                raise RuntimeError("model yüklenemedi")
+
+        runner = JobRunner(self.queue, handler, lease_seconds=5, poll_interval=0.05)
+        runner.start()
+        try:
+            for _ in range(100):
+                if runner.get_stats()['completed'] + runner.get_stats()['failed'] == 2:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            await runner.stop()
+
+        assert calisan == ["a1", "a2"]
+        assert self.queue.get(tamam)['durum'] == JOB_DONE
+        job = self.queue.get(hatali)
+        assert job['durum'] == JOB_FAILED
+        assert job['hata_mesaji'] == "model yüklenemedi"
+
+    @pytest.mark.asyncio
+    async def test_runner_stop_releases_job(self):
+        """Kapanışta çalışan iş kuyruğa geri bırakılmalı"""
+        job_id = self.queue.enqueue("a1")
+        basladi = asyncio.Event()
+
+        async def handler(job):
+            basladi.set()
+            await asyncio.sleep(60)
+
+        runner = JobRunner(self.queue, handler, lease_seconds=5, poll_interval=0.05)
+        runner.start()
+        await asyncio.wait_for(basladi.wait(), 2)
+        await runner.stop()
+
+        job = self.queue.get(job_id)
+        assert job['durum'] == JOB_PENDING
+        assert job['deneme'] == 0
+        assert runner.get_stats()['released'] == 1
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
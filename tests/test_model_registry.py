@@ -0,0 +1,141 @@
+import pytest
+import os
+import sys
+import time
+import tempfile
+import shutil
+from unittest.mock import MagicMock
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.model_registry import ModelRegistry
+
+class TestModelRegistry:
+    """Süreç genelindeki model önbelleği testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_a = self._create_model_file("model_a.pt", b"a" * 1024)
+        self.model_b = self._create_model_file("model_b.pt", b"b" * 2048)
+        self.loader = MagicMock(side_effect=lambda path, device: MagicMock(name=f"{path}:{device}"))
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_model_file(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_second_lookup_is_cache_hit(self):
+        """Aynı model ikinci kez diskten okunmamalı"""
+        registry = ModelRegistry(max_models=2, max_memory_mb=10)
+
+        first = registry.get_or_load(self.model_a, "cpu", self.loader)
+        second = registry.get_or_load(self.model_a, "cpu", self.loader)
+
+        assert first is second
+        assert self.loader.call_count == 1
+
+        stats = registry.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['loads'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_device_is_part_of_key(self):
+        """Farklı cihazlar ayrı önbellek kaydı kullanmalı"""
+        registry = ModelRegistry(max_models=2, max_memory_mb=10)
+
+        cpu_model = registry.get_or_load(self.model_a, "cpu", self.loader)
+        cuda_model = registry.get_or_load(self.model_a, "cuda", self.loader)
+
+        assert cpu_model is not cuda_model
+        assert self.loader.call_count == 2
+
+    def test_lru_eviction_by_count(self):
+        """Model sayısı limiti aşılınca en eski model çıkarılmalı"""
+        registry = ModelRegistry(max_models=1, max_memory_mb=10)
+
+        registry.get_or_load(self.model_a, "cpu", self.loader)
+        registry.get_or_load(self.model_b, "cpu", self.loader)
+        registry.get_or_load(self.model_a, "cpu", self.loader)
+
+        stats = registry.get_stats()
+        assert self.loader.call_count == 3
+        assert stats['resident_models'] == 1
+        assert stats['evictions'] == 2
+
+    def test_memory_budget_eviction(self):
+        """Bellek bütçesi aşılınca en eski model çıkarılmalı"""
+        registry = ModelRegistry(max_models=5, max_memory_mb=2.5 / 1024)  # 2.5KB
+
+        registry.get_or_load(self.model_a, "cpu", self.loader)
+        registry.get_or_load(self.model_b, "cpu", self.loader)
+
+        stats = registry.get_stats()
+        assert stats['resident_models'] == 1
+        assert stats['models'][0]['path'] == os.path.abspath(self.model_b)
+
+    def test_file_change_reloads_model(self):
+        """Dosya değişirse (mtime/boyut) model yeniden yüklenmeli"""
+        registry = ModelRegistry(max_models=2, max_memory_mb=10)
+
+        registry.get_or_load(self.model_a, "cpu", self.loader)
+
+        with open(self.model_a, 'wb') as f:
+            f.write(b"c" * 4096)
+        os.utime(self.model_a, (time.time() + 10, time.time() + 10))
+
+        registry.get_or_load(self.model_a, "cpu", self.loader)
+
+        stats = registry.get_stats()
+        assert self.loader.call_count == 2
+        assert stats['resident_models'] == 1
+
+    def test_invalidate(self):
+        """Geçersiz kılınan model önbellekten silinmeli"""
+        registry = ModelRegistry(max_models=2, max_memory_mb=10)
+
+        registry.get_or_load(self.model_a, "cpu", self.loader)
+        registry.get_or_load(self.model_b, "cpu", self.loader)
+        registry.invalidate(self.model_a)
+
+        stats = registry.get_stats()
+        assert stats['resident_models'] == 1
+        assert stats['invalidations'] == 1
+
+        registry.get_or_load(self.model_a, "cpu", self.loader)
+        assert self.loader.call_count == 3
+
+    def test_missing_file_is_not_cached(self):
+        """İmzası alınamayan dosyalar önbelleğe alınmamalı"""
+        registry = ModelRegistry(max_models=2, max_memory_mb=10)
+        missing = os.path.join(self.temp_dir, "missing.pt")
+
+        registry.get_or_load(missing, "cpu", self.loader)
+        registry.get_or_load(missing, "cpu", self.loader)
+
+        assert self.loader.call_count == 2
+        assert registry.get_stats()['resident_models'] == 0
+
+    def test_load_error_is_counted(self):
+        """Yükleme hataları sayılmalı ve yukarı iletilmeli"""
+        registry = ModelRegistry(max_models=2, max_memory_mb=10)
+        failing_loader = MagicMock(side_effect=RuntimeError("bozuk model"))
+
+        with pytest.raises(RuntimeError):
+            registry.get_or_load(self.model_a, "cpu", failing_loader)
+
+        stats = registry.get_stats()
+        assert stats['load_errors'] == 1
+        assert stats['resident_models'] == 0
+        assert registry._load_locks == {}
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,346 @@
+import pytest
+import os
+import sys
+import tempfile
+import shutil
+import yaml
+import cv2
+import numpy as np
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import ZeytinModelTrainer, ONLINE_AUGMENTATION
+from app.dataset_cache import DatasetImageCache
+
+class _FakeTransform:
+    """albumentations yerine: yatay çevirme + tohuma bağlı parlaklık"""
+
+    def __call__(self, image, bboxes, class_labels):
+        parlaklik = int(np.random.randint(0, 40))
+        return {
+            'image': np.clip(image[:, ::-1].astype(np.int16) + parlaklik, 0, 255).astype(np.uint8),
+            'bboxes': [[1 - x, y, w, h] for x, y, w, h in bboxes],
+            'class_labels': class_labels
+        }
+
+def _fake_pipeline():
+    return _FakeTransform()
+
+class TestPrepareDataset:
+    """Eğitim veri seti hazırlama testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.images_dir = os.path.join(self.temp_dir, "kaynak", "images")
+        self.labels_dir = os.path.join(self.temp_dir, "kaynak", "labels")
+        self.output_dir = os.path.join(self.temp_dir, "veri_seti")
+        os.makedirs(self.images_dir)
+        os.makedirs(self.labels_dir)
+        for i in range(10):
+            self._add_image(f"ucus_{i:02d}", "jpg" if i % 2 else "JPG")
+        self.trainer = ZeytinModelTrainer()
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _add_image(self, stem: str, ext: str = "jpg"):
+        with open(os.path.join(self.images_dir, f"{stem}.{ext}"), 'wb') as f:
+            f.write(b"\xff\xd8" + stem.encode())
+        with open(os.path.join(self.labels_dir, f"{stem}.txt"), 'w') as f:
+            f.write("0 0.5 0.5 0.2 0.2\n")
+
+    def _split_files(self, output_dir: str = None) -> dict:
+        output_dir = output_dir or self.output_dir
+        return {split: sorted(os.listdir(os.path.join(output_dir, 'images', split)))
+                for split in ('train', 'val', 'test')}
+
+    def test_hardlink_mode(self):
+        """Görseller ve etiketler kopyalanmadan bağlanmalı, bölümleme 80/10/10 olmalı"""
+        config_path = self.trainer.prepare_dataset(self.images_dir, self.labels_dir, self.output_dir,
+                                                   mode="hardlink")
+
+        bolumler = self._split_files()
+        assert [len(bolumler[s]) for s in ('train', 'val', 'test')] == [8, 1, 1]
+        ornek = bolumler['train'][0]
+        assert os.path.samefile(os.path.join(self.output_dir, 'images', 'train', ornek),
+                                os.path.join(self.images_dir, ornek))
+        assert os.path.exists(os.path.join(self.output_dir, 'labels', 'train',
+                                           os.path.splitext(ornek)[0] + '.txt'))
+        with open(config_path) as f:
+            assert yaml.safe_load(f)['train'] == 'images/train'
+
+    def test_split_is_deterministic(self):
+        """Aynı dosyalar her çalıştırmada aynı bölüme düşmeli"""
+        ikinci = os.path.join(self.temp_dir, "ikinci")
+        self.trainer.prepare_dataset(self.images_dir, self.labels_dir, self.output_dir, mode="symlink")
+        self.trainer.prepare_dataset(self.images_dir, self.labels_dir, ikinci, mode="copy")
+
+        assert self._split_files() == self._split_files(ikinci)
+        assert os.path.islink(os.path.join(self.output_dir, 'images', 'train', self._split_files()['train'][0]))
+
+    def test_incremental_rerun(self):
+        """Tekrar çalıştırmada değişmeyen dosyalar atlanmalı, eskiyen dosyalar silinmeli"""
+        self.trainer.prepare_dataset(self.images_dir, self.labels_dir, self.output_dir, mode="copy")
+
+        with patch('app.models.shutil.copy2') as copy2:
+            self.trainer.prepare_dataset(self.images_dir, self.labels_dir, self.output_dir, mode="copy")
+            copy2.assert_not_called()
+
+        os.remove(os.path.join(self.images_dir, "ucus_03.jpg"))
+        self._add_image("ucus_10")
+        self.trainer.prepare_dataset(self.images_dir, self.labels_dir, self.output_dir, mode="copy")
+
+        tum_dosyalar = sum(self._split_files().values(), [])
+        assert "ucus_03.jpg" not in tum_dosyalar
+        assert "ucus_10.jpg" in tum_dosyalar
+        assert len(tum_dosyalar) == 10
+
+    def test_manifest_mode(self):
+        """Manifest modu dosya listeleri yazmalı, görselleri taşımamalı"""
+        config_path = self.trainer.prepare_dataset(self.images_dir, self.labels_dir, self.output_dir,
+                                                   mode="manifest")
+
+        with open(config_path) as f:
+            config = yaml.safe_load(f)
+        assert config['train'] == 'train.txt'
+        with open(os.path.join(self.output_dir, 'train.txt')) as f:
+            satirlar = f.read().split()
+        assert len(satirlar) == 8
+        assert all(os.path.dirname(p) == os.path.abspath(self.images_dir) for p in satirlar)
+        assert not os.path.exists(os.path.join(self.output_dir, 'images'))
+
+    def test_manifest_requires_yolo_layout(self):
+        """Etiketler YOLO'nun arayacağı yerde değilse manifest modu reddedilmeli"""
+        baska_etiketler = os.path.join(self.temp_dir, "etiketler")
+        shutil.copytree(self.labels_dir, baska_etiketler)
+
+        with pytest.raises(ValueError):
+            self.trainer.prepare_dataset(self.images_dir, baska_etiketler, self.output_dir, mode="manifest")
+        with pytest.raises(ValueError):
+            self.trainer.prepare_dataset(self.images_dir, self.labels_dir, self.output_dir, mode="rsync")
+
+class TestAugmentDataset:
+    """Veri artırma motoru testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.trainer = ZeytinModelTrainer()
+        self.dataset = self._dataset(os.path.join(self.temp_dir, "veri_seti"))
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _dataset(path: str, adet: int = 5) -> str:
+        img_dir = os.path.join(path, 'images', 'train')
+        label_dir = os.path.join(path, 'labels', 'train')
+        os.makedirs(img_dir)
+        os.makedirs(label_dir)
+        rng = np.random.default_rng(1)
+        for i in range(adet):
+            cv2.imwrite(os.path.join(img_dir, f"agac_{i}.jpg"), rng.integers(0, 255, (32, 48, 3), dtype=np.uint8))
+            with open(os.path.join(label_dir, f"agac_{i}.txt"), 'w') as f:
+                f.write("0 0.25 0.5 0.1 0.2\n")
+        return path
+
+    def _outputs(self, path: str) -> dict:
+        img_dir = os.path.join(path, 'images', 'train')
+        return {name: cv2.imread(os.path.join(img_dir, name)) for name in sorted(os.listdir(img_dir)) if '_aug_' in name}
+
+    def test_serial_augmentation_reports_progress(self):
+        """Her görsel için factor kadar çıktı yazılmalı; ilerleme parça başına bildirilmeli"""
+        olaylar = []
+        with patch('app.config.settings.AUGMENT_CHUNK_SIZE', 2):
+            stats = self.trainer.augment_dataset(self.dataset, augmentation_factor=2, mode="offline", workers=1,
+                                                 progress_callback=olaylar.append, pipeline_factory=_fake_pipeline)
+
+        assert stats['images'] == 5 and stats['augmented'] == 10 and stats['failed'] == 0
+        assert stats['images_per_s'] > 0
+        assert [o['images'] for o in olaylar] == [2, 4, 5]
+        assert len(self._outputs(self.dataset)) == 10
+        with open(os.path.join(self.dataset, 'labels', 'train', 'agac_0_aug_1.txt')) as f:
+            assert f.read().split()[1] == '0.75'
+
+        # Tekrar çalıştırmada önceki çıktılar girdi olmamalı
+        stats = self.trainer.augment_dataset(self.dataset, augmentation_factor=2, mode="offline", workers=1,
+                                             pipeline_factory=_fake_pipeline)
+        assert stats['images'] == 5
+
+    def test_process_pool_is_deterministic(self):
+        """Süreç havuzu seri çalıştırmayla aynı çıktıları üretmeli"""
+        ikinci = self._dataset(os.path.join(self.temp_dir, "ikinci"))
+        with patch('app.config.settings.AUGMENT_CHUNK_SIZE', 2):
+            self.trainer.augment_dataset(self.dataset, mode="offline", workers=1, seed=7,
+                                         pipeline_factory=_fake_pipeline)
+            stats = self.trainer.augment_dataset(ikinci, mode="offline", workers=2, seed=7,
+                                                 pipeline_factory=_fake_pipeline)
+
+        assert stats['workers'] == 2
+        seri, paralel = self._outputs(self.dataset), self._outputs(ikinci)
+        assert list(seri) == list(paralel)
+        assert all(np.array_equal(seri[name], paralel[name]) for name in seri)
+
+    def test_online_mode_writes_nothing(self):
+        """Online mod dosya yazmamalı, eğitim ayarlarını döndürmeli"""
+        sonuc = self.trainer.augment_dataset(self.dataset, mode="online")
+
+        assert sonuc['training_overrides'] == ONLINE_AUGMENTATION
+        assert self._outputs(self.dataset) == {}
+        with pytest.raises(ValueError):
+            self.trainer.augment_dataset(self.dataset, mode="streaming")
+
+    def test_manifest_dataset_augmentation(self):
+        """Manifest veri setinde kaynaklar değişmemeli; çıktılar listeye eklenmeli"""
+        kaynak = os.path.join(self.temp_dir, "kaynak")
+        os.makedirs(os.path.join(kaynak, 'images'))
+        os.makedirs(os.path.join(kaynak, 'labels'))
+        for ad in os.listdir(os.path.join(self.dataset, 'images', 'train')):
+            shutil.copy(os.path.join(self.dataset, 'images', 'train', ad), os.path.join(kaynak, 'images', ad))
+            etiket = os.path.splitext(ad)[0] + '.txt'
+            shutil.copy(os.path.join(self.dataset, 'labels', 'train', etiket), os.path.join(kaynak, 'labels', etiket))
+        manifest = os.path.join(self.temp_dir, "manifest")
+        config_path = self.trainer.prepare_dataset(os.path.join(kaynak, 'images'), os.path.join(kaynak, 'labels'),
+                                                   manifest, mode="manifest")
+        with open(os.path.join(manifest, 'train.txt')) as f:
+            kaynak_satirlar = f.read().split()
+
+        # Statik INT8 kalibrasyonu da liste üzerinden görselleri bulmalı
+        assert ZeytinModelTrainer._calibration_images(config_path, 100) == sorted(kaynak_satirlar)
+
+        for _ in range(2):
+            stats = self.trainer.augment_dataset(manifest, augmentation_factor=2, mode="offline", workers=1,
+                                                 pipeline_factory=_fake_pipeline)
+            assert stats['total_images'] == len(kaynak_satirlar) and stats['augmented'] == 2 * len(kaynak_satirlar)
+
+        assert sorted(os.listdir(os.path.join(kaynak, 'images'))) == [f"agac_{i}.jpg" for i in range(5)]
+        assert len(self._outputs(manifest)) == 2 * len(kaynak_satirlar)
+        with open(os.path.join(manifest, 'train.txt')) as f:
+            satirlar = f.read().split()
+        assert satirlar[:len(kaynak_satirlar)] == sorted(kaynak_satirlar)
+        assert len(satirlar) == 3 * len(kaynak_satirlar)
+        assert all(os.path.exists(os.path.join(manifest, 'labels', 'train', os.path.basename(p)[:-4] + '.txt'))
+                   for p in satirlar[len(kaynak_satirlar):])
+
+class TestDatasetImageCache:
+    """Önceden boyutlandırılmış eğitim görseli önbelleği testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = DatasetImageCache(os.path.join(self.temp_dir, "onbellek"), workers=2)
+        self.kaynak = os.path.join(self.temp_dir, "kaynak")
+        os.makedirs(os.path.join(self.kaynak, "images"))
+        os.makedirs(os.path.join(self.kaynak, "labels"))
+        rng = np.random.default_rng(3)
+        for i, (h, w) in enumerate([(300, 800), (900, 400), (50, 60)]):
+            cv2.imwrite(os.path.join(self.kaynak, "images", f"agac_{i}.png"),
+                        rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+            with open(os.path.join(self.kaynak, "labels", f"agac_{i}.txt"), 'w') as f:
+                f.write("0 0.5 0.5 0.2 0.2\n")
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _veri_seti(self, ad: str) -> str:
+        veri_seti = os.path.join(self.temp_dir, ad)
+        ZeytinModelTrainer().prepare_dataset(os.path.join(self.kaynak, "images"),
+                                             os.path.join(self.kaynak, "labels"), veri_seti, mode="copy")
+        return veri_seti
+
+    @staticmethod
+    def _diziler(veri_seti: str) -> dict:
+        sonuc = {}
+        for kok, _, dosyalar in os.walk(os.path.join(veri_seti, 'images')):
+            for ad in dosyalar:
+                if ad.endswith('.npy'):
+                    sonuc[ad] = os.path.join(kok, ad)
+        return sonuc
+
+    def test_arrays_are_resized_next_to_images(self):
+        """Uzun kenar imgsz'e küçültülmeli, küçük görsel büyütülmemeli"""
+        veri_seti = self._veri_seti("veri_seti")
+        stats = self.cache.prepare(veri_seti, imgsz=160)
+
+        assert stats['images'] == 3 and stats['built'] == 3 and stats['failed'] == 0
+        diziler = self._diziler(veri_seti)
+        boyutlar = {ad: np.load(yol).shape for ad, yol in diziler.items()}
+        assert boyutlar == {'agac_0.npy': (60, 160, 3), 'agac_1.npy': (160, 72, 3), 'agac_2.npy': (50, 60, 3)}
+
+        dizi = self.cache.load(os.path.join(self.kaynak, "images", "agac_0.png"), 160)
+        assert isinstance(dizi, np.memmap) and dizi.shape == (60, 160, 3)
+        assert self.cache.load(os.path.join(self.kaynak, "images", "agac_0.png"), 320) is None
+
+    def test_entries_are_shared_and_refreshed(self):
+        """Başka veri seti aynı kayıtları kullanmalı; değişen görsel yeniden oluşturulmalı"""
+        self.cache.prepare(self._veri_seti("ilk"), imgsz=160)
+        ikinci = self._veri_seti("ikinci")
+        stats = self.cache.prepare(ikinci, imgsz=160)
+        assert stats['built'] == 0 and stats['reused'] == 3
+        assert self.cache.get_stats()['entries'] == 3
+
+        # prepare_dataset tekrar çalışınca diziler silinmemeli
+        self._veri_seti("ikinci")
+        assert len(self._diziler(ikinci)) == 3
+
+        cv2.imwrite(os.path.join(self.kaynak, "images", "agac_2.png"), np.zeros((40, 40, 3), dtype=np.uint8))
+        os.remove(os.path.join(self.kaynak, "images", "agac_1.png"))
+        self._veri_seti("ikinci")
+        stats = self.cache.prepare(ikinci, imgsz=160)
+        assert stats['images'] == 2 and stats['built'] == 1 and stats['reused'] == 1
+        diziler = self._diziler(ikinci)
+        assert sorted(diziler) == ['agac_0.npy', 'agac_2.npy']
+        assert np.load(diziler['agac_2.npy']).shape == (40, 40, 3)
+
+    def test_changed_image_invalidates_array(self):
+        """ultralytics .npy'yi görsele bakmadan yükler; değişen görselin eski dizisi kalmamalı"""
+        veri_seti = self._veri_seti("veri_seti")
+        self.cache.prepare(veri_seti, imgsz=160)
+        gorsel = os.path.splitext(self._diziler(veri_seti)['agac_0.npy'])[0] + '.png'
+
+        # Görsel değişti ama yeni kayıt oluşturulamıyor: eski dizi silinmeli
+        with open(gorsel, 'wb') as f:
+            f.write(b"bozuk")
+        stats = self.cache.prepare(veri_seti, imgsz=160)
+        assert stats['failed'] == 1
+        assert 'agac_0.npy' not in self._diziler(veri_seti)
+
+        cv2.imwrite(gorsel, np.full((20, 30, 3), 7, dtype=np.uint8))
+        self.cache.prepare(veri_seti, imgsz=160)
+        assert np.array_equal(np.load(self._diziler(veri_seti)['agac_0.npy']), cv2.imread(gorsel))
+
+    def test_disabled_cache_and_manifest(self):
+        """Kapalı önbellek eski dizileri kaldırmalı; manifest veri setinin önbelleksiz kaldığı loglanmalı"""
+        veri_seti = self._veri_seti("veri_seti")
+        self.cache.prepare(veri_seti, imgsz=160)
+        kapali = DatasetImageCache(self.cache.cache_dir, enabled=False)
+        assert kapali.prepare(veri_seti, imgsz=160)['removed'] == 3
+        assert self._diziler(veri_seti) == {}
+
+        manifest = os.path.join(self.temp_dir, "manifest")
+        ZeytinModelTrainer().prepare_dataset(os.path.join(self.kaynak, "images"),
+                                             os.path.join(self.kaynak, "labels"), manifest, mode="manifest")
+        with patch('app.dataset_cache.logger') as log:
+            stats = self.cache.prepare(manifest, imgsz=160)
+        assert stats['images'] == 0
+        assert 'önbelleğe alınmaz' in log.warning.call_args[0][0]
+
+    def test_prune_keeps_dataset_links(self):
+        """Boyut sınırı en eski kayıtları silmeli, veri setindeki diziler geçerli kalmalı"""
+        veri_seti = self._veri_seti("veri_seti")
+        sinirli = DatasetImageCache(self.cache.cache_dir, max_mb=0.05)
+        stats = sinirli.prepare(veri_seti, imgsz=160)
+
+        assert stats['pruned'] > 0
+        assert sinirli.get_stats()['size_mb'] <= 0.05
+        assert all(np.load(yol).ndim == 3 for yol in self._diziler(veri_seti).values())
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+import pytest
+import os
+import sys
+import time
+import threading
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.pipeline import StagedPipeline
+
+class TestStagedPipeline:
+    """Okuma / çıkarım / yazma işleme hattı testleri"""
+
+    @staticmethod
+    def _infer(batch_no, batch):
+        return [data * 10 for _, data in batch]
+
+    @staticmethod
+    def _encode(item, data, output):
+        return (item, output)
+
+    def test_results_keep_input_order(self):
+        """Sonuçlar girdi sırasıyla dönmeli"""
+        def decode(item):
+            time.sleep(0.001 * (10 - item))  # Sonraki öğeler daha hızlı çözülür
+            return item
+
+        hat = StagedPipeline(decode_workers=4, encode_workers=3, queue_size=4, batch_size=3)
+        results, stats = hat.run(range(10), decode, self._infer, self._encode)
+
+        assert results == [(i, i * 10) for i in range(10)]
+        assert stats['items'] == 10
+        assert stats['batches'] == 4
+
+    def test_inference_runs_in_caller_thread(self):
+        """Çıkarım aşaması çağıran thread'de çalışmalı"""
+        caller = threading.current_thread()
+        threads = set()
+
+        def infer(batch_no, batch):
+            threads.add(threading.current_thread())
+            return [data for _, data in batch]
+
+        hat = StagedPipeline(batch_size=2)
+        hat.run(range(5), lambda item: item, infer, self._encode)
+
+        assert threads == {caller}
+
+    def test_prefetch_is_bounded(self):
+        """Önden okuma kuyruk boyutunu aşmamalı"""
+        in_flight = []
+        lock = threading.Lock()
+        state = {'decoded': 0, 'consumed': 0}
+
+        def decode(item):
+            with lock:
+                state['decoded'] += 1
+                in_flight.append(state['decoded'] - state['consumed'])
+            return item
+
+        def infer(batch_no, batch):
+            time.sleep(0.01)
+            with lock:
+                state['consumed'] += len(batch)
+            return [data for _, data in batch]
+
+        hat = StagedPipeline(decode_workers=4, queue_size=3, batch_size=1)
+        results, stats = hat.run(range(20), decode, infer, self._encode)
+
+        assert len(results) == 20
+        assert stats['decode_queue']['max'] <= 3
+        # Kuyrukta bekleyenler + çıkarımdaki batch + besleyicinin elindeki öğe
+        assert max(in_flight) <= 3 + 2
+
+    def test_stage_errors_skip_items(self):
+        """Okuma ve yazma hataları yalnızca ilgili öğeyi atlamalı"""
+        errors = []
+
+        def decode(item):
+            if item == 2:
+                raise ValueError("bozuk görsel")
+            return None if item == 3 else item
+
+        def encode(item, data, output):
+            if item == 4:
+                raise IOError("disk dolu")
+            return item
+
+        hat = StagedPipeline(batch_size=2)
+        results, _ = hat.run(range(6), decode, self._infer, encode,
+                             on_error=lambda stage, items, exc: errors.append((stage, items)))
+
+        assert results == [0, 1, 5]
+        assert ('decode', [2]) in errors
+        assert ('encode', [4]) in errors
+
+    def test_stats_report_stage_timings(self):
+        """Aşama süreleri ve kuyruk derinlikleri raporlanmalı"""
+        hat = StagedPipeline()
+        _, stats = hat.run([], lambda item: item, self._infer, self._encode)
+
+        for key in ('decode_time', 'infer_time', 'encode_time', 'infer_wait', 'encode_wait', 'total_time'):
+            assert key in stats
+        assert set(stats['decode_queue']) == {'avg', 'max'}
+        assert set(stats['encode_queue']) == {'avg', 'max'}
+        assert stats['items'] == 0
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
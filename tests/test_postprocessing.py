@@ -0,0 +1,131 @@
+import pytest
+import os
+import sys
+import tempfile
+import asyncio
+import cv2
+import numpy as np
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai_analysis import ZeytinAnalizci
+from app.config import settings
+from app.constants import (
+    YOLO_TREE_CLASS, YOLO_OLIVE_CLASS,
+    DEFAULT_OLIVES_PER_DETECTION, OLIVE_DIAMETER_COEFFICIENT
+)
+from app.detections import Detections
+from app.inference_backends import InferenceBackend
+
+class TestDetectionPostProcessing:
+    """Vektörel tespit son işleme testleri"""
+
+    @pytest.fixture
+    def analiz_klasoru(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    @staticmethod
+    def _tespitler() -> Detections:
+        esik = settings.CONFIDENCE_THRESHOLD
+        return Detections(
+            np.array([
+                [0, 0, 40, 40],     # ağaç
+                [50, 50, 70, 90],   # ağaç
+                [10, 10, 30, 30],   # eşik altı ağaç
+                [5, 5, 9, 9],       # zeytin
+                [60, 5, 64, 9]      # eşik altı zeytin
+            ]),
+            np.array([esik + 0.3, esik + 0.1, esik, esik + 0.2, esik - 0.1]),
+            np.array([YOLO_TREE_CLASS, YOLO_TREE_CLASS, YOLO_TREE_CLASS, YOLO_OLIVE_CLASS, YOLO_OLIVE_CLASS])
+        )
+
+    def test_counts_and_diameter(self, analiz_klasoru):
+        """Sayım ve çap yalnızca eşik üstü tespitlerden hesaplanmalı"""
+        analizci = ZeytinAnalizci()
+        gorsel = np.zeros((100, 100, 3), dtype=np.uint8)
+        log_yolu = os.path.join(analiz_klasoru, "analiz.log")
+
+        detay = analizci._dosya_sonucunu_isle("test.jpg", gorsel, self._tespitler(), 0.1,
+                                             analiz_klasoru, log_yolu)
+
+        assert detay['agac_sayisi'] == 2
+        assert detay['zeytin_sayisi'] == DEFAULT_OLIVES_PER_DETECTION
+        assert detay['ortalama_cap'] == pytest.approx((40 + 20) * OLIVE_DIAMETER_COEFFICIENT / 2)
+        assert os.path.exists(os.path.join(analiz_klasoru, "isretli_test.jpg"))
+
+    def test_empty_detections(self, analiz_klasoru):
+        """Tespit yoksa sayımlar sıfır olmalı ve görsel değişmemeli"""
+        analizci = ZeytinAnalizci()
+        gorsel = np.zeros((50, 50, 3), dtype=np.uint8)
+        log_yolu = os.path.join(analiz_klasoru, "analiz.log")
+
+        detay = analizci._dosya_sonucunu_isle("bos.jpg", gorsel, Detections.empty(), 0.1,
+                                             analiz_klasoru, log_yolu)
+
+        assert detay['agac_sayisi'] == 0
+        assert detay['zeytin_sayisi'] == 0
+        assert detay['ortalama_cap'] == 0
+        assert np.array_equal(analizci._gorseli_isaretle(gorsel, Detections.empty()), gorsel)
+
+class _SahteBackend(InferenceBackend):
+    """Görseldeki piksel değeri kadar ağaç tespiti döndürür; çağrı başına batch boyutunu kaydeder"""
+
+    name = "sahte"
+
+    def __init__(self):
+        super().__init__("yok.pt")
+        self.batch_boyutlari = []
+
+    def predict(self, images, conf):
+        self.batch_boyutlari.append(len(images))
+        sonuclar = []
+        for image in images:
+            adet = int(image[0, 0, 0])
+            sonuclar.append(Detections(
+                np.array([[i * 4, 0, i * 4 + 3, 3] for i in range(adet)]).reshape(-1, 4),
+                np.full(adet, min(conf + 0.1, 1.0)),
+                np.full(adet, YOLO_TREE_CLASS)
+            ))
+        return sonuclar
+
+class TestBatchInference:
+    """RGB dosyalarının batch çıkarımı testleri"""
+
+    def test_batches_map_back_to_files(self):
+        """Her batch tek çağrıda çalışmalı, metrik kaydı düşmeli ve sonuçlar doğru dosyaya eşlenmeli"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yukleme_klasoru = os.path.join(temp_dir, "yuklenen")
+            analiz_klasoru = os.path.join(temp_dir, "analiz")
+            os.makedirs(yukleme_klasoru)
+            os.makedirs(analiz_klasoru)
+
+            # Dosya i'de i + 1 ağaç var; kayıpsız PNG piksel değerini korur
+            dosyalar = [f"gorsel_{i}.png" for i in range(5)]
+            for i, dosya_adi in enumerate(dosyalar):
+                cv2.imwrite(os.path.join(yukleme_klasoru, dosya_adi), np.full((32, 32, 3), i + 1, dtype=np.uint8))
+
+            analizci = ZeytinAnalizci()
+            analizci.yolo_model = _SahteBackend()
+            with patch('app.config.settings.INFERENCE_BATCH_SIZE', 2), \
+                 patch('app.config.settings.TILED_INFERENCE_ENABLED', False):
+                sonuc = asyncio.run(analizci._rgb_analiz(yukleme_klasoru, dosyalar, analiz_klasoru,
+                                                         os.path.join(temp_dir, "analiz.log")))
+
+        assert analizci.yolo_model.batch_boyutlari == [2, 2, 1]
+        metrikler = sonuc['batch_metrikleri']
+        assert [m['batch'] for m in metrikler] == [1, 2, 3]
+        assert [m['dosya_sayisi'] for m in metrikler] == [2, 2, 1]
+        assert all(m['sure'] >= 0 and m['gorsel_basina_sure'] == pytest.approx(m['sure'] / m['dosya_sayisi'])
+                   for m in metrikler)
+
+        assert [d['dosya'] for d in sonuc['detaylar']] == dosyalar
+        assert [d['agac_sayisi'] for d in sonuc['detaylar']] == [1, 2, 3, 4, 5]
+        assert [d['batch'] for d in sonuc['detaylar']] == [1, 1, 2, 2, 3]
+        assert sonuc['toplam_agac'] == 15
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,89 @@
+import pytest
+import os
+import sys
+import asyncio
+import multiprocessing
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.progress import ProgressBroker
+
+class TestProgressBroker:
+    """Analiz ilerleme yayını testleri"""
+
+    @pytest.mark.asyncio
+    async def test_subscriber_receives_events(self):
+        """Abone yayınlanan olayları sırasıyla almalı"""
+        broker = ProgressBroker()
+        kuyruk, kacirilanlar, bitti = broker.subscribe("a1")
+
+        broker.publish("a1", {'tip': 'dosya', 'dosya': 'x.jpg'})
+        broker.publish("a1", {'tip': 'sonuc'})
+
+        olaylar = [await asyncio.wait_for(kuyruk.get(), 1) for _ in range(2)]
+        assert kacirilanlar == [] and bitti is False
+        assert [o['tip'] for o in olaylar] == ['dosya', 'sonuc']
+        assert [o['seq'] for o in olaylar] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_late_subscriber_gets_replay(self):
+        """Sonradan bağlanan abone kaçırdığı olayları almalı"""
+        broker = ProgressBroker()
+        for i in range(3):
+            broker.publish("a1", {'tip': 'dosya', 'i': i})
+        broker.publish("a1", {'tip': 'sonuc'})
+
+        _, kacirilanlar, bitti = broker.subscribe("a1", after_seq=2)
+
+        assert [o['seq'] for o in kacirilanlar] == [3, 4]
+        assert bitti is True
+
+    @pytest.mark.asyncio
+    async def test_new_run_clears_history(self):
+        """Biten kanalda yeni analiz başlarsa eski olaylar tekrar gönderilmemeli"""
+        broker = ProgressBroker()
+        broker.publish("a1", {'tip': 'basladi'})
+        broker.publish("a1", {'tip': 'hata'})
+        broker.publish("a1", {'tip': 'basladi'})
+
+        _, kacirilanlar, bitti = broker.subscribe("a1")
+
+        assert [o['tip'] for o in kacirilanlar] == ['basladi']
+        assert bitti is False
+
+    @pytest.mark.asyncio
+    async def test_relay_preserves_order(self):
+        """Worker kuyruğundan gelen olaylar ve sıralı nihai olay aynı sırada teslim edilmeli"""
+        broker = ProgressBroker()
+        queue = multiprocessing.get_context("spawn").SimpleQueue()
+        broker.attach_queue(queue)
+        kuyruk, _, _ = broker.subscribe("a1")
+
+        # Worker tarafı
+        for i in range(5):
+            queue.put(("a1", {'tip': 'dosya', 'i': i}))
+        broker.publish_ordered("a1", {'tip': 'sonuc'})
+
+        olaylar = [await asyncio.wait_for(kuyruk.get(), 2) for _ in range(6)]
+        broker.detach_queue()
+
+        assert [o.get('i') for o in olaylar[:5]] == list(range(5))
+        assert olaylar[-1]['tip'] == 'sonuc'
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe(self):
+        """Aboneliği biten kuyruğa olay gönderilmemeli"""
+        broker = ProgressBroker()
+        kuyruk, _, _ = broker.subscribe("a1")
+        broker.unsubscribe("a1", kuyruk)
+
+        broker.publish("a1", {'tip': 'dosya'})
+        await asyncio.sleep(0)
+
+        assert kuyruk.empty()
+        assert broker.get_stats()['subscribers'] == 0
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
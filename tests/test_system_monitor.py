@@ -0,0 +1,66 @@
+import pytest
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.system_monitor import SystemMonitor
+
+class TestSystemMonitor:
+    """Arka plan sistem kaynak örnekleyicisi testleri"""
+
+    def test_latest_does_not_block(self):
+        """İlk okuma bile beklemeden dönmeli ve örnekleyiciyi başlatmalı"""
+        monitor = SystemMonitor(interval=60)
+
+        start_time = time.perf_counter()
+        sample = monitor.latest()
+        elapsed = time.perf_counter() - start_time
+        monitor.stop()
+
+        assert elapsed < 0.5
+        assert 'cpu_percent' in sample
+        assert 'disk_percent' in sample
+        assert 'gpu' in sample
+        assert sample['age'] >= 0
+
+    def test_background_sampling_fills_ring_buffer(self):
+        """Örnekleyici periyodik çalışmalı, tampon boyutu sınırlı kalmalı"""
+        monitor = SystemMonitor(interval=0.1, history_size=3)
+
+        monitor.start()
+        time.sleep(0.6)
+        monitor.stop()
+
+        assert len(monitor.history()) == 3
+        assert not monitor.running
+
+    def test_summary_min_avg_max(self):
+        """Geçmiş özeti alan başına min / ort / maks içermeli"""
+        monitor = SystemMonitor(interval=60)
+
+        with patch('psutil.cpu_percent', side_effect=[10.0, 30.0, 50.0]):
+            for _ in range(3):
+                monitor.sample_now()
+
+        summary = monitor.summary()
+
+        assert summary['samples'] == 3
+        assert summary['cpu_percent'] == {'min': 10.0, 'avg': 30.0, 'max': 50.0}
+
+    def test_history_window(self):
+        """Zaman penceresi dışındaki örnekler özetlenmemeli"""
+        monitor = SystemMonitor(interval=60)
+        monitor.sample_now()
+        monitor._samples[0]['timestamp'] -= 120
+        monitor.sample_now()
+
+        assert len(monitor.history()) == 2
+        assert len(monitor.history(seconds=60)) == 1
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,154 @@
+import pytest
+import os
+import sys
+import numpy as np
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.detections import Detections
+from app.tiling import tile_windows, nms, batched_nms, TiledInference, configure_torch_threads
+
+class TestTileWindows:
+    """Karo penceresi üretimi testleri"""
+
+    def test_windows_cover_whole_image(self):
+        """Karolar görselin tamamını kaplamalı"""
+        windows = tile_windows(2500, 3100, 640, 128)
+        covered = np.zeros((2500, 3100), dtype=bool)
+        for x1, y1, x2, y2 in windows:
+            covered[y1:y2, x1:x2] = True
+
+        assert covered.all()
+
+    def test_windows_have_equal_size(self):
+        """Görsel karodan büyükse tüm karolar aynı boyutta olmalı"""
+        windows = tile_windows(2500, 3100, 640, 128)
+
+        assert np.all(windows[:, 2] - windows[:, 0] == 640)
+        assert np.all(windows[:, 3] - windows[:, 1] == 640)
+
+    def test_overlap_between_neighbours(self):
+        """Komşu karolar en az overlap kadar örtüşmeli"""
+        windows = tile_windows(640, 3000, 640, 128)
+        x_starts = np.sort(np.unique(windows[:, 0]))
+
+        assert np.all(np.diff(x_starts) <= 640 - 128)
+
+    def test_small_image_single_window(self):
+        """Karodan küçük görsel tek karo olmalı"""
+        windows = tile_windows(300, 400, 640, 128)
+
+        assert windows.tolist() == [[0, 0, 400, 300]]
+
+class TestNMS:
+    """Vektörel NMS testleri"""
+
+    def test_suppresses_overlapping_boxes(self):
+        """Yüksek örtüşmeli düşük skorlu kutu elenmeli"""
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float32)
+        scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+
+        keep = nms(boxes, scores, 0.5)
+
+        assert sorted(keep.tolist()) == [0, 2]
+
+    def test_ios_merges_partial_box(self):
+        """Karo sınırında kesilmiş kısmi kutu IoS ile birleştirilmeli"""
+        boxes = np.array([[0, 0, 100, 100], [60, 0, 100, 100]], dtype=np.float32)
+        scores = np.array([0.9, 0.8], dtype=np.float32)
+
+        assert len(nms(boxes, scores, 0.5, metric="iou")) == 2
+        assert len(nms(boxes, scores, 0.5, metric="ios")) == 1
+
+    def test_batched_nms_keeps_classes_apart(self):
+        """Farklı sınıftaki örtüşen kutular korunmalı"""
+        detections = Detections(
+            np.array([[0, 0, 10, 10], [0, 0, 10, 10]]),
+            np.array([0.9, 0.8]),
+            np.array([0, 1])
+        )
+
+        assert len(batched_nms(detections, 0.5)) == 2
+
+    def test_empty_input(self):
+        """Boş girdi hata vermemeli"""
+        assert len(batched_nms(Detections.empty())) == 0
+
+class TestTiledInference:
+    """Karo tabanlı çıkarım motoru testleri"""
+
+    @staticmethod
+    def _object_predictor(objects: np.ndarray):
+        """Global koordinatlardaki nesneleri karo içinde görünen kısmıyla döndüren sahte model"""
+        def predict(tiles):
+            results = []
+            for tile in tiles:
+                x_off, y_off = int(tile[0, 0, 0]), int(tile[0, 0, 1])
+                h, w = tile.shape[:2]
+                clipped = objects.copy()
+                clipped[:, [0, 2]] = np.clip(clipped[:, [0, 2]] - x_off, 0, w)
+                clipped[:, [1, 3]] = np.clip(clipped[:, [1, 3]] - y_off, 0, h)
+                visible = (clipped[:, 2] - clipped[:, 0] > 0) & (clipped[:, 3] - clipped[:, 1] > 0)
+                results.append(Detections(clipped[visible], np.full(visible.sum(), 0.9), np.zeros(visible.sum())))
+            return results
+        return predict
+
+    @staticmethod
+    def _coordinate_image(height: int, width: int) -> np.ndarray:
+        """Her pikselde kendi (x, y) koordinatını taşıyan görsel"""
+        image = np.zeros((height, width, 2), dtype=np.int32)
+        image[..., 0] = np.arange(width)[None, :]
+        image[..., 1] = np.arange(height)[:, None]
+        return image
+
+    def test_seam_duplicates_are_merged(self):
+        """Karo sınırındaki nesne tek tespit olarak kalmalı"""
+        objects = np.array([[500, 500, 560, 560], [100, 100, 140, 140]], dtype=np.float32)
+        image = self._coordinate_image(1500, 1500)
+        engine = TiledInference(tile_size=640, overlap=128, batch_size=4)
+
+        result = engine.run(image, [self._object_predictor(objects)])
+
+        assert result['tile_count'] == 9
+        assert result['raw_detections'] > len(objects)
+        assert len(result['detections']) == len(objects)
+        np.testing.assert_allclose(np.sort(result['detections'].xyxy, axis=0), np.sort(objects, axis=0))
+
+    def test_parallel_matches_sequential(self):
+        """Paralel mod sıralı modla aynı sonucu vermeli"""
+        objects = np.array([[500, 500, 560, 560], [1200, 300, 1250, 350]], dtype=np.float32)
+        image = self._coordinate_image(1500, 1500)
+        predictor = self._object_predictor(objects)
+
+        sequential = TiledInference(tile_size=640, overlap=128, batch_size=2, workers=1).run(image, [predictor])
+        parallel = TiledInference(tile_size=640, overlap=128, batch_size=2, workers=3).run(image, [predictor] * 3)
+
+        assert parallel['workers'] == 3
+        np.testing.assert_allclose(np.sort(parallel['detections'].xyxy, axis=0),
+                                   np.sort(sequential['detections'].xyxy, axis=0))
+
+    def test_parallel_run_leaves_torch_threads_alone(self):
+        """Paralel karo çalıştırması süreç geneli torch thread ayarını değiştirmemeli"""
+        objects = np.array([[500, 500, 560, 560]], dtype=np.float32)
+        image = self._coordinate_image(1500, 1500)
+        predictor = self._object_predictor(objects)
+
+        with patch('torch.set_num_threads') as set_num_threads:
+            TiledInference(tile_size=640, overlap=128, batch_size=2, workers=2).run(image, [predictor] * 2)
+
+        set_num_threads.assert_not_called()
+
+    def test_configure_torch_threads_splits_cores(self):
+        """Worker başlatıcısı çekirdekleri karo worker'ları arasında bölmeli"""
+        with patch('app.tiling.os.cpu_count', return_value=8), \
+             patch('torch.set_num_threads') as set_num_threads:
+            assert configure_torch_threads(4) == 2
+            assert configure_torch_threads(16) == 1
+
+        assert [call.args[0] for call in set_num_threads.call_args_list] == [2, 1]
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,205 @@
+import pytest
+import os
+import sys
+import time
+import tempfile
+import shutil
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Test için gerekli importlar
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db
+from app.constants import ERROR_MESSAGES
+from app.job_queue import JOB_PENDING, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from app.training_jobs import (
+    TrainingJobStore, TrainingJobManager, TrainingWatchdog, TrainingStopped, epoch_ozeti, egitim_klasoru
+)
+
+def _sahte_trainer(epochs: int):
+    return SimpleNamespace(
+        epoch=0, epochs=epochs, tloss=(0.5, 0.25, 1.0), metrics={},
+        label_loss_items=lambda kayiplar, prefix: {f"{prefix}/{ad}": deger
+                                                   for ad, deger in zip(('box_loss', 'cls_loss', 'dfl_loss'), kayiplar)}
+    )
+
+def _sahte_egitim(job, ilerleme):
+    """ultralytics yerine: callback'leri gerçek eğitimle aynı sırada çağırır"""
+    callbacks = ilerleme.callbacks()
+    trainer = _sahte_trainer(job['payload']['epochs'])
+    for epoch in range(trainer.epochs):
+        trainer.epoch = epoch
+        callbacks['on_train_epoch_start'](trainer)
+        for _ in range(job['payload'].get('batches', 2)):
+            time.sleep(0.05)
+            callbacks['on_train_batch_end'](trainer)
+        trainer.metrics = {'metrics/mAP50(B)': 0.1 * (epoch + 1)}
+        callbacks['on_fit_epoch_end'](trainer)
+    return {'model_path': f"models/{job['model_name']}.pt"}
+
+class TestEpochSummary:
+    """Epoch ilerleme kaydı testleri"""
+
+    def test_summary_fields(self):
+        """Kayıplar, toplam kayıp, mAP ve süre trainer durumundan okunmalı"""
+        trainer = _sahte_trainer(10)
+        trainer.epoch = 2
+        trainer.metrics = {'metrics/mAP50(B)': 0.61234567, 'metrics/mAP50-95(B)': 0.4}
+
+        ozet = epoch_ozeti(trainer, 12.3456)
+        assert ozet['epoch'] == 3 and ozet['epochs'] == 10
+        assert ozet['loss'] == {'box_loss': 0.5, 'cls_loss': 0.25, 'dfl_loss': 1.0}
+        assert ozet['loss_total'] == 1.75
+        assert ozet['map50'] == 0.61235 and ozet['map50_95'] == 0.4
+        assert ozet['precision'] is None
+        assert ozet['epoch_time'] == 12.346
+
+class TestTrainingJobs:
+    """Arka plan eğitim işi testleri"""
+
+    def setup_method(self):
+        """Her test öncesi çalışır"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.patches = [
+            patch('app.config.settings.DATABASE_URL', os.path.join(self.temp_dir, "test.db")),
+            patch('app.config.settings.TRAINING_JOBS_DIR', os.path.join(self.temp_dir, "training")),
+            patch('app.config.settings.TRAINING_HEARTBEAT_SECONDS', 0)
+        ]
+        for p in self.patches:
+            p.start()
+        init_db()
+        self.store = TrainingJobStore()
+        self.manager = TrainingJobManager(self.store, max_concurrent=1, calistirici=_sahte_egitim)
+
+    def teardown_method(self):
+        """Her test sonrası çalışır"""
+        for process in self.manager._processes.values():
+            process.kill()
+            process.join()
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _bekle(self, job_id: str, kosul, timeout: float = 60.0) -> dict:
+        son = time.monotonic() + timeout
+        while time.monotonic() < son:
+            self.manager.tick()
+            job = self.manager.get(job_id)
+            if kosul(job):
+                return job
+            time.sleep(0.1)
+        pytest.fail(f"Eğitim işi beklenen duruma gelmedi: {self.manager.get(job_id)}")
+
+    def test_job_runs_in_process_and_reports_epochs(self):
+        """İş ayrı süreçte çalışmalı; her epoch'un ilerlemesi kaydedilmeli"""
+        job_id = self.manager.submit("zeytin_test", {'epochs': 3})
+        assert self.store.get(job_id)['durum'] == JOB_PENDING
+
+        job = self._bekle(job_id, lambda j: j['durum'] == JOB_DONE)
+        assert job['pid'] and job['pid'] != os.getpid()
+        assert [e['epoch'] for e in job['epoch_gecmisi']] == [1, 2, 3]
+        assert job['epoch_gecmisi'][-1]['map50'] == pytest.approx(0.3)
+        assert job['epoch_gecmisi'][0]['loss_total'] == 1.75
+        assert job['epoch_gecmisi'][0]['epoch_time'] > 0
+        assert job['ilerleme'] == 100.0
+        assert job['sonuc'] == {'model_path': "models/zeytin_test.pt"}
+
+    def test_concurrency_limit_and_pending_cancel(self):
+        """Sınır doluyken ikinci iş beklemeli; bekleyen iş hemen iptal edilebilmeli"""
+        ilk = self.manager.submit("ilk", {'epochs': 50})
+        ikinci = self.manager.submit("ikinci", {'epochs': 1})
+        self.manager.tick()
+
+        assert self.store.get(ilk)['durum'] == JOB_RUNNING
+        assert self.store.get(ikinci)['durum'] == JOB_PENDING
+        assert self.manager.cancel(ikinci) == JOB_CANCELLED
+        assert self.manager.cancel("yok") is None
+
+    def test_cancel_and_resume(self):
+        """Çalışan eğitim iptal edilmeli, checkpoint varsa devam ettirilebilmeli"""
+        job_id = self.manager.submit("zeytin_test", {'epochs': 1000, 'batches': 5})
+        self._bekle(job_id, lambda j: j['epoch'] >= 1)
+
+        assert self.manager.cancel(job_id, "admin") == JOB_RUNNING
+        assert self.manager.get(job_id)['iptal_istendi']
+        job = self._bekle(job_id, lambda j: j['durum'] == JOB_CANCELLED)
+        assert 'devam' in job['hata_mesaji']
+
+        # Checkpoint olmadan devam ettirilemez
+        assert not job['devam_ettirilebilir']
+        assert not self.manager.resume(job_id)
+
+        weights = os.path.join(egitim_klasoru(job), 'weights')
+        os.makedirs(weights)
+        open(os.path.join(weights, 'last.pt'), 'wb').close()
+        assert self.manager.get(job_id)['devam_ettirilebilir']
+        assert self.manager.resume(job_id)
+
+        job = self.store.get(job_id)
+        assert job['durum'] == JOB_PENDING and job['devam'] == 1
+        assert not self.manager.get(job_id)['iptal_istendi']
+
+    def test_crashed_process_is_failed(self):
+        """İşi sonuçlandırmadan ölen süreç hata olarak kaydedilmeli"""
+        job_id = self.manager.submit("zeytin_test", {'epochs': 1000})
+        self._bekle(job_id, lambda j: j['epoch'] >= 1)
+        self.manager._processes[job_id].kill()
+
+        job = self._bekle(job_id, lambda j: j['durum'] == JOB_FAILED)
+        assert 'çıkış kodu' in job['hata_mesaji']
+
+    def test_memory_cap_stops_training(self):
+        """Bellek sınırı aşılınca izleyici eğitimi hata ile durdurmalı"""
+        job_id = self.store.submit("zeytin_test", {'epochs': 1})
+        job = self.store.claim("test", 1)
+        izleyici = TrainingWatchdog(self.store, job)
+
+        with patch('app.config.settings.TRAINING_MAX_MEMORY_MB', 1):
+            izleyici._adim()
+        with pytest.raises(TrainingStopped) as hata:
+            izleyici.kontrol()
+        assert hata.value.durum == JOB_FAILED
+        assert 'Bellek sınırı' in str(hata.value)
+        assert self.store.get(job_id)['durum'] == JOB_RUNNING
+
+    def test_cancel_and_resume_endpoints(self):
+        """İptal / devam uç noktaları iş durumunu doğru HTTP yanıtlarıyla döndürmeli"""
+        from fastapi.testclient import TestClient
+        from app.main import app, get_admin_user_from_header
+
+        app.dependency_overrides[get_admin_user_from_header] = lambda: {'kullanici_adi': "admin", 'rol': "admin"}
+        try:
+            with patch('app.main.training_job_manager', self.manager):
+                client = TestClient(app)
+                job_id = self.manager.submit("zeytin_test", {'epochs': 1})
+
+                response = client.post(f"/models/train/{job_id}/cancel")
+                assert response.status_code == 200
+                assert response.json()['durum'] == JOB_CANCELLED
+                assert not response.json()['iptal_istendi']
+                assert client.post("/models/train/yok/cancel").status_code == 404
+
+                # Checkpoint yokken devam ettirilemez
+                assert client.post(f"/models/train/{job_id}/resume").status_code == 409
+                weights = os.path.join(egitim_klasoru(self.store.get(job_id)), 'weights')
+                os.makedirs(weights)
+                open(os.path.join(weights, 'last.pt'), 'wb').close()
+
+                response = client.post(f"/models/train/{job_id}/resume")
+                assert response.status_code == 202
+                assert response.json()['durum'] == JOB_PENDING
+                assert self.store.get(job_id)['devam'] == 1
+                assert client.post("/models/train/yok/resume").status_code == 404
+
+                # Beklenen çakışmalar production'da sistem hatası gibi görünmemeli
+                with patch('app.config.settings.ENVIRONMENT', "production"):
+                    response = client.post(f"/models/train/{job_id}/resume")
+                assert response.status_code == 409
+                assert response.json()['detail'] == ERROR_MESSAGES["conflict"]
+        finally:
+            app.dependency_overrides.pop(get_admin_user_from_header, None)
+
+# Test çalıştırma
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])